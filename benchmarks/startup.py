@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measures how long ndexloadbiogrid.py takes to start for invocations
+that do not build networks and lists the modules it imports at startup
+
+Run from the root of the repository::
+
+    python benchmarks/startup.py --repeat 10
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import biogrid_fixtures
+
+
+HEAVY_MODULES = ['pandas', 'numpy', 'networkx', 'ndex2', 'py4cytoscape',
+                 'requests', 'tqdm', 'pyarrow', 'ndexutil.tsv.tsv2nicecx2']
+"""
+Modules that should only be imported by the stages that use them
+"""
+
+
+def _parse_arguments(args):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of times to run each invocation')
+    return parser.parse_args(args)
+
+
+def _get_invocations(datadir):
+    """
+    :return: (name, arguments to ndexloadbiogrid.py)
+    :rtype: list
+    """
+    conf = os.path.join(datadir, 'conf')
+    with open(conf, 'w') as f:
+        f.write('[ndexbiogridloader]\nuser = bob\npassword = x\n'
+                'server = localhost\n')
+    report = os.path.join(datadir, 'report.json')
+    with open(report, 'w') as f:
+        f.write('{"biogridVersion": "1.0.0", "exitCode": 0, "entries": []}')
+    return [('--version', ['--version']),
+            ('-h', ['-h']),
+            ('--plan-only', [datadir, '--skipdownload', '--plan-only',
+                             '--conf', conf,
+                             '--biogridversion', '1.0.0',
+                             '--organismfile',
+                             os.path.join(datadir, 'organism_list.txt'),
+                             '--chemicalsfile',
+                             os.path.join(datadir, 'chemicals_list.txt')]),
+            ('--mergereports', [datadir, '--mergereports', report])]
+
+
+def _time_invocation(args, repeat):
+    """
+    :return: seconds taken by each run
+    :rtype: list
+    """
+    cmd = [sys.executable, '-m', 'ndexbiogridloader.ndexloadbiogrid'] + args
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _get_heavy_modules_imported():
+    """
+    :return: modules in :py:const:`HEAVY_MODULES` imported by
+             importing ndexloadbiogrid
+    :rtype: list
+    """
+    code = ('import sys\n'
+            'import ndexbiogridloader.ndexloadbiogrid\n'
+            'print(" ".join(m for m in ' + repr(HEAVY_MODULES) +
+            ' if m in sys.modules))\n')
+    res = subprocess.run([sys.executable, '-c', code],
+                         stdout=subprocess.PIPE, universal_newlines=True)
+    return res.stdout.split()
+
+
+def main(args):
+    theargs = _parse_arguments(args[1:])
+    datadir = tempfile.mkdtemp()
+    try:
+        biogrid_fixtures.create_release_files(datadir)
+        sys.stdout.write('{:<16} {:>10} {:>10}\n'.format('Invocation',
+                                                         'Min (s)',
+                                                         'Median (s)'))
+        baseline_cmd = [sys.executable, '-c', 'pass']
+        baseline = []
+        for i in range(theargs.repeat):
+            start = time.perf_counter()
+            subprocess.run(baseline_cmd)
+            baseline.append(time.perf_counter() - start)
+        sys.stdout.write('{:<16} {:>10.3f} {:>10.3f}\n'.format('python',
+                                                               min(baseline),
+                                                               statistics.median(baseline)))
+        for name, invocation_args in _get_invocations(datadir):
+            times = _time_invocation(invocation_args, theargs.repeat)
+            sys.stdout.write('{:<16} {:>10.3f} {:>10.3f}\n'.format(name, min(times),
+                                                                   statistics.median(times)))
+        heavy = _get_heavy_modules_imported()
+        sys.stdout.write('\nHeavy modules imported at startup: ' +
+                         (', '.join(heavy) if heavy else 'none') + '\n')
+    finally:
+        shutil.rmtree(datadir)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measures throughput and retries of uploading networks with the
+loader against the local NDEx stand-in in
+:py:mod:`ndexbiogridloader.standin`, for each number of profiles
+networks are uploaded to at once
+
+Each run uploads every network as new, then reloads network
+summaries and uploads them again as updates, like a second
+release would. Run from the root of the repository::
+
+    python benchmarks/upload.py --profiles 1,2,4 --bandwidth 50 \\
+        --latency 0.05 --errorrate 0.1 --maxretries 3 --retrysleep 1
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader import standin
+
+
+def _parse_arguments(args):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--networks', type=int, default=4,
+                        help='Number of networks to upload')
+    parser.add_argument('--size', type=float, default=20,
+                        help='Size of each network in megabytes')
+    parser.add_argument('--profiles', default='1,2,4',
+                        help='Comma separated numbers of profiles to '
+                             'upload each network to at once')
+    parser.add_argument('--cxformat', default='cx',
+                        choices=['cx', 'cx2'],
+                        help='Format networks are uploaded in')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds stand-in waits before answering '
+                             'each request')
+    parser.add_argument('--errorrate', type=float, default=0.0,
+                        help='Fraction of uploads stand-in fails')
+    parser.add_argument('--bandwidth', type=float, default=None,
+                        help='Megabytes per second shared by all uploads')
+    parser.add_argument('--maxretries', type=int, default=3,
+                        help='Value of --maxretries passed to loader')
+    parser.add_argument('--retrysleep', type=int, default=0,
+                        help='Value of --retry_sleep passed to loader')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='Seed of random choice of uploads to fail')
+    return parser.parse_args(args)
+
+
+def _write_network(path, name, size, cxformat):
+    """
+    Writes CX or CX2 network of about ``size`` bytes with nodes only
+    """
+    with open(path, 'w') as f:
+        if cxformat == 'cx2':
+            f.write('[{"CXVersion": "2.0", "hasFragments": false}, '
+                    '{"networkAttributes": [' + json.dumps({'name': name}) +
+                    ']}, {"nodes": [')
+            node = '{"id": %d, "v": {"name": "node%d"}}'
+        else:
+            f.write('[{"numberVerification": [{"longNumber": 281474976710655}]}, '
+                    '{"networkAttributes": [' +
+                    json.dumps({'n': 'name', 'v': name}) + ']}, {"nodes": [')
+            node = '{"@id": %d, "n": "node%d"}'
+        node_id = 0
+        while f.tell() < size:
+            if node_id > 0:
+                f.write(', ')
+            f.write(node % (node_id, node_id))
+            node_id += 1
+        f.write(']}, {"status": [{"error": "", "success": true}]}]')
+
+
+def _create_loader(datadir, num_profiles, port, theargs):
+    """
+    Creates loader with a profile per stand-in account and
+    connects it to the stand-in
+    """
+    conf = os.path.join(datadir, 'conf')
+    profiles = []
+    with open(conf, 'w') as f:
+        for index in range(num_profiles):
+            profiles.append('p' + str(index))
+            f.write('[p{0}]\nuser = user{0}\npassword = x\n'
+                    'server = http://127.0.0.1:{1}\n'.format(index, port))
+    args = ndexloadbiogrid._parse_arguments('desc', [datadir, '--conf', conf,
+                                                     '--profile', ','.join(profiles),
+                                                     '--cxformat', theargs.cxformat,
+                                                     '--maxretries', str(theargs.maxretries),
+                                                     '--retry_sleep', str(theargs.retrysleep)])
+    loader = ndexloadbiogrid.NdexBioGRIDLoader(args)
+    loader._parse_config()
+    loader._create_ndex_connection()
+    return loader
+
+
+def _upload(loader, files):
+    """
+    :return: (seconds taken, exit codes)
+    :rtype: tuple
+    """
+    exit_codes = []
+    start = time.perf_counter()
+    net_summaries, status_code = loader._load_network_summaries_for_user()
+    if status_code != 0:
+        return time.perf_counter() - start, [status_code]
+    for path, name in files:
+        exit_codes.append(loader._upload_cx(path, name))
+    return time.perf_counter() - start, exit_codes
+
+
+def main(args):
+    theargs = _parse_arguments(args[1:])
+    datadir = tempfile.mkdtemp()
+    try:
+        files = []
+        for index in range(theargs.networks):
+            name = 'Benchmark network ' + str(index)
+            path = os.path.join(datadir, 'network' + str(index) + '.' + theargs.cxformat)
+            _write_network(path, name, int(theargs.size * 1048576), theargs.cxformat)
+            files.append((path, name))
+        total_bytes = sum(os.path.getsize(path) for path, name in files)
+
+        sys.stdout.write('{:>8} {:>7} {:>10} {:>10} {:>9} {:>8} {:>6}\n'.format('Profiles', 'Pass',
+                                                                              'Seconds', 'MB/s',
+                                                                              'Attempts', 'Failed',
+                                                                              'Exit'))
+        for num_profiles in [int(p) for p in theargs.profiles.split(',')]:
+            stand_in = standin.NDExStandIn(users={'user' + str(i): 'x'
+                                                  for i in range(num_profiles)},
+                                           latency=theargs.latency,
+                                           error_rate=theargs.errorrate,
+                                           bandwidth=None if theargs.bandwidth is None
+                                           else theargs.bandwidth * 1048576,
+                                           seed=theargs.seed)
+            server = standin.create_server(stand_in)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                loader = _create_loader(datadir, num_profiles,
+                                        server.server_address[1], theargs)
+                for upload_pass in ['create', 'update']:
+                    before = stand_in.get_stats()
+                    seconds, exit_codes = _upload(loader, files)
+                    after = stand_in.get_stats()
+                    megabytes = total_bytes * num_profiles / 1048576
+                    sys.stdout.write('{:>8} {:>7} {:>10.2f} {:>10.1f} {:>9} {:>8} {:>6}\n'.format(
+                        num_profiles, upload_pass, seconds, megabytes / seconds,
+                        after['uploads'] - before['uploads'],
+                        after['failedUploads'] - before['failedUploads'],
+                        max(exit_codes)))
+            finally:
+                server.shutdown()
+                server.server_close()
+    finally:
+        shutil.rmtree(datadir)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv))
@@ -0,0 +1,643 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact storage for BioGRID interactions aggregated by the loader
+"""
+
+import os
+import re
+import math
+import heapq
+import shutil
+import tempfile
+from array import array
+
+
+ORGANISM_CITATION_COLUMN = 8
+"""
+Index of Pubmed ID column in rows of the generated organism TSV
+"""
+
+ORGANISM_CATEGORICAL_COLUMNS = (6, 7, 9, 11, 14, 15)
+"""
+Indexes of low cardinality columns (Experimental System,
+Experimental System Type, Throughput, Modification,
+Organism Interactor A and Organism Interactor B) in rows
+of the generated organism TSV
+"""
+
+CHEMICAL_CITATION_COLUMN = 5
+"""
+Index of Pubmed ID column in rows of the generated chemicals TSV
+"""
+
+CHEMICAL_CATEGORICAL_COLUMNS = (3, 4, 9)
+"""
+Indexes of low cardinality columns (Action, Interaction Type and
+Chemical Type) in rows of the generated chemicals TSV
+"""
+
+INTEGER_CITATION_PATTERN = re.compile('[1-9][0-9]{0,17}')
+"""
+Pattern, used with ``fullmatch``, for citations stored as integers.
+Only ASCII digits and at most 18 of them so the value fits in
+the signed 64 bit ``array`` used for citations
+"""
+
+STORE_BYTES_PER_SOURCE_BYTE = 2.0
+"""
+Estimated bytes of memory used by :py:class:`InteractionStore`
+for each byte of BioGRID file aggregated into it
+"""
+
+MAX_OPEN_PARTITIONS = 32
+"""
+Most partition files a :py:class:`SpillingAggregator` keeps open
+at once. Aggregators needing more partitions re-partition each
+partition instead so several aggregators used together stay
+well under the common limit of 1024 open files
+"""
+
+
+class InteractionStore(object):
+    """
+    Insertion ordered store of aggregated interactions.
+
+    Rows are kept column by column instead of as a list of ``str``
+    per interaction. Low cardinality columns are stored as integer
+    codes into a per column vocabulary, remaining columns hold
+    strings interned within this store so values repeated across
+    rows, such as gene symbols, are kept once. Citations are stored
+    as integers with the rare interaction that has more then one
+    citation keeping the extra ones in an ``array``.
+    """
+
+    def __init__(self, num_columns, citation_column,
+                 categorical_columns=()):
+        """
+        Constructor
+
+        :param num_columns: number of columns in each row
+        :type num_columns: int
+        :param citation_column: index of column holding citations
+        :type citation_column: int
+        :param categorical_columns: indexes of low cardinality columns
+        :type categorical_columns: list or tuple
+        """
+        self._num_columns = num_columns
+        self._citation_column = citation_column
+        self._index = {}
+        self._strings = {}
+        self._columns = []
+        self._vocabularies = {}
+        for col in range(num_columns):
+            if col == citation_column:
+                self._columns.append(None)
+            elif col in categorical_columns:
+                self._columns.append(array('I'))
+                self._vocabularies[col] = ({}, [])
+            else:
+                self._columns.append([])
+        self._first_citation = array('q')
+        self._extra_citations = {}
+        self._citation_vocabulary = ({}, [])
+        # (index, column, codes, values) of each column but the
+        # citation column, codes and values are None unless the
+        # column is low cardinality
+        self._append_plan = []
+        for col, column in enumerate(self._columns):
+            if column is None:
+                continue
+            codes, values = self._vocabularies.get(col, (None, None))
+            self._append_plan.append((col, column, codes, values))
+
+    def __len__(self):
+        return len(self._first_citation)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    @staticmethod
+    def _get_code(vocabulary, value):
+        """
+        Gets code for value from vocabulary adding it if needed
+        """
+        codes, values = vocabulary
+        code = codes.get(value)
+        if code is None:
+            code = len(values)
+            codes[value] = code
+            values.append(value)
+        return code
+
+    def _encode_citation(self, citation):
+        """
+        Citations that are plain integers, which is nearly all
+        Pubmed IDs, are stored as is. Anything else, including
+        digits other then ASCII, is stored as a negative code into
+        a vocabulary
+        """
+        if INTEGER_CITATION_PATTERN.fullmatch(citation) is not None:
+            return int(citation)
+        return -1 - InteractionStore._get_code(self._citation_vocabulary,
+                                               citation)
+
+    def _decode_citation(self, code):
+        if code >= 0:
+            return str(code)
+        return self._citation_vocabulary[1][-1 - code]
+
+    def add_citation(self, key, citation):
+        """
+        Appends citation to interaction with key
+
+        :param key: key of interaction
+        :type key: str
+        :param citation: citation to add
+        :type citation: str
+        :return: ``True`` if interaction with key exists otherwise
+                 ``False`` and nothing is added
+        :rtype: bool
+        """
+        row = self._index.get(key)
+        if row is None:
+            return False
+        extra = self._extra_citations.get(row)
+        if extra is None:
+            extra = array('q')
+            self._extra_citations[row] = extra
+        extra.append(self._encode_citation(citation))
+        return True
+
+    def add(self, key, values):
+        """
+        Adds a new interaction. If interaction with key exists
+        only the citation in ``values`` is added to it.
+
+        :param key: key of interaction
+        :type key: str
+        :param values: row of values as ``str`` with the citation
+                       column holding a single citation
+        :type values: list
+        :return: None
+        """
+        if self.add_citation(key, values[self._citation_column]):
+            return
+        self.append(key, values)
+
+    def append(self, key, values):
+        """
+        Adds a new interaction without checking if key exists, for
+        callers that already tried :py:meth:`add_citation`
+
+        :param key: key of interaction, must not be in store
+        :type key: str
+        :param values: see :py:meth:`add`
+        :type values: list
+        :return: None
+        """
+        self._index[key] = len(self._first_citation)
+        strings = self._strings
+        for col, column, codes, vocabulary in self._append_plan:
+            value = values[col]
+            if codes is None:
+                column.append(strings.setdefault(value, value))
+                continue
+            code = codes.get(value)
+            if code is None:
+                code = len(vocabulary)
+                codes[value] = code
+                vocabulary.append(value)
+            column.append(code)
+        self._first_citation.append(
+            self._encode_citation(values[self._citation_column]))
+
+    def get_citations(self, row):
+        """
+        Gets citations for interaction
+
+        :param row: position of interaction in store
+        :type row: int
+        :return: citations
+        :rtype: list
+        """
+        citations = [self._decode_citation(self._first_citation[row])]
+        extra = self._extra_citations.get(row)
+        if extra is not None:
+            citations.extend([self._decode_citation(c) for c in extra])
+        return citations
+
+    def get_column(self, col):
+        """
+        Gets all values in a column
+
+        :param col: index of column
+        :type col: int
+        :return: values as ``str`` with citations joined by ``|``
+        :rtype: list
+        """
+        column = self._columns[col]
+        if column is None:
+            return ['|'.join(self.get_citations(row))
+                    for row in range(len(self))]
+        vocabulary = self._vocabularies.get(col)
+        if vocabulary is not None:
+            values = vocabulary[1]
+            return [values[code] for code in column]
+        return list(column)
+
+    def get_column_codes(self, col):
+        """
+        Gets integer codes and vocabulary for a low cardinality column
+
+        :param col: index of column
+        :type col: int
+        :return: (codes, values) where value of row ``i`` is
+                 ``values[codes[i]]`` or ``None`` if column
+                 is not a low cardinality column
+        :rtype: tuple
+        """
+        vocabulary = self._vocabularies.get(col)
+        if vocabulary is None:
+            return None
+        return self._columns[col], vocabulary[1]
+
+    def get_row(self, row):
+        """
+        Gets interaction as a list of ``str`` with citations
+        joined by ``|``
+
+        :param row: position of interaction in store
+        :type row: int
+        :return: row of values
+        :rtype: list
+        """
+        values = []
+        for col, column in enumerate(self._columns):
+            if column is None:
+                values.append('|'.join(self.get_citations(row)))
+                continue
+            vocabulary = self._vocabularies.get(col)
+            if vocabulary is not None:
+                values.append(vocabulary[1][column[row]])
+            else:
+                values.append(column[row])
+        return values
+
+    def rows(self):
+        """
+        Generator over interactions in the order they were
+        first added
+
+        :return: rows as returned by :py:meth:`get_row`
+        """
+        for row in range(len(self)):
+            yield self.get_row(row)
+
+    def write_tsv(self, out_file, header):
+        """
+        Writes interactions as tab delimited text
+
+        :param out_file: open file to write to
+        :param header: column names to write as first line
+        :type header: list
+        :return: None
+        """
+        out_file.write('\t'.join(header) + '\n')
+        for values in self.rows():
+            out_file.write('\t'.join(values) + '\n')
+
+
+class InMemoryAggregator(object):
+    """
+    Aggregates rows into a single :py:class:`InteractionStore`
+    """
+
+    def __init__(self, store_factory, key_func, add_func):
+        """
+        Constructor
+
+        :param store_factory: function that creates an empty
+                              :py:class:`InteractionStore`
+        :type store_factory: callable
+        :param key_func: function that takes row and returns its key
+        :type key_func: callable
+        :param add_func: function that takes store, row and key and
+                         adds row to store
+        :type add_func: callable
+        """
+        self._store = store_factory()
+        self._key_func = key_func
+        self._add_func = add_func
+
+    def get_store(self):
+        """
+        :return: store rows are aggregated into
+        :rtype: :py:class:`InteractionStore`
+        """
+        return self._store
+
+    def add(self, row):
+        """
+        Adds row to aggregation
+
+        :param row: row of BioGRID file
+        :type row: list
+        :return: None
+        """
+        self._add_func(self._store, row, self._key_func(row))
+
+    def write(self, out_file, header):
+        """
+        Writes aggregated interactions as tab delimited text
+
+        :param out_file: open file to write to
+        :param header: column names to write as first line
+        :type header: list
+        :return: None
+        """
+        self._store.write_tsv(out_file, header)
+
+    def close(self):
+        """
+        Nothing to release, present so aggregators are interchangeable
+        :return: None
+        """
+        pass
+
+
+class RowSpool(object):
+    """
+    Temporary file rows are written to as they are read and read back
+    once all of them are known, so a file holding rows of many networks
+    can be split in one pass and each part aggregated knowing its size
+    """
+
+    def __init__(self, temp_dir=None):
+        """
+        Constructor
+
+        :param temp_dir: directory for temporary file
+        :type temp_dir: str
+        """
+        self._temp_dir = temp_dir
+        self._path = None
+        self._writer = None
+
+    def add(self, row):
+        """
+        Writes row to temporary file
+
+        :param row: row of BioGRID file
+        :type row: list
+        :return: None
+        """
+        if self._writer is None:
+            fd, self._path = tempfile.mkstemp(prefix='spool_',
+                                              dir=self._temp_dir)
+            self._writer = os.fdopen(fd, 'w')
+        self._writer.write('\t'.join(row).rstrip('\n') + '\n')
+
+    def rows(self):
+        """
+        Reads back rows in the order they were added
+
+        :return: rows split by tab
+        :rtype: iterator
+        """
+        if self._writer is None:
+            return
+        self._writer.close()
+        with open(self._path, 'r') as f:
+            for line in f:
+                yield line.rstrip('\n').split('\t')
+
+    def close(self):
+        """
+        Removes temporary file
+        :return: None
+        """
+        if self._writer is not None:
+            self._writer.close()
+            os.unlink(self._path)
+            self._writer = None
+            self._path = None
+
+
+class SpillingAggregator(object):
+    """
+    Aggregates rows under a memory budget by hash partitioning them
+    on their key into temporary files and aggregating one partition
+    at a time.
+
+    Each partition is aggregated into an :py:class:`InteractionStore`
+    and written to a run file ordered by the line the interaction
+    was first seen on. The run files are then merged so output is
+    in the same order as aggregating every row in a single store.
+
+    At most ``max_open_files`` partitions are written at once. If
+    more partitions are needed, each partition is split again, on
+    other bits of the key hash, before it is aggregated.
+    """
+
+    def __init__(self, num_partitions, store_factory, key_func, add_func,
+                 temp_dir=None, max_open_files=MAX_OPEN_PARTITIONS):
+        """
+        Constructor
+
+        :param num_partitions: number of partitions to split rows into
+        :type num_partitions: int
+        :param store_factory: function that creates an empty
+                              :py:class:`InteractionStore`
+        :type store_factory: callable
+        :param key_func: function that takes row and returns its key
+        :type key_func: callable
+        :param add_func: function that takes store, row and key and
+                         adds row to store
+        :type add_func: callable
+        :param temp_dir: directory for temporary files
+        :type temp_dir: str
+        :param max_open_files: most partition files to keep open
+                               at once
+        :type max_open_files: int
+        """
+        self._num_partitions = num_partitions
+        self._max_open_files = max(2, max_open_files)
+        self._fan_out = min(num_partitions, self._max_open_files)
+        self._store_factory = store_factory
+        self._key_func = key_func
+        self._add_func = add_func
+        self._temp_dir = temp_dir
+        self._work_dir = None
+        self._partition_files = None
+        self._writers = None
+        self._line_num = 0
+
+    def _open(self):
+        """
+        Creates temporary directory and partition files
+        """
+        self._work_dir = tempfile.mkdtemp(prefix='aggregate_',
+                                          dir=self._temp_dir)
+        self._partition_files = [os.path.join(self._work_dir,
+                                              'partition_' + str(i))
+                                 for i in range(self._fan_out)]
+        self._writers = [open(p, 'w') for p in self._partition_files]
+
+    def add(self, row):
+        """
+        Writes row prefixed with its line number to the
+        partition file chosen by hashing its key
+
+        :param row: row of BioGRID file
+        :type row: list
+        :return: None
+        """
+        if self._writers is None:
+            self._open()
+        partition = hash(self._key_func(row)) % self._fan_out
+        self._writers[partition].write(str(self._line_num) + '\t' +
+                                       '\t'.join(row).rstrip('\n') + '\n')
+        self._line_num += 1
+
+    def _aggregate_partition(self, partition_file, run_file,
+                             num_partitions=1, divisor=1):
+        """
+        Aggregates rows in partition file and writes interactions
+        prefixed with line they were first seen on to run file.
+        If partition file still needs to be split into more then
+        one partition it is re-partitioned on key hash divided
+        by divisor
+        """
+        if num_partitions > 1 and os.path.getsize(partition_file) > 0:
+            self._split_partition(partition_file, run_file,
+                                  num_partitions, divisor)
+            return
+        store = self._store_factory()
+        first_line = array('q')
+        with open(partition_file, 'r') as f:
+            for line in f:
+                split_line = line.rstrip('\n').split('\t')
+                line_num = int(split_line[0])
+                row = split_line[1:]
+                num_rows = len(store)
+                self._add_func(store, row, self._key_func(row))
+                if len(store) > num_rows:
+                    first_line.append(line_num)
+        os.unlink(partition_file)
+        with open(run_file, 'w') as f:
+            for row_num, values in enumerate(store.rows()):
+                f.write(str(first_line[row_num]) + '\t' +
+                        '\t'.join(values) + '\n')
+
+    def _split_partition(self, partition_file, run_file, num_partitions,
+                         divisor):
+        """
+        Splits partition file into at most ``max_open_files``
+        partitions, aggregates each of them and merges their
+        run files into run file
+        """
+        fan_out = min(num_partitions, self._max_open_files)
+        sub_files = [partition_file + '_' + str(i) for i in range(fan_out)]
+        writers = [open(p, 'w') for p in sub_files]
+        try:
+            with open(partition_file, 'r') as f:
+                for line in f:
+                    row = line.rstrip('\n').split('\t')[1:]
+                    key_hash = hash(self._key_func(row)) // divisor
+                    writers[key_hash % fan_out].write(line)
+        finally:
+            for writer in writers:
+                writer.close()
+        os.unlink(partition_file)
+
+        sub_partitions = int(math.ceil(num_partitions / fan_out))
+        sub_runs = []
+        for sub_file in sub_files:
+            self._aggregate_partition(sub_file, sub_file + '.run',
+                                      sub_partitions, divisor * fan_out)
+            sub_runs.append(sub_file + '.run')
+        with open(run_file, 'w') as f:
+            SpillingAggregator._merge_runs(sub_runs, f, with_line_num=True)
+        for sub_run in sub_runs:
+            os.unlink(sub_run)
+
+    @staticmethod
+    def _read_run(run_file):
+        with open(run_file, 'r') as f:
+            for line in f:
+                line_num, values = line.split('\t', 1)
+                yield int(line_num), values
+
+    @staticmethod
+    def _merge_runs(run_files, out_file, with_line_num=False):
+        """
+        Merges run files in order of line interactions were
+        first seen on writing them to out_file
+        """
+        runs = [SpillingAggregator._read_run(r) for r in run_files]
+        for line_num, values in heapq.merge(*runs):
+            if with_line_num:
+                out_file.write(str(line_num) + '\t')
+            out_file.write(values)
+
+    def write(self, out_file, header):
+        """
+        Aggregates partitions and writes interactions as tab
+        delimited text. Temporary files are removed afterwards
+
+        :param out_file: open file to write to
+        :param header: column names to write as first line
+        :type header: list
+        :return: None
+        """
+        if self._writers is None:
+            self._open()
+        try:
+            for writer in self._writers:
+                writer.close()
+            sub_partitions = int(math.ceil(self._num_partitions /
+                                           self._fan_out))
+            run_files = []
+            for partition_file in self._partition_files:
+                run_file = partition_file + '.run'
+                self._aggregate_partition(partition_file, run_file,
+                                          sub_partitions, self._fan_out)
+                run_files.append(run_file)
+
+            out_file.write('\t'.join(header) + '\n')
+            SpillingAggregator._merge_runs(run_files, out_file)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Removes temporary files
+        :return: None
+        """
+        if self._writers is not None:
+            for writer in self._writers:
+                writer.close()
+            self._writers = None
+        if self._work_dir is not None:
+            shutil.rmtree(self._work_dir)
+            self._work_dir = None
+
+    def aggregate(self, rows, out_file, header):
+        """
+        Aggregates rows writing them as tab delimited text
+
+        :param rows: rows to aggregate
+        :type rows: iterable
+        :param out_file: open file to write to
+        :param header: column names to write as first line
+        :type header: list
+        :return: None
+        """
+        try:
+            for row in rows:
+                self.add(row)
+        except Exception:
+            self.close()
+            raise
+        self.write(out_file, header)
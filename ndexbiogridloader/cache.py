@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar cache of aggregated BioGRID interactions
+"""
+
+import os
+import logging
+
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_FORMAT_VERSION = '1'
+"""
+Version of cache layout. Cached files written with a different
+version are ignored
+"""
+
+CACHE_FILE_EXT = '.parquet'
+"""
+Extension of cached files
+"""
+
+
+class InteractionCache(object):
+    """
+    Persists aggregated interactions in compressed
+    `Parquet <https://parquet.apache.org>`_ files so networks can be
+    rebuilt without re-reading and re-aggregating BioGRID files. Files
+    are stored under ``<cache_dir>/<biogrid version>/`` and named after
+    the BioGRID file they were aggregated from.
+
+    Requires pyarrow
+    """
+
+    def __init__(self, cache_dir, biogrid_version, compression='zstd'):
+        """
+        Constructor
+
+        :param cache_dir: directory to store cached files
+        :type cache_dir: str
+        :param biogrid_version: version of BioGRID release
+        :type biogrid_version: str
+        :param compression: Parquet compression codec
+        :type compression: str
+        :raises NdexBioGRIDLoaderError: if pyarrow is not installed
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as ie:
+            raise NdexBioGRIDLoaderError('pyarrow is required for '
+                                         'interaction cache: ' + str(ie))
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._version_dir = os.path.join(os.path.abspath(cache_dir),
+                                         biogrid_version)
+        self._biogrid_version = biogrid_version
+        self._compression = compression
+
+    def get_path(self, name):
+        """
+        Gets path to cached file
+
+        :param name: name of BioGRID file interactions were
+                     aggregated from without extension ie
+                     BIOGRID-ORGANISM-Zea_mays-4.2.191
+        :type name: str
+        :return: path
+        :rtype: str
+        """
+        return os.path.join(self._version_dir, name + CACHE_FILE_EXT)
+
+    def has(self, name):
+        """
+        Checks if interactions for ``name`` are cached
+
+        :param name: see :py:meth:`get_path`
+        :type name: str
+        :return: ``True`` if valid cached file exists
+        :rtype: bool
+        """
+        path = self.get_path(name)
+        if not os.path.isfile(path):
+            return False
+        try:
+            metadata = self._pq.read_schema(path).metadata or {}
+        except Exception as e:
+            logger.warning('Unable to read cached file ' + path +
+                           ' : ' + str(e))
+            return False
+        return metadata.get(b'cache_format_version') == \
+            CACHE_FORMAT_VERSION.encode('utf-8') and \
+            metadata.get(b'biogrid_version') == \
+            self._biogrid_version.encode('utf-8')
+
+    def put(self, name, store, header):
+        """
+        Writes interactions to cache. Low cardinality columns of
+        ``store`` are written dictionary encoded
+
+        :param name: see :py:meth:`get_path`
+        :type name: str
+        :param store: aggregated interactions
+        :type store:
+            :py:class:`~ndexbiogridloader.aggregation.InteractionStore`
+        :param header: column names
+        :type header: list
+        :return: path to cached file
+        :rtype: str
+        """
+        arrays = []
+        for col in range(len(header)):
+            codes = store.get_column_codes(col)
+            if codes is None:
+                arrays.append(self._pa.array(store.get_column(col),
+                                             type=self._pa.string()))
+                continue
+            arrays.append(self._pa.DictionaryArray.from_arrays(
+                self._pa.array(codes[0], type=self._pa.int32()),
+                self._pa.array(codes[1], type=self._pa.string())))
+        table = self._pa.Table.from_arrays(arrays, names=header)
+        table = table.replace_schema_metadata({
+            'cache_format_version': CACHE_FORMAT_VERSION,
+            'biogrid_version': self._biogrid_version})
+
+        os.makedirs(self._version_dir, exist_ok=True)
+        path = self.get_path(name)
+        tmp_path = path + '.tmp'
+        self._pq.write_table(table, tmp_path, compression=self._compression)
+        os.replace(tmp_path, path)
+        return path
+
+    def put_tsv(self, name, tsv_file, header, categorical_columns=()):
+        """
+        Writes interactions from tab delimited file, with header, to
+        cache a block at a time so the file never needs to fit in memory
+
+        :param name: see :py:meth:`get_path`
+        :type name: str
+        :param tsv_file: path to tab delimited file
+        :type tsv_file: str
+        :param header: column names
+        :type header: list
+        :param categorical_columns: indexes of low cardinality columns
+                                    to write dictionary encoded
+        :type categorical_columns: list or tuple
+        :return: path to cached file
+        :rtype: str
+        """
+        import pyarrow.csv
+
+        column_types = {}
+        for col, col_name in enumerate(header):
+            if col in categorical_columns:
+                column_types[col_name] = self._pa.dictionary(self._pa.int32(),
+                                                             self._pa.string())
+            else:
+                column_types[col_name] = self._pa.string()
+        read_options = pyarrow.csv.ReadOptions(skip_rows=1,
+                                               column_names=header)
+        parse_options = pyarrow.csv.ParseOptions(delimiter='\t',
+                                                 quote_char=False)
+        convert_options = pyarrow.csv.ConvertOptions(column_types=column_types,
+                                                     strings_can_be_null=False,
+                                                     null_values=[])
+        reader = pyarrow.csv.open_csv(tsv_file, read_options=read_options,
+                                      parse_options=parse_options,
+                                      convert_options=convert_options)
+        schema = reader.schema.with_metadata({
+            'cache_format_version': CACHE_FORMAT_VERSION,
+            'biogrid_version': self._biogrid_version})
+
+        os.makedirs(self._version_dir, exist_ok=True)
+        path = self.get_path(name)
+        tmp_path = path + '.tmp'
+        with self._pq.ParquetWriter(tmp_path, schema,
+                                    compression=self._compression) as writer:
+            for batch in reader:
+                writer.write_table(self._pa.Table.from_batches([batch],
+                                                               schema=schema))
+        os.replace(tmp_path, path)
+        return path
+
+    def read(self, name, usecols, dtype):
+        """
+        Reads cached interactions into a :py:class:`pandas.DataFrame`
+
+        :param name: see :py:meth:`get_path`
+        :type name: str
+        :param usecols: names of columns to load
+        :type usecols: list
+        :param dtype: column name => ``str`` or 'category'
+        :type dtype: dict
+        :rtype: :py:class:`pandas.DataFrame`
+        """
+        table = self._pq.read_table(self.get_path(name), columns=usecols)
+        dataframe = table.to_pandas()
+        for col in usecols:
+            if dtype.get(col) == 'category':
+                if str(dataframe[col].dtype) != 'category':
+                    dataframe[col] = dataframe[col].astype('category')
+            elif str(dataframe[col].dtype) == 'category':
+                dataframe[col] = dataframe[col].astype(str)
+        return dataframe
@@ -0,0 +1,621 @@
+# -*- coding: utf-8 -*-
+
+"""
+Writes networks as `CX2 <https://cytoscape.org/cx/>`__, where
+attribute names and types are declared once and each node and edge
+holds only its values, an element at a time. The Cytoscape style of
+the network is translated from the CX ``cyVisualProperties`` aspect
+"""
+
+import json
+import logging
+
+from ndexbiogridloader.network import ColumnarNetwork
+
+logger = logging.getLogger(__name__)
+
+
+CX_FORMAT = 'cx'
+"""
+Networks are written and uploaded as CX
+"""
+
+CX2_FORMAT = 'cx2'
+"""
+Networks are written and uploaded as CX2
+"""
+
+CX_FORMATS = [CX_FORMAT, CX2_FORMAT]
+"""
+Values accepted by --cxformat
+"""
+
+CX2_UPLOAD_METHODS = ['save_cx2_stream_as_new_network', 'update_cx2_network']
+"""
+Methods of :py:class:`ndex2.client.Ndex2` used to upload CX2, added
+in ndex2 3.5.0
+"""
+
+CX2_HEADER = {'CXVersion': '2.0', 'hasFragments': False}
+"""
+First element of every CX2 document
+"""
+
+STATUS = {'status': [{'error': '', 'success': True}]}
+"""
+Last element of every CX2 document
+"""
+
+NODE_SHAPES = {'ELLIPSE': 'ellipse', 'ROUND_RECTANGLE': 'round-rectangle',
+               'RECTANGLE': 'rectangle', 'TRIANGLE': 'triangle',
+               'DIAMOND': 'diamond', 'HEXAGON': 'hexagon',
+               'OCTAGON': 'octagon', 'PARALLELOGRAM': 'parallelogram',
+               'VEE': 'vee'}
+"""
+CX2 node shapes keyed by Cytoscape node shape
+"""
+
+LINE_STYLES = {'SOLID': 'solid', 'DOT': 'dotted', 'EQUAL_DASH': 'dashed',
+               'LONG_DASH': 'dashed', 'DASH_DOT': 'dashed'}
+"""
+CX2 line styles keyed by Cytoscape line type
+"""
+
+ARROW_SHAPES = {'NONE': 'none', 'DELTA': 'triangle', 'ARROW': 'triangle',
+                'T': 'tee', 'CIRCLE': 'circle', 'DIAMOND': 'diamond',
+                'SQUARE': 'square'}
+"""
+CX2 arrow shapes keyed by Cytoscape arrow shape
+"""
+
+EDITOR_PROPERTIES = ['nodeSizeLocked', 'arrowColorMatchesEdge',
+                     'nodeCustomGraphicsSizeSync']
+"""
+Cytoscape style dependencies written to the CX2
+``visualEditorProperties`` aspect
+"""
+
+
+def _to_color(value):
+    return value
+
+
+def _to_opacity(value):
+    return round(float(value) / 255.0, 4)
+
+
+def _to_bool(value):
+    return str(value).lower() == 'true'
+
+
+def _to_visibility(value):
+    return 'element' if _to_bool(value) else 'none'
+
+
+def _to_lower(table):
+    return lambda value: table.get(value, str(value).lower())
+
+
+def _to_font(value):
+    """
+    Translates font like ``HelveticaNeue-Medium,plain,12``
+    """
+    fields = str(value).split(',')
+    style = fields[1].lower() if len(fields) > 1 else 'plain'
+    family = 'monospace' if 'mono' in fields[0].lower() else 'sans-serif'
+    if 'serif' in fields[0].lower() and 'sans' not in fields[0].lower():
+        family = 'serif'
+    return {'FONT_FAMILY': family,
+            'FONT_STYLE': 'italic' if 'italic' in style else 'normal',
+            'FONT_WEIGHT': 'bold' if 'bold' in style else 'normal',
+            'FONT_NAME': fields[0]}
+
+
+def _to_label_position(value):
+    """
+    Translates label position like ``C,C,c,0.00,0.00``, which is
+    anchor on node, anchor on label, justification and offsets
+    """
+    fields = str(value).split(',')
+    if len(fields) != 5:
+        return None
+    horizontal = {'W': 'left', 'E': 'right'}
+    vertical = {'N': 'top', 'S': 'bottom'}
+    justification = {'l': 'left', 'r': 'right'}
+    return {'HORIZONTAL_ALIGN': horizontal.get(fields[0][-1], 'center'),
+            'VERTICAL_ALIGN': vertical.get(fields[0][0], 'center'),
+            'HORIZONTAL_ANCHOR': horizontal.get(fields[1][-1], 'center'),
+            'VERTICAL_ANCHOR': vertical.get(fields[1][0], 'center'),
+            'JUSTIFICATION': justification.get(fields[2], 'center'),
+            'MARGIN_X': float(fields[3]),
+            'MARGIN_Y': float(fields[4])}
+
+
+VISUAL_PROPERTIES = {
+    'NETWORK_BACKGROUND_PAINT': ('NETWORK_BACKGROUND_COLOR', _to_color),
+    'NODE_FILL_COLOR': ('NODE_BACKGROUND_COLOR', _to_color),
+    'NODE_TRANSPARENCY': ('NODE_BACKGROUND_OPACITY', _to_opacity),
+    'NODE_BORDER_PAINT': ('NODE_BORDER_COLOR', _to_color),
+    'NODE_BORDER_STROKE': ('NODE_BORDER_STYLE', _to_lower(LINE_STYLES)),
+    'NODE_BORDER_TRANSPARENCY': ('NODE_BORDER_OPACITY', _to_opacity),
+    'NODE_BORDER_WIDTH': ('NODE_BORDER_WIDTH', float),
+    'NODE_HEIGHT': ('NODE_HEIGHT', float),
+    'NODE_WIDTH': ('NODE_WIDTH', float),
+    'NODE_LABEL': ('NODE_LABEL', str),
+    'NODE_LABEL_COLOR': ('NODE_LABEL_COLOR', _to_color),
+    'NODE_LABEL_FONT_FACE': ('NODE_LABEL_FONT_FACE', _to_font),
+    'NODE_LABEL_FONT_SIZE': ('NODE_LABEL_FONT_SIZE', lambda v: int(float(v))),
+    'NODE_LABEL_POSITION': ('NODE_LABEL_POSITION', _to_label_position),
+    'NODE_LABEL_ROTATION': ('NODE_LABEL_ROTATION', float),
+    'NODE_LABEL_TRANSPARENCY': ('NODE_LABEL_OPACITY', _to_opacity),
+    'NODE_LABEL_WIDTH': ('NODE_LABEL_MAX_WIDTH', float),
+    'NODE_SELECTED_PAINT': ('NODE_SELECTED_PAINT', _to_color),
+    'NODE_SHAPE': ('NODE_SHAPE', _to_lower(NODE_SHAPES)),
+    'NODE_VISIBLE': ('NODE_VISIBILITY', _to_visibility),
+    'NODE_Z_LOCATION': ('NODE_Z_LOCATION', float),
+    'EDGE_STROKE_UNSELECTED_PAINT': ('EDGE_LINE_COLOR', _to_color),
+    'EDGE_STROKE_SELECTED_PAINT': ('EDGE_SELECTED_PAINT', _to_color),
+    'EDGE_LINE_TYPE': ('EDGE_LINE_STYLE', _to_lower(LINE_STYLES)),
+    'EDGE_WIDTH': ('EDGE_WIDTH', float),
+    'EDGE_TRANSPARENCY': ('EDGE_OPACITY', _to_opacity),
+    'EDGE_CURVED': ('EDGE_CURVED', _to_bool),
+    'EDGE_VISIBLE': ('EDGE_VISIBILITY', _to_visibility),
+    'EDGE_Z_ORDER': ('EDGE_Z_ORDER', float),
+    'EDGE_LABEL': ('EDGE_LABEL', str),
+    'EDGE_LABEL_COLOR': ('EDGE_LABEL_COLOR', _to_color),
+    'EDGE_LABEL_FONT_FACE': ('EDGE_LABEL_FONT_FACE', _to_font),
+    'EDGE_LABEL_FONT_SIZE': ('EDGE_LABEL_FONT_SIZE', lambda v: int(float(v))),
+    'EDGE_LABEL_ROTATION': ('EDGE_LABEL_ROTATION', float),
+    'EDGE_LABEL_TRANSPARENCY': ('EDGE_LABEL_OPACITY', _to_opacity),
+    'EDGE_LABEL_WIDTH': ('EDGE_LABEL_MAX_WIDTH', float),
+    'EDGE_SOURCE_ARROW_SHAPE': ('EDGE_SOURCE_ARROW_SHAPE',
+                                _to_lower(ARROW_SHAPES)),
+    'EDGE_SOURCE_ARROW_SIZE': ('EDGE_SOURCE_ARROW_SIZE', float),
+    'EDGE_SOURCE_ARROW_UNSELECTED_PAINT': ('EDGE_SOURCE_ARROW_COLOR',
+                                           _to_color),
+    'EDGE_SOURCE_ARROW_SELECTED_PAINT': ('EDGE_SOURCE_ARROW_SELECTED_PAINT',
+                                         _to_color),
+    'EDGE_TARGET_ARROW_SHAPE': ('EDGE_TARGET_ARROW_SHAPE',
+                                _to_lower(ARROW_SHAPES)),
+    'EDGE_TARGET_ARROW_SIZE': ('EDGE_TARGET_ARROW_SIZE', float),
+    'EDGE_TARGET_ARROW_UNSELECTED_PAINT': ('EDGE_TARGET_ARROW_COLOR',
+                                           _to_color),
+    'EDGE_TARGET_ARROW_SELECTED_PAINT': ('EDGE_TARGET_ARROW_SELECTED_PAINT',
+                                         _to_color)}
+"""
+(CX2 visual property, value converter) keyed by Cytoscape visual
+property. Other visual properties have no CX2 equivalent and are
+not written
+"""
+
+MAPPING_TYPES = {'string': str, 'integer': int, 'long': int,
+                 'double': float, 'boolean': _to_bool}
+"""
+Converters of the keys of discrete mappings keyed by type of the
+mapped attribute
+"""
+
+
+def _split_mapping_definition(definition):
+    """
+    Splits Cytoscape mapping definition like
+    ``COL=type,T=string,K=0=a,V=0=S,,NW`` on single commas, a double
+    comma being an escaped comma in a value
+
+    :return: fields of definition
+    :rtype: list
+    """
+    fields = []
+    current = []
+    index = 0
+    while index < len(definition):
+        char = definition[index]
+        if char == ',':
+            if index + 1 < len(definition) and definition[index + 1] == ',':
+                current.append(',')
+                index += 2
+                continue
+            fields.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+        index += 1
+    fields.append(''.join(current))
+    return fields
+
+
+def _convert_mapping(mapping_type, definition, converter):
+    """
+    Translates Cytoscape passthrough or discrete mapping
+
+    :return: CX2 mapping or ``None`` if mapping cannot be translated
+    :rtype: dict
+    """
+    column = None
+    column_type = 'string'
+    keys = {}
+    values = {}
+    for field in _split_mapping_definition(definition):
+        name, _, value = field.partition('=')
+        if name == 'COL':
+            column = value
+        elif name == 'T':
+            column_type = value
+        elif name in ('K', 'V'):
+            index, _, value = value.partition('=')
+            (keys if name == 'K' else values)[index] = value
+    if column is None:
+        return None
+    mapping_definition = {'attribute': column, 'type': column_type}
+    if mapping_type == 'PASSTHROUGH':
+        return {'type': mapping_type, 'definition': mapping_definition}
+    if mapping_type != 'DISCRETE':
+        return None
+    key_converter = MAPPING_TYPES.get(column_type.replace('list_of_', ''), str)
+    mapping_definition['map'] = []
+    for index, key in keys.items():
+        if index not in values:
+            continue
+        try:
+            mapping_definition['map'].append({'v': key_converter(key),
+                                              'vp': converter(values[index])})
+        except ValueError:
+            logger.debug('Skipping ' + key + ' of mapping on ' + column)
+    return {'type': mapping_type, 'definition': mapping_definition}
+
+
+def convert_visual_properties(cy_visual_properties):
+    """
+    Translates Cytoscape style in CX ``cyVisualProperties`` aspect
+    to CX2 ``visualProperties`` and ``visualEditorProperties``
+    elements. Default values, passthrough and discrete mappings of
+    the visual properties in :py:const:`VISUAL_PROPERTIES` are
+    translated, other visual properties and continuous mappings
+    are not written
+
+    :param cy_visual_properties: elements of ``cyVisualProperties``
+    :type cy_visual_properties: list
+    :return: (``visualProperties`` element,
+              ``visualEditorProperties`` element)
+    :rtype: tuple
+    """
+    defaults = {'network': {}, 'node': {}, 'edge': {}}
+    mappings = {'node': {}, 'edge': {}}
+    editor_properties = {}
+    for element in cy_visual_properties or []:
+        properties_of = element.get('properties_of', '')
+        if properties_of == 'network':
+            target = 'network'
+        elif properties_of == 'nodes:default':
+            target = 'node'
+        elif properties_of == 'edges:default':
+            target = 'edge'
+        else:
+            continue
+        for name, value in (element.get('properties') or {}).items():
+            if name not in VISUAL_PROPERTIES:
+                continue
+            cx2_name, converter = VISUAL_PROPERTIES[name]
+            try:
+                converted = converter(value)
+            except ValueError:
+                converted = None
+            if converted is None:
+                logger.debug('Skipping ' + name + ' value: ' + str(value))
+                continue
+            defaults[target][cx2_name] = converted
+        for name, value in (element.get('dependencies') or {}).items():
+            if name in EDITOR_PROPERTIES:
+                editor_properties[name] = _to_bool(value)
+        if target == 'network':
+            continue
+        for name, mapping in (element.get('mappings') or {}).items():
+            if name not in VISUAL_PROPERTIES:
+                continue
+            cx2_name, converter = VISUAL_PROPERTIES[name]
+            converted = _convert_mapping(mapping.get('type'),
+                                         mapping.get('definition', ''),
+                                         converter)
+            if converted is None:
+                logger.debug('Skipping ' + str(mapping.get('type')) +
+                             ' mapping of ' + name)
+                continue
+            mappings[target][cx2_name] = converted
+    return ({'default': defaults, 'nodeMapping': mappings['node'],
+             'edgeMapping': mappings['edge']},
+            {'properties': editor_properties})
+
+
+def _get_declared_type(data_types):
+    """
+    Gets type to declare for an attribute whose values have data
+    types. If some values are lists, as happens when collapsed edges
+    have their values merged, the list type is declared and the
+    scalar values are written as lists of one value
+
+    :param data_types: data types of values of attribute
+    :type data_types: set
+    :return: data type or ``None`` if the types differ and values
+             have to be written as strings
+    :rtype: str
+    """
+    base_types = set(t.replace('list_of_', '') if t else 'string'
+                     for t in data_types)
+    if len(base_types) != 1:
+        return None
+    base_type = base_types.pop()
+    if any(t is not None and t.startswith('list_of_') for t in data_types):
+        return 'list_of_' + base_type
+    return base_type
+
+
+class _AttributeDeclarations(object):
+    """
+    Declared type and alias of attributes of an aspect and
+    conversion of values to the declared type
+    """
+
+    def __init__(self, types, prefix=None, reserved=()):
+        """
+        Constructor
+
+        :param types: data types of values keyed by attribute name
+        :type types: dict
+        :param prefix: start of aliases, if ``None`` aliases
+                       are not used
+        :type prefix: str
+        :param reserved: names of string attributes of every
+                         element that are not given aliases
+        :type reserved: list
+        """
+        self._declarations = {}
+        self._keys = {}
+        self._types = {}
+        for name in reserved:
+            self._declarations[name] = {'d': 'string'}
+            self._keys[name] = name
+        taken = set(types.keys()).union(reserved)
+        alias_index = 0
+        for name, data_types in types.items():
+            if name in reserved:
+                continue
+            declared = _get_declared_type(data_types)
+            if declared is None:
+                logger.info('Values of ' + name + ' have types ' +
+                            str(sorted(t or 'string' for t in data_types)) +
+                            ', writing them as strings')
+                has_list = any(t and t.startswith('list_of_')
+                               for t in data_types)
+                declared = 'list_of_string' if has_list else 'string'
+                self._types[name] = declared
+            elif any(t != declared for t in data_types):
+                self._types[name] = declared
+            if prefix is None:
+                self._declarations[name] = {'d': declared}
+                self._keys[name] = name
+                continue
+            alias = prefix + str(alias_index)
+            while alias in taken:
+                alias_index += 1
+                alias = prefix + str(alias_index)
+            alias_index += 1
+            if len(alias) < len(name):
+                self._declarations[name] = {'d': declared, 'a': alias}
+                self._keys[name] = alias
+            else:
+                self._declarations[name] = {'d': declared}
+                self._keys[name] = name
+
+    def get_declarations(self):
+        """
+        :return: attribute declarations of aspect
+        :rtype: dict
+        """
+        return self._declarations
+
+    def add_values(self, values, attributes):
+        """
+        Adds attribute values to ``values`` under their alias
+
+        :param values: values of node or edge
+        :type values: dict
+        :param attributes: (name, value, data type) of attributes
+        :type attributes: list
+        :return: values
+        :rtype: dict
+        """
+        for name, value, data_type in attributes:
+            key = self._keys[name]
+            if key in values:
+                continue
+            declared = self._types.get(name)
+            if declared is not None:
+                if declared.startswith('list_of_') and \
+                        not isinstance(value, list):
+                    value = [value]
+                if declared in ('string', 'list_of_string'):
+                    if isinstance(value, list):
+                        value = [str(v) for v in value]
+                    else:
+                        value = str(value)
+            values[key] = value
+        return values
+
+
+class _NiceCXAdapter(object):
+    """
+    Gives a :py:class:`~ndex2.nice_cx_network.NiceCXNetwork` the
+    iterators of a :py:class:`~ndexbiogridloader.network.ColumnarNetwork`
+    """
+
+    def __init__(self, network):
+        self._network = network
+        self.networkAttributes = network.networkAttributes
+        self.opaqueAspects = network.opaqueAspects
+
+    @staticmethod
+    def _get_attributes(attributes):
+        return [(a['n'], a['v'], a.get('d')) for a in attributes or []]
+
+    def iter_nodes_with_attributes(self):
+        node_attributes = self._network.nodeAttributes
+        for node_id, node in self._network.nodes.items():
+            yield (node_id, node.get('n'), node.get('r'),
+                   self._get_attributes(node_attributes.get(node_id)))
+
+    def iter_edges_with_attributes(self):
+        edge_attributes = self._network.edgeAttributes
+        for edge_id, edge in self._network.edges.items():
+            yield (edge_id, edge['s'], edge['t'], edge.get('i'),
+                   self._get_attributes(edge_attributes.get(edge_id)))
+
+    def get_node_count(self):
+        return len(self._network.nodes)
+
+    def get_edge_count(self):
+        return len(self._network.edges)
+
+    def get_edge_attribute_types(self):
+        types = {}
+        for attributes in self._network.edgeAttributes.values():
+            for attribute in attributes:
+                types.setdefault(attribute['n'], set()).add(attribute.get('d'))
+        return types
+
+
+def _get_node_attribute_types(network):
+    types = {}
+    for node_id, name, represents, attributes in \
+            network.iter_nodes_with_attributes():
+        for attribute_name, value, data_type in attributes:
+            types.setdefault(attribute_name, set()).add(data_type)
+    return types
+
+
+def _write_aspect(out, name, elements):
+    """
+    Writes aspect encoding each element on its own
+
+    :return: None
+    """
+    out.write(', {' + json.dumps(name) + ': [')
+    first = True
+    for element in elements:
+        if not first:
+            out.write(', ')
+        out.write(json.dumps(element))
+        first = False
+    out.write(']}')
+
+
+def get_missing_upload_methods(client_class):
+    """
+    Gets methods needed to upload CX2 that NDEx client lacks
+
+    :param client_class: NDEx client class
+    :type client_class: :py:class:`ndex2.client.Ndex2`
+    :return: names of methods in :py:const:`CX2_UPLOAD_METHODS` not
+             defined by client_class
+    :rtype: list
+    """
+    return [method for method in CX2_UPLOAD_METHODS
+            if not hasattr(client_class, method)]
+
+
+def write_cx2(network, out):
+    """
+    Writes network as CX2 to ``out``, an element at a time. Node
+    positions come from the ``cartesianLayout`` aspect and style from
+    the ``cyVisualProperties`` aspect, if set, and node and edge
+    attributes with names longer than their alias are written under
+    the alias
+
+    :param network: network to write
+    :type network: :py:class:`~ndexbiogridloader.network.ColumnarNetwork`
+                   or :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+    :param out: text file to write to
+    :type out: file
+    :return: None
+    """
+    if not isinstance(network, ColumnarNetwork):
+        network = _NiceCXAdapter(network)
+
+    network_attributes = [(a['n'], a['v'], a.get('d'))
+                          for a in network.networkAttributes]
+    network_types = {}
+    for name, value, data_type in network_attributes:
+        network_types.setdefault(name, set()).add(data_type)
+    network_declarations = _AttributeDeclarations(network_types)
+    node_declarations = \
+        _AttributeDeclarations(_get_node_attribute_types(network),
+                               prefix='n', reserved=['name', 'represents'])
+    edge_declarations = \
+        _AttributeDeclarations(network.get_edge_attribute_types(),
+                               prefix='e', reserved=['interaction'])
+    declarations = {'networkAttributes':
+                    network_declarations.get_declarations(),
+                    'nodes': node_declarations.get_declarations(),
+                    'edges': edge_declarations.get_declarations()}
+    network_values = network_declarations.add_values({}, network_attributes)
+
+    layout = {}
+    for position in network.opaqueAspects.get('cartesianLayout') or []:
+        layout[position['node']] = position
+    visual_properties = None
+    cy_visual_properties = network.opaqueAspects.get('cyVisualProperties')
+    if cy_visual_properties:
+        visual_properties = convert_visual_properties(cy_visual_properties)
+
+    def iter_nodes():
+        for node_id, name, represents, attributes in \
+                network.iter_nodes_with_attributes():
+            values = {}
+            if name is not None:
+                values['name'] = name
+            if represents:
+                values['represents'] = represents
+            node = {'id': node_id,
+                    'v': node_declarations.add_values(values, attributes)}
+            position = layout.get(node_id)
+            if position is not None:
+                node['x'] = position['x']
+                node['y'] = position['y']
+                if position.get('z') is not None:
+                    node['z'] = position['z']
+            yield node
+
+    def iter_edges():
+        for edge_id, source, target, interaction, attributes in \
+                network.iter_edges_with_attributes():
+            values = {}
+            if interaction is not None:
+                values['interaction'] = interaction
+            yield {'id': edge_id, 's': source, 't': target,
+                   'v': edge_declarations.add_values(values, attributes)}
+
+    aspects = [('attributeDeclarations', lambda: [declarations], 1)]
+    if network_values:
+        aspects.append(('networkAttributes', lambda: [network_values], 1))
+    if network.get_node_count() > 0:
+        aspects.append(('nodes', iter_nodes, network.get_node_count()))
+    if network.get_edge_count() > 0:
+        aspects.append(('edges', iter_edges, network.get_edge_count()))
+    if visual_properties is not None:
+        aspects.append(('visualProperties',
+                        lambda: [visual_properties[0]], 1))
+        if visual_properties[1]['properties']:
+            aspects.append(('visualEditorProperties',
+                            lambda: [visual_properties[1]], 1))
+
+    out.write('[')
+    out.write(json.dumps(CX2_HEADER))
+    out.write(', ')
+    out.write(json.dumps({'metaData': [{'elementCount': count,
+                                        'name': name}
+                                       for name, iter_factory, count
+                                       in aspects]}))
+    for name, iter_factory, count in aspects:
+        _write_aspect(out, name, iter_factory())
+    out.write(', ')
+    out.write(json.dumps(STATUS))
+    out.write(']')
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+Writes a :py:class:`~ndex2.nice_cx_network.NiceCXNetwork` as CX
+an element at a time instead of building the whole document
+in memory with :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_cx`
+"""
+
+import json
+
+
+NUMBER_VERIFICATION = {'numberVerification': [{'longNumber': 281474976710655}]}
+"""
+First aspect of every CX document
+"""
+
+STATUS = {'status': [{'error': '', 'success': True}]}
+"""
+Last aspect of a CX document with metadata
+"""
+
+CORE_ASPECTS = ['nodes', 'edges', 'networkAttributes', 'nodeAttributes',
+                'edgeAttributes', 'citations']
+"""
+Aspects held as attributes of the same name on network that are
+written in this order, followed by :py:const:`CITATION_ASPECTS`
+"""
+
+CITATION_ASPECTS = [('nodeCitations', 'citations'),
+                    ('edgeCitations', 'citations'),
+                    ('supports', None),
+                    ('edgeSupports', 'supports')]
+"""
+(aspect name, key of values in element) for aspects written after
+:py:const:`CORE_ASPECTS`. Aspects with ``None`` key are core aspects
+"""
+
+
+def _iter_core_elements(aspect_name, aspect):
+    """
+    Generator over elements of a core aspect in the order
+    :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.generate_aspect`
+    outputs them
+    """
+    if isinstance(aspect, list):
+        for element in aspect:
+            yield element
+        return
+    if aspect_name in ['nodes', 'edges']:
+        for element in aspect.values():
+            yield element
+        return
+    for value in aspect.values():
+        if isinstance(value, list):
+            for element in value:
+                yield element
+        else:
+            yield value
+
+
+def _iter_po_elements(aspect, value_key):
+    """
+    Generator over elements of a node/edge citation or support aspect
+    """
+    for po, value in aspect.items():
+        yield {'po': [po],
+               value_key: value if isinstance(value, list) else [value]}
+
+
+def _iter_aspects(network):
+    """
+    Generator over (name, element iterator factory, element count)
+    of the non empty aspects of network in the order
+    :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_cx` outputs them
+    """
+    aspect_names = [(a, None) for a in CORE_ASPECTS] + CITATION_ASPECTS
+    for aspect_name, value_key in aspect_names:
+        aspect = getattr(network, aspect_name)
+        if not aspect:
+            continue
+        if value_key is None:
+            if isinstance(aspect, dict) and \
+                    aspect_name not in ['nodes', 'edges']:
+                count = sum(len(v) if isinstance(v, list) else 1
+                            for v in aspect.values())
+            else:
+                count = len(aspect)
+            yield (aspect_name,
+                   (lambda n=aspect_name, a=aspect:
+                    _iter_core_elements(n, a)),
+                   count)
+        else:
+            if not isinstance(aspect, dict):
+                raise Exception('Citation was not in json format')
+            yield (aspect_name,
+                   (lambda a=aspect, k=value_key: _iter_po_elements(a, k)),
+                   len(aspect))
+
+
+def _update_metadata(metadata, aspects, opaque_aspects):
+    """
+    Updates metadata of network the same way
+    :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_cx` does
+
+    :return: opaque aspects as they are written
+    :rtype: list
+    """
+    for aspect_name, iter_factory, count in aspects:
+        metadata[aspect_name] = {'name': aspect_name,
+                                 'elementCount': count,
+                                 'idCounter': count,
+                                 'version': '1.0',
+                                 'consistencyGroup': 1,
+                                 'properties': []}
+    opaque_aspect_list = []
+    for name, value in (opaque_aspects or {}).items():
+        if isinstance(value, bytes):
+            opaque_aspect_list.append({name: [value.decode('ascii')]})
+        else:
+            opaque_aspect_list.append({name: value})
+        aspect_metadata = metadata.get(name)
+        if aspect_metadata:
+            aspect_metadata['elementCount'] = len(value)
+        else:
+            metadata[name] = {'name': name,
+                              'elementCount': len(value),
+                              'idCounter': len(value) + 1,
+                              'properties': []}
+    return opaque_aspect_list
+
+
+def write_aspects(out, metadata, aspects, opaque_aspects):
+    """
+    Writes CX document to ``out`` encoding and writing each element on
+    its own, updating ``metadata`` as
+    :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_cx` does
+
+    :param out: text file to write to
+    :type out: file
+    :param metadata: metadata of network keyed by aspect name
+    :type metadata: dict
+    :param aspects: (name, element iterator factory, element count)
+                    of non empty core aspects in the order they are
+                    written
+    :type aspects: list
+    :param opaque_aspects: elements of opaque aspects keyed by name
+    :type opaque_aspects: dict
+    :return: None
+    """
+    opaque_aspect_list = _update_metadata(metadata, aspects, opaque_aspects)
+
+    out.write('[')
+    out.write(json.dumps(NUMBER_VERIFICATION))
+    last_aspect = NUMBER_VERIFICATION
+    if metadata:
+        out.write(', ')
+        out.write(json.dumps({'metaData': list(metadata.values())}))
+
+    for aspect_name, iter_factory, count in aspects:
+        out.write(', {' + json.dumps(aspect_name) + ': [')
+        first = True
+        for element in iter_factory():
+            if not first:
+                out.write(', ')
+            out.write(json.dumps(element))
+            first = False
+        out.write(']}')
+        last_aspect = {aspect_name: None}
+
+    for aspect in opaque_aspect_list:
+        out.write(', ')
+        out.write(json.dumps(aspect))
+        last_aspect = aspect
+
+    if metadata and last_aspect.get('status') is None:
+        out.write(', ')
+        out.write(json.dumps(STATUS))
+    out.write(']')
+
+
+def write_cx(network, out):
+    """
+    Writes network as CX to ``out``. Output is identical to
+    ``json.dump(network.to_cx(), out)``, including the updates
+    made to the metadata of network, but each element is encoded
+    and written on its own so memory used does not grow with the
+    size of the network
+
+    :param network: network to write
+    :type network: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+    :param out: text file to write to
+    :type out: file
+    :return: None
+    """
+    write_aspects(out, network.metadata, list(_iter_aspects(network)),
+                  network.opaqueAspects)
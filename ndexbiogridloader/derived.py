@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+Declarative definitions of networks derived from the aggregated
+interactions of an organism, such as physical interactions only,
+so they are built from the same read and aggregation of the BioGRID
+file as the organism network
+"""
+
+import re
+import json
+
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+
+
+DEFINITION_KEYS = {'id', 'name', 'filters', 'splitBy'}
+"""
+Keys of a derived network definition
+"""
+
+ID_PATTERN = re.compile('^[A-Za-z0-9_]+$')
+"""
+Valid id of a definition, ids are added to CX file names
+"""
+
+
+def _to_id(value):
+    """
+    Converts value of split by column to a string that can be
+    added to an id
+
+    :param value: value of column ie 'Affinity Capture-MS'
+    :type value: str
+    :return: value with runs of other then letters and digits
+             replaced by ``_`` ie 'Affinity_Capture_MS'
+    :rtype: str
+    """
+    return re.sub('[^A-Za-z0-9]+', '_', value).strip('_')
+
+
+class DerivedNetwork(object):
+    """
+    Definition of networks derived from interactions of an organism.
+    Interactions are kept if, for every filter column, their value is
+    one of the values listed for it. If a split by column is set a
+    network is derived for each value of that column among the kept
+    interactions
+    """
+
+    def __init__(self, definition_id, name, filters=None, split_by=None):
+        """
+        Constructor
+
+        :param definition_id: id added to CX file name of derived
+                              networks
+        :type definition_id: str
+        :param name: name of derived networks, ``{organism}`` is
+                     replaced by name of organism and ``{value}`` by
+                     value of split by column
+        :type name: str
+        :param filters: column name => list of values to keep
+        :type filters: dict
+        :param split_by: column to derive a network per value of
+        :type split_by: str
+        """
+        self._id = definition_id
+        self._name = name
+        self._filters = filters or {}
+        self._split_by = split_by
+
+    def get_id(self):
+        """
+        :return: id of definition
+        :rtype: str
+        """
+        return self._id
+
+    def get_columns(self):
+        """
+        :return: names of columns filters and split by refer to
+        :rtype: list
+        """
+        columns = list(self._filters.keys())
+        if self._split_by is not None and self._split_by not in columns:
+            columns.append(self._split_by)
+        return columns
+
+    def _get_filter_description(self, value=None):
+        """
+        :return: filters, and value of split by column, as
+                 ``<column>=<value>|<value>`` joined by ``; ``
+        :rtype: str
+        """
+        conditions = [column + '=' + '|'.join(values)
+                      for column, values in self._filters.items()]
+        if value is not None:
+            conditions.append(self._split_by + '=' + value)
+        return '; '.join(conditions)
+
+    def get_networks(self, dataframe, organism):
+        """
+        Generator over networks derived from aggregated interactions.
+        Only one selection of interactions is made at a time.
+        Interactions with an empty or missing ``splitBy`` value are
+        not in any network split by it
+
+        :param dataframe: aggregated interactions of organism
+        :type dataframe: :py:class:`pandas.DataFrame`
+        :param organism: name of organism used in network name
+        :type organism: str
+        :return: (id, name, description of filters, interactions)
+                 for each derived network with interactions
+        :rtype: tuple
+        """
+        mask = None
+        for column, values in self._filters.items():
+            column_mask = dataframe[column].isin(values)
+            mask = column_mask if mask is None else mask & column_mask
+        if mask is not None:
+            dataframe = dataframe[mask]
+        if self._split_by is None:
+            if len(dataframe) > 0:
+                yield (self._id,
+                       self._name.format(organism=organism, value=''),
+                       self._get_filter_description(),
+                       dataframe.reset_index(drop=True))
+            return
+        split_values = dataframe[self._split_by].astype(str)
+        present = dataframe[self._split_by].notna() & (split_values != '')
+        dataframe = dataframe[present]
+        split_values = split_values[present]
+        for value in sorted(set(split_values)):
+            yield (self._id + '_' + _to_id(value),
+                   self._name.format(organism=organism, value=value),
+                   self._get_filter_description(value),
+                   dataframe[split_values == value].reset_index(drop=True))
+
+
+def load_derived_networks(path, columns):
+    """
+    Loads derived network definitions from a JSON file holding a
+    list of objects of the form::
+
+        {"id": "physical",
+         "name": "BioGRID: Physical Interactions ({organism})",
+         "filters": {"Experimental System Type": ["physical"]},
+         "splitBy": "Experimental System"}
+
+    where ``filters`` and ``splitBy`` are optional
+
+    :param path: path to JSON file
+    :type path: str
+    :param columns: names of columns definitions can refer to
+    :type columns: list
+    :raises NdexBioGRIDLoaderError: if file cannot be read or a
+                                    definition is not valid
+    :return: definitions in order listed
+    :rtype: list
+    """
+    try:
+        with open(path, 'r') as f:
+            definitions = json.load(f)
+    except (OSError, ValueError) as e:
+        raise NdexBioGRIDLoaderError('Unable to read derived networks '
+                                     'from ' + str(path) + ': ' + str(e))
+    if not isinstance(definitions, list):
+        raise NdexBioGRIDLoaderError('Derived networks in ' + str(path) +
+                                     ' must be a list')
+    derived_networks = []
+    ids = set()
+    for definition in definitions:
+        if not isinstance(definition, dict) or \
+                not DEFINITION_KEYS.issuperset(definition.keys()):
+            raise NdexBioGRIDLoaderError('Derived network ' + str(definition) +
+                                         ' must be an object with keys ' +
+                                         ', '.join(sorted(DEFINITION_KEYS)))
+        definition_id = definition.get('id')
+        if not isinstance(definition_id, str) or \
+                ID_PATTERN.match(definition_id) is None or \
+                definition_id in ids:
+            raise NdexBioGRIDLoaderError('Derived network id ' +
+                                         str(definition_id) + ' must be '
+                                         'unique and contain only '
+                                         'letters, digits and _')
+        ids.add(definition_id)
+        try:
+            definition['name'].format(organism='', value='')
+        except (KeyError, IndexError, ValueError, AttributeError) as e:
+            raise NdexBioGRIDLoaderError('Name of derived network ' +
+                                         definition_id + ' is not valid: ' +
+                                         str(e))
+        filters = definition.get('filters', {})
+        split_by = definition.get('splitBy')
+        if not isinstance(filters, dict) or \
+                not all(isinstance(values, list) and values and
+                        all(isinstance(v, str) for v in values)
+                        for values in filters.values()):
+            raise NdexBioGRIDLoaderError('Filters of derived network ' +
+                                         definition_id + ' must map '
+                                         'columns to lists of values')
+        if not filters and split_by is None:
+            raise NdexBioGRIDLoaderError('Derived network ' + definition_id +
+                                         ' needs filters or splitBy')
+        derived_network = DerivedNetwork(definition_id, definition['name'],
+                                         filters=filters, split_by=split_by)
+        unknown = [c for c in derived_network.get_columns()
+                   if c not in columns]
+        if unknown:
+            raise NdexBioGRIDLoaderError('Derived network ' + definition_id +
+                                         ' refers to unknown columns: ' +
+                                         ', '.join(unknown))
+        derived_networks.append(derived_network)
+    return derived_networks
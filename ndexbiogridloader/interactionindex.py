@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQLite index of aggregated BioGRID interactions so the networks
+holding interactions of a gene, chemical, citation or organism can
+be found without reading generated TSV or CX files
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import operator
+import itertools
+import logging
+import argparse
+
+from ndexbiogridloader.aggregation import ORGANISM_CITATION_COLUMN
+from ndexbiogridloader.aggregation import CHEMICAL_CITATION_COLUMN
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_FORMAT_VERSION = '1'
+"""
+Version of index schema, stored in ``PRAGMA user_version``
+"""
+
+ORGANISM_TYPE = 'organism'
+"""
+Type of networks built from BIOGRID-ORGANISM or BIOGRID-ALL files
+"""
+
+CHEMICAL_TYPE = 'chemical'
+"""
+Type of networks built from BIOGRID-CHEMICALS files
+"""
+
+INTERACTION_COLUMNS = ['entrez_a', 'symbol_a', 'organism_a',
+                       'entrez_b', 'symbol_b', 'organism_b',
+                       'chemical_id', 'chemical_name', 'chemical_type',
+                       'experimental_system', 'experimental_system_type',
+                       'action']
+"""
+Columns of ``interactions`` table besides ``id`` and ``network_id``.
+Columns that do not apply to a type of network are ``NULL``
+"""
+
+ORGANISM_COLUMNS = {'entrez_a': 0, 'entrez_b': 1, 'symbol_a': 2,
+                    'symbol_b': 3, 'experimental_system': 6,
+                    'experimental_system_type': 7, 'organism_a': 14,
+                    'organism_b': 15}
+"""
+Index of column in rows of the generated organism TSV keyed by
+column of ``interactions`` table
+"""
+
+CHEMICAL_COLUMNS = {'entrez_a': 0, 'symbol_a': 1, 'action': 3,
+                    'chemical_name': 6, 'chemical_id': 8,
+                    'chemical_type': 9}
+"""
+Index of column in rows of the generated chemicals TSV keyed by
+column of ``interactions`` table
+"""
+
+CACHE_KILOBYTES = 131072
+"""
+Size of SQLite page cache, large enough to keep pages of indexes
+being updated by a bulk insert in memory
+"""
+
+INSERT_BATCH_SIZE = 10000
+"""
+Number of interactions inserted by each statement
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS networks (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    taxon TEXT,
+    biogrid_version TEXT NOT NULL,
+    num_interactions INTEGER NOT NULL,
+    UNIQUE (name, biogrid_version));
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    network_id INTEGER NOT NULL REFERENCES networks (id),
+    """ + ',\n    '.join(c + ' TEXT' for c in INTERACTION_COLUMNS) + """);
+CREATE TABLE IF NOT EXISTS citations (
+    interaction_id INTEGER NOT NULL REFERENCES interactions (id),
+    pubmed_id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS interactions_network ON interactions (network_id);
+CREATE INDEX IF NOT EXISTS interactions_entrez_a ON interactions (entrez_a);
+CREATE INDEX IF NOT EXISTS interactions_entrez_b ON interactions (entrez_b);
+CREATE INDEX IF NOT EXISTS interactions_symbol_a
+    ON interactions (symbol_a COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS interactions_symbol_b
+    ON interactions (symbol_b COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS interactions_organism_a
+    ON interactions (organism_a);
+CREATE INDEX IF NOT EXISTS interactions_organism_b
+    ON interactions (organism_b);
+CREATE INDEX IF NOT EXISTS interactions_chemical_id
+    ON interactions (chemical_id COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS interactions_chemical_name
+    ON interactions (chemical_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS citations_pubmed_id ON citations (pubmed_id);
+CREATE INDEX IF NOT EXISTS citations_interaction
+    ON citations (interaction_id);
+"""
+
+
+class InteractionIndex(object):
+    """
+    Interactions of networks, stored in a SQLite database with an
+    index on Entrez gene IDs, gene symbols, chemical IDs and names,
+    Pubmed IDs and organisms. Rows are inserted in bulk, a network
+    at a time, replacing interactions indexed for the same network
+    and BioGRID version by an earlier run. Worker processes can add
+    networks to the same database, each through its own instance
+    """
+
+    def __init__(self, path, timeout=600):
+        """
+        Constructor, creates database if needed
+
+        :param path: path to SQLite database
+        :type path: str
+        :param timeout: seconds to wait for another process adding
+                        a network to finish
+        :type timeout: float
+        """
+        self._connection = sqlite3.connect(path, timeout=timeout)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('PRAGMA cache_size=-' + str(CACHE_KILOBYTES))
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute('PRAGMA user_version=' +
+                                     INDEX_FORMAT_VERSION)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes database
+        :return: None
+        """
+        self._connection.close()
+
+    @staticmethod
+    def _get_interactions(rows, columns, citation_column, next_id, extra=()):
+        """
+        Generator over (values of row of ``interactions`` table,
+        Pubmed IDs) for rows of generated TSV. Empty values are
+        stored as ``NULL``
+
+        :param columns: indexes of columns in rows to insert
+        :type columns: list
+        :param extra: values appended to values of every row
+        :type extra: tuple
+        """
+        get_values = operator.itemgetter(*columns)
+        for values in rows:
+            row = tuple([v or None for v in get_values(values)])
+            citations = (values[citation_column] or '').split('|')
+            yield (next_id,) + row + extra, [p for p in citations if p]
+            next_id += 1
+
+    def add_network(self, name, network_type, biogrid_version, rows,
+                    taxon=None):
+        """
+        Adds interactions of network replacing any added earlier
+        for the same network and version. Interactions are inserted
+        :py:const:`INSERT_BATCH_SIZE` at a time in one transaction
+
+        :param name: name of network such as
+                     ``BIOGRID-ORGANISM-Homo_sapiens``
+        :type name: str
+        :param network_type: :py:const:`ORGANISM_TYPE` or
+                             :py:const:`CHEMICAL_TYPE`
+        :type network_type: str
+        :param biogrid_version: version of BioGRID release
+        :type biogrid_version: str
+        :param rows: rows of generated organism or chemicals TSV
+                     without header
+        :type rows: iterable
+        :param taxon: NCBI taxonomy id of chemical network, used as
+                      organism of its genes
+        :type taxon: str
+        :return: number of interactions added
+        :rtype: int
+        """
+        if network_type == ORGANISM_TYPE:
+            columns = ORGANISM_COLUMNS
+            citation_column = ORGANISM_CITATION_COLUMN
+            extra = {}
+        else:
+            columns = CHEMICAL_COLUMNS
+            citation_column = CHEMICAL_CITATION_COLUMN
+            extra = {'organism_a': taxon}
+        names = list(columns.keys()) + list(extra.keys())
+        connection = self._connection
+        num_interactions = 0
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            self._delete_network(name, biogrid_version)
+            cursor = connection.execute('INSERT INTO networks (name, type, '
+                                        'taxon, biogrid_version, '
+                                        'num_interactions) '
+                                        'VALUES (?, ?, ?, ?, 0)',
+                                        (name, network_type, taxon,
+                                         biogrid_version))
+            network_id = cursor.lastrowid
+            next_id = connection.execute('SELECT COALESCE(MAX(id), 0) + 1 '
+                                         'FROM interactions').fetchone()[0]
+            insert_sql = 'INSERT INTO interactions (id, network_id, ' + \
+                         ', '.join(names) + ') VALUES (?, ' + \
+                         str(network_id) + ', ' + \
+                         ', '.join('?' * len(names)) + ')'
+            interactions = self._get_interactions(rows,
+                                                  list(columns.values()),
+                                                  citation_column, next_id,
+                                                  tuple(extra.values()))
+            while True:
+                batch = list(itertools.islice(interactions,
+                                              INSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                connection.executemany(insert_sql, [b[0] for b in batch])
+                connection.executemany('INSERT INTO citations '
+                                       '(interaction_id, pubmed_id) '
+                                       'VALUES (?, ?)',
+                                       [(b[0][0], p) for b in batch
+                                        for p in b[1]])
+                num_interactions += len(batch)
+            connection.execute('UPDATE networks SET num_interactions = ? '
+                               'WHERE id = ?', (num_interactions, network_id))
+        return num_interactions
+
+    def has_network(self, name, biogrid_version):
+        """
+        Checks if interactions of network were added
+
+        :param name: see :py:meth:`add_network`
+        :type name: str
+        :param biogrid_version: version of BioGRID release
+        :type biogrid_version: str
+        :rtype: bool
+        """
+        row = self._connection.execute('SELECT 1 FROM networks '
+                                       'WHERE name = ? '
+                                       'AND biogrid_version = ?',
+                                       (name, biogrid_version)).fetchone()
+        return row is not None
+
+    def _delete_network(self, name, biogrid_version):
+        """
+        Deletes network and its interactions, caller must be
+        in a transaction
+        """
+        connection = self._connection
+        row = connection.execute('SELECT id FROM networks WHERE name = ? '
+                                 'AND biogrid_version = ?',
+                                 (name, biogrid_version)).fetchone()
+        if row is None:
+            return
+        logger.debug('Replacing interactions of ' + name + ' in index')
+        connection.execute('DELETE FROM citations WHERE interaction_id IN '
+                           '(SELECT id FROM interactions '
+                           'WHERE network_id = ?)', row)
+        connection.execute('DELETE FROM interactions WHERE network_id = ?',
+                           row)
+        connection.execute('DELETE FROM networks WHERE id = ?', row)
+
+    @staticmethod
+    def _get_conditions(entrez=None, symbol=None, chemical=None, pubmed=None,
+                        organism=None, biogrid_version=None):
+        """
+        :return: (SQL conditions joined by AND, parameters)
+        :rtype: tuple
+        """
+        conditions = []
+        params = []
+        if entrez is not None:
+            conditions.append('(i.entrez_a = ? OR i.entrez_b = ?)')
+            params.extend([entrez, entrez])
+        if symbol is not None:
+            conditions.append('(i.symbol_a = ? COLLATE NOCASE OR '
+                              'i.symbol_b = ? COLLATE NOCASE)')
+            params.extend([symbol, symbol])
+        if chemical is not None:
+            conditions.append('(i.chemical_id = ? COLLATE NOCASE OR '
+                              'i.chemical_name = ? COLLATE NOCASE)')
+            params.extend([chemical, chemical])
+        if pubmed is not None:
+            conditions.append('i.id IN (SELECT interaction_id FROM citations '
+                              'WHERE pubmed_id = ?)')
+            params.append(pubmed)
+        if organism is not None:
+            conditions.append('(i.organism_a = ? OR i.organism_b = ?)')
+            params.extend([organism, organism])
+        if biogrid_version is not None:
+            conditions.append('n.biogrid_version = ?')
+            params.append(biogrid_version)
+        return ' AND '.join(conditions) or '1', params
+
+    def find_networks(self, **kwargs):
+        """
+        Finds networks with interactions matching every criteria
+        passed in
+
+        :param kwargs: see :py:meth:`find_interactions`
+        :return: dicts with name, type, taxon, biogridVersion and
+                 numMatches, number of matching interactions, of
+                 each network
+        :rtype: list
+        """
+        conditions, params = self._get_conditions(**kwargs)
+        cursor = self._connection.execute('SELECT n.name, n.type, n.taxon, '
+                                          'n.biogrid_version, COUNT(*) '
+                                          'FROM interactions i '
+                                          'JOIN networks n '
+                                          'ON i.network_id = n.id WHERE ' +
+                                          conditions + ' GROUP BY n.id '
+                                          'ORDER BY n.biogrid_version, n.name',
+                                          params)
+        return [{'name': row[0], 'type': row[1], 'taxon': row[2],
+                 'biogridVersion': row[3], 'numMatches': row[4]}
+                for row in cursor]
+
+    def find_interactions(self, entrez=None, symbol=None, chemical=None,
+                          pubmed=None, organism=None, biogrid_version=None,
+                          limit=None):
+        """
+        Finds interactions matching every criteria passed in
+
+        :param entrez: Entrez gene ID of either interactor
+        :type entrez: str
+        :param symbol: official symbol of either interactor,
+                       ignoring case
+        :type symbol: str
+        :param chemical: source ID, such as DrugBank ID, or name of
+                         chemical, ignoring case
+        :type chemical: str
+        :param pubmed: Pubmed ID of a citation
+        :type pubmed: str
+        :param organism: NCBI taxonomy ID of either interactor
+        :type organism: str
+        :param biogrid_version: version of BioGRID release
+        :type biogrid_version: str
+        :param limit: most interactions to return, if ``None``
+                      all are returned
+        :type limit: int
+        :return: dicts with network, biogridVersion, pubmedIds and
+                 columns of :py:const:`INTERACTION_COLUMNS` that are
+                 set for each interaction
+        :rtype: list
+        """
+        conditions, params = \
+            self._get_conditions(entrez=entrez, symbol=symbol,
+                                 chemical=chemical, pubmed=pubmed,
+                                 organism=organism,
+                                 biogrid_version=biogrid_version)
+        sql = 'SELECT n.name, n.biogrid_version, i.id, ' + \
+              ', '.join('i.' + c for c in INTERACTION_COLUMNS) + \
+              ' FROM interactions i JOIN networks n ' \
+              'ON i.network_id = n.id WHERE ' + conditions + \
+              ' ORDER BY n.biogrid_version, n.name, i.id'
+        if limit is not None:
+            sql += ' LIMIT ' + str(int(limit))
+        results = []
+        for row in self._connection.execute(sql, params).fetchall():
+            interaction = {'network': row[0], 'biogridVersion': row[1]}
+            for column, value in zip(INTERACTION_COLUMNS, row[3:]):
+                if value is not None:
+                    interaction[column] = value
+            citations = self._connection.execute('SELECT pubmed_id '
+                                                 'FROM citations '
+                                                 'WHERE interaction_id = ?',
+                                                 (row[2],))
+            interaction['pubmedIds'] = [r[0] for r in citations]
+            results.append(interaction)
+        return results
+
+
+def _parse_arguments(desc, args):
+    help_formatter = argparse.RawDescriptionHelpFormatter
+    parser = argparse.ArgumentParser(description=desc,
+                                     formatter_class=help_formatter)
+    parser.add_argument('indexfile',
+                        help='SQLite database written via --interactionindex')
+    parser.add_argument('--entrez', help='Entrez gene ID of either interactor')
+    parser.add_argument('--symbol',
+                        help='Official symbol of either interactor')
+    parser.add_argument('--chemical', help='Source ID or name of chemical')
+    parser.add_argument('--pubmed', help='Pubmed ID of a citation')
+    parser.add_argument('--organism',
+                        help='NCBI taxonomy ID of either interactor')
+    parser.add_argument('--biogridversion', help='Version of BioGRID release')
+    parser.add_argument('--interactions', action='store_true',
+                        help='Output matching interactions as JSON lines '
+                             'instead of networks holding them')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Most interactions to output with '
+                             '--interactions')
+    return parser.parse_args(args)
+
+
+def main(args):
+    """
+    Outputs networks, or with --interactions the interactions, in
+    index matching every criteria passed in
+    """
+    theargs = _parse_arguments(__doc__, args[1:])
+    if not os.path.isfile(theargs.indexfile):
+        sys.stderr.write(theargs.indexfile + ' does not exist\n')
+        return 1
+    criteria = {'entrez': theargs.entrez, 'symbol': theargs.symbol,
+                'chemical': theargs.chemical, 'pubmed': theargs.pubmed,
+                'organism': theargs.organism,
+                'biogrid_version': theargs.biogridversion}
+    with InteractionIndex(theargs.indexfile) as index:
+        if theargs.interactions:
+            for interaction in index.find_interactions(limit=theargs.limit,
+                                                       **criteria):
+                sys.stdout.write(json.dumps(interaction) + '\n')
+            return 0
+        for network in index.find_networks(**criteria):
+            sys.stdout.write('\t'.join([network['name'],
+                                        network['biogridVersion'],
+                                        str(network['numMatches'])]) + '\n')
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv))
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compiles a tsv2nicecx2 load plan once and builds a
+:py:class:`~ndexbiogridloader.network.ColumnarNetwork`, or
+:py:class:`~ndex2.nice_cx_network.NiceCXNetwork`, from a whole
+:py:class:`pandas.DataFrame` with it, producing the same network as
+:py:func:`ndexutil.tsv.tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan`
+without creating a :py:class:`pandas.Series` per row
+"""
+
+import json
+import logging
+
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+from ndexbiogridloader.network import ColumnarNetwork
+
+logger = logging.getLogger(__name__)
+
+
+COMPILED_CONVERTER = 'compiled'
+"""
+Converter that builds networks with :py:class:`CompiledLoadPlan`
+"""
+
+TSV2NICECX2_CONVERTER = 'tsv2nicecx2'
+"""
+Converter that builds networks with
+:py:func:`ndexutil.tsv.tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan`
+"""
+
+CONVERTERS = [COMPILED_CONVERTER, TSV2NICECX2_CONVERTER]
+"""
+Values accepted by --converter
+"""
+
+CX_DATA_TYPES = ['boolean', 'byte', 'char', 'double', 'float', 'integer',
+                 'long', 'short', 'string', 'list_of_boolean', 'list_of_byte',
+                 'list_of_char', 'list_of_double', 'list_of_float',
+                 'list_of_integer', 'list_of_long', 'list_of_short',
+                 'list_of_string']
+"""
+Data types a load plan can convert column values to
+"""
+
+NODE_PLAN_KEYS = {'rep_column', 'rep_prefix', 'node_name_column',
+                  'property_columns'}
+"""
+Keys of source and target plans supported by :py:func:`compile_load_plan`
+"""
+
+EDGE_PLAN_KEYS = {'default_predicate', 'predicate_id_column',
+                  'predicate_prefix', 'property_columns'}
+"""
+Keys of edge plan supported by :py:func:`compile_load_plan`
+"""
+
+PROPERTY_KEYS = {'column_name', 'attribute_name', 'delimiter',
+                 'default_value', 'value_prefix', 'data_type'}
+"""
+Keys of property columns supported by :py:func:`compile_load_plan`
+"""
+
+_SKIP = object()
+"""
+Marks a value that does not produce an attribute
+"""
+
+
+def _to_type(data, data_type):
+    """
+    Converts value to data type the same way as
+    :py:func:`ndexutil.tsv.tsv2nicecx2.data_to_type`
+
+    :return: converted value or ``None`` if it cannot be converted
+    """
+    try:
+        if type(data) is str:
+            data = data.replace('[', '').replace(']', '')
+            if 'list_of' in data_type:
+                data = data.split(',')
+        if data_type == 'boolean':
+            if type(data) is str:
+                return data.lower() == 'true'
+            return bool(data)
+        if data_type == 'byte':
+            return str(data).encode()
+        if data_type in ('double', 'float'):
+            return float(data)
+        if data_type in ('integer', 'long', 'short'):
+            return int(data)
+        if data_type == 'list_of_boolean':
+            if type(data[0]) is str:
+                return [s.lower() == 'true' for s in data]
+            return [bool(s) for s in data]
+        if data_type == 'list_of_byte':
+            return [bytes(s) for s in data]
+        if data_type in ('list_of_double', 'list_of_float'):
+            return [float(s) for s in data]
+        if data_type in ('list_of_integer', 'list_of_long', 'list_of_short'):
+            return [int(s) for s in data]
+        if data_type in ('list_of_string', 'list_of_char'):
+            return [str(s) for s in data]
+        return str(data)
+    except Exception:
+        return None
+
+
+def _infer_type(value):
+    """
+    Gets CX data type of value the same way NiceCXBuilder does for
+    attributes added without a type
+
+    :return: (value, data type)
+    :rtype: tuple
+    """
+    if isinstance(value, float):
+        if value != value:
+            return None, 'double'
+        if value in (float('inf'), float('-inf')):
+            return 'INFINITY', 'double'
+        return value, 'double'
+    if isinstance(value, bool):
+        return value, 'boolean'
+    if isinstance(value, int):
+        return value, 'integer'
+    if isinstance(value, list):
+        if len(value) > 0:
+            if isinstance(value[0], float):
+                return value, 'list_of_double'
+            if isinstance(value[0], bool):
+                return value, 'list_of_boolean'
+            if isinstance(value[0], int):
+                return value, 'list_of_integer'
+        return value, 'list_of_string'
+    return value, 'string'
+
+
+def _finish_attribute(value, data_type):
+    """
+    Normalizes value and data type the same way NiceCXBuilder does
+    when an attribute is added
+
+    :return: (value, data type) or :py:const:`_SKIP`
+    """
+    if data_type:
+        if data_type in ('float', 'double'):
+            data_type = 'double'
+            if not isinstance(value, float):
+                value = float(value)
+        elif data_type in ('list_of_float', 'list_of_double'):
+            data_type = 'list_of_double'
+    else:
+        value, data_type = _infer_type(value)
+    if value is None:
+        return _SKIP
+    return value, data_type
+
+
+class _PropertyColumn(object):
+    """
+    Attribute created from a property column of a load plan
+    """
+
+    def __init__(self, column_raw, is_edge):
+        unknown = set(column_raw.keys()).difference(PROPERTY_KEYS)
+        if unknown:
+            raise NdexBioGRIDLoaderError('Unsupported property column keys: ' +
+                                         ', '.join(sorted(unknown)))
+        data_type = column_raw.get('data_type')
+        if data_type is not None and data_type not in CX_DATA_TYPES:
+            raise NdexBioGRIDLoaderError('data_type: ' + str(data_type) +
+                                         ' is not valid')
+        if data_type is not None and not is_edge and \
+                not column_raw.get('delimiter'):
+            # tsv2nicecx2 stops adding attributes to the node if
+            # such a value cannot be converted
+            raise NdexBioGRIDLoaderError('data_type without delimiter is '
+                                         'not supported for node properties')
+        self.column_name = column_raw.get('column_name')
+        self.attribute_name = column_raw.get('attribute_name') or \
+            self.column_name
+        if self.attribute_name is None:
+            raise NdexBioGRIDLoaderError('Property column needs column_name '
+                                         'or attribute_name')
+        self._delimiter = column_raw.get('delimiter')
+        self._default_value = column_raw.get('default_value')
+        self._value_prefix = column_raw.get('value_prefix')
+        self._data_type = data_type
+        self._is_edge = is_edge
+
+    def _convert(self, value):
+        """
+        Converts raw column value into (attribute value, data type)
+        or :py:const:`_SKIP`
+        """
+        if self._is_edge:
+            if value is None or value != value or value == 'None':
+                if not self._default_value:
+                    return _SKIP
+                value = self._default_value
+        else:
+            if value is None and self._default_value:
+                value = self._default_value
+            if not value:
+                return _SKIP
+
+        data_type = self._data_type
+        if self._delimiter:
+            if not isinstance(value, str):
+                value = str(value)
+            value = [entry.strip() for entry in value.split(self._delimiter)]
+            if data_type:
+                value = _to_type(value, data_type)
+                if not data_type.startswith('list'):
+                    data_type = 'list_of_' + data_type
+            else:
+                data_type = 'list_of_string'
+            if value is None:
+                return _SKIP
+            if self._value_prefix:
+                value = [self._value_prefix + ':' + str(v) for v in value]
+        else:
+            if data_type:
+                value = _to_type(value, data_type)
+            if value is None:
+                return _SKIP
+            if self._value_prefix:
+                value = self._value_prefix + ':' + str(value)
+        return _finish_attribute(value, data_type)
+
+    def convert_column(self, values):
+        """
+        Converts a whole column converting each distinct value once.
+        Rows with the same value share the converted value object
+
+        :param values: column values, ``None`` for every row if
+                       column is not in the data
+        :type values: list
+        :return: (attribute value, data type) or :py:const:`_SKIP`
+                 for each row
+        :rtype: list
+        """
+        converted = {}
+        res = []
+        for value in values:
+            try:
+                res.append(converted[value])
+            except KeyError:
+                converted[value] = self._convert(value)
+                res.append(converted[value])
+            except TypeError:
+                # unhashable
+                res.append(self._convert(value))
+        return res
+
+
+class _NodePlan(object):
+    """
+    Compiled source or target plan
+    """
+
+    def __init__(self, node_plan):
+        unknown = set(node_plan.keys()).difference(NODE_PLAN_KEYS)
+        if unknown:
+            raise NdexBioGRIDLoaderError('Unsupported node plan keys: ' +
+                                         ', '.join(sorted(unknown)))
+        self.node_name_column = node_plan['node_name_column']
+        if '::' in self.node_name_column:
+            raise NdexBioGRIDLoaderError('Node name data types are not '
+                                         'supported')
+        self.rep_column = node_plan.get('rep_column')
+        if not self.rep_column:
+            raise NdexBioGRIDLoaderError('rep_column is required')
+        self._rep_prefix = node_plan.get('rep_prefix')
+        self.properties = []
+        for column_raw in node_plan.get('property_columns') or []:
+            if not isinstance(column_raw, dict):
+                raise NdexBioGRIDLoaderError('Only property columns given '
+                                             'as objects are supported')
+            self.properties.append(_PropertyColumn(column_raw, False))
+
+    def convert_reps(self, values):
+        """
+        Adds prefix to each distinct non empty value of rep column
+
+        :param values: values of rep column
+        :type values: list
+        :rtype: list
+        """
+        if not self._rep_prefix:
+            return values
+        converted = {}
+        res = []
+        for value in values:
+            rep = converted.get(value)
+            if rep is None:
+                rep = self._rep_prefix + ':' + str(value) if value else value
+                converted[value] = rep
+            res.append(rep)
+        return res
+
+
+class CompiledLoadPlan(object):
+    """
+    Load plan compiled by :py:func:`compile_load_plan`
+    """
+
+    def __init__(self, load_plan):
+        """
+        Constructor
+
+        :param load_plan: tsv2nicecx2 load plan
+        :type load_plan: dict
+        :raises NdexBioGRIDLoaderError: if plan uses a feature
+                                        that is not supported
+        """
+        unknown = set(load_plan.keys()).difference({'context',
+                                                    'source_plan',
+                                                    'target_plan',
+                                                    'edge_plan'})
+        if unknown:
+            raise NdexBioGRIDLoaderError('Unsupported load plan keys: ' +
+                                         ', '.join(sorted(unknown)))
+        self._context = load_plan.get('context')
+        self._source = _NodePlan(load_plan['source_plan'])
+        self._target = _NodePlan(load_plan['target_plan'])
+        edge_plan = load_plan['edge_plan']
+        unknown = set(edge_plan.keys()).difference(EDGE_PLAN_KEYS)
+        if unknown:
+            raise NdexBioGRIDLoaderError('Unsupported edge plan keys: ' +
+                                         ', '.join(sorted(unknown)))
+        self._default_predicate = edge_plan.get('default_predicate')
+        self._predicate_column = edge_plan.get('predicate_id_column')
+        self._predicate_prefix = edge_plan.get('predicate_prefix')
+        self._edge_properties = []
+        for column_raw in edge_plan.get('property_columns') or []:
+            if not isinstance(column_raw, dict):
+                raise NdexBioGRIDLoaderError('Only property columns given '
+                                             'as objects are supported')
+            self._edge_properties.append(_PropertyColumn(column_raw, True))
+        names = [p.attribute_name for p in self._edge_properties]
+        if len(names) != len(set(names)):
+            raise NdexBioGRIDLoaderError('Edge attribute names must be unique')
+
+    def get_columns(self):
+        """
+        :return: names of data columns used by plan
+        :rtype: set
+        """
+        columns = set()
+        for node_plan in [self._source, self._target]:
+            columns.add(node_plan.node_name_column)
+            columns.add(node_plan.rep_column)
+            columns.update(p.column_name for p in node_plan.properties
+                           if p.column_name)
+        if self._predicate_column:
+            columns.add(self._predicate_column)
+        columns.update(p.column_name for p in self._edge_properties
+                       if p.column_name)
+        return columns
+
+    @staticmethod
+    def _get_column(dataframe, column_name):
+        """
+        :return: values of column as list, ``None`` for every row if
+                 column is not in dataframe or name is ``None``
+        :rtype: list
+        """
+        if column_name is None or column_name not in dataframe.columns:
+            return [None] * len(dataframe)
+        return dataframe[column_name].tolist()
+
+    def _get_node_columns(self, dataframe, node_plan):
+        """
+        :return: (names, reps, converted values of each property)
+        :rtype: tuple
+        """
+        return (self._get_column(dataframe, node_plan.node_name_column),
+                node_plan.convert_reps(self._get_column(dataframe,
+                                                        node_plan.rep_column)),
+                [p.convert_column(self._get_column(dataframe, p.column_name))
+                 for p in node_plan.properties])
+
+    def _get_predicates(self, dataframe):
+        """
+        :return: interaction of each edge
+        :rtype: list
+        """
+        if self._predicate_column is None:
+            predicates = [None] * len(dataframe)
+        else:
+            predicates = self._get_column(dataframe, self._predicate_column)
+        res = []
+        for predicate in predicates:
+            if not predicate:
+                predicate = self._default_predicate
+            if not predicate:
+                raise NdexBioGRIDLoaderError('Value for predicate string is '
+                                             'not found in this row.')
+            if self._predicate_prefix:
+                predicate = self._predicate_prefix + ':' + predicate
+            res.append(predicate)
+        return res
+
+    def convert_to_columnar(self, dataframe):
+        """
+        Builds network from dataframe. Column values are converted
+        a column at a time, each distinct value once, and nodes are
+        looked up by name in an index, as NiceCXBuilder does, so the
+        only per row work is adding the node, edge and attribute
+        values to the network
+
+        :param dataframe: data with columns named in load plan
+        :type dataframe: :py:class:`pandas.DataFrame`
+        :return: network
+        :rtype: :py:class:`~ndexbiogridloader.network.ColumnarNetwork`
+        """
+        node_plans = [(node_plan,
+                       self._get_node_columns(dataframe, node_plan))
+                      for node_plan in [self._source, self._target]]
+        predicates = self._get_predicates(dataframe)
+        edge_values = [p.convert_column(self._get_column(dataframe,
+                                                         p.column_name))
+                       for p in self._edge_properties]
+
+        network = ColumnarNetwork()
+        if self._context:
+            network.add_network_attribute(name='@context',
+                                          values=json.dumps(self._context))
+        edge_columns = [network.add_edge_attribute_column(p.attribute_name)
+                        for p in self._edge_properties]
+        edge_attributes = list(zip(edge_columns, edge_values))
+
+        node_ids = {}
+        # names of attributes already set on each node
+        node_attribute_names = []
+
+        for row in range(len(predicates)):
+            row_node_ids = []
+            for node_plan, (names, reps, properties) in node_plans:
+                name = names[row]
+                rep = reps[row]
+                if name and not rep:
+                    rep = name
+                elif not name and rep:
+                    name = rep
+                elif not name and not rep:
+                    logger.debug('No node name or ext id. Skipping this '
+                                 'node (' + node_plan.node_name_column + ')')
+                    row_node_ids.append(None)
+                    continue
+                node_id = node_ids.get(name)
+                if node_id is None:
+                    node_id = network.add_node(name, rep)
+                    node_ids[name] = node_id
+                    node_attribute_names.append(set())
+                attribute_names = node_attribute_names[node_id]
+                for index, prop in enumerate(node_plan.properties):
+                    if prop.attribute_name in attribute_names:
+                        continue
+                    converted = properties[index][row]
+                    if converted is _SKIP:
+                        continue
+                    attribute_names.add(prop.attribute_name)
+                    network.add_node_attribute(node_id, prop.attribute_name,
+                                               converted[0], converted[1])
+                row_node_ids.append(node_id)
+
+            source_id, target_id = row_node_ids
+            if source_id is None or target_id is None:
+                continue
+
+            network.add_edge(source_id, target_id, predicates[row])
+            for column, values in edge_attributes:
+                converted = values[row]
+                if converted is _SKIP:
+                    column.append(None, None)
+                else:
+                    column.append(converted[0], converted[1])
+        return network
+
+    def convert(self, dataframe):
+        """
+        Builds network from dataframe with :py:meth:`convert_to_columnar`
+
+        :param dataframe: data with columns named in load plan
+        :type dataframe: :py:class:`pandas.DataFrame`
+        :return: network
+        :rtype: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        """
+        return self.convert_to_columnar(dataframe).to_nice_cx()
+
+
+def compile_load_plan(load_plan):
+    """
+    Compiles load plan
+
+    :param load_plan: tsv2nicecx2 load plan
+    :type load_plan: dict
+    :raises NdexBioGRIDLoaderError: if plan uses a feature that is not
+                                    supported, in which case
+                                    tsv2nicecx2 should be used
+    :rtype: :py:class:`CompiledLoadPlan`
+    """
+    return CompiledLoadPlan(load_plan)
@@ -1,6 +1,8 @@
 #! /usr/bin/env python
 
 import os
+import gc
+import math
 import zipfile
 import argparse
 import sys
@@ -8,20 +10,54 @@ import logging
 import time
 import tempfile
 import shutil
+import multiprocessing
+import concurrent.futures
 from logging import config
-import requests
 
 from ndexutil.config import NDExUtilConfig
 import ndexbiogridloader
 from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
-import ndex2
-from ndex2.client import Ndex2
-import networkx as nx
-from ndexutil.cytoscape import Py4CytoscapeWrapper
-from ndexutil.cytoscape import DEFAULT_CYREST_API
-from ndexutil.ndex import NDExExtraUtils
-from tqdm import tqdm
-
+from ndexbiogridloader.tracing import TraceRecorder
+from ndexbiogridloader.aggregation import InteractionStore
+from ndexbiogridloader.aggregation import InMemoryAggregator
+from ndexbiogridloader.aggregation import SpillingAggregator
+from ndexbiogridloader.aggregation import RowSpool
+from ndexbiogridloader.aggregation import STORE_BYTES_PER_SOURCE_BYTE
+from ndexbiogridloader.aggregation import ORGANISM_CITATION_COLUMN
+from ndexbiogridloader.aggregation import ORGANISM_CATEGORICAL_COLUMNS
+from ndexbiogridloader.aggregation import CHEMICAL_CITATION_COLUMN
+from ndexbiogridloader.aggregation import CHEMICAL_CATEGORICAL_COLUMNS
+from ndexbiogridloader import parsers
+from ndexbiogridloader.cache import InteractionCache
+from ndexbiogridloader.interactionindex import InteractionIndex
+from ndexbiogridloader.planner import WorkItem
+from ndexbiogridloader.planner import WorkPlanner
+from ndexbiogridloader.planner import get_zip_member_sizes
+from ndexbiogridloader.planner import SOURCE_BYTES_PER_ROW
+from ndexbiogridloader.prefetch import MemberPrefetcher
+from ndexbiogridloader.prefetch import COPY_BUFFER_SIZE
+from ndexbiogridloader import progress
+from ndexbiogridloader.progress import StageProgress
+from ndexbiogridloader.progress import ProgressReader
+from ndexbiogridloader.sampling import RowSampler
+from ndexbiogridloader.sampling import parse_sample
+from ndexbiogridloader import sharding
+from ndexbiogridloader.targets import UploadTarget
+from ndexbiogridloader.targets import parse_profiles
+from ndexbiogridloader.watcher import RELEASE_ARCHIVE_URL
+from ndexbiogridloader.watcher import WATCH_STATE_FILE
+from ndexbiogridloader import cxwriter
+from ndexbiogridloader import cx2writer
+from ndexbiogridloader import loadplan
+from ndexbiogridloader.derived import load_derived_networks
+from ndexbiogridloader.network import ColumnarNetwork
+from ndexbiogridloader.network import get_merged_type
+from ndexbiogridloader.network import merge_values
+
+# pandas, ndex2, networkx, requests, tqdm, py4cytoscape and the
+# ndexutil tsv and cytoscape modules are imported by the methods
+# that use them so --help, --version, --plan-only and
+# --mergereports start quickly
 
 
 logger = logging.getLogger(__name__)
@@ -34,8 +70,6 @@ LOG_FORMAT = "%(asctime)-15s %(levelname)s %(relativeCreated)dms " \
 
 
 import json
-import pandas as pd
-import ndexutil.tsv.tsv2nicecx2 as t2n
 
 
 class Formatter(argparse.ArgumentDefaultsHelpFormatter,
@@ -81,6 +115,66 @@ Name of file containing json load plan
 for biogrid protein-chemical interactions
 """
 
+DERIVED_NETWORKS = 'derived_networks.json'
+"""
+Name of file containing example definitions of
+networks derived from organism interactions
+"""
+
+SOURCE_MODE_ORGANISM = 'organism'
+"""
+Source mode where each organism network is built from its own
+member of the BIOGRID-ORGANISM archive
+"""
+
+SOURCE_MODE_ALL = 'all'
+"""
+Source mode where all organism networks are built from a single
+pass over the BIOGRID-ALL archive
+"""
+
+SOURCE_MODES = [SOURCE_MODE_ORGANISM, SOURCE_MODE_ALL]
+"""
+Supported source modes
+"""
+
+ORGANISM_MAX_COLUMN = 21
+"""
+Index of last column of BioGRID tab2 file used to aggregate
+interactions, later columns are left unsplit by the parser
+"""
+
+CHEMICAL_MAX_COLUMN = 22
+"""
+Index of last column of BioGRID chemtab file used to aggregate
+interactions, later columns are left unsplit by the parser
+"""
+
+ORGANISM_GENE_COLUMNS = (1, 2)
+"""
+Indexes of Entrez Gene ID columns of interactors in BioGRID tab2
+file, used to keep neighborhoods of genes sampled via --sample
+"""
+
+CHEMICAL_GENE_COLUMNS = (2,)
+"""
+Index of Entrez Gene ID column in BioGRID chemtab file, used to
+keep neighborhoods of genes sampled via --sample
+"""
+
+SAMPLE_NAME_SUFFIX = ' (Sample)'
+"""
+Appended to name of networks built with --sample so uploading
+them does not replace networks built from all interactions
+"""
+
+DEFAULT_CYREST_API = 'http://localhost:1234/v1'
+"""
+URL of CyREST API of locally running Cytoscape, same as
+:py:const:`ndexutil.cytoscape.DEFAULT_CYREST_API` which is not
+imported here to avoid loading py4cytoscape at startup
+"""
+
 
 def get_package_dir():
     """
@@ -146,6 +240,218 @@ def get_chemicalsfile():
     return os.path.join(get_package_dir(), CHEMICALSLISTFILE)
 
 
+def get_derived_networks():
+    """
+    Gets the derived network definitions stored with this package
+
+    :return: path to file
+    :rtype: string
+    """
+    return os.path.join(get_package_dir(), DERIVED_NETWORKS)
+
+
+def _positive_float(value):
+    """
+    Argument type for values that must be a number greater then 0
+
+    :param value: value from command line
+    :type value: str
+    :raises argparse.ArgumentTypeError: if value is not a positive number
+    :return: value as float
+    :rtype: float
+    """
+    try:
+        res = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(str(value) + ' is not a number')
+    if res <= 0:
+        raise argparse.ArgumentTypeError(str(value) + ' must be greater '
+                                                      'then 0')
+    return res
+
+
+def _non_negative_int(value):
+    """
+    Argument type for values that must be an integer 0 or greater
+
+    :param value: value from command line
+    :type value: str
+    :raises argparse.ArgumentTypeError: if value is not an integer
+            0 or greater
+    :return: value as int
+    :rtype: int
+    """
+    try:
+        res = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(str(value) + ' is not an integer')
+    if res < 0:
+        raise argparse.ArgumentTypeError(str(value) + ' must be 0 or greater')
+    return res
+
+
+def _positive_int(value):
+    """
+    Argument type for values that must be an integer greater then 0
+
+    :param value: value from command line
+    :type value: str
+    :raises argparse.ArgumentTypeError: if value is not a positive integer
+    :return: value as int
+    :rtype: int
+    """
+    try:
+        res = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(str(value) + ' is not an integer')
+    if res <= 0:
+        raise argparse.ArgumentTypeError(str(value) + ' must be greater '
+                                                      'then 0')
+    return res
+
+
+def _get_physical_memory():
+    """
+    Gets physical memory of this machine
+
+    :return: memory in bytes or ``None`` if it cannot be determined
+    :rtype: int
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _get_peak_memory():
+    """
+    Gets peak resident memory of this process
+
+    :return: memory in bytes or ``None`` if it cannot be determined
+    :rtype: int
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+def _reset_peak_memory():
+    """
+    Resets peak resident memory of this process, as reported by
+    :py:func:`_get_peak_memory_since_reset`, so memory used by one
+    network is not attributed to networks built after it. Only
+    supported on Linux
+
+    :return: ``True`` if peak was reset
+    :rtype: bool
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _get_peak_memory_since_reset():
+    """
+    Gets peak resident memory of this process since last call
+    to :py:func:`_reset_peak_memory`
+
+    :return: memory in bytes or ``None`` if it cannot be determined
+    :rtype: int
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+_WORKER_LOADER = None
+"""
+Loader used by :py:func:`_process_entry_in_worker`, set before worker
+processes are forked
+"""
+
+
+def _process_entry_in_worker(entry, type):
+    """
+    Builds network for entry in a worker process forked from the
+    process running the loader
+
+    :param entry: line from organism or chemicals file split by tab
+    :type entry: list
+    :param type: either 'organism' or 'chemicals'
+    :type type: str
+    :return: (exit code, trace events recorded by worker,
+             seconds taken, peak memory of worker in bytes while
+             building network or ``None`` if unknown,
+             exit codes of uploads keyed by profile)
+    :rtype: tuple
+    """
+    loader = _WORKER_LOADER
+    loader._tracer.clear()
+    # archives opened by parent share file offsets with it
+    loader._zip_files = {}
+    loader._upload_statuses = None
+    peak_reset = _reset_peak_memory()
+    start = time.time()
+    exit_code = loader._process_entry(entry, type)
+    seconds = time.time() - start
+    peak_memory = _get_peak_memory_since_reset() if peak_reset else None
+    return exit_code, loader._tracer.get_events(), seconds, \
+        peak_memory, loader.get_upload_statuses()
+
+
+def _merge_reports(theargs):
+    """
+    Merges run reports passed via --mergereports, writing the merged
+    report to --reportfile, if set, and a summary to standard out
+
+    :param theargs: parsed command line arguments
+    :return: exit code of merged report
+    :rtype: int
+    """
+    reports = []
+    errors = []
+    for report_file in theargs.mergereports:
+        try:
+            with open(report_file, 'r') as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError) as e:
+            errors.append('Unable to read report ' + report_file +
+                          ' : ' + str(e))
+    merged = sharding.merge_reports(reports)
+    if errors:
+        merged['errors'] = errors + merged['errors']
+        merged['exitCode'] = max(merged['exitCode'], 2)
+
+    if theargs.reportfile is not None:
+        with open(theargs.reportfile, 'w') as f:
+            json.dump(merged, f, indent=2)
+    for error in merged['errors']:
+        sys.stdout.write(error + '\n')
+    failed = [e['name'] for e in merged['entries'] if e.get('exitCode') != 0]
+    sys.stdout.write('Merged ' + str(len(reports)) + ' of ' +
+                     str(merged['numShards']) + ' shard reports: ' +
+                     str(len(merged['entries'])) + ' networks, ' +
+                     str(len(failed)) + ' failed, exit code ' +
+                     str(merged['exitCode']) + '\n')
+    for name in failed:
+        sys.stdout.write('Failed: ' + name + '\n')
+    return merged['exitCode']
+
+
 def _parse_arguments(desc, args):
     """
     Parses command line arguments
@@ -161,7 +467,11 @@ def _parse_arguments(desc, args):
                                           'file to use to load '
                                           'NDEx credentials which means'
                                           'configuration under [XXX] will be'
-                                          'used '
+                                          'used. Set to comma separated '
+                                          'profiles, such as '
+                                          'staging,production, to upload '
+                                          'each network to every one of '
+                                          'them at once '
                                           '(default '
                                           'ndexbiogridloader)',
                         default='ndexbiogridloader')
@@ -212,8 +522,18 @@ def _parse_arguments(desc, args):
                         default=get_chemical_load_plan())
     parser.add_argument('--chemicalsfile', default=get_chemicalsfile(),
                         help='File containing list of chemicals to '
-                             'upload to NDEx. By default the list '
+                             'upload to NDEx. Each line builds a network '
+                             'for the taxon in its second column. '
+                             'By default the list '
                              'stored with this tool is used')
+    parser.add_argument('--derivednetworks', default=None,
+                        help='JSON file of networks to derive from the '
+                             'aggregated interactions of each organism, '
+                             'such as physical interactions only, built '
+                             'from the same read of its BioGRID file. '
+                             'Example definitions are stored with this '
+                             'tool in ' + get_derived_networks() +
+                             '. If unset no networks are derived')
     parser.add_argument('--organismstyle',
                         help='Use alternate organism style file',
                         default=get_organism_style())
@@ -223,6 +543,17 @@ def _parse_arguments(desc, args):
     parser.add_argument('--noprogressbar', action='store_true',
                         help='If set, disabled tqdm progress'
                              'bar from displaying')
+    parser.add_argument('--progressinterval', type=_positive_float,
+                        default=progress.LOG_INTERVAL,
+                        help='Seconds between log lines reporting bytes '
+                             'downloaded, bytes decompressed, rows '
+                             'parsed, edges collapsed and bytes uploaded, '
+                             'with rate and estimated time left, for '
+                             'each network. Lines are logged at INFO '
+                             'level in place of progress bars when '
+                             '--noprogressbar is set, standard error is '
+                             'not a terminal or networks are built in '
+                             'worker processes')
     parser.add_argument('--maxretries', type=int, default=5,
                         help='Number of retries to attempt to upload'
                              'each of network to NDEx')
@@ -241,7 +572,181 @@ def _parse_arguments(desc, args):
                         default=DEFAULT_CYREST_API,
                         help='URL of CyREST API. Default value '
                              'is default for locally running Cytoscape')
-    return parser.parse_args(args)
+    parser.add_argument('--tracefile', default=None,
+                        help='If set, a timeline of the download, unzip, '
+                             'aggregate, convert, collapse, layout, write '
+                             'and upload steps for each network is written '
+                             'to this path in Trace Event JSON format which '
+                             'can be viewed in chrome://tracing or '
+                             'https://ui.perfetto.dev')
+    parser.add_argument('--parser', choices=parsers.PARSERS,
+                        default=parsers.PYTHON_PARSER,
+                        help='Parser used to read BioGRID files and '
+                             'the intermediate TSV files. "' +
+                             parsers.ARROW_PARSER + '" uses the '
+                             'multi-threaded CSV reader from pyarrow '
+                             'and falls back to "' + parsers.PYTHON_PARSER +
+                             '" if pyarrow is not installed')
+    parser.add_argument('--converter', choices=loadplan.CONVERTERS,
+                        default=loadplan.COMPILED_CONVERTER,
+                        help='Converter used to build networks from '
+                             'aggregated interactions. "' +
+                             loadplan.COMPILED_CONVERTER + '" compiles each '
+                             'load plan once and converts whole columns at '
+                             'a time, falling back to "' +
+                             loadplan.TSV2NICECX2_CONVERTER + '" if a load '
+                             'plan uses a feature it does not support')
+    parser.add_argument('--cxformat', choices=cx2writer.CX_FORMATS,
+                        default=cx2writer.CX_FORMAT,
+                        help='Format networks are written to disk and '
+                             'uploaded to NDEx in. "' +
+                             cx2writer.CX2_FORMAT + '" writes .cx2 files '
+                             'that declare attribute names and types once '
+                             'and uploads them with the NDEx CX2 endpoints')
+    parser.add_argument('--cachedir', default=None,
+                        help='If set, aggregated interactions for each '
+                             'network are stored in compressed Parquet '
+                             'files under this directory, keyed by '
+                             'BioGRID version, and reused on later runs '
+                             'so changes to load plan, style or layout '
+                             'do not require re-reading BioGRID files. '
+                             'Requires pyarrow')
+    parser.add_argument('--interactionindex', default=None,
+                        help='If set, aggregated interactions of each '
+                             'network are also added to a SQLite database '
+                             'at this path, indexed by Entrez gene ID, '
+                             'symbol, chemical, Pubmed ID and organism. '
+                             'Query it with python -m '
+                             'ndexbiogridloader.interactionindex')
+    parser.add_argument('--aggregationmemory', type=_positive_float,
+                        default=None,
+                        help='Memory budget in megabytes for aggregating '
+                             'interactions from a BioGRID file. Files '
+                             'estimated to need more are hash partitioned '
+                             'into temporary files in <datadir> and '
+                             'aggregated one partition at a time. If unset '
+                             'all interactions are aggregated in memory')
+    parser.add_argument('--sample', type=parse_sample, default=None,
+                        help='If set, builds each network from a sample '
+                             'of the rows of its BioGRID file for quick '
+                             'end to end runs. Set to a fraction, such as '
+                             '0.01, to keep rows whose BioGRID interaction '
+                             'ID is selected by --sampleseed or to a '
+                             'number of rows, such as 5000, to keep the '
+                             'first rows. Sample is recorded in network '
+                             'attributes, --cachedir and '
+                             '--interactionindex are not used and upload '
+                             'is skipped unless --sampleupload is set')
+    parser.add_argument('--sampleseed', type=int, default=0,
+                        help='Seed selecting rows, or genes, kept when '
+                             '--sample is a fraction')
+    parser.add_argument('--sampleneighborhoods', action='store_true',
+                        help='If set, --sample selects genes instead of '
+                             'rows and keeps every row with a selected '
+                             'gene so neighborhoods of those genes are '
+                             'whole. With a number of rows, genes of the '
+                             'first rows are selected')
+    parser.add_argument('--sampleupload', action='store_true',
+                        help='If set, networks built with --sample are '
+                             'uploaded to NDEx with "' + SAMPLE_NAME_SUFFIX +
+                             '" appended to their names')
+    parser.add_argument('--sourcemode', choices=SOURCE_MODES,
+                        default=SOURCE_MODE_ORGANISM,
+                        help='Where organism interactions are read from. '
+                             '"' + SOURCE_MODE_ORGANISM + '" extracts and '
+                             'reads a file per organism from the '
+                             'BIOGRID-ORGANISM archive. "' +
+                             SOURCE_MODE_ALL + '" downloads the '
+                             'BIOGRID-ALL archive and reads it once, '
+                             'routing each interaction to the networks '
+                             'of the taxa of its interactors')
+    parser.add_argument('--workers', type=_positive_int, default=1,
+                        help='Number of organism networks to build at '
+                             'once, each in its own process. Networks are '
+                             'started largest first, sized by the '
+                             'uncompressed size of their BioGRID file')
+    parser.add_argument('--prefetch', type=_non_negative_int, default=1,
+                        help='Number of upcoming BioGRID organism files '
+                             'to extract from the organism archive in '
+                             'background threads while the current '
+                             'network is built. Only used when '
+                             '--workers is 1. Set to 0 to extract each '
+                             'file just before it is needed')
+    parser.add_argument('--memorybudget', type=_positive_float,
+                        default=None,
+                        help='Memory in megabytes available to networks '
+                             'built at once. A network only starts if its '
+                             'estimated memory fits alongside those already '
+                             'running. If unset, physical memory is used')
+    parser.add_argument('--lowmemory', action='store_true',
+                        help='If set, lowers peak memory used to build '
+                             'each network by releasing the interactions '
+                             'table once the network is created, writing '
+                             'CX an element at a time and releasing the '
+                             'network once it is written. Peak memory is '
+                             'logged and recorded in the run report')
+    parser.add_argument('--shard', type=sharding.parse_shard, default=None,
+                        help='Only build networks assigned to this shard, '
+                             'given as i/N where i is 1 to N. Organism and '
+                             'chemical networks are split into N shards of '
+                             'similar total size, the same way on every '
+                             'host given the same release files, so N hosts '
+                             'each running one shard build the full release')
+    parser.add_argument('--reportfile', default=None,
+                        help='Path to write JSON report listing exit code '
+                             'and time taken for each network. If unset '
+                             'and --shard is set, the report is written to '
+                             'run_report_shard_<i>_of_<N>.json in <datadir>. '
+                             'With --mergereports, path to write merged '
+                             'report to')
+    parser.add_argument('--mergereports', nargs='+', default=None,
+                        help='Merges run reports from every shard of a load '
+                             'printing a summary and exiting with the '
+                             'largest exit code of the shards, or 2 if any '
+                             'shard is missing or did not finish. No '
+                             'networks are built')
+    parser.add_argument('--serve', type=_positive_int, default=None,
+                        help='If set, runs as a service listening on this '
+                             'port instead of building every network. '
+                             'POST {"name": <name>, "version": <version>} '
+                             'to /networks builds and uploads the network '
+                             'with that name, as shown by --plan-only, for '
+                             'that BioGRID version (default '
+                             '--biogridversion). '
+                             'Files for each version are kept in '
+                             '<datadir>/<version> and style templates, load '
+                             'plans and archives are reused across requests. '
+                             'GET /networks lists names and GET /status '
+                             'reports builds done')
+    parser.add_argument('--servehost', default='127.0.0.1',
+                        help='Address service listens on when --serve '
+                             'is set')
+    parser.add_argument('--watch', type=_positive_int, default=None,
+                        help='If set, runs until interrupted checking '
+                             '--releaseindexurl every this many seconds for '
+                             'a BioGRID version newer then the last one '
+                             'loaded, starting from --biogridversion, and '
+                             'loading the newest into <datadir>/<version> '
+                             'when found. Last version loaded is kept in '
+                             '<datadir>/' + WATCH_STATE_FILE + '. Failed '
+                             'checks or loads are retried after a wait '
+                             'that doubles each time')
+    parser.add_argument('--releaseindexurl', default=RELEASE_ARCHIVE_URL,
+                        help='Page listing BioGRID releases checked by '
+                             '--watch')
+    parser.add_argument('--watchmaxbackoff', type=_positive_int,
+                        default=86400,
+                        help='Most seconds --watch waits before retrying '
+                             'after failed checks or loads')
+    parser.add_argument('--plan-only', dest='plan_only', action='store_true',
+                        help='If set, prints estimated size, rows, memory '
+                             'and time for each network and the order they '
+                             'would be built in, then exits without '
+                             'building any networks')
+    theargs = parser.parse_args(args)
+    if theargs.sample is not None and theargs.sampleupload is False:
+        theargs.skipupload = True
+    return theargs
 
 
 def _setup_logging(args):
@@ -286,8 +791,8 @@ class NdexBioGRIDLoader(object):
     Class to load content
     """
     def __init__(self, args,
-                 py4cyto=Py4CytoscapeWrapper(),
-                 ndexextra=NDExExtraUtils()):
+                 py4cyto=None,
+                 ndexextra=None):
         """
 
         :param args:
@@ -307,24 +812,74 @@ class NdexBioGRIDLoader(object):
         self._server = None
 
         self._ndex = None
+        self._targets = []
+        self._upload_statuses = None
 
         self._biogrid_version = args.biogridversion
 
         self._organism_file_name = os.path.join(self._datadir, 'organism.zip')
         self._chemicals_file_name = os.path.join(self._datadir, 'chemicals.zip')
+        self._all_file_name = os.path.join(self._datadir, 'all.zip')
 
         self._biogrid_organism_file_ext = '-' + self._biogrid_version + '.tab2.txt'
         self._biogrid_chemicals_file_ext = '-' + self._biogrid_version + '.chemtab.txt'
         self._skipdownload = args.skipdownload
         self._network = None
-        self._py4 = py4cyto
-        self._ndexextra = ndexextra
+        self._py4cyto = py4cyto
+        self._ndex_extra_utils = ndexextra
+        self._tracer = TraceRecorder(enabled=args.tracefile is not None)
+        self._parser = None
+        self._cache = None
+        self._chemical_tsv_files = {}
+        self._organism_tsv_files = {}
+        self._organism_source_sizes = {}
+        self._planner = None
+        self._shard_names = None
+        self._report = None
+        self._load_plans = {}
+        self._derived_networks = None
+        self._interactions = None
+        self._compiled_load_plans = {}
+        self._zip_files = {}
+        self._prefetcher = None
+        self._samplers = {}
+        self._organism_style_template = None
+        self._chem_style_template = None
+        self._ready = False
+
+    @property
+    def _py4(self):
+        """
+        Wrapper used to call Cytoscape. Unless passed to constructor,
+        it is created on first use so py4cytoscape is only imported
+        if a Cytoscape layout is run
+
+        :rtype: :py:class:`~ndexutil.cytoscape.Py4CytoscapeWrapper`
+        """
+        if self._py4cyto is None:
+            from ndexutil.cytoscape import Py4CytoscapeWrapper
+            self._py4cyto = Py4CytoscapeWrapper()
+        return self._py4cyto
+
+    @property
+    def _ndexextra(self):
+        """
+        NDEx utilities used by Cytoscape layout. Unless passed to
+        constructor, it is created on first use
+
+        :rtype: :py:class:`~ndexutil.ndex.NDExExtraUtils`
+        """
+        if self._ndex_extra_utils is None:
+            from ndexutil.ndex import NDExExtraUtils
+            self._ndex_extra_utils = NDExExtraUtils()
+        return self._ndex_extra_utils
 
     def _load_chemical_style_template(self):
         """
         Loads the CX network specified by self._chem_style into self._chem_style_template
         :return:
         """
+        import ndex2
         self._chem_style_template = ndex2.create_nice_cx_from_file(os.path.abspath(self._chem_style))
 
     def _load_organism_style_template(self):
@@ -332,8 +887,578 @@ class NdexBioGRIDLoader(object):
         Loads the CX network specified by self._organism_style into self._organism_style_template
         :return:
         """
+        import ndex2
         self._organism_style_template = ndex2.create_nice_cx_from_file(os.path.abspath(self._organism_style))
 
+    def _get_load_plan(self, type='organism'):
+        """
+        Gets load plan parsed from --organismloadplan or
+        --chemicalloadplan the first time it is needed
+
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :return: load plan
+        :rtype: dict
+        """
+        if type not in self._load_plans:
+            if type == 'organism':
+                load_plan = self._organism_load_plan
+            else:
+                load_plan = self._chem_load_plan
+            with open(load_plan, 'r') as lp:
+                self._load_plans[type] = json.load(lp)
+        return self._load_plans[type]
+
+    def _get_compiled_load_plan(self, type='organism'):
+        """
+        Gets load plan compiled with
+        :py:func:`~ndexbiogridloader.loadplan.compile_load_plan`
+        the first time it is needed
+
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :return: compiled load plan or ``None`` if load plan cannot
+                 be compiled or --converter is set to
+                 tsv2nicecx2
+        :rtype: :py:class:`~ndexbiogridloader.loadplan.CompiledLoadPlan`
+        """
+        if self._args.converter == loadplan.TSV2NICECX2_CONVERTER:
+            return None
+        if type not in self._compiled_load_plans:
+            try:
+                self._compiled_load_plans[type] = \
+                    loadplan.compile_load_plan(self._get_load_plan(type))
+            except NdexBioGRIDLoaderError as e:
+                logger.warning('Unable to compile ' + type + ' load plan, '
+                               'falling back to ' +
+                               loadplan.TSV2NICECX2_CONVERTER + ': ' + str(e))
+                self._compiled_load_plans[type] = None
+        return self._compiled_load_plans[type]
+
+    def _get_derived_networks(self, type='organism'):
+        """
+        Gets networks to derive from organism interactions, loaded
+        from --derivednetworks the first time they are needed
+
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :raises NdexBioGRIDLoaderError: if definitions are not valid
+        :return: definitions, empty for chemicals or if
+                 --derivednetworks is not set
+        :rtype: list
+        """
+        if type != 'organism' or self._args.derivednetworks is None:
+            return []
+        if self._derived_networks is None:
+            header = self._get_header_for_generating_organism_tsv()
+            # citations are aggregated so cannot be filtered on
+            columns = [c for i, c in enumerate(header)
+                       if i != ORGANISM_CITATION_COLUMN]
+            self._derived_networks = \
+                load_derived_networks(self._args.derivednetworks, columns)
+        return self._derived_networks
+
+    def _convert_dataframe_to_network(self, dataframe, type='organism'):
+        """
+        Builds network from aggregated interactions with the
+        converter set via --converter
+
+        :param dataframe: aggregated interactions
+        :type dataframe: :py:class:`pandas.DataFrame`
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :return: network, compiled load plans build a
+                 :py:class:`~ndexbiogridloader.network.ColumnarNetwork`
+        :rtype: :py:class:`~ndexbiogridloader.network.ColumnarNetwork` or
+                :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        """
+        compiled_plan = self._get_compiled_load_plan(type)
+        if compiled_plan is not None:
+            return compiled_plan.convert_to_columnar(dataframe)
+        import ndexutil.tsv.tsv2nicecx2 as t2n
+        return t2n.convert_pandas_to_nice_cx_with_load_plan(
+            dataframe, self._get_load_plan(type))
+
+    def _get_zip_file(self, zip_file):
+        """
+        Gets archive opened for reading. Archives are kept open,
+        with their central directory already read, until
+        :py:meth:`_close_zip_files` is called
+
+        :param zip_file: path to archive
+        :type zip_file: str
+        :rtype: :py:class:`zipfile.ZipFile`
+        """
+        zip_ref = self._zip_files.get(zip_file)
+        if zip_ref is None:
+            zip_ref = zipfile.ZipFile(zip_file, 'r')
+            self._zip_files[zip_file] = zip_ref
+        return zip_ref
+
+    def _close_zip_files(self):
+        """
+        Closes archives opened by :py:meth:`_get_zip_file`
+        :return: None
+        """
+        for zip_ref in self._zip_files.values():
+            zip_ref.close()
+        self._zip_files = {}
+
+    def _get_parser(self):
+        """
+        Gets parser set via --parser flag creating it on first call
+
+        :return: parser
+        :rtype: :py:class:`~ndexbiogridloader.parsers.ParserBackend`
+        """
+        if self._parser is None:
+            self._parser = parsers.get_parser_backend(self._args.parser)
+        return self._parser
+
+    def _get_cache(self):
+        """
+        Gets cache of aggregated interactions set via --cachedir
+        creating it on first call
+
+        :return: cache or ``None`` if caching is disabled
+        :rtype: :py:class:`~ndexbiogridloader.cache.InteractionCache`
+        """
+        if self._cache is None and self._args.cachedir is not None and \
+                self._args.sample is None:
+            try:
+                self._cache = InteractionCache(self._args.cachedir,
+                                               self._biogrid_version)
+            except NdexBioGRIDLoaderError as e:
+                logger.warning(str(e) + ' disabling cache')
+                self._args.cachedir = None
+        return self._cache
+
+    def _get_planner(self):
+        """
+        Gets planner configured via --workers and --memorybudget
+        creating it on first call
+
+        :return: planner
+        :rtype: :py:class:`~ndexbiogridloader.planner.WorkPlanner`
+        """
+        if self._planner is None:
+            if self._args.memorybudget is None:
+                memory_budget = _get_physical_memory()
+            else:
+                memory_budget = int(self._args.memorybudget * 1024 * 1024)
+            self._planner = WorkPlanner(max_workers=self._args.workers,
+                                        memory_budget=memory_budget)
+        return self._planner
+
+    def _get_work_item_name(self, entry, type='organism'):
+        """
+        Gets name identifying entry in plans and reports
+
+        :param entry: line from organism or chemicals file split by tab
+        :type entry: list
+        :param type: either 'organism' or 'chemicals'
+        :type type: str
+        :return: first column of entry followed by ``-<taxon>``
+                 for chemicals
+        :rtype: str
+        """
+        if type == 'organism':
+            return entry[0]
+        return entry[0] + '-' + self._get_taxon_id(entry)
+
+    def _get_entries(self, type='organism'):
+        """
+        Gets entries from organism or chemicals file to build. If
+        --shard is set only entries assigned to this shard by
+        :py:func:`~ndexbiogridloader.sharding.assign_shards` are returned
+
+        :param type: either 'organism' or 'chemicals'
+        :type type: str
+        :return: lines from file split by tab
+        :rtype: list
+        """
+        entries = self._get_organism_or_chemicals_file_content(type)
+        if self._args.shard is None:
+            return entries
+        if self._shard_names is None:
+            index, num_shards = self._args.shard
+            items = []
+            for item_type in ['organism', 'chemicals']:
+                items.extend(self._get_work_items(
+                    self._get_organism_or_chemicals_file_content(item_type),
+                    item_type))
+            shard_items = sharding.assign_shards(items, num_shards)[index - 1]
+            self._shard_names = set((item.get_type(), item.get_name())
+                                    for item in shard_items)
+            logger.info('Shard ' + str(index) + '/' + str(num_shards) +
+                        ' has ' + str(len(shard_items)) + ' of ' +
+                        str(len(items)) + ' networks')
+        return [entry for entry in entries
+                if (type, self._get_work_item_name(entry, type)) in
+                self._shard_names]
+
+    def _get_work_items(self, entries, type='organism'):
+        """
+        Creates work items for entries sized by the uncompressed size
+        of their BioGRID files read from the central directory of
+        the archives. In --sourcemode all, where an organism has no
+        file of its own, its share of the BIOGRID-ALL file found by
+        :py:meth:`_split_biogrid_all_file` is used if the file was
+        split, otherwise the BIOGRID-ALL file divided evenly across
+        every organism in the organism file so every shard estimates
+        the same sizes before splitting
+
+        :param entries: lines from organism or chemicals file split by tab
+        :type entries: list
+        :param type: either 'organism' or 'chemicals'
+        :type type: str
+        :return: work items in same order as entries
+        :rtype: list
+        """
+        if type != 'organism':
+            sizes = get_zip_member_sizes(self._chemicals_file_name)
+        elif self._args.sourcemode == SOURCE_MODE_ALL:
+            sizes = get_zip_member_sizes(self._all_file_name)
+            all_size = sizes.get(self._get_biogrid_all_file_name('.tab2.txt'))
+            if all_size is not None:
+                num_organisms = len(
+                    self._get_organism_or_chemicals_file_content('organism'))
+                all_size = int(all_size / max(num_organisms, 1))
+        else:
+            sizes = get_zip_member_sizes(self._organism_file_name)
+
+        items = []
+        for entry in entries:
+            name = self._get_work_item_name(entry, type)
+            if type == 'organism':
+                file_name = self._get_biogrid_file_name(entry)
+                if self._args.sourcemode == SOURCE_MODE_ALL:
+                    file_path = os.path.join(self._datadir, file_name)
+                    size = self._organism_source_sizes.get(file_path,
+                                                           all_size)
+                else:
+                    size = sizes.get(file_name)
+            else:
+                file_name = self._get_biogrid_chemicals_file_name(entry)
+                size = sizes.get(file_name)
+            if size is None:
+                logger.warning('Unable to determine size of ' + file_name)
+            items.append(WorkItem(name, entry, type, size))
+        return items
+
+    def _add_to_report(self, item, exit_code, seconds, peak_memory=None,
+                       uploads=None):
+        """
+        Records result of building work item in run report
+        """
+        if self._report is not None:
+            self._report.add_entry(item, exit_code, seconds,
+                                   peak_memory=peak_memory,
+                                   uploads=uploads)
+
+    def _process_item(self, item):
+        """
+        Builds network for work item in this process
+
+        :param item: work item
+        :type item: :py:class:`~ndexbiogridloader.planner.WorkItem`
+        :return: exit code of :py:meth:`_process_entry`
+        :rtype: int
+        """
+        peak_reset = _reset_peak_memory()
+        start = time.time()
+        self._upload_statuses = None
+        exit_code = self._process_entry(item.get_entry(), item.get_type())
+        seconds = time.time() - start
+        peak_memory = _get_peak_memory_since_reset() if peak_reset else None
+        self._add_to_report(item, exit_code, seconds,
+                            peak_memory=peak_memory,
+                            uploads=self._upload_statuses)
+        return exit_code
+
+    def _create_prefetcher(self, items):
+        """
+        Creates prefetcher that extracts BioGRID organism files of
+        items, in order, ahead of when they are needed
+
+        :param items: work items in order they will be built
+        :type items: list
+        :return: prefetcher or ``None`` if --prefetch is 0 or no
+                 file needs extracting
+        :rtype: :py:class:`~ndexbiogridloader.prefetch.MemberPrefetcher`
+        """
+        if self._args.prefetch == 0 or \
+                self._args.sourcemode == SOURCE_MODE_ALL:
+            return None
+        members = []
+        for item in items:
+            if item.get_type() != 'organism':
+                continue
+            file_name = self._get_biogrid_file_name(item.get_entry())
+            if not self._is_cached(os.path.join(self._datadir, file_name)):
+                members.append(file_name)
+        if len(members) <= 1:
+            return None
+        return MemberPrefetcher(self._organism_file_name, members,
+                                self._datadir, ahead=self._args.prefetch,
+                                create_progress=lambda member, total:
+                                self._create_progress('decompress', member,
+                                                      total, bar=False))
+
+    def _create_progress(self, stage, name=None, total=None,
+                         unit=progress.BYTES_UNIT, bar=True):
+        """
+        Creates progress of a stage of work. A progress bar is shown
+        if bar is ``True``, --noprogressbar is not set, standard error
+        is a terminal and this is not a worker process, otherwise
+        progress is logged every --progressinterval seconds
+
+        :param stage: name of stage ie 'download'
+        :type stage: str
+        :param name: name of item stage works on
+        :type name: str
+        :param total: amount of work in stage or ``None`` if unknown
+        :type total: int
+        :param unit: unit of work
+        :type unit: str
+        :param bar: if ``False`` progress is always logged, used for
+                    work done in background threads
+        :type bar: bool
+        :rtype: :py:class:`~ndexbiogridloader.progress.StageProgress`
+        """
+        bar = bar and self._args.noprogressbar is False and \
+            _WORKER_LOADER is None and sys.stderr.isatty()
+        return StageProgress(stage, name=name, total=total, unit=unit,
+                             bar=bar, log_interval=self._args.progressinterval)
+
+    def _iter_rows_with_progress(self, rows, name, file_size=None):
+        """
+        Wraps rows of BioGRID file so rows parsed are reported
+
+        :param rows: rows of BioGRID file
+        :type rows: iterable
+        :param name: name of BioGRID file
+        :type name: str
+        :param file_size: size of BioGRID file used to estimate
+                          number of rows, ``None`` if rows are filtered
+        :type file_size: int
+        :return: rows
+        """
+        total = None
+        if file_size is not None:
+            total = int(file_size / SOURCE_BYTES_PER_ROW)
+        with self._create_progress('parse', name, total,
+                                   unit='rows') as rows_progress:
+            for row in progress.iter_with_progress(rows, rows_progress):
+                yield row
+
+    def _process_entries(self, items, desc='Organisms'):
+        """
+        Builds networks for work items largest first. If --workers is
+        greater then 1 networks are built in forked worker processes
+        with items admitted by
+        :py:meth:`~ndexbiogridloader.planner.WorkPlanner.select_next`
+
+        :param items: work items to build
+        :type items: list
+        :param desc: description shown on progress bar
+        :type desc: str
+        :return: exit codes of the items
+        :rtype: set
+        """
+        from tqdm import tqdm
+        planner = self._get_planner()
+        pending = planner.order(items)
+        exit_codes = set()
+        if planner.get_max_workers() == 1 or len(pending) <= 1:
+            self._prefetcher = self._create_prefetcher(pending)
+            try:
+                for item in tqdm(pending, desc=desc,
+                                 disable=self._args.noprogressbar):
+                    exit_codes.add(self._process_item(item))
+            finally:
+                if self._prefetcher is not None:
+                    self._prefetcher.close()
+                    self._prefetcher = None
+            return exit_codes
+
+        global _WORKER_LOADER
+        _WORKER_LOADER = self
+        running = {}
+        try:
+            mp_context = multiprocessing.get_context('fork')
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=planner.get_max_workers(),
+                    mp_context=mp_context) as executor, \
+                    tqdm(total=len(pending), desc=desc,
+                         disable=self._args.noprogressbar) as progress:
+                while pending or running:
+                    item = planner.select_next(pending,
+                                               list(running.values()))
+                    while item is not None:
+                        pending.remove(item)
+                        logger.info('Starting ' + item.get_name() +
+                                    ' in worker')
+                        running[executor.submit(_process_entry_in_worker,
+                                                item.get_entry(),
+                                                item.get_type())] = item
+                        item = planner.select_next(pending,
+                                                   list(running.values()))
+                    done, not_done = concurrent.futures.wait(
+                        running,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        running_item = running.pop(future)
+                        exit_code, events, seconds, peak_memory, uploads = \
+                            future.result()
+                        self._tracer.add_events(events)
+                        self._add_to_report(running_item, exit_code, seconds,
+                                            peak_memory=peak_memory,
+                                            uploads=uploads)
+                        exit_codes.add(exit_code)
+                        progress.update(1)
+        finally:
+            _WORKER_LOADER = None
+        return exit_codes
+
+    def _get_cache_name(self, file_path, taxon=None):
+        """
+        Gets name of aggregated interactions in cache for BioGRID file
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param taxon: NCBI taxonomy id interactions were selected
+                      for, only set for chemicals file
+        :type taxon: str
+        :return: file name without .tab2.txt or .chemtab.txt extension
+                 followed by ``-<taxon>`` if taxon is set
+        :rtype: str
+        """
+        name = os.path.basename(file_path)
+        for ext in ['.tab2.txt', '.chemtab.txt']:
+            if name.endswith(ext):
+                name = name[:-len(ext)]
+                break
+        if taxon is not None:
+            name += '-' + taxon
+        return name
+
+    def _is_cached(self, file_path, taxon=None):
+        """
+        Checks if aggregated interactions for BioGRID file are cached
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :rtype: bool
+        """
+        cache = self._get_cache()
+        if cache is None:
+            return False
+        return cache.has(self._get_cache_name(file_path, taxon))
+
+    def _put_in_cache(self, file_path, store, header, taxon=None):
+        """
+        Stores aggregated interactions in cache if caching is enabled
+
+        :param file_path: path to BioGRID file interactions came from
+        :type file_path: str
+        :param store: aggregated interactions
+        :type store:
+            :py:class:`~ndexbiogridloader.aggregation.InteractionStore`
+        :param header: column names
+        :type header: list
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: None
+        """
+        cache = self._get_cache()
+        if cache is None:
+            return
+        logger.info('Caching aggregated interactions from ' +
+                    os.path.basename(file_path))
+        cache.put(self._get_cache_name(file_path, taxon), store, header)
+
+    def _get_interaction_index_name(self, file_path, taxon=None):
+        """
+        Gets name of network in interaction index for BioGRID file
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: name from :py:meth:`_get_cache_name` without
+                 BioGRID version
+        :rtype: str
+        """
+        return self._get_cache_name(file_path,
+                                    taxon).replace('-' + self._biogrid_version,
+                                                   '', 1)
+
+    def _add_to_interaction_index(self, file_path, rows, type='organism',
+                                  taxon=None):
+        """
+        Adds aggregated interactions to database set via
+        --interactionindex if it is set. Each call opens the database
+        so worker processes can add networks to it
+
+        :param file_path: path to BioGRID file interactions came from
+        :type file_path: str
+        :param rows: aggregated interactions, lists of str in order of
+                     header of generated TSV
+        :type rows: iterable
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: None
+        """
+        if self._args.interactionindex is None or \
+                self._args.sample is not None:
+            return
+        name = self._get_interaction_index_name(file_path, taxon)
+        with self._tracer.span('index', args={'entry': name}):
+            with InteractionIndex(self._args.interactionindex) as index:
+                num_interactions = index.add_network(name, type,
+                                                     self._biogrid_version,
+                                                     rows, taxon=taxon)
+        logger.info('Added ' + str(num_interactions) + ' interactions of ' +
+                    name + ' to ' + self._args.interactionindex)
+
+    def _index_cached_interactions(self, file_path, type='organism',
+                                   taxon=None):
+        """
+        Adds interactions in cache to database set via --interactionindex
+        unless they were added by an earlier run
+
+        :param file_path: path to BioGRID file interactions came from
+        :type file_path: str
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: None
+        """
+        if self._args.interactionindex is None:
+            return
+        with InteractionIndex(self._args.interactionindex) as index:
+            if index.has_network(self._get_interaction_index_name(file_path,
+                                                                  taxon),
+                                 self._biogrid_version):
+                return
+        if type == 'organism':
+            header = self._get_header_for_generating_organism_tsv()
+        else:
+            header = self._get_header_for_generating_chemicals_tsv()
+        dataframe = self._get_cache().read(self._get_cache_name(file_path,
+                                                                taxon),
+                                           header, {})
+        self._add_to_interaction_index(file_path,
+                                       dataframe.itertuples(index=False,
+                                                            name=None),
+                                       type, taxon)
+
     def _get_biogrid_organism_file_name(self, file_extension):
         return 'BIOGRID-ORGANISM-' + self._biogrid_version + file_extension
 
@@ -345,6 +1470,14 @@ class NdexBioGRIDLoader(object):
         url = self._get_download_url() + self._get_biogrid_organism_file_name('.tab2.zip')
         return url
 
+    def _get_biogrid_all_file_name(self, file_extension):
+        return 'BIOGRID-ALL-' + self._biogrid_version + file_extension
+
+    def _build_all_file_url(self):
+        url = self._get_download_url() + \
+            self._get_biogrid_all_file_name('.tab2.zip')
+        return url
+
     def _get_chemicals_file_name(self, file_extension):
         return 'BIOGRID-CHEMICALS-' + self._biogrid_version + file_extension
 
@@ -359,9 +1492,33 @@ class NdexBioGRIDLoader(object):
         """
         ncon = NDExUtilConfig(conf_file=self._conf_file)
         con = ncon.get_config()
-        self._user = con.get(self._profile, NDExUtilConfig.USER)
-        self._pass = con.get(self._profile, NDExUtilConfig.PASSWORD)
-        self._server = con.get(self._profile, NDExUtilConfig.SERVER)
+        self._targets = []
+        for profile in parse_profiles(self._profile):
+            self._targets.append(
+                UploadTarget(profile,
+                             server=con.get(profile, NDExUtilConfig.SERVER),
+                             user=con.get(profile, NDExUtilConfig.USER),
+                             password=con.get(profile,
+                                              NDExUtilConfig.PASSWORD)))
+        self._user = self._targets[0].get_user()
+        self._pass = self._targets[0].get_password()
+        self._server = self._targets[0].get_server()
+
+    def _get_targets(self):
+        """
+        Gets NDEx servers and accounts networks are uploaded to,
+        one per profile set via --profile. If config has not been
+        parsed the credentials set on this loader are used
+
+        :return: targets, first is the one whose connection is
+                 set as ``self._ndex``
+        :rtype: list
+        """
+        if not self._targets:
+            self._targets = [UploadTarget(self._profile, server=self._server,
+                                          user=self._user,
+                                          password=self._pass)]
+        return self._targets
 
     def _get_biogrid_file_name(self, organism_entry):
         return organism_entry[0] + self._biogrid_organism_file_ext
@@ -369,6 +1526,43 @@ class NdexBioGRIDLoader(object):
     def _get_biogrid_chemicals_file_name(self, chemical_entry):
         return chemical_entry[0] + self._biogrid_chemicals_file_ext
 
+    def _get_taxon_id(self, entry):
+        """
+        Gets NCBI taxonomy id from organism or chemicals file entry
+        whose second column is of form ``Human, 9606, Homo sapiens``
+
+        :param entry: line from organism or chemicals file split by tab
+        :type entry: list
+        :raises NdexBioGRIDLoaderError: if entry has no taxonomy id
+        :return: taxonomy id
+        :rtype: str
+        """
+        split_names = entry[1].split(',') if len(entry) > 1 else []
+        taxon = split_names[1].strip() if len(split_names) > 1 else ''
+        if not taxon or taxon.strip('0123456789'):
+            raise NdexBioGRIDLoaderError('Entry ' + repr('\t'.join(entry)) +
+                                         ' needs a second column such as '
+                                         '"Human, 9606, Homo sapiens"')
+        return taxon
+
+    def _check_organism_and_chemicals_files(self):
+        """
+        Checks every entry of organism and chemicals files has a
+        taxonomy id, as it picks the rows of BioGRID files used
+        for the entry
+
+        :raises NdexBioGRIDLoaderError: if an entry is not valid
+        :return: None
+        """
+        for type in ['organism', 'chemicals']:
+            for entry in self._get_organism_or_chemicals_file_content(type):
+                try:
+                    self._get_taxon_id(entry)
+                except NdexBioGRIDLoaderError as e:
+                    path = self._args.organismfile if type == 'organism' \
+                        else self._args.chemicalsfile
+                    raise NdexBioGRIDLoaderError(str(path) + ': ' + str(e))
+
     def _get_header(self, file_path):
 
         with open(file_path, 'r') as f_read:
@@ -378,11 +1572,20 @@ class NdexBioGRIDLoader(object):
         return header_line_split, 0
 
     def _download_file(self, url, local_file):
+        import requests
         try:
-            response = requests.get(url)
+            response = requests.get(url, stream=True)
             if response.status_code // 100 == 2:
-                with open(local_file, "wb") as received_file:
-                    received_file.write(response.content)
+                total = response.headers.get('Content-Length')
+                if total is not None:
+                    total = int(total)
+                with open(local_file, "wb") as received_file, \
+                        self._create_progress('download',
+                                              os.path.basename(local_file),
+                                              total) as download_progress:
+                    for chunk in response.iter_content(COPY_BUFFER_SIZE):
+                        received_file.write(chunk)
+                        download_progress.update(len(chunk))
             else:
                 return response.status_code
 
@@ -393,10 +1596,15 @@ class NdexBioGRIDLoader(object):
         return 0
 
     def _download_biogrid_files(self):
-        biogrid_organism_url = self._build_organism_file_url()
         biogrid_chemicals_url = self._build_chemicals_file_url()
 
-        download_status = self._download_file(biogrid_organism_url, self._organism_file_name)
+        if self._args.sourcemode == SOURCE_MODE_ALL:
+            download_status = self._download_file(self._build_all_file_url(),
+                                                  self._all_file_name)
+        else:
+            download_status = \
+                self._download_file(self._build_organism_file_url(),
+                                    self._organism_file_name)
         if (download_status != 0):
             return download_status;
 
@@ -410,18 +1618,30 @@ class NdexBioGRIDLoader(object):
         with open(path_to_file, 'r') as f:
             for cnt, line in enumerate(f):
                 line_split = line.strip().split('\t')
-                line_split[1] = line_split[1].replace('"', '')
+                if len(line_split) > 1:
+                    line_split[1] = line_split[1].replace('"', '')
                 file_names.append(line_split)
         return file_names
 
     def _unzip_biogrid_file(self, file_name, type='organism'):
         try:
+            if self._prefetcher is not None:
+                extracted_file_path = self._prefetcher.get(file_name)
+                if extracted_file_path is not None:
+                    return 0, extracted_file_path
             if type == 'organism':
-                with zipfile.ZipFile(self._organism_file_name, "r") as zip_ref:
-                    extracted_file_path = zip_ref.extract(file_name, self._datadir)
+                zip_ref = self._get_zip_file(self._organism_file_name)
             else:
-                with zipfile.ZipFile(self._chemicals_file_name, "r") as zip_ref:
-                    extracted_file_path = zip_ref.extract(file_name, self._datadir)
+                zip_ref = self._get_zip_file(self._chemicals_file_name)
+            extracted_file_path = os.path.join(self._datadir, file_name)
+            file_size = zip_ref.getinfo(file_name).file_size
+            with zip_ref.open(file_name) as source, \
+                    open(extracted_file_path, 'wb') as target, \
+                    self._create_progress('decompress', file_name,
+                                          file_size) as decompress_progress:
+                progress.copy_with_progress(source, target,
+                                            decompress_progress,
+                                            COPY_BUFFER_SIZE)
 
         except Exception as e:
             logger.exception('Caught exception: ' + str(e))
@@ -483,140 +1703,621 @@ class NdexBioGRIDLoader(object):
 
     def _create_ndex_connection(self):
         """
-        creates connection to ndex
-        :return:
+        creates connection to ndex for every target. A connection
+        already set as ``self._ndex`` is used for the first target
+        :return: connection for first target
         """
-        if self._ndex is None:
-
-            try:
-                self._ndex = Ndex2(host=self._server, username=self._user,
-                                   password=self._pass,
-                                   user_agent=self._get_user_agent())
-            except Exception as e:
-                self._ndex = None
-
+        targets = self._get_targets()
+        if self._ndex is not None and targets[0].get_ndex() is None:
+            targets[0].set_ndex(self._ndex)
+        for target in targets:
+            target.connect(self._get_user_agent())
+        self._ndex = targets[0].get_ndex()
         return self._ndex
 
     def _load_network_summaries_for_user(self):
         """
-        Gets a dictionary of all networks for user account
+        Gets a dictionary of all networks for user account of
+        every target
         <network name upper cased> => <NDEx UUID>
-        :return: 0 if success, 2 otherwise
+        A target that is not connected or whose networks cannot be
+        loaded is skipped by uploads, which report 2 for it, while
+        networks are still uploaded to the other targets
+        :return: (networks of first available target, 0) if success
+                 for any target, (None, 2) otherwise
         """
-        self._network_summaries = {}
-
-        try:
-            network_summaries = self._ndex.get_network_summaries_for_user(self._user)
-        except Exception as e:
-            logger.error('Got error trying to get list of'
-                         'networks for user: ' + str(e))
+        summaries = []
+        for target in self._get_targets():
+            network_summaries, status_code = target.load_network_summaries()
+            if status_code != 0:
+                logger.error('Networks will not be uploaded to profile ' +
+                             target.get_profile())
+                continue
+            summaries.append(network_summaries)
+        if not summaries:
             return None, 2
-
-        for summary in network_summaries:
-            if summary.get('name') is not None:
-                self._network_summaries[summary.get('name').upper()] = summary.get('externalId')
-
+        self._network_summaries = summaries[0]
         return self._network_summaries, 0
 
-    def _generate_tsv_from_biogrid_organism_file(self, file_path):
-
-        tsv_file_path = file_path.replace('.tab2.txt', '.tsv')
-
-        with open(file_path, 'r') as f_read:
-            next(f_read) # skip header
+    def _create_organism_interaction_store(self):
+        """
+        :return: empty store for organism interactions
+        :rtype: :py:class:`~ndexbiogridloader.aggregation.InteractionStore`
+        """
+        num_columns = len(self._get_header_for_generating_organism_tsv())
+        return InteractionStore(num_columns, ORGANISM_CITATION_COLUMN,
+                                ORGANISM_CATEGORICAL_COLUMNS)
 
-            pubmed_id_idx = 8
-            result = {}
-            line_count = 0
+    def _get_organism_interaction_key(self, split_line):
+        """
+        Gets key used to aggregate row of BioGRID tab2 file. Rows
+        differing only by Pubmed ID get the same key
 
-            for line in f_read:
+        :param split_line: row of tab2 file
+        :type split_line: list
+        :rtype: str
+        """
+        return split_line[1] + "," + split_line[2] + "," + \
+            split_line[11] + "," + split_line[12] + "," + \
+            split_line[17] + "," + split_line[18] + "," + \
+            split_line[19] + "," + split_line[20] + "," + split_line[21]
 
-                split_line = line.split('\t')
+    def _add_organism_interaction(self, result, split_line, key):
+        """
+        Adds row of BioGRID tab2 file to store of organism interactions
+
+        :param result: store to add row to
+        :type result:
+            :py:class:`~ndexbiogridloader.aggregation.InteractionStore`
+        :param split_line: row of tab2 file
+        :type split_line: list
+        :param key: key returned by :py:meth:`_get_organism_interaction_key`
+        :type key: str
+        :return: None
+        """
+        if not result.add_citation(key, split_line[14]):
+            # same as _cvtfield() on each column but inlined since
+            # this runs for every interaction
+            result.append(key, [
+                split_line[1], split_line[2], split_line[7], split_line[8],
+                '' if split_line[9] == '-' else split_line[9],
+                '' if split_line[10] == '-' else split_line[10],
+                '' if split_line[11] == '-' else split_line[11],
+                '' if split_line[12] == '-' else split_line[12],
+                split_line[14],  # pubmed_id
+                '' if split_line[17] == '-' else split_line[17],
+                '' if split_line[18] == '-' else split_line[18],
+                '' if split_line[19] == '-' else split_line[19],
+                '' if split_line[20] == '-' else split_line[20],
+                '' if split_line[21] == '-' else split_line[21],
+                split_line[15], split_line[16]])
+
+    def _create_chemical_interaction_store(self):
+        """
+        :return: empty store for chemical interactions
+        :rtype: :py:class:`~ndexbiogridloader.aggregation.InteractionStore`
+        """
+        num_columns = len(self._get_header_for_generating_chemicals_tsv())
+        return InteractionStore(num_columns, CHEMICAL_CITATION_COLUMN,
+                                CHEMICAL_CATEGORICAL_COLUMNS)
 
-                key = split_line[1] + "," + split_line[2] + "," + split_line[11] + "," + split_line[12] + "," + \
-                      split_line[17] + "," + split_line[18] + "," + split_line[19] + "," + split_line[20] + "," + \
-                      split_line[21]
+    def _get_chemical_interaction_key(self, split_line):
+        """
+        Gets key used to aggregate row of BioGRID chemtab file
 
-                entry = result.get(key)
+        :param split_line: row of chemtab file
+        :type split_line: list
+        :rtype: str
+        """
+        return split_line[1] + "," + split_line[13]
 
-                if entry:
-                    entry[pubmed_id_idx].append(split_line[14])
-                else:
-                    entry = [split_line[1], split_line[2], split_line[7], split_line[8], \
-                             _cvtfield(split_line[9]), _cvtfield(split_line[10]), _cvtfield(split_line[11]),
-                             _cvtfield(split_line[12]), [split_line[14]],  # pubmed_ids
-                             _cvtfield(split_line[17]), _cvtfield(split_line[18]), _cvtfield(split_line[19]),
-                             _cvtfield(split_line[20]), _cvtfield(split_line[21]), split_line[15], split_line[16]]
+    def _add_chemical_interaction(self, result, split_line, key):
+        """
+        Adds row of BioGRID chemtab file to store of chemical interactions
+
+        :param result: store to add row to
+        :type result:
+            :py:class:`~ndexbiogridloader.aggregation.InteractionStore`
+        :param split_line: row of chemtab file
+        :type split_line: list
+        :param key: key returned by :py:meth:`_get_chemical_interaction_key`
+        :type key: str
+        :return: None
+        """
+        if not result.add_citation(key, split_line[11]):
+
+            chem_synon = "" if split_line[15] == '-' else split_line[15]
+            cas = "" if split_line[22] == '-' else "cas:" + split_line[22]
+            chem_alias = cas
+            if chem_alias:
+                if chem_synon:
+                    chem_alias += "|" + chem_synon
+            else:
+                chem_alias = chem_synon
 
-                    result[key] = entry
+            result.append(key, [
+                split_line[2], split_line[4],
+                "" if split_line[5] == '-' else split_line[5],
+                split_line[8], split_line[9], split_line[11],
+                split_line[14], chem_alias, split_line[18], split_line[20]])
 
-                line_count += 1
+    def _get_num_aggregation_partitions(self, file_path, file_size=None):
+        """
+        Gets number of partitions needed to aggregate BioGRID file
+        within memory budget set via --aggregationmemory
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param file_size: size of file rows are read from, if not
+                          set the size of file_path is used
+        :type file_size: int
+        :return: 1 if file can be aggregated in memory, this is not
+                 capped as aggregator re-partitions instead of opening
+                 more then
+                 :py:const:`~ndexbiogridloader.aggregation.MAX_OPEN_PARTITIONS`
+                 files
+        :rtype: int
+        """
+        if self._args.aggregationmemory is None:
+            return 1
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
+        budget = self._args.aggregationmemory * 1024 * 1024
+        estimate = file_size * STORE_BYTES_PER_SOURCE_BYTE
+        return max(1, int(math.ceil(estimate / budget)))
+
+    def _create_aggregator(self, file_path, type='organism', file_size=None):
+        """
+        Creates aggregator for rows of BioGRID file. If the file is too
+        large to aggregate within --aggregationmemory a
+        :py:class:`~ndexbiogridloader.aggregation.SpillingAggregator`
+        is returned otherwise an
+        :py:class:`~ndexbiogridloader.aggregation.InMemoryAggregator`
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param file_size: see :py:meth:`_get_num_aggregation_partitions`
+        :type file_size: int
+        :return: aggregator
+        """
+        if type == 'organism':
+            store_factory = self._create_organism_interaction_store
+            key_func = self._get_organism_interaction_key
+            add_func = self._add_organism_interaction
+        else:
+            store_factory = self._create_chemical_interaction_store
+            key_func = self._get_chemical_interaction_key
+            add_func = self._add_chemical_interaction
+
+        num_partitions = self._get_num_aggregation_partitions(file_path,
+                                                              file_size)
+        if num_partitions > 1:
+            logger.info('Aggregating ' + os.path.basename(file_path) +
+                        ' in ' + str(num_partitions) + ' partitions')
+            return SpillingAggregator(num_partitions, store_factory,
+                                      key_func, add_func,
+                                      temp_dir=self._datadir)
+        return InMemoryAggregator(store_factory, key_func, add_func)
+
+    def _get_sampled_add(self, aggregator, file_path, type='organism',
+                         taxon=None):
+        """
+        Gets function that adds rows of BioGRID file to aggregator.
+        If --sample is set, a new sampler is created for the network
+        and only rows it keeps are added
+
+        :param aggregator: aggregator returned by
+                           :py:meth:`_create_aggregator`
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: function taking a row
+        :rtype: function
+        """
+        if self._args.sample is None:
+            return aggregator.add
+        gene_columns = None
+        if self._args.sampleneighborhoods is True:
+            if type == 'organism':
+                gene_columns = ORGANISM_GENE_COLUMNS
+            else:
+                gene_columns = CHEMICAL_GENE_COLUMNS
+        fraction, max_rows = self._args.sample
+        sampler = RowSampler(fraction=fraction, max_rows=max_rows,
+                             seed=self._args.sampleseed,
+                             gene_columns=gene_columns)
+        self._samplers[self._get_cache_name(file_path, taxon)] = sampler
+        add = aggregator.add
+        keep = sampler.keep
+
+        def sampled_add(split_line):
+            if keep(split_line):
+                add(split_line)
+        return sampled_add
+
+    def _get_sample_done(self, cache_names):
+        """
+        Gets function telling if every network sampled while reading
+        a BioGRID file is done, see
+        :py:meth:`~ndexbiogridloader.sampling.RowSampler.is_done`
+
+        :param cache_names: names, from :py:meth:`_get_cache_name`,
+                            of networks sampled
+        :type cache_names: list
+        :return: function taking no arguments or ``None`` if
+                 --sample is not set or reading cannot stop early
+        :rtype: function
+        """
+        if self._args.sample is None or \
+                self._args.sampleneighborhoods is True or \
+                self._args.sample[0] is not None:
+            return None
+        samplers = [self._samplers[name] for name in cache_names]
+        if not samplers:
+            return None
+
+        def sample_done():
+            return all(sampler.is_done() for sampler in samplers)
+        return sample_done
+
+    def _write_aggregated(self, aggregator, file_path, tsv_file_path,
+                          type='organism', taxon=None):
+        """
+        Writes interactions aggregated by aggregator to tsv_file_path
+        and, if enabled, to the cache
+
+        :param aggregator: aggregator returned by
+                           :py:meth:`_create_aggregator`
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param tsv_file_path: path to write aggregated interactions to
+        :type tsv_file_path: str
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: None
+        """
+        if type == 'organism':
+            header = self._get_header_for_generating_organism_tsv()
+            categorical_columns = ORGANISM_CATEGORICAL_COLUMNS
+        else:
+            header = self._get_header_for_generating_chemicals_tsv()
+            categorical_columns = CHEMICAL_CATEGORICAL_COLUMNS
+
+        with open(tsv_file_path, 'w') as f_output_tsv:
+            aggregator.write(f_output_tsv, header)
+
+        if isinstance(aggregator, InMemoryAggregator):
+            self._add_to_interaction_index(file_path,
+                                           aggregator.get_store().rows(),
+                                           type, taxon)
+            self._put_in_cache(file_path, aggregator.get_store(), header,
+                               taxon)
+            return
+        with open(tsv_file_path, 'r') as f_input_tsv:
+            next(f_input_tsv)
+            self._add_to_interaction_index(file_path,
+                                           (line.rstrip('\n').split('\t')
+                                            for line in f_input_tsv),
+                                           type, taxon)
+        cache = self._get_cache()
+        if cache is not None:
+            cache.put_tsv(self._get_cache_name(file_path, taxon),
+                          tsv_file_path, header, categorical_columns)
+
+    def _aggregate_to_tsv(self, file_path, tsv_file_path, rows,
+                          type='organism'):
+        """
+        Aggregates rows of BioGRID file into interactions that are
+        written to tsv_file_path and, if enabled, to the cache
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param tsv_file_path: path to write aggregated interactions to
+        :type tsv_file_path: str
+        :param rows: rows of BioGRID file
+        :type rows: iterable
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :return: None
+        """
+        aggregator = self._create_aggregator(file_path, type)
+        try:
+            add = self._get_sampled_add(aggregator, file_path, type)
+            sample_done = \
+                self._get_sample_done([self._get_cache_name(file_path)])
+            for split_line in rows:
+                add(split_line)
+                if sample_done is not None and sample_done():
+                    break
+        except Exception:
+            aggregator.close()
+            raise
+        self._write_aggregated(aggregator, file_path, tsv_file_path, type)
 
-            with open(tsv_file_path, 'w') as f_output_tsv:
-                output_header = '\t'.join(self._get_header_for_generating_organism_tsv()) + '\n'
-                f_output_tsv.write(output_header)
+    def _generate_tsv_from_biogrid_organism_file(self, file_path):
 
-                for key, value in result.items():
-                    value[pubmed_id_idx] = '|'.join(value[pubmed_id_idx])
-                    f_output_tsv.write('\t'.join(value) + "\n")
+        tsv_file_path = file_path.replace('.tab2.txt', '.tsv')
 
+        rows = self._get_parser().iter_rows(file_path,
+                                            max_column=ORGANISM_MAX_COLUMN)
+        rows = self._iter_rows_with_progress(rows,
+                                             os.path.basename(file_path),
+                                             os.path.getsize(file_path))
+        self._aggregate_to_tsv(file_path, tsv_file_path, rows, 'organism')
         return tsv_file_path
 
-    def _generate_tsv_from_biogrid_chemicals_file(self, file_path):
-
-        tsv_file_path = file_path.replace('.chemtab.txt', '.tsv')
-
-        with open(file_path, 'r') as f_read:
-            next(f_read)  # skip header
-
-            result = {}
-            line_count = 0
-
-            for line in f_read:
-
-                line_count += 1
+    def _split_biogrid_all_file(self):
+        """
+        Aggregates interactions for every organism in the organism file,
+        that is not already cached, in a single pass over the
+        BIOGRID-ALL tab2 file streamed from its archive. Each
+        interaction is routed to the organisms matching the taxon of
+        either interactor, so cross-species interactions are added to
+        both organisms as in the BIOGRID-ORGANISM files.
+
+        If the whole file does not fit in --aggregationmemory, rows of
+        each organism are spooled to a temporary file instead and every
+        organism is aggregated on its own, after the pass, sized by its
+        share of the rows.
+
+        The tsv files are written where they would be if generated
+        from the BIOGRID-ORGANISM files and recorded so
+        :py:meth:`_is_organism_tsv_generated` returns ``True`` for them
+
+        :return: 0 upon success, 2 if archive could not be read
+        :rtype: int
+        """
+        member_name = self._get_biogrid_all_file_name('.tab2.txt')
+        try:
+            with zipfile.ZipFile(self._all_file_name, 'r') as zip_ref:
+                file_size = zip_ref.getinfo(member_name).file_size
+                spool = self._get_num_aggregation_partitions(member_name,
+                                                             file_size) > 1
+                routes = {}
+                aggregators = {}
+                taxa = {}
+                for entry in self._get_entries('organism'):
+                    file_path = os.path.join(
+                        self._datadir, self._get_biogrid_file_name(entry))
+                    if file_path in aggregators or \
+                            self._is_organism_tsv_generated(file_path) or \
+                            self._is_cached(file_path):
+                        continue
+                    if spool:
+                        aggregator = RowSpool(temp_dir=self._datadir)
+                    else:
+                        aggregator = self._create_aggregator(
+                            file_path, 'organism', file_size=file_size)
+                    aggregators[file_path] = aggregator
+                    taxa[file_path] = self._get_taxon_id(entry)
+                    routes.setdefault(taxa[file_path], []).append(
+                        self._get_sampled_add(aggregator, file_path))
+
+                logger.info('Aggregating ' + str(len(aggregators)) +
+                            ' organisms from ' + member_name)
+                sample_done = self._get_sample_done(
+                    [self._get_cache_name(file_path)
+                     for file_path in aggregators])
+                taxon_rows = dict.fromkeys(routes, 0)
+                num_rows = 0
+                try:
+                    with zip_ref.open(member_name) as f_read, \
+                            self._create_progress('decompress', member_name,
+                                                  file_size) as decompressed:
+                        rows = self._get_parser().iter_rows(
+                            ProgressReader(f_read, decompressed),
+                            max_column=ORGANISM_MAX_COLUMN)
+                        rows = self._iter_rows_with_progress(rows,
+                                                             member_name,
+                                                             file_size)
+                        for split_line in rows:
+                            num_rows += 1
+                            taxon_a = split_line[15]
+                            taxon_b = split_line[16]
+                            if taxon_a in taxon_rows:
+                                taxon_rows[taxon_a] += 1
+                                for add in routes[taxon_a]:
+                                    add(split_line)
+                            if taxon_b != taxon_a and taxon_b in taxon_rows:
+                                taxon_rows[taxon_b] += 1
+                                for add in routes[taxon_b]:
+                                    add(split_line)
+                            if sample_done is not None and sample_done():
+                                break
+                except Exception:
+                    for aggregator in aggregators.values():
+                        aggregator.close()
+                    raise
+        except Exception as e:
+            logger.exception('Caught exception: ' + str(e))
+            return 2
 
-                split_line = line.split('\t')
+        try:
+            for file_path, aggregator in aggregators.items():
+                # share of BIOGRID-ALL file holding rows of organism
+                source_size = int(file_size * taxon_rows[taxa[file_path]] /
+                                  max(num_rows, 1))
+                self._organism_source_sizes[file_path] = source_size
+                tsv_file_path = file_path.replace('.tab2.txt', '.tsv')
+                if spool:
+                    aggregator = self._aggregate_spooled(file_path,
+                                                         aggregator,
+                                                         source_size)
+                self._write_aggregated(aggregator, file_path, tsv_file_path,
+                                       'organism')
+                self._organism_tsv_files[file_path] = tsv_file_path
+        finally:
+            for aggregator in aggregators.values():
+                aggregator.close()
+        return 0
 
-                if split_line[6] != '9606':
-                    continue
+    def _aggregate_spooled(self, file_path, row_spool, source_size):
+        """
+        Aggregates rows of organism spooled by
+        :py:meth:`_split_biogrid_all_file`, removing the spool
+
+        :param file_path: path to BioGRID organism file
+        :type file_path: str
+        :param row_spool: rows of organism
+        :type row_spool: :py:class:`~ndexbiogridloader.aggregation.RowSpool`
+        :param source_size: estimated size of BioGRID organism file
+        :type source_size: int
+        :return: aggregator holding the rows
+        """
+        aggregator = self._create_aggregator(file_path, 'organism',
+                                             file_size=source_size)
+        try:
+            for row in row_spool.rows():
+                aggregator.add(row)
+        except Exception:
+            aggregator.close()
+            raise
+        finally:
+            row_spool.close()
+        return aggregator
 
-                # add line to hash table
-                key = split_line[1] + "," + split_line[13]
-                entry = result.get(key)
+    def _is_organism_tsv_generated(self, file_path):
+        """
+        Checks if tsv for BioGRID organism file was generated by
+        :py:meth:`_split_biogrid_all_file`
 
-                if entry:
-                    entry[5].append(split_line[11])
-                else:
+        :rtype: bool
+        """
+        return file_path in self._organism_tsv_files
 
-                    chem_synon = "" if split_line[15] == '-' else split_line[15]
-                    cas = "" if split_line[22] == '-' else "cas:" + split_line[22]
-                    chem_alias = cas
-                    if chem_alias:
-                        if chem_synon:
-                            chem_alias += "|" + chem_synon
-                    else:
-                        chem_alias = chem_synon
+    def _get_chemicals_tsv_file_path(self, file_path, taxon):
+        """
+        :return: path of tsv with interactions for taxon from chemtab file
+        :rtype: str
+        """
+        return file_path.replace('.chemtab.txt', '-' + taxon + '.tsv')
 
-                    entry = [split_line[2], split_line[4], "" if split_line[5] == '-' else \
-                        split_line[5], split_line[8], split_line[9], [split_line[11]],
-                        split_line[14], chem_alias, split_line[18], split_line[20]]
+    def _get_chemical_taxa(self):
+        """
+        Gets NCBI taxonomy ids of networks listed in chemicals file
 
-                    result[key] = entry
+        :return: taxonomy ids in order listed without duplicates
+        :rtype: list
+        """
+        taxa = []
+        for entry in self._get_entries('chemicals'):
+            taxon = self._get_taxon_id(entry)
+            if taxon not in taxa:
+                taxa.append(taxon)
+        return taxa
+
+    def _split_biogrid_chemicals_file(self, file_path, taxa):
+        """
+        Aggregates interactions of BioGRID chemtab file for every taxon
+        in a single scan of the file. Rows are routed to an aggregator
+        per taxon by the Organism ID column and rows for any
+        other taxon are rejected by the parser before being fully split
+
+        :param file_path: path to BioGRID chemtab file
+        :type file_path: str
+        :param taxa: NCBI taxonomy ids
+        :type taxa: list
+        :return: taxon => path to tsv file with its interactions
+        :rtype: dict
+        """
+        aggregators = {}
+        adds = {}
+        for taxon in taxa:
+            aggregators[taxon] = self._create_aggregator(file_path, 'chemical')
+            adds[taxon] = self._get_sampled_add(aggregators[taxon], file_path,
+                                                'chemical', taxon)
+        sample_done = self._get_sample_done([self._get_cache_name(file_path,
+                                                                  taxon)
+                                             for taxon in taxa])
+        try:
+            rows = self._get_parser().iter_rows(file_path,
+                                                filter_column=6,
+                                                filter_values=set(taxa),
+                                                max_column=CHEMICAL_MAX_COLUMN)
+            rows = self._iter_rows_with_progress(rows,
+                                                 os.path.basename(file_path))
+            for split_line in rows:
+                adds[split_line[6]](split_line)
+                if sample_done is not None and sample_done():
+                    break
+        except Exception:
+            for aggregator in aggregators.values():
+                aggregator.close()
+            raise
+
+        tsv_files = {}
+        for taxon, aggregator in aggregators.items():
+            tsv_file_path = self._get_chemicals_tsv_file_path(file_path, taxon)
+            self._write_aggregated(aggregator, file_path, tsv_file_path,
+                                   'chemical', taxon)
+            tsv_files[taxon] = tsv_file_path
+        return tsv_files
+
+    def _is_chemicals_tsv_generated(self, file_path, taxon):
+        """
+        Checks if tsv for taxon was generated from chemtab file by
+        an earlier call to :py:meth:`_generate_tsv_from_biogrid_chemicals_file`
 
-            with open(tsv_file_path, 'w') as f_output_tsv:
-                output_header = '\t'.join(self._get_header_for_generating_chemicals_tsv()) + '\n'
-                f_output_tsv.write(output_header)
+        :rtype: bool
+        """
+        return taxon in self._chemical_tsv_files.get(file_path, {})
 
-                for key, value in result.items():
-                    value[5] = '|'.join(value[5])
-                    f_output_tsv.write('\t'.join(value) + "\n")
+    def _generate_tsv_from_biogrid_chemicals_file(self, file_path,
+                                                  taxon='9606'):
+        """
+        Generates tsv with interactions for taxon from BioGRID chemtab
+        file. The first call for a file aggregates interactions for
+        every taxon in the chemicals file, that is not already cached,
+        in one scan so later calls for those taxa do not read the
+        file again
+
+        :param file_path: path to BioGRID chemtab file
+        :type file_path: str
+        :param taxon: NCBI taxonomy id
+        :type taxon: str
+        :return: path to tsv file
+        :rtype: str
+        """
+        if not self._is_chemicals_tsv_generated(file_path, taxon):
+            taxa = [taxon]
+            for other_taxon in self._get_chemical_taxa():
+                if other_taxon not in taxa and \
+                        not self._is_chemicals_tsv_generated(file_path,
+                                                             other_taxon) and \
+                        not self._is_cached(file_path, other_taxon):
+                    taxa.append(other_taxon)
+            logger.info('Aggregating chemical interactions for taxa ' +
+                        ', '.join(taxa))
+            tsv_files = self._chemical_tsv_files.setdefault(file_path, {})
+            tsv_files.update(self._split_biogrid_chemicals_file(file_path,
+                                                                taxa))
+        return self._chemical_tsv_files[file_path][taxon]
+
+    def _is_cx2(self):
+        """
+        Tells if networks are written and uploaded as CX2
 
-        return tsv_file_path
+        :return: ``True`` if --cxformat is set to CX2
+        :rtype: bool
+        """
+        return self._args.cxformat == cx2writer.CX2_FORMAT
 
     def _get_cx_file_path_and_name(self, file_path, organism_or_chemical_entry, type='organism'):
-        cx_file_path = file_path.replace('.tab2.txt', '.cx') if type == 'organism' else file_path.replace('.chemtab.txt',
-                                                                                                          '.cx')
+        extension = '.' + (cx2writer.CX2_FORMAT if self._is_cx2() else
+                           cx2writer.CX_FORMAT)
+        if type == 'organism':
+            cx_file_path = file_path.replace('.tab2.txt', extension)
+        else:
+            taxon = self._get_taxon_id(organism_or_chemical_entry)
+            cx_file_path = file_path.replace('.chemtab.txt',
+                                             '-' + taxon + extension)
         cx_file_name_indx = cx_file_path.find(organism_or_chemical_entry[0])
 
         cx_file_name = cx_file_path[cx_file_name_indx:]
@@ -647,122 +2348,265 @@ class NdexBioGRIDLoader(object):
                 # attriubute with the samae name and value; do not add
                 continue
 
-            if not 'd' in attribute1:
-                attribute1['d'] = 'list_of_string'
-            elif attribute1['d'] == 'boolean':
-                attribute1['d'] = 'list_of_boolean'
-            elif attribute1['d'] == 'double':
-                attribute1['d'] = 'list_of_double'
-            elif attribute1['d'] == 'integer':
-                attribute1['d'] = 'list_of_integer'
-            elif attribute1['d'] == 'long':
-                attribute1['d'] = 'list_of_long'
-            elif attribute1['d'] == 'string':
-                attribute1['d'] = 'list_of_string'
-
-            new_list_of_values = []
-
-            if isinstance(attribute1['v'], list):
-                for value in attribute1['v']:
-                    if value not in new_list_of_values and value:
-                        new_list_of_values.append(value)
-            else:
-                if attribute1['v'] not in new_list_of_values and attribute1['v']:
-                    new_list_of_values.append(attribute1['v'])
-
-            if isinstance(attribute2['v'], list):
-                for value in attribute2['v']:
-                    if value not in new_list_of_values and value:
-                        new_list_of_values.append(value)
-            else:
-                if attribute2['v'] not in new_list_of_values and attribute2['v']:
-                    new_list_of_values.append(attribute2['v'])
-
-            attribute1['v'] = new_list_of_values
+            attribute1['d'] = get_merged_type(attribute1.get('d'))
+            attribute1['v'] = merge_values(attribute1['v'], attribute2['v'])
 
     def _collapse_edges(self):
+        """
+        Collapses edges of self._network with the same source, target
+        and interaction, in either direction, into the edge seen first.
+        Attributes of the other edges are merged into those of the
+        first edge and the other edges and their attributes are
+        deleted in place so no copy of the edges is made
 
+        :return: None
+        """
+        if isinstance(self._network, ColumnarNetwork):
+            with self._create_progress('collapse', self._network.get_name(),
+                                       self._network.get_edge_count(),
+                                       unit='edges') as collapse_progress:
+                self._network.collapse_edges(progress=collapse_progress)
+            logger.info(self._network.get_edge_count())
+            return
+
+        # key is a tuple (edge_source, interacts, edge_target) and
+        # value is id of first edge seen with that key
         unique_edges = {}
+        duplicate_edge_ids = []
+
+        edge_attributes = self._network.edgeAttributes
+        with self._create_progress('collapse', self._network.get_name(),
+                                   len(self._network.edges),
+                                   unit='edges') as collapse_progress:
+            edges = progress.iter_with_progress(self._network.edges.items(),
+                                                collapse_progress)
+            for edge_id, edge in edges:
+
+                edge_key = (edge['s'], edge['i'], edge['t'])
+                first_edge_id = unique_edges.get(edge_key)
+                if first_edge_id is None:
+                    first_edge_id = unique_edges.get((edge['t'], edge['i'],
+                                                      edge['s']))
+
+                if first_edge_id is None:
+                    unique_edges[edge_key] = edge_id
+                    continue
 
-        # in the loop below, we build a map where key is a tuple (edge_source, interacts, edge_target)
-        # and the value is a list of edge ids
-        for edge_id, edge in self._network.edges.items():
-
-            edge_key = (edge['s'], edge['i'], edge['t'])
-            edge_key_reverse = (edge['t'], edge['i'], edge['s'])
-
-            if edge_key in unique_edges:
-                if edge_id not in unique_edges[edge_key]:
-                    unique_edges[edge_key].append(edge_id)
-
-            elif edge_key_reverse in unique_edges:
-                if edge_id not in unique_edges[edge_key_reverse]:
-                    unique_edges[edge_key_reverse].append(edge_id)
-            else:
-                unique_edges[edge_key] = [edge_id]
+                # add attributes of the edge to already existing
+                # list of edge attributes of the first edge
+                self._merge_attributes(edge_attributes[first_edge_id],
+                                       edge_attributes[edge_id])
+                duplicate_edge_ids.append(edge_id)
 
         logger.info(len(unique_edges))
+        del unique_edges
 
-        # build collapsed edges and collapsed edges attributes
-        # and then use them to replace self._network.edges and self._network.edgeAttributes
-        collapsed_edges = {}
-        collapsed_edge_attributes = {}
+        for edge_id in duplicate_edge_ids:
+            del self._network.edges[edge_id]
+            del edge_attributes[edge_id]
 
-        # create a new edges aspect in collapsed_edges
-        for key, list_of_edge_attribute_ids in unique_edges.items():
-            edge_id = list_of_edge_attribute_ids.pop(0)
-            collapsed_edges[edge_id] = self._network.edges[edge_id]
+    def _get_load_plan_columns(self, plan):
+        """
+        Gets names of TSV columns referenced by load plan
 
-            if not list_of_edge_attribute_ids:
-                collapsed_edge_attributes[edge_id] = self._network.edgeAttributes[edge_id]
-                del self._network.edgeAttributes[edge_id]
+        :param plan: load plan
+        :type plan: dict
+        :return: column names
+        :rtype: set
+        """
+        columns = set()
+        for node_plan_name in ['source_plan', 'target_plan']:
+            node_plan = plan.get(node_plan_name, {})
+            for key in ['rep_column', 'node_name_column']:
+                if node_plan.get(key):
+                    columns.add(node_plan[key].split('::')[0])
+        for sub_plan in [plan.get('source_plan', {}),
+                         plan.get('target_plan', {}),
+                         plan.get('edge_plan', {})]:
+            for column in sub_plan.get('property_columns', []):
+                if isinstance(column, dict):
+                    if column.get('column_name'):
+                        columns.add(column['column_name'])
+                else:
+                    columns.add(column.split('::')[0])
+        edge_plan = plan.get('edge_plan', {})
+        for key in ['predicate_id_column', 'citation_id_column']:
+            if edge_plan.get(key):
+                columns.add(edge_plan[key])
+        return columns
+
+    def _get_dataframe_columns(self, plan, type='organism'):
+        """
+        Gets columns of generated TSV to load for load plan along
+        with their dtypes. Low cardinality columns such as
+        Experimental System are loaded as categoricals to reduce memory.
+
+        :param plan: load plan
+        :type plan: dict
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :return: (names of columns to load, column name => ``str``
+                 or 'category')
+        :rtype: tuple
+        """
+        if type == 'organism':
+            header = self._get_header_for_generating_organism_tsv()
+            categorical_columns = ORGANISM_CATEGORICAL_COLUMNS
+        else:
+            header = self._get_header_for_generating_chemicals_tsv()
+            categorical_columns = CHEMICAL_CATEGORICAL_COLUMNS
+
+        plan_columns = self._get_load_plan_columns(plan)
+        for derived_network in self._get_derived_networks(type):
+            plan_columns.update(derived_network.get_columns())
+        usecols = []
+        dtype = {}
+        for col_index, col_name in enumerate(header):
+            if col_name not in plan_columns:
                 continue
+            usecols.append(col_name)
+            if col_index in categorical_columns:
+                dtype[col_name] = 'category'
+            else:
+                dtype[col_name] = str
+        return usecols, dtype
 
-            attribute_list = self._network.edgeAttributes[edge_id]
-
-            # here, the list of collapsed edges is not empty, we need to iterate over it
-            # and add attributes of the edge(s) to already existing list of edge attributes
-            for attribute_id in list_of_edge_attribute_ids:
-
-                attribute_list_for_adding = self._network.edgeAttributes[attribute_id]
-
-                self._merge_attributes(attribute_list, attribute_list_for_adding)
-
-                collapsed_edge_attributes[edge_id] = attribute_list
-
-        del self._network.edges
-        self._network.edges = collapsed_edges
+    def _read_tsv_as_dataframe(self, tsv_file_path, plan, type='organism'):
+        """
+        Loads TSV generated by
+        :py:meth:`_generate_tsv_from_biogrid_organism_file` or
+        :py:meth:`_generate_tsv_from_biogrid_chemicals_file` into a
+        :py:class:`pandas.DataFrame` loading only columns referenced by
+        the load plan. See :py:meth:`_get_dataframe_columns`
+
+        :param tsv_file_path: path to TSV file
+        :type tsv_file_path: str
+        :param plan: load plan
+        :type plan: dict
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :return: data from TSV file
+        :rtype: :py:class:`pandas.DataFrame`
+        """
+        usecols, dtype = self._get_dataframe_columns(plan, type)
+        return self._get_parser().read_tsv(tsv_file_path, usecols, dtype)
 
-        del self._network.edgeAttributes
-        self._network.edgeAttributes = collapsed_edge_attributes
+    def _read_cached_interactions_as_dataframe(self, file_path, plan,
+                                               type='organism', taxon=None):
+        """
+        Loads aggregated interactions for BioGRID file from cache into a
+        :py:class:`pandas.DataFrame`. See :py:meth:`_get_dataframe_columns`
+
+        :param file_path: path to BioGRID file
+        :type file_path: str
+        :param plan: load plan
+        :type plan: dict
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param taxon: see :py:meth:`_get_cache_name`
+        :type taxon: str
+        :return: aggregated interactions
+        :rtype: :py:class:`pandas.DataFrame`
+        """
+        usecols, dtype = self._get_dataframe_columns(plan, type)
+        return self._get_cache().read(self._get_cache_name(file_path, taxon),
+                                      usecols, dtype)
 
     def _using_panda_generate_nice_cx(self, biogrid_file_path, organism_entry, template_network, type='organism'):
 
-        tsv_file_path = self._generate_tsv_from_biogrid_organism_file(biogrid_file_path) if type == 'organism' else \
-            self._generate_tsv_from_biogrid_chemicals_file(biogrid_file_path)
+        tsv_file_path = None
+        taxon = None
+        if type != 'organism':
+            taxon = self._get_taxon_id(organism_entry)
+        span_args = {'entry': organism_entry[0]}
+        if self._is_cached(biogrid_file_path, taxon):
+            logger.info('Using cached interactions for ' + organism_entry[0])
+            self._index_cached_interactions(biogrid_file_path, type, taxon)
+        else:
+            with self._tracer.span('aggregate', args=span_args):
+                if type != 'organism':
+                    tsv_file_path = \
+                        self._generate_tsv_from_biogrid_chemicals_file(
+                            biogrid_file_path, taxon)
+                elif self._is_organism_tsv_generated(biogrid_file_path):
+                    tsv_file_path = self._organism_tsv_files[biogrid_file_path]
+                else:
+                    tsv_file_path = \
+                        self._generate_tsv_from_biogrid_organism_file(
+                            biogrid_file_path)
 
         cx_file_path, cx_file_name = self._get_cx_file_path_and_name(biogrid_file_path, organism_entry, type)
         logger.info('started generating {}...'.format(cx_file_name))
 
-        load_plan = self._organism_load_plan if type == 'organism' else self._chem_load_plan
-
-        with open(load_plan, 'r') as lp:
-            plan = json.load(lp)
+        with self._tracer.span('convert', args={'entry': organism_entry[0]}):
+            plan = self._get_load_plan(type)
 
-        dataframe = pd.read_csv(tsv_file_path,
-                                dtype=str,
-                                na_filter=False,
-                                delimiter='\t',
-                                engine='python')
+            if tsv_file_path is None:
+                dataframe = self._read_cached_interactions_as_dataframe(
+                    biogrid_file_path, plan, type, taxon)
+            else:
+                dataframe = self._read_tsv_as_dataframe(tsv_file_path, plan,
+                                                        type)
 
-        network = t2n.convert_pandas_to_nice_cx_with_load_plan(dataframe, plan)
+            network = self._convert_dataframe_to_network(dataframe, type)
+            if self._get_derived_networks(type):
+                # kept until networks are derived from it
+                self._interactions = dataframe
+            del dataframe
+            self._release_memory()
 
         if type == 'organism':
             network_name = "BioGRID: Protein-Protein Interactions (" + organism_entry[2] + ")"
-            network_type = ['interactome', 'ppi']
         else:
             network_name = "BioGRID: Protein-Chemical Interactions (" + organism_entry[2] + ")"
+
+        sampler = self._samplers.get(self._get_cache_name(biogrid_file_path,
+                                                          taxon))
+        if sampler is not None:
+            logger.info('Building ' + organism_entry[0] + ' from ' +
+                        str(sampler.get_num_kept()) + ' of ' +
+                        str(sampler.get_num_rows()) + ' sampled rows')
+
+        network_name = self._set_network_attributes(network, network_name,
+                                                    organism_entry,
+                                                    template_network, type,
+                                                    sampler)
+        self._network = network
+
+        # note, CX file is in memory, but it is not written to file yet
+        logger.info(cx_file_name + ' - finished generating')
+
+        # return path where to write CX file abd network name
+        return cx_file_path, network_name
+
+    def _set_network_attributes(self, network, network_name, organism_entry,
+                                template_network, type='organism',
+                                sampler=None):
+        """
+        Sets name, network attributes and style of network
+
+        :param network: network to update
+        :param network_name: name of network
+        :type network_name: str
+        :param organism_entry: line from organism or chemicals file
+                               split by tab
+        :type organism_entry: list
+        :param template_network: network to copy style, description
+                                 and reference from
+        :param type: either 'organism' or 'chemical'
+        :type type: str
+        :param sampler: if set, sampler rows of network were kept by
+        :type sampler: :py:class:`~ndexbiogridloader.sampling.RowSampler`
+        :return: name of network, if sampler is set with
+                 :py:const:`SAMPLE_NAME_SUFFIX` appended
+        :rtype: str
+        """
+        if type == 'organism':
+            network_type = ['interactome', 'ppi']
+        else:
             network_type = ['proteinassociation', 'compoundassociation']
+        if sampler is not None:
+            network_name += SAMPLE_NAME_SUFFIX
 
         network.set_name(network_name)
 
@@ -778,66 +2622,145 @@ class NdexBioGRIDLoader(object):
         network.set_network_attribute("__iconurl",
                                       "https://home.ndexbio.org"
                                       "/img/biogrid_logo.jpg")
+        if sampler is not None:
+            for name, value, attr_type in sampler.get_network_attributes():
+                network.set_network_attribute(name, value, attr_type)
 
         network.apply_style_from_network(template_network)
-
-        self._network = network
-
-        # note, CX file is in memory, but it is not written to file yet
-        logger.info(cx_file_name + ' - finished generating')
-
-        # return path where to write CX file abd network name
-        return cx_file_path, network_name
+        return network_name
 
     def _upload_cx(self, path_to_network_in_cx, network_name):
+        """
+        Uploads CX file to every target set via --profile. If there
+        is more then one target, the file is uploaded to all of them
+        at once, each from its own thread, and exit code of each
+        is kept for the run report
+
+        :param path_to_network_in_cx: path to CX file
+        :type path_to_network_in_cx: str
+        :param network_name: name of network
+        :type network_name: str
+        :return: 0 if upload to every target succeeded, otherwise 2
+        :rtype: int
+        """
         if self._args.skipupload is True:
             logger.info('Skipping upload of "' + network_name +
                         '" network since --skipupload flag is set')
             return 0
-        network_uuid = self._network_summaries.get(network_name.upper())
+        targets = self._get_targets()
+        if len(targets) == 1:
+            self._upload_statuses = {
+                targets[0].get_profile():
+                self._upload_cx_to_target(targets[0], path_to_network_in_cx,
+                                          network_name)}
+            return self._upload_statuses[targets[0].get_profile()]
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(targets)) as executor:
+            futures = [(target.get_profile(),
+                        executor.submit(self._upload_cx_to_target, target,
+                                        path_to_network_in_cx, network_name))
+                       for target in targets]
+            self._upload_statuses = {profile: future.result()
+                                     for profile, future in futures}
+        for profile, exit_code in self._upload_statuses.items():
+            logger.info('Upload of "' + network_name + '" to profile ' +
+                        profile + ' exited with ' + str(exit_code))
+        return max(self._upload_statuses.values())
+
+    def _upload_cx_to_target(self, target, path_to_network_in_cx,
+                             network_name):
+        """
+        Uploads CX file to target, updating network with same name
+        if the target account has one
+
+        :param target: NDEx server and account to upload to
+        :type target: :py:class:`~ndexbiogridloader.targets.UploadTarget`
+        :return: see :py:meth:`_update_or_upload_with_retry`, 2 if
+                 target is not available
+        :rtype: int
+        """
+        if not target.is_available():
+            logger.error('Not uploading "' + network_name + '" to profile ' +
+                         target.get_profile() + ' since connecting to it '
+                         'or loading its networks failed')
+            return 2
+        return self._update_or_upload_with_retry(
+            cxfile=path_to_network_in_cx, network_name=network_name,
+            network_uuid=target.get_network_uuid(network_name),
+            maxretries=self._args.maxretries,
+            retry_sleep=self._args.retry_sleep, target=target)
 
-        return self._update_or_upload_with_retry(cxfile=path_to_network_in_cx,
-                                                 network_name=network_name,
-                                                 network_uuid=network_uuid,
-                                                 maxretries=self._args.maxretries,
-                                                 retry_sleep=self._args.retry_sleep)
+    def get_upload_statuses(self):
+        """
+        Gets exit code of upload of last network to each target
+
+        :return: exit codes keyed by profile or ``None`` if last
+                 network was not uploaded
+        :rtype: dict
+        """
+        return self._upload_statuses
 
     def _update_or_upload_with_retry(self, cxfile=None,
                                      network_name=None,
                                      network_uuid=None,
                                      maxretries=2,
-                                     retry_sleep=5):
+                                     retry_sleep=5,
+                                     target=None):
         """
 
-        :param cxfile: Path to CX file to upload
+        :param cxfile: Path to CX file to upload. If --cxformat is
+                       set to CX2, file must be CX2
         :param network_name: name of network (for logging purposes)
         :param network_uuid: If set method will attempt to update network
                              with UUID passed in. If `None` then new network
                              will be uploaded to NDEx
         :param maxretries: number of retries before giving up
+        :param target: target to upload with, if `None` the connection
+                       set as ``self._ndex`` is used
+        :type target: :py:class:`~ndexbiogridloader.targets.UploadTarget`
         :return: 0 upon success, 2 upon failure
         :rtype: int
         """
+        if target is None:
+            ndex = self._ndex
+            to_profile = ''
+        else:
+            ndex = target.get_ndex()
+            to_profile = ' to profile ' + target.get_profile()
         retry_count = 1
         while retry_count <= maxretries:
-            logger.debug('Attempting upload of network try # ' +
-                         str(retry_count))
-            with open(cxfile, 'rb') as network_out:
+            logger.debug('Attempting upload of network' + to_profile +
+                         ' try # ' + str(retry_count))
+            with open(cxfile, 'rb') as cx_in, \
+                    self._create_progress('upload', network_name,
+                                          os.path.getsize(cxfile)) as \
+                    upload_progress:
+                network_out = ProgressReader(cx_in, upload_progress)
                 try:
-                    if network_uuid is None:
-                        self._ndex.save_cx_stream_as_new_network(network_out)
+                    if self._is_cx2():
+                        if network_uuid is None:
+                            ndex.save_cx2_stream_as_new_network(network_out)
+                        else:
+                            ndex.update_cx2_network(network_out,
+                                                    network_uuid)
+                    elif network_uuid is None:
+                        ndex.save_cx_stream_as_new_network(network_out)
                     else:
-                        self._ndex.update_cx_network(network_out, network_uuid)
+                        ndex.update_cx_network(network_out, network_uuid)
                     return 0
                 except Exception as e:
                     logger.info('Caught exception attempting to '
-                                'upload network : ' + str(e))
-                    logger.debug('Sleeping ' + str(retry_sleep) +
-                                 ' seconds')
-                    time.sleep(retry_sleep)
+                                'upload network' + to_profile + ' : ' +
+                                str(e))
+            # progress is closed so sleep is not counted as upload
+            logger.debug('Sleeping ' + str(retry_sleep) +
+                         ' seconds')
+            time.sleep(retry_sleep)
             retry_count += 1
         logger.error('Unable to upload ' + str(network_name) +
-                     ' network after ' + str(maxretries) + ' retries.')
+                     ' network' + to_profile + ' after ' +
+                     str(maxretries) + ' retries.')
         return 2
 
     def _check_if_data_dir_exists(self):
@@ -849,13 +2772,50 @@ class NdexBioGRIDLoader(object):
 
         return data_dir_existed
 
+    def _release_memory(self):
+        """
+        If --lowmemory is set, runs garbage collector so memory of
+        intermediates no longer referenced is released before the
+        next step starts
+
+        :return: None
+        """
+        if self._args.lowmemory is True:
+            gc.collect()
+
+    def _write_cx(self, network, out):
+        """
+        Writes network as CX. A
+        :py:class:`~ndexbiogridloader.network.ColumnarNetwork` and,
+        if --lowmemory is set, a
+        :py:class:`~ndex2.nice_cx_network.NiceCXNetwork` are written
+        an element at a time
+
+        :param network: network to write
+        :type network:
+            :py:class:`~ndexbiogridloader.network.ColumnarNetwork` or
+            :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        :param out: text file to write to
+        :type out: file
+        :return: None
+        """
+        if isinstance(network, ColumnarNetwork):
+            network.write_cx(out)
+        elif self._args.lowmemory is True:
+            cxwriter.write_cx(network, out)
+        else:
+            json.dump(network.to_cx(), out)
+
     def _write_nice_cx_to_file(self, cx_file_path):
 
         logger.info('started writing network "{}" to disk...'.
                     format(self._network.get_name()))
 
         with open(cx_file_path, 'w') as f:
-            json.dump(self._network.to_cx(), f)
+            if self._is_cx2():
+                cx2writer.write_cx2(self._network, f)
+            else:
+                self._write_cx(self._network, f)
 
         logger.info('finished writing network "{}" to disk'.
                     format(self._network.get_name()))
@@ -866,17 +2826,33 @@ class NdexBioGRIDLoader(object):
         :param theargs:
         :return:
         """
-        self._parse_config()
+        self._report = sharding.RunReport(self._biogrid_version,
+                                          shard=self._args.shard)
+        exit_code = None
+        try:
+            exit_code = self._run()
+            return exit_code
+        finally:
+            self._close_zip_files()
+            logger.info('Peak memory: ' + str(_get_peak_memory()) + ' bytes')
+            self._write_trace()
+            self._write_report(exit_code)
 
-        self._create_ndex_connection()
+    def _run(self):
+        """
+        Downloads BioGRID files and builds and uploads every
+        network listed in the organism and chemicals files
+        :return: exit code
+        :rtype: int
+        """
+        status_code = self._setup()
+        if status_code != 0:
+            return status_code
 
-        data_dir_existed = self._check_if_data_dir_exists()
+        if self._args.plan_only is True:
+            return self._print_plan()
 
-        if self._skipdownload is False or data_dir_existed is False:
-            logger.info('Downloading biogrid files')
-            download_status = self._download_biogrid_files()
-            if download_status != 0:
-                return download_status
+        self._create_ndex_connection()
 
         net_summaries, status_code = self._load_network_summaries_for_user()
         if status_code != 0:
@@ -885,77 +2861,384 @@ class NdexBioGRIDLoader(object):
         self._load_organism_style_template()
         self._load_chemical_style_template()
         upload_exit_codes = set()
-        organism_file_entries = self._get_organism_or_chemicals_file_content('organism')
-        for entry in tqdm(organism_file_entries,
-                          desc='Organisms',
-                          disable=self._args.noprogressbar):
-            file_name = self._get_biogrid_file_name(entry)
+        organism_file_entries = self._get_entries('organism')
+        if self._args.sourcemode == SOURCE_MODE_ALL and self._args.workers > 1:
+            # split once here so forked workers share the result
+            with self._tracer.span('split'):
+                self._split_biogrid_all_file()
+        upload_exit_codes.update(self._process_entries(
+            self._get_work_items(organism_file_entries, 'organism')))
+
+        # chemical networks share a single scan of the chemtab
+        # file so they are always built in this process
+        from tqdm import tqdm
+        chemical_file_entries = self._get_entries('chemicals')
+        chemical_items = self._get_work_items(chemical_file_entries,
+                                              'chemicals')
+        for item in tqdm(self._get_planner().order(chemical_items),
+                         desc='Chemicals', disable=self._args.noprogressbar):
+            upload_exit_codes.add(self._process_item(item))
+
+        return max(upload_exit_codes, default=0)
+
+    def _setup(self):
+        """
+        Parses config and derived network definitions and downloads
+        BioGRID files unless --skipdownload is set and <datadir> exists
+        :return: 0 upon success, 2 if organism or chemicals file or
+                 derived network definitions are not valid or installed
+                 ndex2 cannot upload CX2 when needed, otherwise status
+                 of download
+        :rtype: int
+        """
+        if self._is_cx2() and self._args.skipupload is False:
+            import ndex2
+            import ndex2.client
+            missing = cx2writer.get_missing_upload_methods(ndex2.client.Ndex2)
+            if missing:
+                logger.error('--cxformat ' + cx2writer.CX2_FORMAT +
+                             ' needs ndex2 3.5.0 or later to upload, '
+                             'installed ndex2 ' +
+                             str(getattr(ndex2, '__version__', 'unknown')) +
+                             ' lacks ' + ', '.join(missing))
+                return 2
+        self._parse_config()
+        try:
+            self._check_organism_and_chemicals_files()
+            self._get_derived_networks()
+        except NdexBioGRIDLoaderError as e:
+            logger.error(str(e))
+            return 2
 
-            logger.debug('Unzipping biogrid file: ' + file_name)
-            status_code,\
-                biogrid_organism_file_path = self._unzip_biogrid_file(file_name,
-                                                                      'organism')
+        data_dir_existed = self._check_if_data_dir_exists()
 
-            if status_code == 0:
+        if self._skipdownload is False or data_dir_existed is False:
+            logger.info('Downloading biogrid files')
+            with self._tracer.span('download'):
+                download_status = self._download_biogrid_files()
+            if download_status != 0:
+                return download_status
+        return 0
 
-                logger.info('Creating CX for ' + str(entry))
-                cx_file_path,\
-                    network_name = self._using_panda_generate_nice_cx(biogrid_organism_file_path,
-                                                                      entry, self._organism_style_template, 'organism')
+    def _get_work_item(self, name):
+        """
+        Finds work item for entry of the organism or chemicals file
 
-                self._collapse_edges()
-                if self._args.layout is not None:
-                    if self._args.layout == 'spring':
-                        logger.info('Applying spring layout for ' + str(entry))
-                        self._apply_simple_spring_layout(self._network)
-                    else:
-                        if self._args.layout == '-':
-                            self._args.layout = 'force-directed-cl'
-                        self._apply_cytoscape_layout(self._network)
-                logger.info('Writing CX to file for ' + str(entry))
-                self._write_nice_cx_to_file(cx_file_path)
-                logger.info('Uploading CX to NDEx for ' + str(entry))
-                upload_exit_codes.add(self._upload_cx(cx_file_path,
-                                                      network_name))
-            else:
-                upload_exit_codes.add(9)
-                logger.error('Unable to extract ' + file_name + ' from archive')
+        :param name: name of entry as shown by --plan-only such as
+                     BIOGRID-ORGANISM-Homo_sapiens or BIOGRID-CHEMICALS-9606
+        :type name: str
+        :raises NdexBioGRIDLoaderError: if no entry has that name
+        :rtype: :py:class:`~ndexbiogridloader.planner.WorkItem`
+        """
+        for type in ['organism', 'chemicals']:
+            entries = [entry for entry in
+                       self._get_organism_or_chemicals_file_content(type)
+                       if self._get_work_item_name(entry, type) == name]
+            if entries:
+                return self._get_work_items(entries, type)[0]
+        raise NdexBioGRIDLoaderError('No organism or chemicals entry named ' +
+                                     str(name))
+
+    def get_work_item_names(self):
+        """
+        Gets names of every network that can be built
 
-        chemical_file_entries = self._get_organism_or_chemicals_file_content('chemicals')
+        :return: names accepted by :py:meth:`build_network`
+        :rtype: list
+        """
+        names = []
+        for type in ['organism', 'chemicals']:
+            names.extend(self._get_work_item_name(entry, type) for entry in
+                         self._get_organism_or_chemicals_file_content(type))
+        return names
 
-        for entry in tqdm(chemical_file_entries, desc='Chemicals',
-                          disable=self._args.noprogressbar):
-            file_name = self._get_biogrid_chemicals_file_name(entry)
+    def is_ready(self):
+        """
+        :return: ``True`` if a call to :py:meth:`build_network`
+                 downloaded BioGRID files and connected to NDEx
+        :rtype: bool
+        """
+        return self._ready
 
-            status_code, biogrid_chemicals_file_path = self._unzip_biogrid_file(file_name,
-                                                                                'chemicals')
-
-            if status_code == 0:
-                logger.info('Creating CX for ' + str(entry))
-                cx_file_path,\
-                    network_name = self._using_panda_generate_nice_cx(biogrid_chemicals_file_path,
-                                                                      entry,
-                                                                      self._chem_style_template,
-                                                                      'chemical')
-                self._collapse_edges()
-                if self._args.layout is not None:
-                    if self._args.layout == 'spring':
-                        logger.info('Applying spring layout for ' + str(entry))
-                        self._apply_simple_spring_layout(self._network)
-                    else:
-                        if self._args.layout == '-':
-                            self._args.layout = 'force-directed-cl'
-                        self._apply_cytoscape_layout(self._network)
-
-                logger.info('Writing CX to file for ' + str(entry))
-                self._write_nice_cx_to_file(cx_file_path)
-                logger.info('Uploading CX to NDEx for ' + str(entry))
-                upload_exit_codes.add(self._upload_cx(cx_file_path,
-                                                      network_name))
+    def close(self):
+        """
+        Closes archives kept open by :py:meth:`build_network`. The
+        loader can still be used afterwards, archives are reopened
+        when needed
+
+        :return: None
+        """
+        self._close_zip_files()
+
+    def build_network(self, name):
+        """
+        Builds and uploads the network for a single entry of the
+        organism or chemicals file. The first call downloads BioGRID
+        files, if needed, and connects to NDEx. Style templates, load
+        plans, open archives and chemical interactions aggregated by
+        earlier calls are reused so a long lived loader, such as
+        the one used by :py:mod:`ndexbiogridloader.service`, only pays
+        for work specific to the network
+
+        :param name: see :py:meth:`_get_work_item`
+        :type name: str
+        :raises NdexBioGRIDLoaderError: if no entry has that name
+        :return: (work item, exit code of :py:meth:`_process_entry`
+                  or status of setup if it failed, seconds taken)
+        :rtype: tuple
+        """
+        start = time.time()
+        item = self._get_work_item(name)
+        if self._ready is False:
+            status_code = self._setup()
+            if status_code != 0:
+                return item, status_code, time.time() - start
+            self._create_ndex_connection()
+            self._ready = True
+        if item.get_type() == 'organism':
+            if self._organism_style_template is None:
+                self._load_organism_style_template()
+        elif self._chem_style_template is None:
+            self._load_chemical_style_template()
+
+        if self._args.skipupload is False:
+            # networks uploaded since last call must be updated not added
+            net_summaries, status_code = \
+                self._load_network_summaries_for_user()
+            if status_code != 0:
+                return item, status_code, time.time() - start
+
+        self._upload_statuses = None
+        exit_code = self._process_entry(item.get_entry(), item.get_type())
+        return item, exit_code, time.time() - start
+
+    def _print_plan(self):
+        """
+        Prints estimates and order networks would be built in
+        for --plan-only
+        :return: 0
+        :rtype: int
+        """
+        items = self._get_work_items(self._get_entries('organism'),
+                                     'organism')
+        items.extend(self._get_work_items(self._get_entries('chemicals'),
+                                          'chemicals'))
+        if self._args.shard is not None:
+            sys.stdout.write('Shard {}/{}\n'.format(*self._args.shard))
+        sys.stdout.write(self._get_planner().format_plan(items))
+        return 0
+
+    def _process_entry(self, entry, type='organism'):
+        """
+        Extracts, converts, collapses, lays out, writes and
+        uploads the network for a single organism or chemicals
+        entry
+
+        :param entry: line from organism or chemicals file split by tab
+        :type entry: list
+        :param type: either 'organism' or 'chemicals'
+        :type type: str
+        :return: 0 upon success, 9 or 10 if file could not be extracted
+                 for organism or chemicals respectively, otherwise
+                 status of upload
+        :rtype: int
+        """
+        span_args = {'entry': entry[0]}
+        if type == 'organism':
+            file_name = self._get_biogrid_file_name(entry)
+            template_network = self._organism_style_template
+            unzip_error_code = 9
+            taxon = None
+        else:
+            file_name = self._get_biogrid_chemicals_file_name(entry)
+            template_network = self._chem_style_template
+            unzip_error_code = 10
+            taxon = self._get_taxon_id(entry)
+
+        with self._tracer.span('entry', args=span_args):
+            biogrid_file_path = os.path.join(self._datadir, file_name)
+            if self._is_cached(biogrid_file_path, taxon):
+                logger.debug('Skipping unzip of biogrid file: ' + file_name +
+                             ' since interactions are cached')
+            elif taxon is not None and \
+                    self._is_chemicals_tsv_generated(biogrid_file_path, taxon):
+                logger.debug('Skipping unzip of biogrid file: ' + file_name +
+                             ' since interactions were already aggregated')
+            elif type == 'organism' and \
+                    self._args.sourcemode == SOURCE_MODE_ALL:
+                if not self._is_organism_tsv_generated(biogrid_file_path):
+                    with self._tracer.span('split', args=span_args):
+                        status_code = self._split_biogrid_all_file()
+                    if status_code != 0 or \
+                            not self._is_organism_tsv_generated(
+                                biogrid_file_path):
+                        logger.error('Unable to read interactions for ' +
+                                     file_name + ' from ' +
+                                     self._all_file_name)
+                        return unzip_error_code
             else:
-                upload_exit_codes.add(10)
-                logger.error('Unable to extract ' + file_name + ' from archive')
-        return max(upload_exit_codes)
+                logger.debug('Unzipping biogrid file: ' + file_name)
+                with self._tracer.span('unzip', args=span_args):
+                    status_code, biogrid_file_path = \
+                        self._unzip_biogrid_file(file_name, type)
+                if status_code != 0:
+                    logger.error('Unable to extract ' + file_name +
+                                 ' from archive')
+                    return unzip_error_code
+
+            logger.info('Creating CX for ' + str(entry))
+            cx_file_path, network_name = \
+                self._using_panda_generate_nice_cx(
+                    biogrid_file_path, entry, template_network,
+                    'organism' if type == 'organism' else 'chemical')
+            exit_code = self._finish_network(entry, cx_file_path,
+                                             network_name, span_args)
+            if self._interactions is not None:
+                exit_code = max(exit_code,
+                                self._process_derived_networks(
+                                    entry, biogrid_file_path, cx_file_path,
+                                    network_name, template_network))
+            return exit_code
+
+    def _finish_network(self, entry, cx_file_path, network_name, span_args):
+        """
+        Collapses, lays out, writes and uploads self._network
+
+        :param entry: line from organism or chemicals file split by tab
+        :type entry: list
+        :param cx_file_path: path to write CX file to
+        :type cx_file_path: str
+        :param network_name: name of network
+        :type network_name: str
+        :param span_args: arguments of trace spans
+        :type span_args: dict
+        :return: status of upload
+        :rtype: int
+        """
+        with self._tracer.span('collapse', args=span_args):
+            self._collapse_edges()
+            self._release_memory()
+        if self._args.layout is not None:
+            with self._tracer.span('layout', args=span_args):
+                if self._args.layout == 'spring':
+                    logger.info('Applying spring layout for ' + str(entry))
+                    self._apply_simple_spring_layout(self._network)
+                else:
+                    if self._args.layout == '-':
+                        self._args.layout = 'force-directed-cl'
+                    self._apply_cytoscape_layout(self._network)
+
+        logger.info('Writing CX to file for ' + str(entry))
+        with self._tracer.span('write', args=span_args):
+            self._write_nice_cx_to_file(cx_file_path)
+        if self._args.lowmemory is True:
+            # upload streams the CX file so network is not needed
+            self._network = None
+            self._release_memory()
+            logger.info('Peak memory after ' + entry[0] + ': ' +
+                        str(_get_peak_memory()) + ' bytes')
+        logger.info('Uploading CX to NDEx for ' + str(entry))
+        with self._tracer.span('upload', args=span_args):
+            return self._upload_cx(cx_file_path, network_name)
+
+    def _process_derived_networks(self, entry, biogrid_file_path, cx_file_path,
+                                  network_name, template_network):
+        """
+        Builds networks set via --derivednetworks from the interactions
+        of the organism network just built, then collapses, lays out,
+        writes and uploads each of them. The interactions were read and
+        aggregated once so each derived network only costs its own
+        conversion and later steps
+
+        :param entry: line from organism file split by tab
+        :type entry: list
+        :param biogrid_file_path: path to BioGRID file
+        :type biogrid_file_path: str
+        :param cx_file_path: path of CX file of organism network, CX
+                             file of each derived network has its id
+                             appended to it
+        :type cx_file_path: str
+        :param network_name: name of organism network
+        :type network_name: str
+        :param template_network: network to copy style from
+        :return: highest status of uploads, 0 if no network was derived
+        :rtype: int
+        """
+        exit_code = 0
+        sampler = self._samplers.get(self._get_cache_name(biogrid_file_path))
+        cx_file_base, extension = os.path.splitext(cx_file_path)
+        try:
+            for derived_network in self._get_derived_networks():
+                networks = derived_network.get_networks(self._interactions,
+                                                        entry[2])
+                for derived_id, derived_name, derived_filter, dataframe in \
+                        networks:
+                    span_args = {'entry': entry[0], 'derived': derived_id}
+                    logger.info('Creating CX for ' + derived_id + ' network '
+                                'derived from ' + str(entry))
+                    with self._tracer.span('convert', args=span_args):
+                        network = self._convert_dataframe_to_network(dataframe)
+                        del dataframe
+                    derived_name = self._set_network_attributes(
+                        network, derived_name, entry, template_network,
+                        sampler=sampler)
+                    network.set_network_attribute('derivedFrom', network_name)
+                    network.set_network_attribute('derivedFilter',
+                                                  derived_filter)
+                    self._network = network
+                    del network
+                    derived_cx_file_path = cx_file_base + '-' + derived_id + \
+                        extension
+                    exit_code = max(exit_code,
+                                    self._finish_network(entry,
+                                                         derived_cx_file_path,
+                                                         derived_name,
+                                                         span_args))
+        finally:
+            self._interactions = None
+            self._release_memory()
+        return exit_code
+
+    def _get_report_file(self):
+        """
+        Gets path to write run report to
+
+        :return: --reportfile or, if --shard is set, default path
+                 for shard in <datadir> otherwise ``None``
+        :rtype: str
+        """
+        if self._args.reportfile is not None:
+            return self._args.reportfile
+        if self._args.shard is not None:
+            return os.path.join(self._datadir,
+                                'run_report_shard_{}_of_{}.json'.format(
+                                    *self._args.shard))
+        return None
+
+    def _write_report(self, exit_code):
+        """
+        Writes run report if a report file is set and this is
+        not a --plan-only run
+
+        :param exit_code: exit code of run or ``None`` if it failed
+        :type exit_code: int
+        :return: None
+        """
+        report_file = self._get_report_file()
+        if report_file is None or self._args.plan_only is True:
+            return
+        logger.info('Writing run report to ' + report_file)
+        self._report.write(report_file, exit_code)
+
+    def _write_trace(self):
+        """
+        Writes trace of run to path set via --tracefile, if set
+        :return: None
+        """
+        if self._args.tracefile is None:
+            return
+        logger.info('Writing trace to ' + str(self._args.tracefile))
+        self._tracer.write(self._args.tracefile)
 
     def _apply_simple_spring_layout(self, network, iterations=5):
         """
@@ -971,9 +3254,10 @@ class NdexBioGRIDLoader(object):
         :type iterations: int
         :return: None
         """
-        num_nodes = len(network.get_nodes())
+        import networkx as nx
         logger.debug('Converting network to networkx')
         my_networkx = network.to_networkx(mode='default')
+        num_nodes = my_networkx.number_of_nodes()
         if num_nodes < 10:
             nodescale = num_nodes*20
         elif num_nodes < 20:
@@ -1025,7 +3309,7 @@ class NdexBioGRIDLoader(object):
             tmp_cx_file = os.path.join(temp_dir, 'tmp.cx')
 
             with open(tmp_cx_file, 'w') as f:
-                json.dump(network.to_cx(), f)
+                self._write_cx(network, f)
 
             annotated_cx_file = os.path.join(temp_dir, 'annotated.tmp.cx')
 
@@ -1110,6 +3394,14 @@ def main(args):
 
     try:
         _setup_logging(theargs)
+        if theargs.mergereports is not None:
+            return _merge_reports(theargs)
+        if theargs.serve is not None:
+            from ndexbiogridloader import service
+            return service.serve(theargs, NdexBioGRIDLoader)
+        if theargs.watch is not None:
+            from ndexbiogridloader import watcher
+            return watcher.watch(theargs, NdexBioGRIDLoader)
         loader = NdexBioGRIDLoader(theargs)
         return loader.run()
     except Exception as e:
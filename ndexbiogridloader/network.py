@@ -0,0 +1,549 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact network model used by the loader in place of a
+:py:class:`~ndex2.nice_cx_network.NiceCXNetwork`. Nodes and edges
+are kept in arrays indexed by position instead of a dict per node,
+edge and attribute, and the network is written as CX directly
+"""
+
+from array import array
+import logging
+
+from ndexbiogridloader import cxwriter
+from ndexbiogridloader.progress import iter_with_progress
+
+logger = logging.getLogger(__name__)
+
+
+MERGED_TYPES = {'boolean': 'list_of_boolean',
+                'double': 'list_of_double',
+                'integer': 'list_of_integer',
+                'long': 'list_of_long',
+                'string': 'list_of_string'}
+"""
+Data type of an attribute once the differing values of collapsed
+edges are merged into a list, keyed by data type of the attribute.
+Other data types are left as is
+"""
+
+
+def get_merged_type(data_type):
+    """
+    Gets data type of an attribute whose values were merged
+    by :py:func:`merge_values`
+
+    :param data_type: data type of attribute or ``None`` if not set
+    :type data_type: str
+    :rtype: str
+    """
+    if data_type is None:
+        return 'list_of_string'
+    return MERGED_TYPES.get(data_type, data_type)
+
+
+def merge_values(value1, value2):
+    """
+    Merges attribute values of two edges being collapsed into a list
+    of the distinct non empty values, in the order they are found
+
+    :param value1: value, or list of values, of first edge
+    :param value2: value, or list of values, of second edge
+    :rtype: list
+    """
+    merged = []
+    for value in (value1 if isinstance(value1, list) else [value1]) + \
+            (value2 if isinstance(value2, list) else [value2]):
+        if value not in merged and value:
+            merged.append(value)
+    return merged
+
+
+class EdgeAttributeColumn(object):
+    """
+    Values of one edge attribute for every edge of a
+    :py:class:`ColumnarNetwork`. Values of all edges are kept in a
+    single list with the values of edge ``i`` at
+    ``offsets[i]:offsets[i + 1]``, so list values do not need a list
+    object per edge, and the data type of each edge is a one byte
+    code with 0 meaning the edge does not have the attribute
+    """
+
+    def __init__(self, name):
+        """
+        Constructor
+
+        :param name: name of attribute
+        :type name: str
+        """
+        self.name = name
+        self._types = [None]
+        self._type_codes = {}
+        self._codes = array('B')
+        self._offsets = array('q', [0])
+        self._values = []
+
+    def __len__(self):
+        return len(self._codes)
+
+    def _get_type_code(self, data_type, is_list):
+        """
+        :return: code of data type, whether value is a list is part of
+                 the code since merged values can be lists with a
+                 scalar data type
+        :rtype: int
+        """
+        key = (data_type, is_list)
+        code = self._type_codes.get(key)
+        if code is None:
+            code = len(self._types)
+            if code > 255:
+                raise ValueError('Too many data types for ' + str(self.name))
+            self._types.append(key)
+            self._type_codes[key] = code
+        return code
+
+    def append(self, value, data_type):
+        """
+        Adds value of the next edge
+
+        :param value: value or list of values, ``None`` if edge does
+                      not have the attribute
+        :param data_type: CX data type of value
+        :type data_type: str
+        :return: None
+        """
+        if value is None:
+            self._codes.append(0)
+        elif isinstance(value, list):
+            self._codes.append(self._get_type_code(data_type, True))
+            self._values.extend(value)
+        else:
+            self._codes.append(self._get_type_code(data_type, False))
+            self._values.append(value)
+        self._offsets.append(len(self._values))
+
+    def get(self, index):
+        """
+        Gets value of edge at index
+
+        :param index: position of edge
+        :type index: int
+        :return: (value, data type) or ``None`` if edge does not
+                 have the attribute
+        :rtype: tuple
+        """
+        code = self._codes[index]
+        if code == 0:
+            return None
+        data_type, is_list = self._types[code]
+        offset = self._offsets[index]
+        if is_list:
+            return self._values[offset:self._offsets[index + 1]], data_type
+        return self._values[offset], data_type
+
+    def get_types(self):
+        """
+        :return: data types of the values in column
+        :rtype: set
+        """
+        return set(data_type for data_type, is_list in self._types[1:])
+
+    def get_count(self):
+        """
+        :return: number of edges with the attribute
+        :rtype: int
+        """
+        return len(self._codes) - self._codes.count(0)
+
+    def _copy_edges(self, column, start, end):
+        """
+        Appends values of edges at positions ``start`` to ``end``,
+        inclusive, to column
+        """
+        first_offset = self._offsets[start]
+        shift = len(column._values) - first_offset
+        column._codes.extend(self._codes[start:end + 1])
+        column._values.extend(self._values[first_offset:
+                                           self._offsets[end + 1]])
+        column._offsets.extend(offset + shift for offset in
+                               self._offsets[start + 1:end + 2])
+
+    def select(self, indexes, replaced_values):
+        """
+        Creates column with the values of the edges at indexes.
+        Consecutive positions are copied as one slice
+
+        :param indexes: positions of edges to keep in ascending order
+        :type indexes: iterable
+        :param replaced_values: (value, data type) keyed by position
+                                of edges whose value is replaced
+        :type replaced_values: dict
+        :rtype: :py:class:`EdgeAttributeColumn`
+        """
+        column = EdgeAttributeColumn(self.name)
+        column._types = list(self._types)
+        column._type_codes = dict(self._type_codes)
+        run_start = None
+        run_end = None
+        for index in indexes:
+            if index in replaced_values:
+                if run_start is not None:
+                    self._copy_edges(column, run_start, run_end)
+                    run_start = None
+                column.append(*replaced_values[index])
+            elif run_start is not None and index == run_end + 1:
+                run_end = index
+            else:
+                if run_start is not None:
+                    self._copy_edges(column, run_start, run_end)
+                run_start = run_end = index
+        if run_start is not None:
+            self._copy_edges(column, run_start, run_end)
+        return column
+
+
+class ColumnarNetwork(object):
+    """
+    Network with node ids numbered from 0 in the order nodes are
+    added, edge sources, targets and interactions held in arrays and
+    edge attributes held in :py:class:`EdgeAttributeColumn` objects.
+
+    Network attributes, metadata and opaque aspects, which are small,
+    are held in a :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+    without nodes or edges so the methods of the loader that set them
+    work on either kind of network
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        from ndex2.nice_cx_network import NiceCXNetwork
+        self._header = NiceCXNetwork(user_agent='niceCx Builder')
+        self._node_names = []
+        self._node_represents = []
+        self._node_attributes = {}
+        self._node_attribute_count = 0
+        self._edge_ids = array('q')
+        self._sources = array('q')
+        self._targets = array('q')
+        self._interaction_codes = array('l')
+        self._interactions = []
+        self._interaction_index = {}
+        self._next_edge_id = 0
+        self._edge_attribute_columns = []
+
+    @property
+    def metadata(self):
+        return self._header.metadata
+
+    @property
+    def networkAttributes(self):
+        return self._header.networkAttributes
+
+    @property
+    def opaqueAspects(self):
+        return self._header.opaqueAspects
+
+    def get_name(self):
+        return self._header.get_name()
+
+    def set_name(self, network_name):
+        self._header.set_name(network_name)
+
+    def set_network_attribute(self, name, values=None, type=None):
+        self._header.set_network_attribute(name, values=values, type=type)
+
+    def add_network_attribute(self, name=None, values=None, type=None):
+        self._header.add_network_attribute(name=name, values=values,
+                                           type=type)
+
+    def apply_style_from_network(self, nicecxnetwork):
+        self._header.apply_style_from_network(nicecxnetwork)
+
+    def set_opaque_aspect(self, aspect_name, aspect_elements):
+        self._header.set_opaque_aspect(aspect_name, aspect_elements)
+
+    def get_opaque_aspect(self, aspect_name):
+        return self._header.get_opaque_aspect(aspect_name)
+
+    def add_node(self, name, represents=None):
+        """
+        Adds node
+
+        :param name: name of node
+        :type name: str
+        :param represents: represents of node, not set if empty
+        :type represents: str
+        :return: id of node
+        :rtype: int
+        """
+        self._node_names.append(name)
+        self._node_represents.append(represents)
+        return len(self._node_names) - 1
+
+    def add_node_attribute(self, node_id, name, value, data_type):
+        """
+        Adds attribute to node. Attributes are written grouped by
+        node, in the order the nodes first got an attribute
+
+        :param node_id: id of node
+        :type node_id: int
+        :param name: name of attribute
+        :type name: str
+        :param value: value of attribute
+        :param data_type: CX data type of value
+        :type data_type: str
+        :return: None
+        """
+        self._node_attributes.setdefault(node_id, []).append((name, value,
+                                                              data_type))
+        self._node_attribute_count += 1
+
+    def add_edge_attribute_column(self, name):
+        """
+        Adds edge attribute. A value, or ``None``, must be appended
+        to the returned column for every edge added
+
+        :param name: name of attribute
+        :type name: str
+        :rtype: :py:class:`EdgeAttributeColumn`
+        """
+        column = EdgeAttributeColumn(name)
+        self._edge_attribute_columns.append(column)
+        return column
+
+    def add_edge(self, source, target, interaction):
+        """
+        Adds edge
+
+        :param source: id of source node
+        :type source: int
+        :param target: id of target node
+        :type target: int
+        :param interaction: interaction of edge
+        :type interaction: str
+        :return: id of edge
+        :rtype: int
+        """
+        code = self._interaction_index.get(interaction)
+        if code is None:
+            code = len(self._interactions)
+            self._interactions.append(interaction)
+            self._interaction_index[interaction] = code
+        edge_id = self._next_edge_id
+        self._next_edge_id += 1
+        self._edge_ids.append(edge_id)
+        self._sources.append(source)
+        self._targets.append(target)
+        self._interaction_codes.append(code)
+        return edge_id
+
+    def get_node_count(self):
+        """
+        :rtype: int
+        """
+        return len(self._node_names)
+
+    def get_edge_count(self):
+        """
+        :rtype: int
+        """
+        return len(self._edge_ids)
+
+    def collapse_edges(self, progress=None):
+        """
+        Collapses edges with the same source, target and interaction,
+        in either direction, into the edge seen first. Where both edges
+        have an attribute with different values the values are merged
+        with :py:func:`merge_values`, attributes only the later edge
+        has are dropped. Same result as
+        :py:meth:`~ndexbiogridloader.ndexloadbiogrid.NdexBioGRIDLoader._collapse_edges`
+        on a :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+
+        :param progress: if set, edges examined are added to it
+        :type progress: :py:class:`~ndexbiogridloader.progress.StageProgress`
+        :return: None
+        """
+        unique_edges = {}
+        kept = array('q')
+        columns = self._edge_attribute_columns
+        merged = [{} for column in columns]
+        sources = self._sources
+        targets = self._targets
+        interactions = self._interaction_codes
+        edge_keys = zip(sources, interactions, targets)
+        if progress is not None:
+            edge_keys = iter_with_progress(edge_keys, progress)
+        for index, edge_key in enumerate(edge_keys):
+            first = unique_edges.get(edge_key)
+            if first is None:
+                first = unique_edges.get((edge_key[2], edge_key[1],
+                                          edge_key[0]))
+            if first is None:
+                unique_edges[edge_key] = index
+                kept.append(index)
+                continue
+            for column, merged_values in zip(columns, merged):
+                attribute1 = merged_values.get(first) or column.get(first)
+                if attribute1 is None:
+                    continue
+                attribute2 = column.get(index)
+                if attribute2 is None or attribute1[0] == attribute2[0]:
+                    continue
+                merged_values[first] = (merge_values(attribute1[0],
+                                                     attribute2[0]),
+                                        get_merged_type(attribute1[1]))
+        del unique_edges
+        if len(kept) == len(sources):
+            return
+        self._edge_ids = array('q', (self._edge_ids[i] for i in kept))
+        self._sources = array('q', (sources[i] for i in kept))
+        self._targets = array('q', (targets[i] for i in kept))
+        self._interaction_codes = array('l', (interactions[i] for i in kept))
+        self._edge_attribute_columns = [column.select(kept, merged_values)
+                                        for column, merged_values
+                                        in zip(columns, merged)]
+
+    def iter_nodes_with_attributes(self):
+        """
+        Generator over nodes
+
+        :return: (node id, name, represents, list of
+                 (attribute name, value, data type)) for each node
+        :rtype: tuple
+        """
+        no_attributes = []
+        for node_id, name in enumerate(self._node_names):
+            yield (node_id, name, self._node_represents[node_id],
+                   self._node_attributes.get(node_id, no_attributes))
+
+    def iter_edges_with_attributes(self):
+        """
+        Generator over edges
+
+        :return: (edge id, source, target, interaction, list of
+                 (attribute name, value, data type)) for each edge
+        :rtype: tuple
+        """
+        columns = self._edge_attribute_columns
+        interactions = self._interactions
+        edges = zip(self._edge_ids, self._sources, self._targets,
+                    self._interaction_codes)
+        for index, (edge_id, source, target, code) in enumerate(edges):
+            attributes = []
+            for column in columns:
+                attribute = column.get(index)
+                if attribute is not None:
+                    attributes.append((column.name, attribute[0],
+                                       attribute[1]))
+            yield edge_id, source, target, interactions[code], attributes
+
+    def get_edge_attribute_types(self):
+        """
+        :return: data types of values of each edge attribute
+        :rtype: dict
+        """
+        return {column.name: column.get_types()
+                for column in self._edge_attribute_columns}
+
+    def _iter_nodes(self):
+        for node_id, name in enumerate(self._node_names):
+            node = {'@id': node_id, 'n': name}
+            represents = self._node_represents[node_id]
+            if represents:
+                node['r'] = represents
+            yield node
+
+    def _iter_edges(self):
+        interactions = self._interactions
+        for edge_id, source, target, code in zip(self._edge_ids, self._sources,
+                                                 self._targets,
+                                                 self._interaction_codes):
+            yield {'@id': edge_id, 's': source, 't': target,
+                   'i': interactions[code]}
+
+    def _iter_node_attributes(self):
+        for node_id, attributes in self._node_attributes.items():
+            for name, value, data_type in attributes:
+                yield {'po': node_id, 'n': name, 'v': value, 'd': data_type}
+
+    def _iter_edge_attributes(self):
+        columns = self._edge_attribute_columns
+        for index, edge_id in enumerate(self._edge_ids):
+            for column in columns:
+                attribute = column.get(index)
+                if attribute is not None:
+                    yield {'po': edge_id, 'n': column.name,
+                           'v': attribute[0], 'd': attribute[1]}
+
+    def _get_aspects(self):
+        """
+        :return: (name, element iterator factory, element count) of
+                 the non empty aspects in the order
+                 :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_cx`
+                 outputs them
+        :rtype: list
+        """
+        aspects = [('nodes', self._iter_nodes, len(self._node_names)),
+                   ('edges', self._iter_edges, len(self._edge_ids)),
+                   ('networkAttributes', lambda: iter(self.networkAttributes),
+                    len(self.networkAttributes)),
+                   ('nodeAttributes', self._iter_node_attributes,
+                    self._node_attribute_count),
+                   ('edgeAttributes', self._iter_edge_attributes,
+                    sum(c.get_count() for c in self._edge_attribute_columns))]
+        return [aspect for aspect in aspects if aspect[2] > 0]
+
+    def write_cx(self, out):
+        """
+        Writes network as CX to ``out`` an element at a time. Output
+        is identical to writing the network returned by
+        :py:meth:`to_nice_cx` with
+        :py:func:`~ndexbiogridloader.cxwriter.write_cx`
+
+        :param out: text file to write to
+        :type out: file
+        :return: None
+        """
+        cxwriter.write_aspects(out, self.metadata, self._get_aspects(),
+                               self.opaqueAspects)
+
+    def to_networkx(self, mode='default'):
+        """
+        Creates graph of nodes and edges, without attributes, which is
+        all the layouts need
+
+        :param mode: ignored, accepted so this can be called like
+                     :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_networkx`
+        :rtype: :py:class:`networkx.MultiDiGraph`
+        """
+        import networkx as nx
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(range(len(self._node_names)))
+        graph.add_edges_from(zip(self._sources, self._targets))
+        return graph
+
+    def to_nice_cx(self):
+        """
+        Creates :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        with the same content, for use with the ndex2 API
+
+        :rtype: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        """
+        import copy
+        network = copy.deepcopy(self._header)
+        for node in self._iter_nodes():
+            network.nodes[node['@id']] = node
+        for attribute in self._iter_node_attributes():
+            network.nodeAttributes.setdefault(attribute['po'],
+                                              []).append(attribute)
+        for edge in self._iter_edges():
+            network.edges[edge['@id']] = edge
+        for attribute in self._iter_edge_attributes():
+            network.edgeAttributes.setdefault(attribute['po'],
+                                              []).append(attribute)
+        network.node_int_id_generator = max(len(self._node_names) - 1, 0) + 1
+        network.edge_int_id_generator = max(self._next_edge_id - 1, 0) + 1
+        return network
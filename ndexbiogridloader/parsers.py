@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parsers used to read BioGRID source files and the TSV files
+generated from them
+"""
+
+import io
+import logging
+
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+
+logger = logging.getLogger(__name__)
+
+
+PYTHON_PARSER = 'python'
+"""
+Name of parser that uses pure python to read source files
+and C parser in pandas to read TSV files
+"""
+
+ARROW_PARSER = 'arrow'
+"""
+Name of parser that uses multi-threaded Apache Arrow CSV reader
+"""
+
+PARSERS = [PYTHON_PARSER, ARROW_PARSER]
+"""
+Names of supported parsers
+"""
+
+
+class ParserBackend(object):
+    """
+    Base class for parsers of BioGRID source files (tab2 and chemtab)
+    and TSV files generated by the loader
+    """
+    def __init__(self, name):
+        """
+        Constructor
+
+        :param name: name of parser
+        :type name: str
+        """
+        self._name = name
+
+    def get_name(self):
+        """
+        :return: name of parser
+        :rtype: str
+        """
+        return self._name
+
+    def iter_rows(self, file_path, filter_column=None, filter_values=None,
+                  max_column=None):
+        """
+        Generator over tab delimited rows in ``file_path`` skipping the
+        first line which is the header. Values of the last column
+        may include the line terminator. ``file_path`` can also be a
+        binary file object, such as a member opened from a zip
+        archive, which is read sequentially.
+
+        If ``filter_column`` is set, only rows whose value in that
+        column is in ``filter_values`` are returned. Implementations
+        reject other rows before splitting them fully
+
+        If ``max_column`` is set, values of columns after it are not
+        needed and implementations may return them unsplit, or not at
+        all, so only values up to and including ``max_column`` can be
+        relied on
+
+        :param file_path: path to BioGRID source file or binary file object
+        :type file_path: str or file
+        :param filter_column: index of column to filter on
+        :type filter_column: int
+        :param filter_values: values to keep
+        :type filter_values: set
+        :param max_column: index of last column needed
+        :type max_column: int
+        :return: values for each row
+        :rtype: list or tuple
+        """
+        raise NotImplementedError('subclasses should implement this')
+
+    def read_tsv(self, file_path, usecols, dtype):
+        """
+        Reads tab delimited file with header into a
+        :py:class:`pandas.DataFrame`. Empty values are kept as
+        empty strings
+
+        :param file_path: path to tsv file
+        :type file_path: str
+        :param usecols: names of columns to load
+        :type usecols: list
+        :param dtype: column name => ``str`` or 'category'
+        :type dtype: dict
+        :rtype: :py:class:`pandas.DataFrame`
+        """
+        raise NotImplementedError('subclasses should implement this')
+
+
+class PythonParserBackend(ParserBackend):
+    """
+    Reads source files a line at a time in pure python and
+    TSV files with pandas C parser
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        super(PythonParserBackend, self).__init__(PYTHON_PARSER)
+
+    def iter_rows(self, file_path, filter_column=None, filter_values=None,
+                  max_column=None):
+        """
+        Generator over rows in ``file_path`` that splits each
+        line on tab. When filtering, only the columns up to
+        ``filter_column`` are split to decide if a row is kept.
+        If ``max_column`` is set the last value of each row
+        holds the rest of the line after ``max_column``
+
+        :param file_path: path to BioGRID source file or binary file object
+        :type file_path: str or file
+        :param filter_column: index of column to filter on
+        :type filter_column: int
+        :param filter_values: values to keep
+        :type filter_values: set
+        :param max_column: index of last column needed
+        :type max_column: int
+        :return: values for each row
+        :rtype: list
+        """
+        if isinstance(file_path, str):
+            f_read = open(file_path, 'r')
+        else:
+            f_read = io.TextIOWrapper(file_path, encoding='utf-8')
+        max_split = -1 if max_column is None else max_column + 1
+        with f_read:
+            next(f_read)  # skip header
+            if filter_column is None:
+                for line in f_read:
+                    yield line.split('\t', max_split)
+                return
+            filter_split = filter_column + 1
+            for line in f_read:
+                if line.split('\t', filter_split)[filter_column] in \
+                        filter_values:
+                    yield line.split('\t', max_split)
+
+    def read_tsv(self, file_path, usecols, dtype):
+        """
+        Reads tsv file using pandas C parser
+
+        :param file_path: path to tsv file
+        :type file_path: str
+        :param usecols: names of columns to load
+        :type usecols: list
+        :param dtype: column name => ``str`` or 'category'
+        :type dtype: dict
+        :rtype: :py:class:`pandas.DataFrame`
+        """
+        import pandas as pd
+        return pd.read_csv(file_path,
+                           usecols=usecols,
+                           dtype=dtype,
+                           na_filter=False,
+                           delimiter='\t',
+                           engine='c')
+
+
+class ArrowParserBackend(ParserBackend):
+    """
+    Reads files using the multi-threaded CSV reader from
+    `pyarrow <https://arrow.apache.org/docs/python/csv.html>`_
+    """
+    def __init__(self, block_size=16 * 1024 * 1024, use_threads=True):
+        """
+        Constructor
+
+        :param block_size: number of bytes to process at a time
+        :type block_size: int
+        :param use_threads: If ``True`` blocks are parsed in parallel
+        :type use_threads: bool
+        :raises NdexBioGRIDLoaderError: if pyarrow is not installed
+        """
+        super(ArrowParserBackend, self).__init__(ARROW_PARSER)
+        try:
+            import pyarrow
+            import pyarrow.csv
+        except ImportError as ie:
+            raise NdexBioGRIDLoaderError('pyarrow is required for ' +
+                                         ARROW_PARSER + ' parser: ' +
+                                         str(ie))
+        self._pa = pyarrow
+        self._pacsv = pyarrow.csv
+        self._block_size = block_size
+        self._use_threads = use_threads
+
+    def _get_header(self, file_path):
+        """
+        Gets column names from first line of file. If ``file_path`` is
+        a file object the header line is consumed from it
+        """
+        if not isinstance(file_path, str):
+            line = file_path.readline().decode('utf-8')
+            return line.rstrip('\r\n').split('\t')
+        with open(file_path, 'r') as f:
+            return f.readline().rstrip('\r\n').split('\t')
+
+    def _get_options(self, column_names, column_types, skip_rows=1,
+                     quote_char='"', include_columns=None):
+        read_options = self._pacsv.ReadOptions(use_threads=self._use_threads,
+                                               block_size=self._block_size,
+                                               skip_rows=skip_rows,
+                                               column_names=column_names)
+        parse_options = self._pacsv.ParseOptions(delimiter='\t',
+                                                 quote_char=quote_char,
+                                                 ignore_empty_lines=True)
+        convert_options = \
+            self._pacsv.ConvertOptions(column_types=column_types,
+                                       strings_can_be_null=False,
+                                       quoted_strings_can_be_null=False,
+                                       null_values=[],
+                                       include_columns=include_columns)
+        return read_options, parse_options, convert_options
+
+    def iter_rows(self, file_path, filter_column=None, filter_values=None,
+                  max_column=None):
+        """
+        Generator over rows in ``file_path``. Blocks of the file
+        are parsed in parallel by arrow and converted to tuples
+        of ``str`` a batch at a time. When filtering, rows are
+        removed from each batch before conversion. If ``max_column``
+        is set columns after it are not converted
+
+        :param file_path: path to BioGRID source file or binary file object
+        :type file_path: str or file
+        :param filter_column: index of column to filter on
+        :type filter_column: int
+        :param filter_values: values to keep
+        :type filter_values: set
+        :param max_column: index of last column needed
+        :type max_column: int
+        :return: values for each row
+        :rtype: tuple
+        """
+        # columns are given positional names since BioGRID headers
+        # are not guaranteed to be unique
+        column_names = ['c' + str(i) for i in
+                        range(len(self._get_header(file_path)))]
+        column_types = {c: self._pa.string() for c in column_names}
+        include_columns = None
+        if max_column is not None:
+            last = max(max_column,
+                       -1 if filter_column is None else filter_column)
+            include_columns = column_names[:last + 1]
+        skip_rows = 1 if isinstance(file_path, str) else 0
+        read_opts, parse_opts, convert_opts = \
+            self._get_options(column_names, column_types,
+                              skip_rows=skip_rows, quote_char=False,
+                              include_columns=include_columns)
+        reader = self._pacsv.open_csv(file_path, read_options=read_opts,
+                                      parse_options=parse_opts,
+                                      convert_options=convert_opts)
+        value_set = None
+        if filter_column is not None:
+            import pyarrow.compute
+            value_set = self._pa.array(sorted(filter_values),
+                                       type=self._pa.string())
+        for batch in reader:
+            if value_set is not None:
+                batch = batch.filter(
+                    pyarrow.compute.is_in(batch.column(filter_column),
+                                          value_set=value_set))
+            columns = [col.to_pylist() for col in batch.columns]
+            for row in zip(*columns):
+                yield row
+
+    def read_tsv(self, file_path, usecols, dtype):
+        """
+        Reads tsv file in parallel with arrow. Columns with 'category'
+        dtype are dictionary encoded and become categoricals
+
+        :param file_path: path to tsv file
+        :type file_path: str
+        :param usecols: names of columns to load
+        :type usecols: list
+        :param dtype: column name => ``str`` or 'category'
+        :type dtype: dict
+        :rtype: :py:class:`pandas.DataFrame`
+        """
+        column_names = self._get_header(file_path)
+        column_types = {}
+        for col in column_names:
+            if dtype.get(col) == 'category':
+                column_types[col] = self._pa.dictionary(self._pa.int32(),
+                                                        self._pa.string())
+            else:
+                column_types[col] = self._pa.string()
+        read_opts, parse_opts, convert_opts = \
+            self._get_options(column_names, column_types,
+                              include_columns=usecols)
+        table = self._pacsv.read_csv(file_path, read_options=read_opts,
+                                     parse_options=parse_opts,
+                                     convert_options=convert_opts)
+        return table.to_pandas()
+
+
+def get_parser_backend(name):
+    """
+    Gets parser with ``name``. If :py:const:`ARROW_PARSER` is
+    requested, but pyarrow is not installed, a warning is logged
+    and :py:class:`PythonParserBackend` is returned
+
+    :param name: name of parser, one of :py:const:`PARSERS`
+    :type name: str
+    :raises NdexBioGRIDLoaderError: if name is not a known parser
+    :return: parser
+    :rtype: :py:class:`ParserBackend`
+    """
+    if name == PYTHON_PARSER:
+        return PythonParserBackend()
+    if name == ARROW_PARSER:
+        try:
+            return ArrowParserBackend()
+        except NdexBioGRIDLoaderError as e:
+            logger.warning(str(e) + ' falling back to ' + PYTHON_PARSER +
+                           ' parser')
+            return PythonParserBackend()
+    raise NdexBioGRIDLoaderError('Unknown parser: ' + str(name))
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+"""
+Estimates the work needed to build each network and plans the
+order networks are built in
+"""
+
+import os
+import logging
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+
+SOURCE_BYTES_PER_ROW = 350
+"""
+Estimated average size in bytes of a row in BioGRID tab2
+and chemtab files
+"""
+
+NETWORK_BYTES_PER_SOURCE_BYTE = 16.0
+"""
+Estimated peak memory, in bytes, used to aggregate, convert and
+lay out a network for each byte of BioGRID file it is built from
+"""
+
+SOURCE_BYTES_PER_SECOND = 256 * 1024
+"""
+Estimated bytes of BioGRID file built into a network per second,
+including spring layout
+"""
+
+
+def get_zip_member_sizes(zip_file):
+    """
+    Gets uncompressed size of every member of zip file by reading
+    its central directory, no members are decompressed
+
+    :param zip_file: path to zip file
+    :type zip_file: str
+    :return: member name => size in bytes or empty dict if
+             zip file does not exist or cannot be read
+    :rtype: dict
+    """
+    if not os.path.isfile(zip_file):
+        return {}
+    try:
+        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+            return {info.filename: info.file_size
+                    for info in zip_ref.infolist()}
+    except zipfile.BadZipFile as e:
+        logger.warning('Unable to read ' + zip_file + ' : ' + str(e))
+        return {}
+
+
+class WorkItem(object):
+    """
+    A network to build along with estimates of the work needed
+    derived from the size of the BioGRID file it is built from
+    """
+
+    def __init__(self, name, entry, type, source_size):
+        """
+        Constructor
+
+        :param name: name of network for display
+        :type name: str
+        :param entry: line from organism or chemicals file split by tab
+        :type entry: list
+        :param type: either 'organism' or 'chemicals'
+        :type type: str
+        :param source_size: uncompressed size in bytes of BioGRID file
+                            or ``None`` if unknown
+        :type source_size: int
+        """
+        self._name = name
+        self._entry = entry
+        self._type = type
+        self._source_size = source_size
+
+    def get_name(self):
+        """
+        :return: name of network
+        :rtype: str
+        """
+        return self._name
+
+    def get_entry(self):
+        """
+        :return: line from organism or chemicals file split by tab
+        :rtype: list
+        """
+        return self._entry
+
+    def get_type(self):
+        """
+        :return: either 'organism' or 'chemicals'
+        :rtype: str
+        """
+        return self._type
+
+    def get_source_size(self):
+        """
+        :return: uncompressed size in bytes of BioGRID file, 0 if unknown
+        :rtype: int
+        """
+        return self._source_size or 0
+
+    def get_estimated_rows(self):
+        """
+        :return: estimated number of rows in BioGRID file
+        :rtype: int
+        """
+        return int(self.get_source_size() / SOURCE_BYTES_PER_ROW)
+
+    def get_estimated_memory(self):
+        """
+        :return: estimated peak memory in bytes needed to build network
+        :rtype: int
+        """
+        return int(self.get_source_size() * NETWORK_BYTES_PER_SOURCE_BYTE)
+
+    def get_estimated_seconds(self):
+        """
+        :return: estimated seconds needed to build network
+        :rtype: float
+        """
+        return self.get_source_size() / SOURCE_BYTES_PER_SECOND
+
+    def to_dict(self):
+        """
+        :return: name, type and estimates of this item
+        :rtype: dict
+        """
+        return {'name': self._name,
+                'type': self._type,
+                'sourceBytes': self.get_source_size(),
+                'estimatedRows': self.get_estimated_rows(),
+                'estimatedMemoryBytes': self.get_estimated_memory(),
+                'estimatedSeconds': round(self.get_estimated_seconds(), 1)}
+
+
+class WorkPlanner(object):
+    """
+    Schedules :py:class:`WorkItem` objects largest first across
+    workers. An item is only admitted to run if its estimated memory,
+    plus that of the items already running, fits within the memory
+    budget. An item that does not fit on its own is admitted when
+    nothing else is running.
+    """
+
+    def __init__(self, max_workers=1, memory_budget=None):
+        """
+        Constructor
+
+        :param max_workers: number of items that can run at once
+        :type max_workers: int
+        :param memory_budget: memory in bytes available to running
+                              items, ``None`` for no limit
+        :type memory_budget: int
+        """
+        self._max_workers = max_workers
+        self._memory_budget = memory_budget
+
+    def get_max_workers(self):
+        """
+        :return: number of items that can run at once
+        :rtype: int
+        """
+        return self._max_workers
+
+    def get_memory_budget(self):
+        """
+        :return: memory in bytes available to running items or ``None``
+        :rtype: int
+        """
+        return self._memory_budget
+
+    def order(self, items):
+        """
+        Sorts items largest first. Items of equal size keep
+        their original order
+
+        :param items: items to sort
+        :type items: list
+        :return: sorted items
+        :rtype: list
+        """
+        return sorted(items, key=lambda item: -item.get_source_size())
+
+    def select_next(self, pending, running):
+        """
+        Picks the next item to run
+
+        :param pending: items waiting to run ordered by :py:meth:`order`
+        :type pending: list
+        :param running: items currently running
+        :type running: list
+        :return: first item in pending that can be admitted or ``None``
+        :rtype: :py:class:`WorkItem`
+        """
+        if len(running) >= self._max_workers:
+            return None
+        used = sum(item.get_estimated_memory() for item in running)
+        for item in pending:
+            if not running or self._memory_budget is None or \
+                    used + item.get_estimated_memory() <= self._memory_budget:
+                return item
+        return None
+
+    def simulate(self, items):
+        """
+        Simulates running items using the estimates to predict when
+        each starts and how long and how much memory the whole run needs
+
+        :param items: items to run
+        :type items: list
+        :return: (list of (item, start seconds, end seconds) in the order
+                 items start, estimated total seconds, estimated peak
+                 memory in bytes)
+        :rtype: tuple
+        """
+        pending = self.order(items)
+        running = []
+        schedule = []
+        now = 0.0
+        peak_memory = 0
+        while pending or running:
+            item = self.select_next(pending, [r[0] for r in running])
+            while item is not None:
+                pending.remove(item)
+                end = now + item.get_estimated_seconds()
+                running.append((item, end))
+                schedule.append((item, now, end))
+                item = self.select_next(pending, [r[0] for r in running])
+            peak_memory = max(peak_memory,
+                              sum(r[0].get_estimated_memory()
+                                  for r in running))
+            now = min(r[1] for r in running)
+            running = [r for r in running if r[1] > now]
+        return schedule, now, peak_memory
+
+    def format_plan(self, items):
+        """
+        Formats estimates for items and their simulated schedule
+        as a table
+
+        :param items: items to run
+        :type items: list
+        :return: human readable plan
+        :rtype: str
+        """
+        schedule, total_seconds, peak_memory = self.simulate(items)
+        mb = 1024.0 * 1024.0
+        header_format = '{:>5}  {:<60} {:>10} {:>10} {:>12} {:>9} {:>9}'
+        row_format = ('{:>5}  {:<60} {:>10.1f} {:>10} {:>12.1f} {:>9.1f} '
+                      '{:>9.1f}')
+        lines = [header_format.format('Order', 'Network', 'Size (MB)',
+                                      'Rows', 'Memory (MB)', 'Time (s)',
+                                      'Start (s)')]
+        for index, (item, start, end) in enumerate(schedule):
+            lines.append(row_format.format(
+                index + 1, item.get_name()[:60], item.get_source_size() / mb,
+                item.get_estimated_rows(), item.get_estimated_memory() / mb,
+                item.get_estimated_seconds(), start))
+        budget = 'unlimited' if self._memory_budget is None else \
+            '{:.1f} MB'.format(self._memory_budget / mb)
+        lines.append('')
+        lines.append('Workers: {}  Memory budget: {}'.format(self._max_workers,
+                                                             budget))
+        lines.append('Estimated peak memory: {:.1f} MB  '
+                     'Estimated time: {:.1f} s'.format(peak_memory / mb,
+                                                       total_seconds))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""
+Extracts upcoming members of a zip archive in background threads
+while the current member is being processed
+"""
+
+import os
+import shutil
+import zipfile
+import logging
+import threading
+import concurrent.futures
+
+from ndexbiogridloader.progress import copy_with_progress
+
+logger = logging.getLogger(__name__)
+
+
+PREFETCH_SUFFIX = '.prefetch'
+"""
+Suffix of file a member is extracted to before it is complete
+"""
+
+COPY_BUFFER_SIZE = 1048576
+"""
+Bytes decompressed at a time. zlib releases the GIL while
+decompressing so larger reads let other threads run longer
+"""
+
+
+class MemberPrefetcher(object):
+    """
+    Extracts members of an archive, in the order they will be
+    needed, into a directory using background threads. At most
+    ``ahead`` members are extracted, or being extracted, and not yet
+    taken with :py:meth:`get` at any time, bounding disk used by
+    members extracted early. Each thread opens the archive itself
+    so extraction does not contend with reads of the archive by the
+    caller
+    """
+
+    def __init__(self, zip_file, members, dest_dir, ahead=1,
+                 create_progress=None):
+        """
+        Constructor, starts extracting first members
+
+        :param zip_file: path to archive
+        :type zip_file: str
+        :param members: names of members in order they will be needed
+        :type members: list
+        :param dest_dir: directory to extract members into
+        :type dest_dir: str
+        :param ahead: number of members to extract ahead
+        :type ahead: int
+        :param create_progress: if set, called with member name and
+                                uncompressed size to get a
+                                :py:class:`~ndexbiogridloader.progress.StageProgress`
+                                that bytes extracted are added to
+        :type create_progress: function
+        """
+        self._zip_file = zip_file
+        self._create_progress = create_progress
+        self._dest_dir = dest_dir
+        self._ahead = ahead
+        self._queue = list(members)
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=ahead, thread_name_prefix='prefetch')
+        self._submit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _submit(self):
+        """
+        Starts extracting queued members until ``ahead`` are
+        outstanding
+        """
+        with self._lock:
+            while self._queue and len(self._futures) < self._ahead:
+                member = self._queue.pop(0)
+                self._futures[member] = self._executor.submit(self._extract,
+                                                              member)
+
+    def _extract(self, member):
+        """
+        Extracts member to a temporary file that is renamed once
+        complete so a partially extracted member is never used
+
+        :return: path to extracted member
+        :rtype: str
+        """
+        dest = os.path.join(self._dest_dir, member)
+        tmp_dest = dest + PREFETCH_SUFFIX
+        try:
+            with zipfile.ZipFile(self._zip_file, 'r') as zip_ref, \
+                    zip_ref.open(member) as source, \
+                    open(tmp_dest, 'wb') as target:
+                if self._create_progress is None:
+                    shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+                else:
+                    file_size = zip_ref.getinfo(member).file_size
+                    with self._create_progress(member,
+                                               file_size) as progress:
+                        copy_with_progress(source, target, progress,
+                                           COPY_BUFFER_SIZE)
+            os.replace(tmp_dest, dest)
+        except BaseException:
+            if os.path.exists(tmp_dest):
+                os.remove(tmp_dest)
+            raise
+        logger.debug('Prefetched ' + member)
+        return dest
+
+    def get(self, member):
+        """
+        Waits for member to be extracted and starts extracting the
+        next queued member
+
+        :param member: name of member
+        :type member: str
+        :raises Exception: error raised extracting member
+        :return: path to extracted member or ``None`` if member was
+                 not passed to constructor or was already taken
+        :rtype: str
+        """
+        with self._lock:
+            future = self._futures.get(member)
+            if future is None and member in self._queue:
+                # needed out of order, extract it now
+                self._queue.remove(member)
+                future = self._executor.submit(self._extract, member)
+                self._futures[member] = future
+        if future is None:
+            return None
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                del self._futures[member]
+            self._submit()
+
+    def close(self):
+        """
+        Drops queued members and waits for members being extracted
+        :return: None
+        """
+        with self._lock:
+            self._queue = []
+            futures = list(self._futures.values())
+            self._futures = {}
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+
+"""
+Reports progress of each stage of building a network, such as
+bytes downloaded or rows parsed, with rate and estimated time left
+"""
+
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+BYTES_UNIT = 'B'
+"""
+Unit of stages that count bytes
+"""
+
+LOG_INTERVAL = 30.0
+"""
+Default seconds between progress log lines of a stage
+"""
+
+UPDATE_BATCH = 65536
+"""
+Rows or edges counted before progress is updated, keeps the cost
+of reporting progress per row negligible
+"""
+
+
+class StageProgress(object):
+    """
+    Progress of one stage of work on a named item, such as
+    decompressing a BioGRID file.
+
+    If ``bar`` is ``True`` a ``tqdm`` progress bar shows amount done,
+    rate and estimated time left. Otherwise a line of the form::
+
+        progress stage=parse done=100 total=500 unit=rows rate=25.0/s eta=16s
+
+    is logged at most every ``log_interval`` seconds and once more
+    when the stage ends. ``name="<name>"`` follows the stage if a name
+    is set. ``total``, ``rate`` and ``eta`` are left out when they are
+    not known
+    """
+
+    def __init__(self, stage, name=None, total=None, unit=BYTES_UNIT,
+                 bar=False, log_interval=LOG_INTERVAL, clock=time.monotonic):
+        """
+        Constructor
+
+        :param stage: name of stage ie 'download'
+        :type stage: str
+        :param name: name of item stage works on ie a file name
+        :type name: str
+        :param total: amount of work in stage or ``None`` if unknown
+        :type total: int
+        :param unit: unit of work ie 'B' or 'rows'
+        :type unit: str
+        :param bar: if ``True`` shows a progress bar instead of
+                    logging progress
+        :type bar: bool
+        :param log_interval: seconds between progress log lines
+        :type log_interval: float
+        :param clock: function returning current time in seconds
+        :type clock: function
+        """
+        self._stage = stage
+        self._name = name
+        self._total = total
+        self._unit = unit
+        self._log_interval = float(log_interval)
+        self._clock = clock
+        self._start = clock()
+        self._last_log = self._start
+        self._done = 0
+        self._closed = False
+        self._bar = None
+        if bar is True:
+            from tqdm import tqdm
+            desc = stage if name is None else stage + ' ' + name
+            self._bar = tqdm(total=total, desc=desc,
+                             unit=unit, unit_scale=True,
+                             unit_divisor=1024 if unit == BYTES_UNIT else 1000,
+                             leave=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def update(self, amount):
+        """
+        Adds amount of work done
+
+        :param amount: work done since last update
+        :type amount: int
+        :return: None
+        """
+        self._done += amount
+        if self._bar is not None:
+            self._bar.update(amount)
+            return
+        now = self._clock()
+        if now - self._last_log >= self._log_interval:
+            self._log(now)
+
+    def get_done(self):
+        """
+        :return: amount of work done
+        :rtype: int
+        """
+        return self._done
+
+    def get_rate(self, now=None):
+        """
+        :param now: current time, if ``None`` clock is used
+        :type now: float
+        :return: work done per second or ``None`` if no time passed
+        :rtype: float
+        """
+        if now is None:
+            now = self._clock()
+        elapsed = now - self._start
+        if elapsed <= 0:
+            return None
+        return self._done / elapsed
+
+    def get_eta(self, now=None):
+        """
+        :param now: current time, if ``None`` clock is used
+        :type now: float
+        :return: estimated seconds left or ``None`` if total is not
+                 known or nothing is done yet
+        :rtype: float
+        """
+        rate = self.get_rate(now)
+        if self._total is None or not rate:
+            return None
+        return max(0.0, (self._total - self._done) / rate)
+
+    def _log(self, now, status=None):
+        """
+        Logs progress line
+        """
+        self._last_log = now
+        line = 'progress stage=' + self._stage
+        if self._name is not None:
+            line += ' name=' + json.dumps(self._name)
+        line += ' done=' + str(self._done)
+        if self._total is not None:
+            line += ' total=' + str(self._total)
+        line += ' unit=' + self._unit
+        rate = self.get_rate(now)
+        if rate is not None:
+            line += ' rate=' + '{:.1f}'.format(rate) + '/s'
+        eta = self.get_eta(now)
+        if eta is not None and status is None:
+            line += ' eta=' + str(int(round(eta))) + 's'
+        if status is not None:
+            line += ' status=' + status
+        logger.info(line)
+
+    def close(self):
+        """
+        Ends stage, closing progress bar or logging a final line
+        with ``status=done``
+        :return: None
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._bar is not None:
+            self._bar.close()
+            return
+        self._log(self._clock(), status='done')
+
+
+class ProgressReader(object):
+    """
+    Wraps a binary file object adding bytes read from it to a
+    :py:class:`StageProgress`. Other attributes are those of the
+    wrapped file
+    """
+
+    def __init__(self, fileobj, progress):
+        """
+        Constructor
+
+        :param fileobj: file object to read from
+        :param progress: progress to update
+        :type progress: :py:class:`StageProgress`
+        """
+        self._fileobj = fileobj
+        self._progress = progress
+
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
+
+    def __iter__(self):
+        for line in self._fileobj:
+            self._progress.update(len(line))
+            yield line
+
+    def read(self, size=-1):
+        """
+        Reads from wrapped file
+
+        :param size: most bytes to read, -1 for all
+        :type size: int
+        :return: data read
+        :rtype: bytes
+        """
+        data = self._fileobj.read(size)
+        self._progress.update(len(data))
+        return data
+
+    def read1(self, size=-1):
+        """
+        Reads from wrapped file with at most one call to underlying
+        stream
+
+        :param size: most bytes to read, -1 for any amount
+        :type size: int
+        :return: data read
+        :rtype: bytes
+        """
+        data = self._fileobj.read1(size)
+        self._progress.update(len(data))
+        return data
+
+    def readinto(self, buffer):
+        """
+        Reads into buffer from wrapped file
+
+        :return: number of bytes read
+        :rtype: int
+        """
+        num_bytes = self._fileobj.readinto(buffer)
+        if num_bytes:
+            self._progress.update(num_bytes)
+        return num_bytes
+
+
+def iter_with_progress(iterable, progress, batch=UPDATE_BATCH):
+    """
+    Generator over iterable adding number of items yielded to
+    progress every batch items and once the iterable is exhausted
+
+    :param iterable: items such as rows of a BioGRID file
+    :type iterable: iterable
+    :param progress: progress to update
+    :type progress: :py:class:`StageProgress`
+    :param batch: items yielded between updates
+    :type batch: int
+    :return: items of iterable
+    """
+    count = 0
+    for item in iterable:
+        yield item
+        count += 1
+        if count == batch:
+            progress.update(count)
+            count = 0
+    progress.update(count)
+
+
+def copy_with_progress(source, target, progress, buffer_size=1048576):
+    """
+    Copies binary file source to target adding bytes copied to
+    progress
+
+    :param source: file object to read
+    :param target: file object to write
+    :param progress: progress to update
+    :type progress: :py:class:`StageProgress`
+    :param buffer_size: bytes copied at a time
+    :type buffer_size: int
+    :return: None
+    """
+    while True:
+        data = source.read(buffer_size)
+        if not data:
+            return
+        target.write(data)
+        progress.update(len(data))
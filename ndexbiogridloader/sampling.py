@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+Deterministic sampling of BioGRID rows for fast end to end runs
+on large organisms
+"""
+
+import zlib
+import argparse
+
+
+SCORE_RANGE = 4294967296.0
+"""
+Number of values a row or gene can score, scores are crc32
+checksums so they fall in ``[0, 2**32)``
+"""
+
+
+def parse_sample(value):
+    """
+    Argument type for sample passed as either a fraction greater
+    then 0 and less then 1, such as ``0.01``, or as a whole number
+    of rows, such as ``5000``
+
+    :param value: value from command line
+    :type value: str
+    :raises argparse.ArgumentTypeError: if value is not valid
+    :return: (fraction, maximum rows) with one of them ``None``
+    :rtype: tuple
+    """
+    try:
+        max_rows = int(value)
+    except ValueError:
+        max_rows = None
+    if max_rows is not None:
+        if max_rows < 1:
+            raise argparse.ArgumentTypeError(str(value) + ' must be 1 '
+                                                          'or more rows')
+        return None, max_rows
+    try:
+        fraction = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(str(value) + ' is not a fraction '
+                                                      'or number of rows')
+    if not 0 < fraction < 1:
+        raise argparse.ArgumentTypeError(str(value) + ' must be greater '
+                                                      'then 0 and less '
+                                                      'then 1')
+    return fraction, None
+
+
+class RowSampler(object):
+    """
+    Decides which rows of a BioGRID file are kept for a network.
+
+    A fraction keeps each row whose BioGRID interaction ID scores
+    below it, a seeded checksum of the ID, so the same rows are
+    kept regardless of order rows are read in. A number of rows
+    keeps the first rows read.
+
+    If gene columns are set, genes are sampled instead of rows and
+    every row with a sampled gene is kept so the neighborhood of
+    each sampled gene is whole. A fraction samples genes scoring
+    below it, a number of rows samples genes of the first rows read
+    until that many rows are kept, after which only rows with
+    genes already sampled are kept
+    """
+
+    def __init__(self, fraction=None, max_rows=None, seed=0,
+                 gene_columns=None, id_column=0):
+        """
+        Constructor
+
+        :param fraction: fraction of rows, or genes, to keep
+        :type fraction: float
+        :param max_rows: number of rows to keep, ignored if
+                         fraction is set
+        :type max_rows: int
+        :param seed: changes rows, or genes, a fraction keeps
+        :type seed: int
+        :param gene_columns: indexes of gene columns, if set genes
+                             are sampled instead of rows
+        :type gene_columns: list
+        :param id_column: index of BioGRID interaction ID column
+        :type id_column: int
+        """
+        self._fraction = fraction
+        self._max_rows = max_rows if fraction is None else None
+        self._seed = seed
+        self._prefix = (str(seed) + ':').encode('utf-8')
+        self._gene_columns = gene_columns
+        self._id_column = id_column
+        self._genes = set()
+        self._num_rows = 0
+        self._num_kept = 0
+
+    def _is_below_fraction(self, value):
+        """
+        :return: ``True`` if seeded score of value is below fraction
+        :rtype: bool
+        """
+        score = zlib.crc32(value.encode('utf-8'),
+                           zlib.crc32(self._prefix))
+        return score < self._fraction * SCORE_RANGE
+
+    def _keep_neighborhood(self, row):
+        """
+        :return: ``True`` if row has a sampled gene, adding its genes
+                 to the sample while under the number of rows
+        :rtype: bool
+        """
+        genes = [row[c] for c in self._gene_columns]
+        if self._fraction is not None:
+            return any(self._is_below_fraction(gene) for gene in genes)
+        if self._num_kept < self._max_rows:
+            self._genes.update(genes)
+            return True
+        return any(gene in self._genes for gene in genes)
+
+    def keep(self, row):
+        """
+        Tells if row is kept, must be called once for every row of
+        the network in order they are read
+
+        :param row: row of BioGRID file
+        :type row: list
+        :rtype: bool
+        """
+        self._num_rows += 1
+        if self._gene_columns is not None:
+            kept = self._keep_neighborhood(row)
+        elif self._fraction is not None:
+            kept = self._is_below_fraction(row[self._id_column])
+        else:
+            kept = self._num_kept < self._max_rows
+        if kept:
+            self._num_kept += 1
+        return kept
+
+    def is_done(self):
+        """
+        Tells if no later row can be kept, so the rest of the BioGRID
+        file need not be read. Only a number of rows sampled without
+        gene columns is ever done, once that many rows are kept
+
+        :rtype: bool
+        """
+        return self._fraction is None and self._gene_columns is None and \
+            self._num_kept >= self._max_rows
+
+    def get_num_rows(self):
+        """
+        :return: number of rows passed to :py:meth:`keep`, which are
+                 the rows read until :py:meth:`is_done`
+        :rtype: int
+        """
+        return self._num_rows
+
+    def get_num_kept(self):
+        """
+        :return: number of rows kept
+        :rtype: int
+        """
+        return self._num_kept
+
+    def get_network_attributes(self):
+        """
+        Gets network attributes describing the sample
+
+        :return: (name, value, type) of each attribute
+        :rtype: list
+        """
+        attributes = []
+        if self._fraction is not None:
+            attributes.append(('sampleFraction', self._fraction, 'double'))
+            attributes.append(('sampleSeed', self._seed, 'integer'))
+        else:
+            attributes.append(('sampleMaxRows', self._max_rows, 'integer'))
+        attributes.append(('sampleNeighborhoods',
+                           self._gene_columns is not None, 'boolean'))
+        attributes.append(('sampleRows', self._num_kept, 'integer'))
+        attributes.append(('sourceRows', self._num_rows, 'integer'))
+        return attributes
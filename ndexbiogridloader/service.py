@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+"""
+Long lived HTTP service that builds single networks on request
+reusing loaders, and the style templates, load plans and archives
+they hold, across requests
+"""
+
+import os
+import re
+import copy
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+
+import ndexbiogridloader
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+
+logger = logging.getLogger(__name__)
+
+
+NETWORKS_PATH = '/networks'
+"""
+Path to ``POST`` a build request to, or ``GET`` names of networks
+that can be built
+"""
+
+STATUS_PATH = '/status'
+"""
+Path to ``GET`` status of service
+"""
+
+VERSION_PATTERN = re.compile(r'^\d+(\.\d+)+$')
+"""
+Valid BioGRID version in a request, such as ``4.2.191``. Versions
+are used as directory names under <datadir> and in download URLs
+"""
+
+MAX_LOADERS = 2
+"""
+Most loaders kept, the least recently used is dropped when a loader
+for another version is set up
+"""
+
+
+class InvalidRequestError(NdexBioGRIDLoaderError):
+    """
+    Raised if a request to :py:class:`LoaderService` is not valid
+    """
+    pass
+
+
+class LoaderService(object):
+    """
+    Builds networks with a loader per BioGRID version. Loaders are
+    created on first request for a version, each with its own
+    directory under <datadir>, and kept once they set up successfully
+    so later requests skip download, style template parsing and load
+    plan parsing. At most :py:const:`MAX_LOADERS` loaders are kept,
+    loaders dropped or never kept are closed.
+
+    Builds run one at a time, since loaders are not thread safe and
+    each can use much of the memory, but only hold the lock guarding
+    the kept loaders while looking up or keeping their loader, so
+    other requests are answered during a build
+    """
+
+    def __init__(self, args, loader_factory):
+        """
+        Constructor
+
+        :param args: parsed command line arguments
+        :type args: :py:class:`argparse.Namespace`
+        :param loader_factory: callable that takes arguments and
+                               returns a
+                               :py:class:`~ndexbiogridloader.ndexloadbiogrid.NdexBioGRIDLoader`
+        :type loader_factory: callable
+        """
+        self._args = args
+        self._loader_factory = loader_factory
+        self._loaders = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._builds = 0
+        self._failed_builds = 0
+
+    def get_default_version(self):
+        """
+        :return: BioGRID version used when request does not set one
+        :rtype: str
+        """
+        return self._args.biogridversion
+
+    def _get_version(self, version):
+        """
+        Gets version of request
+
+        :param version: BioGRID version, if ``None`` default is used
+        :type version: str
+        :raises InvalidRequestError: if version is not of the form
+                                     ``4.2.191``
+        :return: version
+        :rtype: str
+        """
+        if version is None:
+            return self.get_default_version()
+        if not isinstance(version, str) or \
+                VERSION_PATTERN.match(version) is None:
+            raise InvalidRequestError('Invalid BioGRID version: ' +
+                                      str(version))
+        return version
+
+    def _get_loader(self, version):
+        """
+        Gets kept loader for version or creates a new one that is
+        only kept by :py:meth:`_keep_loader`. Caller must hold
+        self._lock
+        """
+        loader = self._loaders.get(version)
+        if loader is not None:
+            self._loaders.move_to_end(version)
+            return loader
+        args = copy.copy(self._args)
+        args.biogridversion = version
+        args.datadir = os.path.join(self._args.datadir, version)
+        return self._loader_factory(args)
+
+    def _keep_loader(self, version, loader):
+        """
+        Keeps loader if it set up successfully, closing and dropping
+        least recently used loaders beyond :py:const:`MAX_LOADERS`.
+        Caller must hold self._lock
+
+        :return: ``True`` if loader is kept
+        :rtype: bool
+        """
+        if self._loaders.get(version) is loader:
+            return True
+        if version in self._loaders or loader.is_ready() is not True:
+            return False
+        self._loaders[version] = loader
+        while len(self._loaders) > MAX_LOADERS:
+            evicted_version, evicted = self._loaders.popitem(last=False)
+            logger.info('Closing loader for version ' + evicted_version)
+            evicted.close()
+        return True
+
+    def get_names(self, version=None):
+        """
+        :param version: BioGRID version, if ``None`` default is used
+        :type version: str
+        :raises InvalidRequestError: if version is not valid
+        :return: names of networks that can be built
+        :rtype: list
+        """
+        version = self._get_version(version)
+        with self._lock:
+            loader = self._get_loader(version)
+            kept = self._loaders.get(version) is loader
+        try:
+            return loader.get_work_item_names()
+        finally:
+            if not kept:
+                loader.close()
+
+    def build(self, name, version=None):
+        """
+        Builds and uploads network
+
+        :param name: name of network as returned by :py:meth:`get_names`
+        :type name: str
+        :param version: BioGRID version, if ``None`` default is used
+        :type version: str
+        :raises InvalidRequestError: if version is not valid
+        :raises NdexBioGRIDLoaderError: if there is no network with name
+        :return: work item estimates along with version, exitCode,
+                 seconds and uploads, the exit code of the upload to
+                 each profile
+        :rtype: dict
+        """
+        version = self._get_version(version)
+        with self._build_lock:
+            with self._lock:
+                loader = self._get_loader(version)
+            try:
+                item, exit_code, seconds = loader.build_network(name)
+                uploads = loader.get_upload_statuses()
+            finally:
+                with self._lock:
+                    kept = self._keep_loader(version, loader)
+                if not kept:
+                    loader.close()
+        with self._lock:
+            self._builds += 1
+            if exit_code != 0:
+                self._failed_builds += 1
+        res = item.to_dict()
+        res['version'] = version
+        res['exitCode'] = exit_code
+        res['seconds'] = round(seconds, 3)
+        res['uploads'] = uploads
+        return res
+
+    def get_status(self):
+        """
+        :return: versions with loaders and counts of builds
+        :rtype: dict
+        """
+        with self._lock:
+            return {'version': ndexbiogridloader.__version__,
+                    'defaultBiogridVersion': self.get_default_version(),
+                    'loadedBiogridVersions': sorted(self._loaders.keys()),
+                    'builds': self._builds,
+                    'failedBuilds': self._failed_builds}
+
+
+class LoaderRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles requests to :py:class:`LoaderService` set as ``service``
+    on the server
+    """
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == STATUS_PATH:
+            self._send_json(200, self.server.service.get_status())
+            return
+        if url.path != NETWORKS_PATH:
+            self._send_json(404, {'error': 'Unknown path: ' + url.path})
+            return
+        version = parse_qs(url.query).get('version', [None])[0]
+        try:
+            names = self.server.service.get_names(version)
+        except InvalidRequestError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.exception('Caught exception getting names for version ' +
+                             str(version))
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'names': names})
+
+    def do_POST(self):
+        if urlparse(self.path).path != NETWORKS_PATH:
+            self._send_json(404, {'error': 'Unknown path: ' + self.path})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            name = request['name']
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': 'Request must be JSON object '
+                                           'with name: ' + str(e)})
+            return
+        try:
+            res = self.server.service.build(name,
+                                            version=request.get('version'))
+        except InvalidRequestError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except NdexBioGRIDLoaderError as e:
+            self._send_json(404, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.exception('Caught exception building ' + str(name))
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200 if res['exitCode'] == 0 else 500, res)
+
+    def log_message(self, format, *args):
+        logger.info(self.address_string() + ' ' + (format % args))
+
+
+def create_server(service, host='127.0.0.1', port=0):
+    """
+    Creates HTTP server for service. Call ``serve_forever()`` on the
+    result to handle requests
+
+    :param service: service to handle requests with
+    :type service: :py:class:`LoaderService`
+    :param host: address to listen on
+    :type host: str
+    :param port: port to listen on, 0 picks a free port
+    :type port: int
+    :rtype: :py:class:`http.server.ThreadingHTTPServer`
+    """
+    server = ThreadingHTTPServer((host, port), LoaderRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(args, loader_factory):
+    """
+    Runs service on --servehost and --serve port until interrupted
+
+    :param args: parsed command line arguments
+    :type args: :py:class:`argparse.Namespace`
+    :param loader_factory: see :py:class:`LoaderService`
+    :type loader_factory: callable
+    :return: 0
+    :rtype: int
+    """
+    server = create_server(LoaderService(args, loader_factory),
+                           host=args.servehost, port=args.serve)
+    logger.info('Serving on http://' + args.servehost + ':' +
+                str(server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
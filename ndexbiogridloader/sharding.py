@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""
+Splits a load across several hosts and records what each
+host, or shard, built
+"""
+
+import json
+import time
+import argparse
+
+
+REPORT_FORMAT_VERSION = '1'
+"""
+Version of run report layout
+"""
+
+
+def parse_shard(value):
+    """
+    Argument type for shard passed as ``i/N`` where ``i`` is
+    the 1 based index of this shard out of ``N`` shards
+
+    :param value: value from command line
+    :type value: str
+    :raises argparse.ArgumentTypeError: if value is not valid
+    :return: (index, number of shards)
+    :rtype: tuple
+    """
+    try:
+        index, num_shards = [int(v) for v in value.split('/')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(str(value) + ' is not of form i/N')
+    if num_shards < 1 or index < 1 or index > num_shards:
+        raise argparse.ArgumentTypeError(str(value) + ' must satisfy '
+                                                      '1 <= i <= N')
+    return index, num_shards
+
+
+def assign_shards(items, num_shards):
+    """
+    Partitions work items into shards of similar total estimated time
+    by assigning items, largest first, to the shard with the least
+    work so far. Ties are broken by item type and name, and by lowest
+    shard index, so every host given the same release computes the
+    same assignment
+
+    :param items: work items to partition
+    :type items: list
+    :param num_shards: number of shards
+    :type num_shards: int
+    :return: list of ``num_shards`` lists of items
+    :rtype: list
+    """
+    shards = [[] for i in range(num_shards)]
+    loads = [0] * num_shards
+    for item in sorted(items, key=lambda item: (-item.get_source_size(),
+                                                item.get_type(),
+                                                item.get_name())):
+        shard = loads.index(min(loads))
+        shards[shard].append(item)
+        loads[shard] += item.get_source_size()
+    return shards
+
+
+class RunReport(object):
+    """
+    Report of the networks built by a run of the loader
+    """
+
+    def __init__(self, biogrid_version, shard=None):
+        """
+        Constructor
+
+        :param biogrid_version: version of BioGRID release
+        :type biogrid_version: str
+        :param shard: (index, number of shards) or ``None`` if load
+                      is not sharded
+        :type shard: tuple
+        """
+        self._biogrid_version = biogrid_version
+        self._shard = shard
+        self._start_time = time.time()
+        self._entries = []
+
+    def add_entry(self, item, exit_code, seconds, peak_memory=None,
+                  uploads=None):
+        """
+        Records result of building network for work item
+
+        :param item: work item
+        :type item: :py:class:`~ndexbiogridloader.planner.WorkItem`
+        :param exit_code: exit code for item
+        :type exit_code: int
+        :param seconds: seconds taken to build network
+        :type seconds: float
+        :param peak_memory: peak resident memory in bytes of the
+                            process while it built network, if known.
+                            Not the peak over the life of the process
+                            so earlier networks do not inflate it
+        :type peak_memory: int
+        :param uploads: exit code of upload to each NDEx target keyed
+                        by profile, if network was uploaded
+        :type uploads: dict
+        :return: None
+        """
+        entry = item.to_dict()
+        entry['exitCode'] = exit_code
+        entry['seconds'] = round(seconds, 3)
+        entry['peakMemoryBytes'] = peak_memory
+        entry['uploads'] = uploads
+        self._entries.append(entry)
+
+    def to_dict(self, exit_code):
+        """
+        :param exit_code: exit code of run or ``None`` if run
+                          raised an exception
+        :type exit_code: int
+        :return: report
+        :rtype: dict
+        """
+        return {'reportFormatVersion': REPORT_FORMAT_VERSION,
+                'biogridVersion': self._biogrid_version,
+                'shard': None if self._shard is None else self._shard[0],
+                'numShards': 1 if self._shard is None else self._shard[1],
+                'startTime': self._start_time,
+                'endTime': time.time(),
+                'exitCode': exit_code,
+                'entries': self._entries}
+
+    def write(self, report_file, exit_code):
+        """
+        Writes report as JSON
+
+        :param report_file: path to write report to
+        :type report_file: str
+        :param exit_code: see :py:meth:`to_dict`
+        :type exit_code: int
+        :return: None
+        """
+        with open(report_file, 'w') as f:
+            json.dump(self.to_dict(exit_code), f, indent=2)
+
+
+def merge_reports(reports):
+    """
+    Combines reports written by each shard of a load. Exit code of the
+    merged report is the largest exit code of the shards or 2 if any
+    shard failed without an exit code, is missing, is reported more
+    then once or was run against a different release or number of shards
+
+    :param reports: reports as returned by :py:meth:`RunReport.to_dict`
+    :type reports: list
+    :return: merged report
+    :rtype: dict
+    """
+    versions = sorted(set(str(r.get('biogridVersion')) for r in reports))
+    num_shards = max([r.get('numShards', 1) for r in reports] or [1])
+    errors = []
+    if len(versions) > 1:
+        errors.append('Reports are for different BioGRID versions: ' +
+                      ', '.join(versions))
+    if len(set(r.get('numShards', 1) for r in reports)) > 1:
+        errors.append('Reports are for different numbers of shards')
+
+    exit_codes = [0]
+    shards = []
+    entries = []
+    for report in sorted(reports, key=lambda r: r.get('shard') or 0):
+        shard = report.get('shard') or 1
+        if shard in shards:
+            errors.append('Shard ' + str(shard) + ' reported more then once')
+        shards.append(shard)
+        if report.get('exitCode') is None:
+            errors.append('Shard ' + str(shard) + ' did not finish')
+        else:
+            exit_codes.append(report['exitCode'])
+        entries.extend(report.get('entries', []))
+
+    missing = [s for s in range(1, num_shards + 1) if s not in shards]
+    if missing:
+        errors.append('Missing reports for shards: ' +
+                      ', '.join(str(s) for s in missing))
+    exit_code = max(exit_codes)
+    if errors:
+        exit_code = max(exit_code, 2)
+
+    return {'reportFormatVersion': REPORT_FORMAT_VERSION,
+            'biogridVersion': versions[0] if len(versions) == 1 else versions,
+            'numShards': num_shards,
+            'shards': shards,
+            'missingShards': missing,
+            'errors': errors,
+            'exitCode': exit_code,
+            'entries': entries}
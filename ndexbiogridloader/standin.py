@@ -0,0 +1,549 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local HTTP stand-in for the NDEx endpoints the loader uses, so the
+upload path can be run and benchmarked without an NDEx server.
+Networks are kept in memory as name, owner and size only. Latency,
+injected errors and a limit on throughput of uploads can be set
+to try upload concurrency and retry settings offline
+
+Run with::
+
+    python -m ndexbiogridloader.standin --user bob:secret --latency 0.05
+
+and set ``server = http://127.0.0.1:<port>`` in the configuration
+file passed to ``ndexloadbiogrid.py``. The address must not contain
+``localhost`` since the NDEx client rewrites such addresses
+"""
+
+import re
+import sys
+import json
+import time
+import uuid
+import base64
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+
+SERVER_VERSION = '2.5.0'
+"""
+NDEx version reported by the stand-in, the NDEx client uses
+v2 endpoints for it
+"""
+
+STATUS_PATH = '/rest/admin/status'
+"""
+Path the NDEx client gets version of server from
+"""
+
+USER_PATH = '/v2/user'
+"""
+Path to get account of user by ``username``
+"""
+
+NETWORK_SUMMARY_PATH = re.compile('^/v2/user/([^/]+)/networksummary$')
+"""
+Path to get summaries of networks owned by user with id
+"""
+
+NETWORK_PATHS = re.compile('^/(v2)/network(?:/([^/]+))?$|'
+                           '^/(v3)/networks(?:/([^/]+))?$')
+"""
+Paths to ``POST`` a new CX (v2) or CX2 (v3) network to or
+``PUT`` an update of network with id to
+"""
+
+NAME_PREFIX_BYTES = 1048576
+"""
+Bytes at start of uploaded network searched for its name
+"""
+
+CHUNK_BYTES = 65536
+"""
+Bytes of uploaded network read at a time
+"""
+
+
+def get_network_name(data):
+    """
+    Gets name of network from the ``networkAttributes`` aspect of
+    CX or CX2, which the loader writes before nodes and edges
+
+    :param data: start of uploaded network
+    :type data: bytes
+    :return: name or ``None`` if not found
+    :rtype: str
+    """
+    index = data.find(b'"networkAttributes"')
+    if index < 0:
+        return None
+    start = data.find(b'[', index)
+    if start < 0:
+        return None
+    try:
+        text = data[start:].decode('utf-8', errors='ignore')
+        attributes, end = json.JSONDecoder().raw_decode(text)
+    except ValueError:
+        return None
+    for attribute in attributes:
+        if not isinstance(attribute, dict):
+            continue
+        if 'n' in attribute:
+            if attribute['n'] == 'name':
+                return attribute.get('v')
+        elif 'name' in attribute:
+            return attribute['name']
+    return None
+
+
+class NDExStandIn(object):
+    """
+    In memory accounts and networks behind the stand-in server along
+    with its latency, error injection and throughput settings and a
+    record of the uploads it received
+    """
+
+    def __init__(self, users=None, latency=0.0, error_rate=0.0,
+                 fail_first=0, bandwidth=None, seed=None):
+        """
+        Constructor
+
+        :param users: passwords keyed by user name of accounts that
+                      can upload networks
+        :type users: dict
+        :param latency: seconds to wait before answering each request
+        :type latency: float
+        :param error_rate: fraction of uploads, from 0 to 1, to
+                           fail with status 500
+        :type error_rate: float
+        :param fail_first: number of uploads to fail with status 500
+                           before ``error_rate`` applies
+        :type fail_first: int
+        :param bandwidth: bytes per second shared by all uploads,
+                          if ``None`` uploads are not limited
+        :type bandwidth: float
+        :param seed: seed of random choice of uploads to fail
+        :type seed: int
+        """
+        self._users = dict(users or {})
+        self._latency = latency
+        self._error_rate = error_rate
+        self._fail_first = fail_first
+        self._bandwidth = bandwidth
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._link_free_at = 0.0
+        self._networks = {}
+        self._uploads = []
+
+    @staticmethod
+    def get_user_id(user):
+        """
+        :param user: name of user
+        :type user: str
+        :return: id of account of user
+        :rtype: str
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, 'ndexstandin/' + user))
+
+    def get_user(self, user):
+        """
+        :param user: name of user
+        :type user: str
+        :return: account of user as returned by NDEx or ``None``
+                 if there is no such user
+        :rtype: dict
+        """
+        if user not in self._users:
+            return None
+        return {'userName': user, 'externalId': self.get_user_id(user),
+                'isIndividual': True, 'isVerified': True}
+
+    def authenticate(self, authorization):
+        """
+        Checks basic credentials in Authorization header
+
+        :param authorization: value of Authorization header
+        :type authorization: str
+        :return: name of user or ``None`` if credentials are not valid
+        :rtype: str
+        """
+        if authorization is None or not authorization.startswith('Basic '):
+            return None
+        try:
+            credentials = base64.b64decode(authorization[6:]).decode('utf-8')
+            user, _, password = credentials.partition(':')
+        except ValueError:
+            return None
+        if self._users.get(user) != password:
+            return None
+        return user
+
+    def add_network(self, owner, name, network_format='cx'):
+        """
+        Adds network to account, as if uploaded earlier
+
+        :return: id of network
+        :rtype: str
+        """
+        network_id = str(uuid.uuid4())
+        with self._lock:
+            self._networks[network_id] = {'externalId': network_id,
+                                          'name': name, 'owner': owner,
+                                          'format': network_format,
+                                          'bytes': 0,
+                                          'modificationTime':
+                                          int(time.time() * 1000)}
+        return network_id
+
+    def save_network(self, owner, name, num_bytes, network_format,
+                     network_id=None):
+        """
+        Saves network uploaded by owner
+
+        :param network_id: id of network to update, if ``None``
+                           a new network is created
+        :type network_id: str
+        :return: id of network or ``None`` if owner has no network
+                 with ``network_id``
+        :rtype: str
+        """
+        with self._lock:
+            if network_id is None:
+                network_id = str(uuid.uuid4())
+            elif self._networks.get(network_id, {}).get('owner') != owner:
+                return None
+            self._networks[network_id] = {'externalId': network_id,
+                                          'name': name, 'owner': owner,
+                                          'format': network_format,
+                                          'bytes': num_bytes,
+                                          'modificationTime':
+                                          int(time.time() * 1000)}
+        return network_id
+
+    def get_networks(self):
+        """
+        :return: networks keyed by id
+        :rtype: dict
+        """
+        with self._lock:
+            return {k: dict(v) for k, v in self._networks.items()}
+
+    def get_network_summaries(self, user_id):
+        """
+        :param user_id: id of account
+        :type user_id: str
+        :return: summaries of networks of account
+        :rtype: list
+        """
+        with self._lock:
+            return [{'externalId': n['externalId'], 'name': n['name'],
+                     'owner': n['owner'],
+                     'modificationTime': n['modificationTime']}
+                    for n in self._networks.values()
+                    if self.get_user_id(n['owner']) == user_id]
+
+    def wait(self):
+        """
+        Waits for the configured latency
+        :return: None
+        """
+        if self._latency > 0:
+            time.sleep(self._latency)
+
+    def throttle(self, num_bytes):
+        """
+        Waits until ``num_bytes`` could have been received over a link
+        shared by all uploads of ``bandwidth`` bytes per second
+
+        :param num_bytes: bytes received
+        :type num_bytes: int
+        :return: None
+        """
+        if self._bandwidth is None:
+            return
+        with self._lock:
+            now = time.time()
+            self._link_free_at = max(now, self._link_free_at) + \
+                num_bytes / self._bandwidth
+            delay = self._link_free_at - now
+        time.sleep(delay)
+
+    def should_fail(self):
+        """
+        Decides if upload being received is failed with an injected
+        error. The first ``fail_first`` uploads fail and after that
+        uploads fail at ``error_rate``
+
+        :rtype: bool
+        """
+        with self._lock:
+            if self._fail_first > 0:
+                self._fail_first -= 1
+                return True
+            return self._random.random() < self._error_rate
+
+    def record_upload(self, upload):
+        """
+        Records upload received
+
+        :param upload: user, path, status, bytes and seconds of upload
+        :type upload: dict
+        :return: None
+        """
+        with self._lock:
+            self._uploads.append(upload)
+
+    def get_uploads(self):
+        """
+        :return: uploads received in order they finished, see
+                 :py:meth:`record_upload`
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._uploads)
+
+    def get_stats(self):
+        """
+        :return: number of uploads received, number that failed, with
+                 injected errors or otherwise, and bytes received
+        :rtype: dict
+        """
+        uploads = self.get_uploads()
+        return {'uploads': len(uploads),
+                'failedUploads': len([u for u in uploads
+                                      if u['status'] >= 400]),
+                'bytes': sum(u['bytes'] for u in uploads)}
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles NDEx requests with :py:class:`NDExStandIn` set as
+    ``standin`` on the server
+    """
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {'errorCode': 'NDEx_Stand_In_Error',
+                                 'message': message})
+
+    def do_GET(self):
+        standin = self.server.standin
+        standin.wait()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        summary_path = NETWORK_SUMMARY_PATH.match(url.path)
+        if url.path == STATUS_PATH:
+            self._send_json(200, {'properties':
+                                  {'ServerVersion': SERVER_VERSION}})
+        elif url.path == USER_PATH:
+            user = standin.get_user(query.get('username', [''])[0])
+            if user is None:
+                self._send_error(404, 'User not found')
+            else:
+                self._send_json(200, user)
+        elif summary_path is not None:
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', ['0'])[0])
+            summaries = \
+                standin.get_network_summaries(summary_path.group(1))[offset:]
+            self._send_json(200, summaries[:limit] if limit > 0 else summaries)
+        else:
+            self._send_error(404, 'Unknown path: ' + url.path)
+
+    def do_POST(self):
+        self._receive_network()
+
+    def do_PUT(self):
+        self._receive_network()
+
+    def _read_network(self):
+        """
+        Reads uploaded network a chunk at a time at the throughput
+        allowed by the stand-in
+
+        :return: (start of network, bytes read)
+        :rtype: tuple
+        """
+        standin = self.server.standin
+        remaining = int(self.headers.get('Content-Length', 0))
+        prefix = []
+        prefix_bytes = 0
+        num_bytes = 0
+        while remaining > 0:
+            chunk = self.rfile.read(min(CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            num_bytes += len(chunk)
+            if prefix_bytes < NAME_PREFIX_BYTES:
+                prefix.append(chunk)
+                prefix_bytes += len(chunk)
+            standin.throttle(len(chunk))
+        return b''.join(prefix), num_bytes
+
+    def _receive_network(self):
+        start = time.time()
+        standin = self.server.standin
+        standin.wait()
+        path = NETWORK_PATHS.match(urlparse(self.path).path)
+        user = standin.authenticate(self.headers.get('Authorization'))
+        # body is read even if request fails so client sees response
+        data, num_bytes = self._read_network()
+        if path is None:
+            status, message = 404, 'Unknown path: ' + self.path
+        elif (self.command == 'POST') != (path.group(2) is None and
+                                          path.group(4) is None):
+            status, message = 405, 'Method not allowed'
+        elif user is None:
+            status, message = 401, 'Invalid credentials'
+        elif standin.should_fail():
+            status, message = 500, 'Injected error'
+        else:
+            status, message = self._save_network(path, user, data, num_bytes)
+        # recorded before responding so callers see it once upload returns
+        standin.record_upload({'user': user, 'method': self.command,
+                               'path': self.path, 'status': status,
+                               'bytes': num_bytes,
+                               'seconds': time.time() - start})
+        if status == 201:
+            body = message.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Location', message)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif status == 204:
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self._send_error(status, message)
+
+    def _save_network(self, path, user, data, num_bytes):
+        """
+        Saves network
+
+        :return: (HTTP status NDEx would send, URL of network if
+                  created otherwise error message)
+        :rtype: tuple
+        """
+        standin = self.server.standin
+        is_cx2 = path.group(3) is not None
+        network_id = path.group(4) if is_cx2 else path.group(2)
+        saved_id = standin.save_network(user, get_network_name(data),
+                                        num_bytes, 'cx2' if is_cx2 else 'cx',
+                                        network_id=network_id)
+        if saved_id is None:
+            return 404, 'Network ' + str(network_id) + ' not found'
+        if network_id is not None:
+            return 204, None
+        return 201, 'http://' + self.headers.get('Host', '') + \
+            ('/v3/networks/' if is_cx2 else '/v2/network/') + saved_id
+
+    def log_message(self, format, *args):
+        logger.debug(self.address_string() + ' ' + (format % args))
+
+
+def create_server(standin, host='127.0.0.1', port=0):
+    """
+    Creates HTTP server for stand-in. Call ``serve_forever()`` on the
+    result to handle requests
+
+    :param standin: accounts and settings of stand-in
+    :type standin: :py:class:`NDExStandIn`
+    :param host: address to listen on
+    :type host: str
+    :param port: port to listen on, 0 picks a free port
+    :type port: int
+    :rtype: :py:class:`http.server.ThreadingHTTPServer`
+    """
+    server = ThreadingHTTPServer((host, port), StandInRequestHandler)
+    server.daemon_threads = True
+    server.standin = standin
+    return server
+
+
+def _parse_user(value):
+    """
+    Argument type for user passed as ``name:password``
+    """
+    user, sep, password = value.partition(':')
+    if not user or not sep:
+        raise argparse.ArgumentTypeError(str(value) + ' is not of form '
+                                                      'name:password')
+    return user, password
+
+
+def _parse_arguments(desc, args):
+    help_formatter = argparse.RawDescriptionHelpFormatter
+    parser = argparse.ArgumentParser(description=desc,
+                                     formatter_class=help_formatter)
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080,
+                        help='Port to listen on')
+    parser.add_argument('--user', type=_parse_user, action='append',
+                        default=[],
+                        help='Account as name:password, can be repeated')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds to wait before answering each request')
+    parser.add_argument('--errorrate', type=float, default=0.0,
+                        help='Fraction of uploads to fail with status 500')
+    parser.add_argument('--failfirst', type=int, default=0,
+                        help='Number of uploads to fail before --errorrate '
+                             'applies')
+    parser.add_argument('--bandwidth', type=float, default=None,
+                        help='Megabytes per second shared by all uploads')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed of random choice of uploads to fail')
+    return parser.parse_args(args)
+
+
+def main(args):
+    """
+    Runs stand-in until interrupted
+    """
+    theargs = _parse_arguments(__doc__, args[1:])
+    logging.basicConfig(level=logging.INFO)
+    standin = NDExStandIn(users=dict(theargs.user),
+                          latency=theargs.latency,
+                          error_rate=theargs.errorrate,
+                          fail_first=theargs.failfirst,
+                          bandwidth=None if theargs.bandwidth is None else
+                          theargs.bandwidth * 1048576,
+                          seed=theargs.seed)
+    server = create_server(standin, host=theargs.host, port=theargs.port)
+    logger.info('Serving NDEx stand-in on http://' + theargs.host + ':' +
+                str(server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info('Upload stats: ' + json.dumps(standin.get_stats()))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+NDEx servers and accounts, or targets, that networks are uploaded to
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_profiles(value):
+    """
+    Splits value of --profile into profile names
+
+    :param value: comma separated names of profiles in
+                  configuration file
+    :type value: str
+    :return: profile names in order given without duplicates
+    :rtype: list
+    """
+    profiles = []
+    for profile in value.split(','):
+        profile = profile.strip()
+        if profile and profile not in profiles:
+            profiles.append(profile)
+    return profiles
+
+
+class UploadTarget(object):
+    """
+    NDEx server and account networks are uploaded to along with
+    its connection and the networks the account already has.
+    Networks are not uploaded to a target that failed to connect
+    or load its networks, see :py:meth:`is_available`
+    """
+
+    def __init__(self, profile, server=None, user=None, password=None):
+        """
+        Constructor
+
+        :param profile: name of profile in configuration file
+        :type profile: str
+        :param server: NDEx server
+        :type server: str
+        :param user: NDEx user
+        :type user: str
+        :param password: password of NDEx user
+        :type password: str
+        """
+        self._profile = profile
+        self._server = server
+        self._user = user
+        self._password = password
+        self._ndex = None
+        self._network_summaries = {}
+        self._summaries_failed = False
+
+    def get_profile(self):
+        """
+        :return: name of profile in configuration file
+        :rtype: str
+        """
+        return self._profile
+
+    def get_server(self):
+        """
+        :return: NDEx server
+        :rtype: str
+        """
+        return self._server
+
+    def get_user(self):
+        """
+        :return: NDEx user
+        :rtype: str
+        """
+        return self._user
+
+    def get_password(self):
+        """
+        :return: password of NDEx user
+        :rtype: str
+        """
+        return self._password
+
+    def get_ndex(self):
+        """
+        :return: connection to NDEx or ``None`` if not connected
+        :rtype: :py:class:`~ndex2.client.Ndex2`
+        """
+        return self._ndex
+
+    def is_available(self):
+        """
+        :return: ``False`` if target is not connected or loading
+                 its networks last failed
+        :rtype: bool
+        """
+        return self._ndex is not None and self._summaries_failed is False
+
+    def set_ndex(self, ndex):
+        """
+        Sets connection to NDEx
+
+        :param ndex: connection to NDEx
+        :type ndex: :py:class:`~ndex2.client.Ndex2`
+        :return: None
+        """
+        self._ndex = ndex
+
+    def connect(self, user_agent):
+        """
+        Creates connection to NDEx unless one is set
+
+        :param user_agent: user agent sent to NDEx
+        :type user_agent: str
+        :return: connection to NDEx or ``None`` if it could
+                 not be created
+        :rtype: :py:class:`~ndex2.client.Ndex2`
+        """
+        if self._ndex is None:
+            try:
+                from ndex2.client import Ndex2
+                self._ndex = Ndex2(host=self._server, username=self._user,
+                                   password=self._password,
+                                   user_agent=user_agent)
+            except Exception as e:
+                logger.error('Unable to connect to ' + str(self._server) +
+                             ' for profile ' + self._profile + ': ' + str(e))
+                self._ndex = None
+        return self._ndex
+
+    def load_network_summaries(self):
+        """
+        Gets a dictionary of all networks for user account
+        <network name upper cased> => <NDEx UUID>
+
+        :return: (networks, 0) if success, (``None``, 2) otherwise
+        :rtype: tuple
+        """
+        self._network_summaries = {}
+        self._summaries_failed = True
+        if self._ndex is None:
+            logger.error('Not connected to ' + str(self._server) +
+                         ' for profile ' + self._profile)
+            return None, 2
+
+        try:
+            network_summaries = \
+                self._ndex.get_network_summaries_for_user(self._user)
+        except Exception as e:
+            logger.error('Got error trying to get list of '
+                         'networks for user ' + str(self._user) +
+                         ' of profile ' + self._profile + ': ' + str(e))
+            return None, 2
+        self._summaries_failed = False
+
+        for summary in network_summaries:
+            if summary.get('name') is not None:
+                name = summary.get('name').upper()
+                self._network_summaries[name] = summary.get('externalId')
+
+        return self._network_summaries, 0
+
+    def get_network_uuid(self, network_name):
+        """
+        Gets UUID of network with same name, ignoring case, in
+        account when networks were last loaded
+
+        :param network_name: name of network
+        :type network_name: str
+        :return: UUID or ``None`` if account has no such network
+        :rtype: str
+        """
+        return self._network_summaries.get(network_name.upper())
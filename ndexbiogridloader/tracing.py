@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+Records spans of work done by the loader in the Trace Event Format
+understood by chrome://tracing and https://ui.perfetto.dev
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+class TraceRecorder(object):
+    """
+    Collects complete ('X') trace events for named spans of work.
+
+    Each event is tagged with the process id and thread id that ran
+    it so overlapping work done by different workers/threads shows up
+    on separate tracks in the viewer. If ``enabled`` is ``False``
+    :py:meth:`span` is a no-op and nothing is recorded.
+    """
+    def __init__(self, enabled=True):
+        """
+        Constructor
+
+        :param enabled: If ``False`` no events are recorded
+        :type enabled: bool
+        """
+        self._enabled = enabled
+        self._events = []
+        self._lock = threading.Lock()
+        self._named_threads = set()
+
+    def is_enabled(self):
+        """
+        :return: ``True`` if events are being recorded
+        :rtype: bool
+        """
+        return self._enabled
+
+    @staticmethod
+    def _now():
+        """
+        :return: current time in microseconds
+        :rtype: float
+        """
+        return time.perf_counter() * 1000000.0
+
+    def _name_thread(self, pid, tid):
+        """
+        Adds thread name metadata event the first time a
+        thread is seen. Caller must hold self._lock
+        """
+        if (pid, tid) in self._named_threads:
+            return
+        self._named_threads.add((pid, tid))
+        self._events.append({'name': 'thread_name',
+                             'ph': 'M',
+                             'pid': pid,
+                             'tid': tid,
+                             'args': {'name':
+                                      threading.current_thread().name}})
+
+    def add_span(self, name, start, end, category='loader', args=None):
+        """
+        Adds a complete event to the trace
+
+        :param name: name of span ie 'download'
+        :type name: str
+        :param start: start time in microseconds
+        :type start: float
+        :param end: end time in microseconds
+        :type end: float
+        :param category: category of span
+        :type category: str
+        :param args: extra information to show for span
+        :type args: dict
+        :return: None
+        """
+        if not self._enabled:
+            return
+        pid = os.getpid()
+        tid = threading.get_ident()
+        event = {'name': name,
+                 'cat': category,
+                 'ph': 'X',
+                 'ts': start,
+                 'dur': max(end - start, 0.0),
+                 'pid': pid,
+                 'tid': tid}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._name_thread(pid, tid)
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name, category='loader', args=None):
+        """
+        Context manager that records the time spent within it
+        as a span named ``name``
+
+        Example:
+
+        .. code-block:: python
+
+            with tracer.span('unzip',
+                             args={'entry': 'BIOGRID-ORGANISM-Zea_mays'}):
+                do_unzip()
+
+        :param name: name of span ie 'download'
+        :type name: str
+        :param category: category of span
+        :type category: str
+        :param args: extra information to show for span
+        :type args: dict
+        """
+        if not self._enabled:
+            yield
+            return
+        start = TraceRecorder._now()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, TraceRecorder._now(),
+                          category=category, args=args)
+
+    def get_events(self):
+        """
+        :return: copy of events recorded so far
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._events)
+
+    def add_events(self, events):
+        """
+        Adds events recorded elsewhere, such as in a worker process,
+        to this trace
+
+        :param events: events as returned by :py:meth:`get_events`
+        :type events: list
+        :return: None
+        """
+        if not self._enabled or not events:
+            return
+        with self._lock:
+            self._events.extend(events)
+
+    def clear(self):
+        """
+        Removes all recorded events
+        :return: None
+        """
+        with self._lock:
+            self._events = []
+            self._named_threads = set()
+
+    def write(self, trace_file):
+        """
+        Writes recorded events to ``trace_file`` as
+        trace event JSON
+
+        :param trace_file: path to output file
+        :type trace_file: str
+        :return: None
+        """
+        with open(trace_file, 'w') as f:
+            json.dump({'traceEvents': self.get_events(),
+                       'displayTimeUnit': 'ms'}, f)
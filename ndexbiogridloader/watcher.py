@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+"""
+Watches the BioGRID release archive and loads each new release
+into NDEx once it is published
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+RELEASE_ARCHIVE_URL = ('https://downloads.thebiogrid.org/BioGRID/'
+                       'Release-Archive/')
+"""
+Page listing every BioGRID release
+"""
+
+VERSION_PATTERN = re.compile(r'BIOGRID-(\d+(?:\.\d+)+)')
+"""
+Matches names of releases, such as ``BIOGRID-4.2.191``, on the
+release archive page
+"""
+
+WATCH_STATE_FILE = 'watch_state.json'
+"""
+File in <datadir> recording last BioGRID version loaded by watch mode
+"""
+
+
+def get_version_key(version):
+    """
+    :param version: BioGRID version such as ``4.2.191``
+    :type version: str
+    :return: key that sorts versions oldest first
+    :rtype: tuple
+    """
+    return tuple(int(v) for v in version.split('.'))
+
+
+def parse_versions(content):
+    """
+    Finds BioGRID versions on release archive page
+
+    :param content: release archive page
+    :type content: str
+    :return: versions without duplicates, oldest first
+    :rtype: list
+    """
+    return sorted(set(VERSION_PATTERN.findall(content)),
+                  key=get_version_key)
+
+
+def _fetch(url):
+    """
+    :return: content of page at url
+    :rtype: str
+    :raises requests.exceptions.RequestException: if page could
+            not be retrieved
+    """
+    import requests
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    return response.text
+
+
+class ReleaseWatcher(object):
+    """
+    Polls the release archive page and runs a loader for the newest
+    version when it is newer then the last version loaded. Files of
+    each version are kept in <datadir>/<version>. Checks or loads that
+    fail are retried after a wait that doubles with each consecutive
+    failure, up to --watchmaxbackoff seconds
+    """
+
+    def __init__(self, args, loader_factory, fetch=_fetch, sleep=time.sleep):
+        """
+        Constructor
+
+        :param args: parsed command line arguments
+        :type args: :py:class:`argparse.Namespace`
+        :param loader_factory: callable that takes arguments and
+                               returns a
+                               :py:class:`~ndexbiogridloader.ndexloadbiogrid.NdexBioGRIDLoader`
+        :type loader_factory: callable
+        :param fetch: callable that takes a URL and returns content
+                      of page
+        :type fetch: callable
+        :param sleep: callable that waits for seconds passed in
+        :type sleep: callable
+        """
+        self._args = args
+        self._loader_factory = loader_factory
+        self._fetch = fetch
+        self._sleep = sleep
+        self._failures = 0
+
+    def _get_state_file(self):
+        return os.path.join(os.path.abspath(self._args.datadir),
+                            WATCH_STATE_FILE)
+
+    def get_last_loaded_version(self):
+        """
+        :return: last version loaded by watch mode or, if none
+                 has been, --biogridversion
+        :rtype: str
+        """
+        try:
+            with open(self._get_state_file(), 'r') as f:
+                return json.load(f)['lastLoadedVersion']
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug('No watch state read: ' + str(e))
+        return self._args.biogridversion
+
+    def _save_last_loaded_version(self, version):
+        os.makedirs(os.path.abspath(self._args.datadir), mode=0o755,
+                    exist_ok=True)
+        with open(self._get_state_file(), 'w') as f:
+            json.dump({'lastLoadedVersion': version,
+                       'loadTime': time.time()}, f)
+
+    def get_new_version(self):
+        """
+        Gets newest version on release archive page if it is newer
+        then the last version loaded
+
+        :return: version or ``None`` if there is no newer version
+        :rtype: str
+        """
+        versions = parse_versions(self._fetch(self._args.releaseindexurl))
+        if not versions:
+            logger.warning('No BioGRID versions found at ' +
+                           self._args.releaseindexurl)
+            return None
+        last_version = self.get_last_loaded_version()
+        if get_version_key(versions[-1]) <= get_version_key(last_version):
+            logger.debug('No version newer then ' + last_version)
+            return None
+        return versions[-1]
+
+    def load(self, version):
+        """
+        Downloads files of version and builds and uploads its networks,
+        recording version as loaded if it succeeds
+
+        :param version: BioGRID version
+        :type version: str
+        :return: exit code of loader or 2 if loader raised an
+                 exception, such as for a half published release
+        :rtype: int
+        """
+        args = copy.copy(self._args)
+        args.biogridversion = version
+        args.datadir = os.path.join(os.path.abspath(self._args.datadir),
+                                    version)
+        args.skipdownload = False
+        logger.info('Loading BioGRID version ' + version + ' into ' +
+                    args.datadir)
+        try:
+            exit_code = self._loader_factory(args).run()
+        except Exception as e:
+            logger.exception('Load of BioGRID version ' + version +
+                             ' raised exception: ' + str(e))
+            return 2
+        if exit_code == 0:
+            self._save_last_loaded_version(version)
+            logger.info('Loaded BioGRID version ' + version)
+        else:
+            logger.error('Load of BioGRID version ' + version +
+                         ' failed with exit code ' + str(exit_code))
+        return exit_code
+
+    def check(self):
+        """
+        Loads newest version if it is newer then last version loaded
+
+        :return: 0 if there was nothing to load or load succeeded,
+                 otherwise exit code of load or 2 if release archive
+                 page could not be read
+        :rtype: int
+        """
+        try:
+            version = self.get_new_version()
+        except Exception as e:
+            logger.error('Unable to check ' + str(self._args.releaseindexurl) +
+                         ' for new BioGRID versions: ' + str(e))
+            return 2
+        if version is None:
+            return 0
+        return self.load(version)
+
+    def get_wait(self, exit_code):
+        """
+        Gets seconds to wait before next check, --watch seconds after
+        a successful check otherwise doubled for each consecutive
+        failure up to --watchmaxbackoff seconds
+
+        :param exit_code: exit code of last check
+        :type exit_code: int
+        :rtype: int
+        """
+        if exit_code == 0:
+            self._failures = 0
+            return self._args.watch
+        self._failures += 1
+        return min(self._args.watch * 2 ** self._failures,
+                   max(self._args.watch, self._args.watchmaxbackoff))
+
+    def run(self, max_checks=None):
+        """
+        Checks for and loads new versions until interrupted
+
+        :param max_checks: number of checks to do, if ``None``
+                           checks until interrupted
+        :type max_checks: int
+        :return: exit code of last check
+        :rtype: int
+        """
+        exit_code = 0
+        checks = 0
+        while max_checks is None or checks < max_checks:
+            exit_code = self.check()
+            checks += 1
+            if max_checks is not None and checks >= max_checks:
+                break
+            wait = self.get_wait(exit_code)
+            logger.info('Checking for new BioGRID versions again in ' +
+                        str(wait) + ' seconds')
+            self._sleep(wait)
+        return exit_code
+
+
+def watch(args, loader_factory):
+    """
+    Runs watch mode until interrupted
+
+    :param args: parsed command line arguments
+    :type args: :py:class:`argparse.Namespace`
+    :param loader_factory: see :py:class:`ReleaseWatcher`
+    :type loader_factory: callable
+    :return: 0
+    :rtype: int
+    """
+    watcher = ReleaseWatcher(args, loader_factory)
+    logger.info('Watching ' + args.releaseindexurl + ' for BioGRID versions '
+                'newer then ' + watcher.get_last_loaded_version())
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -18,7 +18,7 @@ with open('README.rst') as readme_file:
 with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
-requirements = ['ndex2>=3.1.0a1,<4.0.0',
+requirements = ['ndex2>=3.5.0,<4.0.0',
                 'ndexutil>=0.1.0a3,<1.0.0',
                 'requests',
                 'pandas',
@@ -27,6 +27,8 @@ requirements = ['ndex2>=3.1.0a1,<4.0.0',
                 'tqdm',
                 'py4cytoscape']
 
+extras_requirements = {'arrow': ['pyarrow']}
+
 setup_requirements = [ ]
 
 test_requirements = [ ]
@@ -39,12 +41,14 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: BSD License',
         'Natural Language :: English',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
     ],
     description="Loads BioGRID data into NDEx",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="BSD license",
+    python_requires='>=3.7',
     long_description=readme + '\n\n' + history,
     include_package_data=True,
     keywords='ndexbiogridloader',
@@ -53,7 +57,7 @@ setup(
     scripts=[ 'ndexbiogridloader/ndexloadbiogrid.py'],
     package_data={'ndexbiogridloader':
       ['chem_load_plan.json', 'organism_load_plan.json', 'chemical_style.cx', 'organism_style.cx',
-       'chemicals_list.txt', 'organism_list.txt']},
+       'chemicals_list.txt', 'organism_list.txt', 'derived_networks.json']},
     setup_requires=setup_requirements,
     test_suite='tests',
     tests_require=test_requirements,
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+Helpers to create small BioGRID release files for tests
+"""
+
+import os
+import zipfile
+from unittest.mock import MagicMock
+
+from ndexbiogridloader import ndexloadbiogrid
+
+
+ORGANISM_HEADER = ['#BioGRID Interaction ID', 'Entrez Gene Interactor A',
+                   'Entrez Gene Interactor B', 'BioGRID ID Interactor A',
+                   'BioGRID ID Interactor B', 'Systematic Name Interactor A',
+                   'Systematic Name Interactor B',
+                   'Official Symbol Interactor A',
+                   'Official Symbol Interactor B', 'Synonyms Interactor A',
+                   'Synonyms Interactor B', 'Experimental System',
+                   'Experimental System Type', 'Author', 'Pubmed ID',
+                   'Organism Interactor A', 'Organism Interactor B',
+                   'Throughput', 'Score', 'Modification', 'Phenotypes',
+                   'Qualifications', 'Tags', 'Source Database']
+
+CHEMICAL_HEADER = ['#BioGRID Chemical Interaction ID', 'BioGRID Gene ID',
+                   'Entrez Gene ID', 'Systematic Name', 'Official Symbol',
+                   'Synonyms', 'Organism ID', 'Organism', 'Action',
+                   'Interaction Type', 'Author', 'Pubmed ID',
+                   'BioGRID Publication ID', 'BioGRID Chemical ID',
+                   'Chemical Name', 'Chemical Synonyms', 'Chemical Brands',
+                   'Chemical Source', 'Chemical Source ID',
+                   'Molecular Formula', 'Chemical Type', 'ATC Codes',
+                   'CAS Number', 'Curated By', 'Method',
+                   'Method Description', 'Related BioGRID Gene ID',
+                   'Related Entrez Gene ID', 'Related Systematic Name',
+                   'Related Official Symbol', 'Related Synonyms',
+                   'Related Organism ID', 'Related Organism',
+                   'Related Type', 'Notes']
+
+SYSTEMS = [('Two-hybrid', 'physical'),
+           ('Affinity Capture-MS', 'physical'),
+           ('Synthetic Lethality', 'genetic'),
+           ('Dosage Rescue', 'genetic')]
+
+
+def organism_row(row_id, gene_a, gene_b, pubmed, system=0,
+                 taxon_a='9606', taxon_b='9606',
+                 throughput='Low Throughput', score='-',
+                 modification='-'):
+    """
+    Creates a row in BioGRID tab2 format
+    """
+    exp_sys, exp_type = SYSTEMS[system]
+    return [str(row_id), str(gene_a), str(gene_b),
+            str(100 + gene_a), str(100 + gene_b),
+            'SYS' + str(gene_a), 'SYS' + str(gene_b),
+            'G' + str(gene_a), 'G' + str(gene_b),
+            'A' + str(gene_a) + '|B' + str(gene_a), '-',
+            exp_sys, exp_type, 'Smith J (2001)', str(pubmed),
+            taxon_a, taxon_b, throughput, score, modification, '-', '-',
+            '-', 'BIOGRID']
+
+
+def chemical_row(row_id, gene, chem, pubmed, taxon='9606',
+                 action='inhibitor'):
+    """
+    Creates a row in BioGRID chemtab format
+    """
+    return [str(row_id), str(100 + gene), str(gene), 'SYS' + str(gene),
+            'G' + str(gene), 'S' + str(gene) + '|T' + str(gene),
+            taxon, 'Homo sapiens', action, 'target', 'Smith J (2001)',
+            str(pubmed), '1', str(chem), 'chem' + str(chem),
+            'syn' + str(chem) if chem % 2 else '-', '-', 'DRUGBANK',
+            'DB0000' + str(chem), 'C1H1', 'small molecule', '-',
+            '50-00-' + str(chem) if chem % 3 else '-',
+            'BioGRID', '-', '-', '-', '-', '-', '-', '-', '-', '-', '-',
+            '-']
+
+
+def get_organism_rows(taxon='9606', num_genes=8):
+    """
+    Creates a list of organism rows that contain duplicates
+    that need aggregating, reverse edges that need collapsing and
+    rows for other taxons
+    """
+    rows = []
+    row_id = 1
+    for a in range(1, num_genes):
+        for b in range(a + 1, min(a + 4, num_genes + 1)):
+            rows.append(organism_row(row_id, a, b, 1000 + row_id,
+                                     system=row_id % len(SYSTEMS),
+                                     taxon_a=taxon, taxon_b=taxon,
+                                     throughput='High Throughput'
+                                     if row_id % 3 else 'Low Throughput',
+                                     score='0.5' if row_id % 5 == 0
+                                     else '-'))
+            row_id += 1
+    # same interaction reported in other publications
+    rows.append(organism_row(row_id, 1, 2, 2000, taxon_a=taxon,
+                             taxon_b=taxon, throughput='High Throughput'))
+    row_id += 1
+    rows.append(organism_row(row_id, 1, 2, 2001, taxon_a=taxon,
+                             taxon_b=taxon, throughput='High Throughput'))
+    row_id += 1
+    # reverse edge with different system
+    rows.append(organism_row(row_id, 3, 2, 2002, system=2,
+                             taxon_a=taxon, taxon_b=taxon))
+    row_id += 1
+    # cross species interaction
+    rows.append(organism_row(row_id, 1, 50, 2003, taxon_a=taxon,
+                             taxon_b='10090'))
+    return rows
+
+
+def get_chemical_rows():
+    """
+    Creates a list of chemical rows for human and mouse
+    """
+    rows = []
+    row_id = 1
+    for gene in range(1, 6):
+        for chem in range(1, 4):
+            rows.append(chemical_row(row_id, gene, chem, 3000 + row_id))
+            row_id += 1
+    rows.append(chemical_row(row_id, 1, 1, 4000))
+    row_id += 1
+    rows.append(chemical_row(row_id, 2, 1, 4001, action='activator'))
+    row_id += 1
+    for gene in range(60, 63):
+        rows.append(chemical_row(row_id, gene, 1, 5000 + row_id,
+                                 taxon='10090'))
+        row_id += 1
+    return rows
+
+
+def write_rows(path, header, rows):
+    """
+    Writes header and rows in tab delimited format to path
+    """
+    with open(path, 'w') as f:
+        f.write('\t'.join(header) + '\n')
+        for row in rows:
+            f.write('\t'.join(row) + '\n')
+    return path
+
+
+def create_release_files(datadir, version='1.0.0',
+                         organisms=(('Homo_sapiens', '9606'),
+                                    ('Mus_musculus', '10090')),
+                         chemicals=(('Human, 9606, Homo sapiens',
+                                     'H. sapiens'),)):
+    """
+    Creates organism.zip, all.zip and chemicals.zip files in datadir
+    along with organism and chemicals list files. all.zip holds the
+    rows of every organism in a single BIOGRID-ALL file. Every entry
+    in chemicals is written to the chemicals list file
+
+    :return: (path to organism list file, path to chemical list file)
+    :rtype: tuple
+    """
+    os.makedirs(datadir, exist_ok=True)
+    org_list = os.path.join(datadir, 'organism_list.txt')
+    all_rows = []
+    with zipfile.ZipFile(os.path.join(datadir, 'organism.zip'), 'w',
+                         compression=zipfile.ZIP_DEFLATED) as zf,\
+            open(org_list, 'w') as olist:
+        for name, taxon in organisms:
+            rows = get_organism_rows(taxon=taxon)
+            all_rows.extend(rows)
+            zf.writestr('BIOGRID-ORGANISM-' + name + '-' + version +
+                        '.tab2.txt',
+                        '\t'.join(ORGANISM_HEADER) + '\n' +
+                        ''.join(['\t'.join(r) + '\n' for r in rows]))
+            olist.write('BIOGRID-ORGANISM-' + name + '\t"' + name + ', ' +
+                        taxon + ', ' + name + '"\t' + name + '\n')
+
+    with zipfile.ZipFile(os.path.join(datadir, 'all.zip'), 'w',
+                         compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('BIOGRID-ALL-' + version + '.tab2.txt',
+                    '\t'.join(ORGANISM_HEADER) + '\n' +
+                    ''.join(['\t'.join(r) + '\n' for r in all_rows]))
+
+    chem_list = os.path.join(datadir, 'chemicals_list.txt')
+    with zipfile.ZipFile(os.path.join(datadir, 'chemicals.zip'), 'w',
+                         compression=zipfile.ZIP_DEFLATED) as zf,\
+            open(chem_list, 'w') as clist:
+        rows = get_chemical_rows()
+        zf.writestr('BIOGRID-CHEMICALS-' + version + '.chemtab.txt',
+                    '\t'.join(CHEMICAL_HEADER) + '\n' +
+                    ''.join(['\t'.join(r) + '\n' for r in rows]))
+        for organism, network_suffix in chemicals:
+            clist.write('BIOGRID-CHEMICALS\t"' + organism + '"\t' +
+                        network_suffix + '\n')
+    return org_list, chem_list
+
+
+def get_args(datadir, extra_args=None, version='1.0.0'):
+    """
+    Parses command line arguments suitable for running the loader
+    against files created by :py:func:`create_release_files`
+    """
+    org_list = os.path.join(datadir, 'organism_list.txt')
+    chem_list = os.path.join(datadir, 'chemicals_list.txt')
+    conf = os.path.join(datadir, 'conf')
+    with open(conf, 'w') as f:
+        f.write('[ndexbiogridloader]\nuser = bob\npassword = x\n'
+                'server = localhost\n')
+    args = [datadir, '--skipdownload', '--skipupload',
+            '--biogridversion', version,
+            '--conf', conf,
+            '--organismfile', org_list,
+            '--chemicalsfile', chem_list,
+            '--chemicalstyle', ndexloadbiogrid.get_organism_style(),
+            '--layout', 'spring', '--noprogressbar']
+    if extra_args:
+        args.extend(extra_args)
+    return ndexloadbiogrid._parse_arguments('desc', args)
+
+
+def create_loader(args):
+    """
+    Creates loader with a mock NDEx connection
+    """
+    loader = ndexloadbiogrid.NdexBioGRIDLoader(args)
+    loader._ndex = MagicMock()
+    loader._ndex.get_network_summaries_for_user = MagicMock(return_value=[])
+    return loader
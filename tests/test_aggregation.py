@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `aggregation` module."""
+
+import io
+import os
+import random
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+from ndexbiogridloader import aggregation
+from ndexbiogridloader.aggregation import InteractionStore
+from ndexbiogridloader.aggregation import SpillingAggregator
+
+
+class TestInteractionStore(unittest.TestCase):
+    """Tests for `InteractionStore` class."""
+
+    def test_add_and_get_row(self):
+        store = InteractionStore(4, 2, categorical_columns=(1,))
+        self.assertEqual(0, len(store))
+        store.add('a', ['x', 'physical', '123', 'foo'])
+        store.add('b', ['y', 'genetic', '456', 'foo'])
+        self.assertEqual(2, len(store))
+        self.assertTrue('a' in store)
+        self.assertFalse('c' in store)
+        self.assertEqual(['x', 'physical', '123', 'foo'], store.get_row(0))
+        self.assertEqual(['y', 'genetic', '456', 'foo'], store.get_row(1))
+
+    def test_add_citation(self):
+        store = InteractionStore(2, 1)
+        self.assertFalse(store.add_citation('a', '1'))
+        self.assertEqual(0, len(store))
+        store.add('a', ['x', '1'])
+        self.assertTrue(store.add_citation('a', '2'))
+        # adding existing key only adds the citation
+        store.add('a', ['ignored', '3'])
+        self.assertEqual(1, len(store))
+        self.assertEqual(['1', '2', '3'], store.get_citations(0))
+        self.assertEqual(['x', '1|2|3'], store.get_row(0))
+
+    def test_append(self):
+        store = InteractionStore(3, 1, categorical_columns=(2,))
+        store.append('a', ['x', '1', 'physical'])
+        store.append('b', ['y', '2', 'genetic'])
+        store.append('c', ['x', '3', 'physical'])
+        self.assertEqual(3, len(store))
+        self.assertTrue('b' in store)
+        self.assertEqual(['x', '3', 'physical'], store.get_row(2))
+        self.assertEqual(([0, 1, 0], ['physical', 'genetic']),
+                         (list(store.get_column_codes(2)[0]),
+                          store.get_column_codes(2)[1]))
+
+    def test_non_integer_citations_preserved(self):
+        store = InteractionStore(2, 1)
+        store.add('a', ['x', '0123'])
+        store.add_citation('a', 'doi:10.1/x')
+        store.add_citation('a', '')
+        store.add_citation('a', '99999999999999999999999')
+        store.add_citation('a', '\u00b2')
+        store.add_citation('a', '\u0661\u0662\u0663')
+        store.add_citation('a', '12\n')
+        store.add_citation('a', '999999999999999999')
+        self.assertEqual(['0123', 'doi:10.1/x', '',
+                          '99999999999999999999999', '\u00b2',
+                          '\u0661\u0662\u0663', '12\n',
+                          '999999999999999999'],
+                         store.get_citations(0))
+
+    def test_rows_in_insertion_order(self):
+        store = InteractionStore(3, 0, categorical_columns=(1, 2))
+        for i in range(10):
+            store.add(str(i), [str(i), 'sys' + str(i % 2), '-'])
+        res = list(store.rows())
+        self.assertEqual(10, len(res))
+        self.assertEqual(['3', 'sys1', '-'], res[3])
+
+    def test_write_tsv(self):
+        store = InteractionStore(2, 1)
+        store.add('a', ['x', '1'])
+        store.add('b', ['y', '2'])
+        store.add('a', ['x', '3'])
+        out = io.StringIO()
+        store.write_tsv(out, ['name', 'Pubmed ID'])
+        self.assertEqual('name\tPubmed ID\nx\t1|3\ny\t2\n', out.getvalue())
+
+
+class TestSpillingAggregator(unittest.TestCase):
+    """Tests for `SpillingAggregator` class."""
+
+    @staticmethod
+    def _key_func(row):
+        return row[0] + ',' + row[1]
+
+    @staticmethod
+    def _add_func(store, row, key):
+        if not store.add_citation(key, row[2]):
+            store.add(key, [row[0], row[1], row[2]])
+
+    def test_aggregate_matches_in_memory(self):
+        random.seed(1)
+        rows = [[str(random.randint(0, 30)), str(random.randint(0, 3)),
+                 str(i), 'extra\n'] for i in range(1, 500)]
+        header = ['a', 'b', 'citation']
+        store = InteractionStore(3, 2, categorical_columns=(1,))
+        for row in rows:
+            TestSpillingAggregator._add_func(store, row,
+                                             TestSpillingAggregator._key_func(row))
+        expected = io.StringIO()
+        store.write_tsv(expected, header)
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for num_partitions in [1, 2, 7]:
+                aggregator = SpillingAggregator(num_partitions,
+                                                lambda: InteractionStore(3, 2, (1,)),
+                                                TestSpillingAggregator._key_func,
+                                                TestSpillingAggregator._add_func,
+                                                temp_dir=temp_dir)
+                out = io.StringIO()
+                aggregator.aggregate(iter(rows), out, header)
+                self.assertEqual(expected.getvalue(), out.getvalue())
+                # temporary files are removed
+                self.assertEqual([], os.listdir(temp_dir))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_aggregate_many_partitions_limits_open_files(self):
+        random.seed(2)
+        rows = [[str(random.randint(0, 200)), str(random.randint(0, 3)),
+                 str(i)] for i in range(1, 2000)]
+        header = ['a', 'b', 'citation']
+        store = InteractionStore(3, 2)
+        for row in rows:
+            TestSpillingAggregator._add_func(store, row,
+                                             TestSpillingAggregator._key_func(row))
+        expected = io.StringIO()
+        store.write_tsv(expected, header)
+
+        open_files = set()
+        max_open = []
+        real_open = open
+
+        class CountingFile(object):
+            def __init__(self, path, mode):
+                self._f = real_open(path, mode)
+                open_files.add(self)
+                max_open.append(len(open_files))
+
+            def __iter__(self):
+                return iter(self._f)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                self.close()
+
+            def write(self, data):
+                return self._f.write(data)
+
+            def close(self):
+                open_files.discard(self)
+                self._f.close()
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            # a tiny memory budget asks for far more partitions
+            # then files allowed open at once
+            for num_partitions, max_open_files in [(2000, 4), (9, 3)]:
+                del max_open[:]
+                aggregator = SpillingAggregator(num_partitions,
+                                                lambda: InteractionStore(3, 2),
+                                                TestSpillingAggregator._key_func,
+                                                TestSpillingAggregator._add_func,
+                                                temp_dir=temp_dir,
+                                                max_open_files=max_open_files)
+                out = io.StringIO()
+                with patch.object(aggregation, 'open', CountingFile,
+                                  create=True):
+                    aggregator.aggregate(iter(rows), out, header)
+                self.assertEqual(expected.getvalue(), out.getvalue())
+                # partitions plus the file they are split from
+                # or merged into
+                self.assertTrue(max(max_open) <= max_open_files + 1)
+                self.assertEqual(0, len(open_files))
+                self.assertEqual([], os.listdir(temp_dir))
+        finally:
+            shutil.rmtree(temp_dir)
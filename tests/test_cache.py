@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `cache` module."""
+
+import os
+import glob
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+import ndex2
+
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+from ndexbiogridloader.aggregation import InteractionStore
+from tests import biogrid_fixtures
+
+try:
+    import pyarrow
+    from ndexbiogridloader.cache import InteractionCache
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def _get_network_elements(cx_file):
+    net = ndex2.create_nice_cx_from_file(cx_file)
+    return (net.get_name(), sorted(str(n) for n in net.get_nodes()),
+            sorted(str(e) for e in net.get_edges()),
+            sorted(str(net.get_edge_attributes(e[0]))
+                   for e in net.get_edges()))
+
+
+class TestInteractionCache(unittest.TestCase):
+    """Tests for `InteractionCache` class."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_constructor_without_pyarrow(self):
+        from ndexbiogridloader.cache import InteractionCache
+        with patch.dict('sys.modules', {'pyarrow': None}):
+            try:
+                InteractionCache(self._temp_dir, '1.0')
+                self.fail('Expected NdexBioGRIDLoaderError')
+            except NdexBioGRIDLoaderError as e:
+                self.assertTrue('pyarrow is required' in str(e))
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_put_has_and_read(self):
+        cache = InteractionCache(self._temp_dir, '1.0')
+        self.assertEqual(os.path.join(self._temp_dir, '1.0', 'foo.parquet'),
+                         cache.get_path('foo'))
+        self.assertFalse(cache.has('foo'))
+        store = InteractionStore(3, 1, categorical_columns=(2,))
+        store.add('a', ['x', '1', 'physical'])
+        store.add('b', ['', '2', 'genetic'])
+        store.add('a', ['x', '3', 'physical'])
+        cache.put('foo', store, ['name', 'Pubmed ID', 'type'])
+        self.assertTrue(cache.has('foo'))
+
+        # different version does not see file
+        self.assertFalse(InteractionCache(self._temp_dir, '2.0').has('foo'))
+
+        df = cache.read('foo', ['name', 'Pubmed ID', 'type'],
+                        {'name': str, 'Pubmed ID': str, 'type': 'category'})
+        self.assertEqual(['x', ''], list(df['name']))
+        self.assertEqual(['1|3', '2'], list(df['Pubmed ID']))
+        self.assertEqual(['physical', 'genetic'], list(df['type']))
+        self.assertEqual('category', str(df['type'].dtype))
+
+        df = cache.read('foo', ['type'], {'type': str})
+        self.assertEqual(['type'], list(df.columns))
+        self.assertNotEqual('category', str(df['type'].dtype))
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_put_tsv(self):
+        cache = InteractionCache(self._temp_dir, '1.0')
+        tsv_file = os.path.join(self._temp_dir, 'x.tsv')
+        with open(tsv_file, 'w') as f:
+            f.write('name\tPubmed ID\ttype\n')
+            f.write('"x\t1|3\tphysical\n')
+            f.write('\t2\tgenetic\n')
+        cache.put_tsv('foo', tsv_file, ['name', 'Pubmed ID', 'type'],
+                      categorical_columns=(2,))
+        self.assertTrue(cache.has('foo'))
+        df = cache.read('foo', ['name', 'type'],
+                        {'name': str, 'type': 'category'})
+        self.assertEqual(['"x', ''], list(df['name']))
+        self.assertEqual(['physical', 'genetic'], list(df['type']))
+        self.assertEqual('category', str(df['type'].dtype))
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_has_invalid_file(self):
+        cache = InteractionCache(self._temp_dir, '1.0')
+        os.makedirs(os.path.join(self._temp_dir, '1.0'))
+        with open(cache.get_path('foo'), 'w') as f:
+            f.write('not parquet')
+        self.assertFalse(cache.has('foo'))
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_run_reuses_cache(self):
+        datadir = os.path.join(self._temp_dir, 'data')
+        cachedir = os.path.join(self._temp_dir, 'cache')
+        biogrid_fixtures.create_release_files(datadir)
+        args = biogrid_fixtures.get_args(datadir,
+                                         extra_args=['--cachedir', cachedir])
+        loader = biogrid_fixtures.create_loader(args)
+        self.assertEqual(0, loader.run())
+        self.assertEqual(3, len(glob.glob(os.path.join(cachedir, '1.0.0',
+                                                       '*.parquet'))))
+        first_run = {}
+        for cx_file in glob.glob(os.path.join(datadir, '*.cx')):
+            first_run[cx_file] = _get_network_elements(cx_file)
+            os.unlink(cx_file)
+
+        # without the archives the second run can only succeed via cache
+        os.unlink(os.path.join(datadir, 'organism.zip'))
+        os.unlink(os.path.join(datadir, 'chemicals.zip'))
+        for ext in ['*.tab2.txt', '*.chemtab.txt', '*.tsv']:
+            for biogrid_file in glob.glob(os.path.join(datadir, ext)):
+                os.unlink(biogrid_file)
+        loader = biogrid_fixtures.create_loader(args)
+        self.assertEqual(0, loader.run())
+        self.assertEqual(3, len(first_run))
+        for cx_file, elements in first_run.items():
+            self.assertEqual(elements, _get_network_elements(cx_file))
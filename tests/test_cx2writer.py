@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `cx2writer` module."""
+
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ndex2.cx2 import CX2Network
+
+from ndexbiogridloader import cx2writer
+from ndexbiogridloader.network import ColumnarNetwork
+from tests.test_network import _create_network
+from tests import biogrid_fixtures
+
+
+class TestCX2Writer(unittest.TestCase):
+    """Tests for `cx2writer` module."""
+
+    def _get_cx2(self, network):
+        out = io.StringIO()
+        cx2writer.write_cx2(network, out)
+        return json.loads(out.getvalue())
+
+    def _load_cx2(self, network):
+        res = CX2Network()
+        res.create_from_raw_cx2(self._get_cx2(network))
+        return res
+
+    def test_write_cx2_same_as_nice_cx(self):
+        network = _create_network()
+        network.set_name('foo')
+        network.set_opaque_aspect('cartesianLayout', [{'node': 1, 'x': 1.0,
+                                                       'y': 2.0}])
+        nice_cx = network.to_nice_cx()
+        res = self._load_cx2(network)
+        self.assertEqual(res.get_nodes(), self._load_cx2(nice_cx).get_nodes())
+        self.assertEqual(res.get_edges(), self._load_cx2(nice_cx).get_edges())
+        self.assertEqual('foo', res.get_name())
+        self.assertEqual(20, len(res.get_nodes()))
+        self.assertEqual(200, len(res.get_edges()))
+        self.assertEqual({'name': 'node1', 'represents': 'ncbigene:1',
+                          'alias': ['a', '1']}, res.get_node(1)['v'])
+        self.assertEqual(1.0, res.get_node(1)['x'])
+        self.assertEqual(2.0, res.get_node(1)['y'])
+
+        for edge_id, edge in nice_cx.get_edges():
+            expected = {a['n']: a['v'] for a in
+                        nice_cx.get_edge_attributes(edge_id) or []}
+            expected['interaction'] = edge['i']
+            self.assertEqual(expected, res.get_edge(edge_id)['v'])
+            self.assertEqual(edge['s'], res.get_edge(edge_id)['s'])
+            self.assertEqual(edge['t'], res.get_edge(edge_id)['t'])
+
+    def test_write_cx2_declares_attributes_once(self):
+        network = _create_network(num_edges=3)
+        cx2 = self._get_cx2(network)
+        self.assertEqual(cx2writer.CX2_HEADER, cx2[0])
+        self.assertEqual(cx2writer.STATUS, cx2[-1])
+        declarations = cx2[2]['attributeDeclarations'][0]
+        self.assertEqual({'name': {'d': 'string'},
+                          'represents': {'d': 'string'},
+                          'type': {'d': 'string', 'a': 'n0'},
+                          'alias': {'d': 'list_of_string', 'a': 'n1'}},
+                         declarations['nodes'])
+        self.assertEqual({'d': 'list_of_double', 'a': 'e1'},
+                         declarations['edges']['score'])
+        metadata = {m['name']: m['elementCount'] for m in cx2[1]['metaData']}
+        self.assertEqual(20, metadata['nodes'])
+        self.assertEqual(3, metadata['edges'])
+        self.assertNotIn('visualProperties', metadata)
+
+    def test_write_cx2_mixed_types(self):
+        network = ColumnarNetwork()
+        network.add_node('a')
+        column = network.add_edge_attribute_column('score')
+        other = network.add_edge_attribute_column('other')
+        for value, data_type, other_value, other_type in \
+                [(1.0, 'double', 1, 'integer'),
+                 ([2.0, 3.0], 'list_of_double', 'x', 'string')]:
+            network.add_edge(0, 0, 'pp')
+            column.append(value, data_type)
+            other.append(other_value, other_type)
+        res = self._load_cx2(network)
+        self.assertEqual([1.0], res.get_edge(0)['v']['score'])
+        self.assertEqual([2.0, 3.0], res.get_edge(1)['v']['score'])
+        self.assertEqual('1', res.get_edge(0)['v']['other'])
+        self.assertEqual('x', res.get_edge(1)['v']['other'])
+
+    def test_write_cx2_empty_network(self):
+        res = self._load_cx2(ColumnarNetwork())
+        self.assertEqual({}, res.get_nodes())
+        self.assertEqual({}, res.get_edges())
+
+    def test_convert_visual_properties(self):
+        cy_visual_properties = [
+            {'properties_of': 'network',
+             'properties': {'NETWORK_BACKGROUND_PAINT': '#FFFFFF',
+                            'NETWORK_TITLE': 'ignored'}},
+            {'properties_of': 'nodes:default',
+             'properties': {'NODE_FILL_COLOR': '#E5E5E5',
+                            'NODE_SHAPE': 'ROUND_RECTANGLE',
+                            'NODE_WIDTH': '40.0'},
+             'dependencies': {'nodeSizeLocked': 'false'},
+             'mappings': {
+                 'NODE_LABEL': {'type': 'PASSTHROUGH',
+                                'definition': 'COL=name,T=string'},
+                 'NODE_FILL_COLOR': {'type': 'DISCRETE',
+                                     'definition': 'COL=type,T=string,'
+                                                   'K=0=protein,V=0=#FF0000,'
+                                                   'K=1=a,,b,V=1=#00FF00'},
+                 'NODE_SIZE': {'type': 'CONTINUOUS',
+                               'definition': 'COL=degree,T=integer'}}}]
+        visual_properties, editor_properties = \
+            cx2writer.convert_visual_properties(cy_visual_properties)
+        self.assertEqual({'NETWORK_BACKGROUND_COLOR': '#FFFFFF'},
+                         visual_properties['default']['network'])
+        node = visual_properties['default']['node']
+        self.assertEqual('#E5E5E5', node['NODE_BACKGROUND_COLOR'])
+        self.assertEqual('round-rectangle', node['NODE_SHAPE'])
+        self.assertEqual(40.0, node['NODE_WIDTH'])
+        node_mapping = visual_properties['nodeMapping']
+        self.assertEqual({'type': 'PASSTHROUGH',
+                          'definition': {'attribute': 'name',
+                                         'type': 'string'}},
+                         node_mapping['NODE_LABEL'])
+        self.assertEqual([{'v': 'protein', 'vp': '#FF0000'},
+                          {'v': 'a,b', 'vp': '#00FF00'}],
+                         node_mapping['NODE_BACKGROUND_COLOR']
+                         ['definition']['map'])
+        self.assertEqual(2, len(node_mapping))
+        self.assertEqual({'properties': {'nodeSizeLocked': False}},
+                         editor_properties)
+
+    def test_write_cx2_style(self):
+        network = _create_network(num_edges=1)
+        network.set_opaque_aspect('cyVisualProperties', [
+            {'properties_of': 'edges:default',
+             'properties': {'EDGE_WIDTH': '2.0'}}])
+        res = self._load_cx2(network)
+        self.assertEqual(2.0, res.get_visual_properties()['default']
+                         ['edge']['EDGE_WIDTH'])
+
+    def test_upload_cx2_needs_newer_ndex2(self):
+        class OldNdex2(object):
+            def save_new_network(self):
+                pass
+
+        self.assertEqual(cx2writer.CX2_UPLOAD_METHODS,
+                         cx2writer.get_missing_upload_methods(OldNdex2))
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            args = biogrid_fixtures.get_args(temp_dir,
+                                             extra_args=['--cxformat',
+                                                         cx2writer.CX2_FORMAT])
+            args.skipupload = False
+            loader = biogrid_fixtures.create_loader(args)
+            with patch('ndex2.client.Ndex2', OldNdex2),\
+                    self.assertLogs('ndexbiogridloader.ndexloadbiogrid',
+                                    level='ERROR') as logs:
+                self.assertEqual(2, loader.run())
+            self.assertIn('update_cx2_network', logs.output[0])
+        finally:
+            shutil.rmtree(temp_dir)
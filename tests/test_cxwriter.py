@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `cxwriter` module."""
+
+import io
+import json
+import copy
+import unittest
+
+import ndex2
+from ndex2.nice_cx_network import NiceCXNetwork
+
+from ndexbiogridloader import cxwriter
+from ndexbiogridloader import ndexloadbiogrid
+
+
+class TestCxWriter(unittest.TestCase):
+    """Tests for `cxwriter` module."""
+
+    def _assert_same_as_to_cx(self, network):
+        expected_net = copy.deepcopy(network)
+        expected = io.StringIO()
+        json.dump(expected_net.to_cx(log_to_stdout=False), expected)
+        out = io.StringIO()
+        cxwriter.write_cx(network, out)
+        self.assertEqual(expected.getvalue(), out.getvalue())
+        self.assertEqual(expected_net.metadata, network.metadata)
+
+    def test_write_cx_empty_network(self):
+        self._assert_same_as_to_cx(NiceCXNetwork())
+
+    def test_write_cx(self):
+        net = ndex2.create_nice_cx_from_file(ndexloadbiogrid.get_organism_style())
+        node_one = net.create_node('one', node_represents='uniprot:1')
+        node_two = net.create_node('two')
+        net.set_node_attribute(node_one, 'alias', ['a', 'b'],
+                               type='list_of_string')
+        edge = net.create_edge(node_one, node_two, 'binds')
+        net.set_edge_attribute(edge, 'score', 1.5, type='double')
+        net.set_edge_attribute(edge, 'pmid', ['1', '2'],
+                               type='list_of_string')
+        net.set_name('foo')
+        net.citations = {1: {'@id': 1, 'dc:title': 'x'}}
+        net.nodeCitations = {node_one: [1], node_two: 1}
+        net.edgeCitations = {edge: [1]}
+        net.supports = {2: {'@id': 2, 'text': 'y'}}
+        net.edgeSupports = {edge: 2}
+        net.set_opaque_aspect('foo', [{'x': 1}])
+        net.opaqueAspects['bar'] = b'abc'
+        self._assert_same_as_to_cx(net)
+
+    def test_write_cx_with_status_aspect(self):
+        net = NiceCXNetwork()
+        net.create_node('one')
+        net.set_opaque_aspect('status', [{'error': 'x', 'success': False}])
+        self._assert_same_as_to_cx(net)
+
+
+if __name__ == '__main__':
+    unittest.main()
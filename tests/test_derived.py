@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `derived` module."""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader.derived import load_derived_networks
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+
+from tests import biogrid_fixtures
+
+
+COLUMNS = ['Experimental System', 'Experimental System Type', 'Throughput']
+
+
+class TestDerived(unittest.TestCase):
+    """Tests for `derived` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _write_definitions(self, definitions):
+        path = os.path.join(self._temp_dir, 'derived.json')
+        with open(path, 'w') as f:
+            json.dump(definitions, f)
+        return path
+
+    def test_load_derived_networks(self):
+        derived_networks = load_derived_networks(ndexloadbiogrid.get_derived_networks(),
+                                                 COLUMNS)
+        self.assertEqual(['physical', 'genetic', 'low_throughput'],
+                         [d.get_id() for d in derived_networks])
+        valid = {'id': 'x', 'name': 'X ({organism})',
+                 'filters': {'Throughput': ['Low Throughput']}}
+        for definition in [dict(valid, id='a b'),
+                           dict(valid, name='{foo}'),
+                           dict(valid, filters={'Pubmed ID': ['1']}),
+                           dict(valid, filters={'Throughput': 'Low Throughput'}),
+                           dict(valid, filters={}),
+                           dict(valid, splitBy='Score'),
+                           dict(valid, other=1)]:
+            with self.assertRaises(NdexBioGRIDLoaderError):
+                load_derived_networks(self._write_definitions([definition]),
+                                      COLUMNS)
+        with self.assertRaises(NdexBioGRIDLoaderError):
+            load_derived_networks(self._write_definitions([valid, valid]),
+                                  COLUMNS)
+        with self.assertRaises(NdexBioGRIDLoaderError):
+            load_derived_networks(os.path.join(self._temp_dir, 'missing.json'),
+                                  COLUMNS)
+
+    def test_get_networks(self):
+        dataframe = pd.DataFrame({'Experimental System': ['Two-hybrid',
+                                                          'Affinity Capture-MS',
+                                                          'Two-hybrid',
+                                                          'Dosage Rescue'],
+                                  'Experimental System Type': ['physical',
+                                                               'physical',
+                                                               'physical',
+                                                               'genetic'],
+                                  'Throughput': ['Low Throughput',
+                                                 'High Throughput',
+                                                 'High Throughput',
+                                                 'Low Throughput']},
+                                 dtype='category')
+        path = self._write_definitions([{'id': 'physical_low',
+                                         'name': 'Low ({organism})',
+                                         'filters': {'Experimental System Type':
+                                                     ['physical'],
+                                                     'Throughput':
+                                                     ['Low Throughput']}},
+                                        {'id': 'system',
+                                         'name': '{value} ({organism})',
+                                         'filters': {'Experimental System Type':
+                                                     ['physical']},
+                                         'splitBy': 'Experimental System'},
+                                        {'id': 'none', 'name': 'None',
+                                         'filters': {'Throughput': ['x']}}])
+        networks = []
+        for derived_network in load_derived_networks(path, COLUMNS):
+            for derived_id, name, description, interactions in \
+                    derived_network.get_networks(dataframe, 'Human'):
+                networks.append((derived_id, name, description,
+                                 list(interactions['Experimental System'])))
+        self.assertEqual([('physical_low', 'Low (Human)',
+                           'Experimental System Type=physical; '
+                           'Throughput=Low Throughput', ['Two-hybrid']),
+                          ('system_Affinity_Capture_MS',
+                           'Affinity Capture-MS (Human)',
+                           'Experimental System Type=physical; '
+                           'Experimental System=Affinity Capture-MS',
+                           ['Affinity Capture-MS']),
+                          ('system_Two_hybrid', 'Two-hybrid (Human)',
+                           'Experimental System Type=physical; '
+                           'Experimental System=Two-hybrid',
+                           ['Two-hybrid', 'Two-hybrid'])],
+                         networks)
+
+    def test_get_networks_skips_missing_split_values(self):
+        dataframe = pd.DataFrame({'Experimental System': ['Two-hybrid', None,
+                                                          '', 'Two-hybrid'],
+                                  'Experimental System Type': ['physical'] * 4,
+                                  'Throughput': ['Low Throughput'] * 4})
+        path = self._write_definitions([{'id': 'system',
+                                         'name': '{value} ({organism})',
+                                         'splitBy': 'Experimental System'}])
+        for df in [dataframe, dataframe.astype('category')]:
+            networks = [(derived_id, len(interactions))
+                        for derived_network in load_derived_networks(path, COLUMNS)
+                        for derived_id, name, description, interactions in
+                        derived_network.get_networks(df, 'Human')]
+            self.assertEqual([('system_Two_hybrid', 2)], networks)
+
+    def _read_cx(self, path):
+        with open(path, 'r') as f:
+            aspects = json.load(f)
+        attributes = {}
+        edges = []
+        for aspect in aspects:
+            for attr in aspect.get('networkAttributes', []):
+                attributes[attr['n']] = attr['v']
+            edges.extend(aspect.get('edges', []))
+        return attributes, edges
+
+    def _run(self, datadir, extra_args=None):
+        args = biogrid_fixtures.get_args(datadir, extra_args=extra_args)
+        loader = biogrid_fixtures.create_loader(args)
+        with patch.object(loader, '_apply_simple_spring_layout'),\
+                patch.object(loader, '_generate_tsv_from_biogrid_organism_file',
+                             wraps=loader._generate_tsv_from_biogrid_organism_file) as mock_gen:
+            exit_code = loader.run()
+        return exit_code, mock_gen.call_count
+
+    def test_run_with_derived_networks(self):
+        datadir = os.path.join(self._temp_dir, 'data')
+        biogrid_fixtures.create_release_files(datadir)
+        self.assertEqual((0, 2), self._run(datadir))
+        base_file = os.path.join(datadir,
+                                 'BIOGRID-ORGANISM-Homo_sapiens-1.0.0.cx')
+        with open(base_file, 'r') as f:
+            base_cx = f.read()
+
+        self.assertEqual((0, 2),
+                         self._run(datadir,
+                                   ['--derivednetworks',
+                                    ndexloadbiogrid.get_derived_networks()]))
+        with open(base_file, 'r') as f:
+            self.assertEqual(base_cx, f.read())
+        base_attributes, base_edges = self._read_cx(base_file)
+        num_edges = 0
+        for derived_id in ['physical', 'genetic']:
+            attributes, edges = self._read_cx(base_file.replace('.cx', '-' +
+                                                                derived_id +
+                                                                '.cx'))
+            self.assertEqual(base_attributes['name'], attributes['derivedFrom'])
+            self.assertEqual('Experimental System Type=' + derived_id,
+                             attributes['derivedFilter'])
+            self.assertIn('(Homo_sapiens)', attributes['name'])
+            self.assertEqual(base_attributes['version'], attributes['version'])
+            num_edges += len(edges)
+        # reverse edges with different systems are only collapsed in
+        # the organism network
+        self.assertTrue(len(base_edges) < num_edges)
+        self.assertTrue(os.path.isfile(os.path.join(datadir,
+                                                    'BIOGRID-ORGANISM-Mus_musculus-'
+                                                    '1.0.0-low_throughput.cx')))
+
+        with open(ndexloadbiogrid.get_derived_networks(), 'r') as f:
+            low_throughput = [d for d in json.load(f)
+                              if d['id'] == 'low_throughput'][0]
+        self.assertEqual(['physical'],
+                         low_throughput['filters']['Experimental System Type'])
+
+        self.assertEqual((2, 0),
+                         self._run(datadir,
+                                   ['--derivednetworks',
+                                    self._write_definitions([{'id': 'x'}])]))
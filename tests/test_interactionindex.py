@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `interactionindex` module."""
+
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from ndexbiogridloader import interactionindex
+from ndexbiogridloader.interactionindex import InteractionIndex
+
+from tests import biogrid_fixtures
+
+
+def _organism_row(entrez_a, entrez_b, pubmed, taxon_b='9606'):
+    return [str(entrez_a), str(entrez_b), 'G' + str(entrez_a),
+            'G' + str(entrez_b), '-', '-', 'Two-hybrid', 'physical',
+            pubmed, 'Low Throughput', '-', '-', '-', '-', '9606', taxon_b]
+
+
+def _chemical_row(entrez, chem, pubmed):
+    return [str(entrez), 'G' + str(entrez), '-', 'inhibitor', 'chemical',
+            pubmed, 'chem' + str(chem), '', 'DB0000' + str(chem),
+            'small molecule']
+
+
+class TestInteractionIndex(unittest.TestCase):
+    """Tests for `interactionindex` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._index_file = os.path.join(self._temp_dir, 'index.db')
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _create_index(self):
+        with InteractionIndex(self._index_file) as index:
+            self.assertEqual(3, index.add_network('BIOGRID-ORGANISM-Homo_sapiens',
+                                                  interactionindex.ORGANISM_TYPE,
+                                                  '4.2.191',
+                                                  [_organism_row(1, 2, '10|11'),
+                                                   _organism_row(2, 3, '11'),
+                                                   _organism_row(1, 50, '12',
+                                                                 taxon_b='10090')]))
+            self.assertEqual(2, index.add_network('BIOGRID-CHEMICALS-9606',
+                                                  interactionindex.CHEMICAL_TYPE,
+                                                  '4.2.191',
+                                                  [_chemical_row(1, 1, '10'),
+                                                   _chemical_row(3, 2, '')],
+                                                  taxon='9606'))
+
+    def test_find_networks(self):
+        self._create_index()
+        with InteractionIndex(self._index_file) as index:
+            self.assertEqual([{'name': 'BIOGRID-CHEMICALS-9606',
+                               'type': 'chemical', 'taxon': '9606',
+                               'biogridVersion': '4.2.191', 'numMatches': 1},
+                              {'name': 'BIOGRID-ORGANISM-Homo_sapiens',
+                               'type': 'organism', 'taxon': None,
+                               'biogridVersion': '4.2.191', 'numMatches': 2}],
+                             index.find_networks(entrez='1'))
+            self.assertEqual([('BIOGRID-ORGANISM-Homo_sapiens', 2)],
+                             [(n['name'], n['numMatches'])
+                              for n in index.find_networks(pubmed='11')])
+            self.assertEqual([('BIOGRID-ORGANISM-Homo_sapiens', 1)],
+                             [(n['name'], n['numMatches'])
+                              for n in index.find_networks(organism='10090')])
+            self.assertEqual([2, 3], [n['numMatches'] for n in
+                                      index.find_networks(organism='9606')])
+            self.assertEqual([], index.find_networks(entrez='1',
+                                                     biogrid_version='4.4.200'))
+
+    def test_find_interactions(self):
+        self._create_index()
+        with InteractionIndex(self._index_file) as index:
+            self.assertEqual([{'network': 'BIOGRID-CHEMICALS-9606',
+                               'biogridVersion': '4.2.191', 'entrez_a': '3',
+                               'symbol_a': 'G3', 'organism_a': '9606',
+                               'chemical_id': 'DB00002',
+                               'chemical_name': 'chem2',
+                               'chemical_type': 'small molecule',
+                               'action': 'inhibitor', 'pubmedIds': []}],
+                             index.find_interactions(chemical='db00002'))
+            self.assertEqual(index.find_interactions(chemical='DB00002'),
+                             index.find_interactions(chemical='CHEM2'))
+            interactions = index.find_interactions(symbol='g2')
+            self.assertEqual([('1', '2', ['10', '11']), ('2', '3', ['11'])],
+                             [(i['entrez_a'], i['entrez_b'], i['pubmedIds'])
+                              for i in interactions])
+            self.assertEqual('Two-hybrid', interactions[0]['experimental_system'])
+            self.assertEqual(1, len(index.find_interactions(symbol='G2', limit=1)))
+            self.assertEqual(['50'], [i['entrez_b'] for i in
+                                      index.find_interactions(entrez='1',
+                                                              pubmed='12')])
+
+    def test_add_network_replaces_same_version(self):
+        self._create_index()
+        with InteractionIndex(self._index_file) as index:
+            self.assertTrue(index.has_network('BIOGRID-CHEMICALS-9606', '4.2.191'))
+            self.assertFalse(index.has_network('BIOGRID-CHEMICALS-9606', '4.4.200'))
+            index.add_network('BIOGRID-ORGANISM-Homo_sapiens',
+                              interactionindex.ORGANISM_TYPE, '4.2.191',
+                              [_organism_row(4, 5, '13')])
+            index.add_network('BIOGRID-ORGANISM-Homo_sapiens',
+                              interactionindex.ORGANISM_TYPE, '4.4.200',
+                              [_organism_row(1, 2, '10')])
+            self.assertEqual([('4.4.200', ['10'])],
+                             [(i['biogridVersion'], i['pubmedIds'])
+                              for i in index.find_interactions(symbol='G2')])
+            self.assertEqual([], index.find_networks(pubmed='11'))
+            self.assertEqual(['4.2.191', '4.2.191', '4.4.200'],
+                             [n['biogridVersion'] for n in index.find_networks()])
+
+    def test_main(self):
+        self.assertEqual(1, interactionindex.main(['prog', self._index_file]))
+        self._create_index()
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(0, interactionindex.main(['prog', self._index_file,
+                                                       '--entrez', '1']))
+        self.assertEqual('BIOGRID-CHEMICALS-9606\t4.2.191\t1\n'
+                         'BIOGRID-ORGANISM-Homo_sapiens\t4.2.191\t2\n',
+                         out.getvalue())
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(0, interactionindex.main(['prog', self._index_file,
+                                                       '--symbol', 'G1',
+                                                       '--interactions',
+                                                       '--limit', '2']))
+        self.assertEqual([['10'], ['10', '11']],
+                         [json.loads(line)['pubmedIds']
+                          for line in out.getvalue().splitlines()])
+
+    def _run_loader(self, datadir, index_file, extra_args=None):
+        args = biogrid_fixtures.get_args(datadir,
+                                         extra_args=['--interactionindex',
+                                                     index_file] +
+                                         (extra_args or []))
+        loader = biogrid_fixtures.create_loader(args)
+        with patch.object(loader, '_apply_simple_spring_layout'):
+            self.assertEqual(0, loader.run())
+        with InteractionIndex(index_file) as index:
+            return index.find_networks(), index.find_interactions()
+
+    def test_run_with_interactionindex(self):
+        datadir = os.path.join(self._temp_dir, 'data')
+        os.makedirs(datadir)
+        biogrid_fixtures.create_release_files(datadir)
+        networks, interactions = self._run_loader(datadir, self._index_file)
+        self.assertEqual(['BIOGRID-CHEMICALS-9606',
+                          'BIOGRID-ORGANISM-Homo_sapiens',
+                          'BIOGRID-ORGANISM-Mus_musculus'],
+                         [n['name'] for n in networks])
+        self.assertTrue(all(n['biogridVersion'] == '1.0.0' for n in networks))
+        self.assertEqual(['9606'], list({i['organism_a'] for i in interactions
+                                         if 'chemical_id' in i}))
+
+        # spilling aggregation and cached interactions index the same
+        for index_file, extra_args in [('spill.db', ['--aggregationmemory',
+                                                     '0.001']),
+                                       ('cached.db', ['--cachedir',
+                                                      os.path.join(self._temp_dir,
+                                                                   'cache')]),
+                                       ('cached.db', ['--cachedir',
+                                                      os.path.join(self._temp_dir,
+                                                                   'cache')])]:
+            self.assertEqual((networks, interactions),
+                             self._run_loader(datadir,
+                                              os.path.join(self._temp_dir,
+                                                           index_file),
+                                              extra_args))
+        with patch.object(InteractionIndex, 'add_network') as mock_add:
+            self._run_loader(datadir, os.path.join(self._temp_dir, 'cached.db'),
+                             ['--cachedir', os.path.join(self._temp_dir, 'cache')])
+        mock_add.assert_not_called()
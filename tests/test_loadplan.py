@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `loadplan` module."""
+
+import os
+import json
+import unittest
+
+import pandas as pd
+import ndexutil.tsv.tsv2nicecx2 as t2n
+
+from ndexbiogridloader import loadplan
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+
+
+PLAN = {'context': {'ncbigene': 'http://identifiers.org/ncbigene/'},
+        'source_plan': {'rep_column': 'idA',
+                        'rep_prefix': 'ncbigene',
+                        'node_name_column': 'nameA',
+                        'property_columns': [
+                            {'column_name': 'taxA',
+                             'attribute_name': 'taxon'},
+                            {'column_name': 'synA',
+                             'attribute_name': 'alias',
+                             'delimiter': '|'},
+                            {'attribute_name': 'type',
+                             'default_value': 'protein'}]},
+        'target_plan': {'rep_column': 'idB',
+                        'node_name_column': 'nameB',
+                        'property_columns': [
+                            {'column_name': 'taxB',
+                             'attribute_name': 'taxon'}]},
+        'edge_plan': {'default_predicate': 'interacts-with',
+                      'property_columns': [
+                          {'column_name': 'system', 'delimiter': '|'},
+                          {'column_name': 'systemtype',
+                           'data_type': 'list_of_string'},
+                          {'column_name': 'pubmed',
+                           'attribute_name': 'citation',
+                           'delimiter': '|', 'value_prefix': 'pubmed'},
+                          {'column_name': 'score', 'delimiter': '|',
+                           'data_type': 'list_of_double'},
+                          {'column_name': 'missing',
+                           'attribute_name': 'note'}]}}
+
+
+class TestLoadPlan(unittest.TestCase):
+    """Tests for `loadplan` module."""
+
+    def _assert_same_as_tsv2nicecx2(self, dataframe, plan):
+        expected = t2n.convert_pandas_to_nice_cx_with_load_plan(dataframe, plan)
+        network = loadplan.compile_load_plan(plan).convert(dataframe)
+        self.assertEqual(json.dumps(expected.to_cx(log_to_stdout=False)),
+                         json.dumps(network.to_cx(log_to_stdout=False)))
+        self.assertEqual(expected.node_int_id_generator,
+                         network.node_int_id_generator)
+        self.assertEqual(expected.edge_int_id_generator,
+                         network.edge_int_id_generator)
+
+    def test_convert_same_as_tsv2nicecx2(self):
+        dataframe = pd.DataFrame(
+            {'idA': ['1', '2', '', '1', '4', ''],
+             'nameA': ['A', 'B', 'C', 'A', '', ''],
+             'taxA': ['9606', '', '9606', '10090', '9606', '9606'],
+             'synA': ['a1|a2', '', 'c1', 'x', '-', 'z'],
+             'idB': ['2', '3', '1', '3', '5', '6'],
+             'nameB': ['B', 'D', 'A', 'D', 'E', ''],
+             'taxB': ['9606', '9606', None, '9606', '1', '2'],
+             'system': ['Two-hybrid|Affinity', 'PCA', '', None, 'None',
+                        'PCA'],
+             'systemtype': ['physical', 'genetic', 'physical',
+                            'physical', 'physical', '[a,b]'],
+             'pubmed': ['1|2', '3', '3', '4', '5', '6'],
+             'score': ['0.5|1', '-', '2', '3', None, '4']})
+        self._assert_same_as_tsv2nicecx2(dataframe, PLAN)
+
+    def test_convert_empty_dataframe(self):
+        dataframe = pd.DataFrame(columns=['idA', 'nameA', 'idB', 'nameB'])
+        self._assert_same_as_tsv2nicecx2(dataframe, PLAN)
+
+    def test_convert_project_load_plans(self):
+        plan_dir = os.path.dirname(loadplan.__file__)
+        for plan_file in ['organism_load_plan.json', 'chem_load_plan.json']:
+            with open(os.path.join(plan_dir, plan_file), 'r') as f:
+                plan = json.load(f)
+            columns = loadplan.compile_load_plan(plan).get_columns()
+            dataframe = pd.DataFrame({c: [str(i % 3) + '|x' for i in range(6)]
+                                      for c in columns})
+            self._assert_same_as_tsv2nicecx2(dataframe, plan)
+
+    def test_compile_unsupported_plans(self):
+        unsupported = [{'citation_id_column': 'x'},
+                       {'node_name_column': 'name::string'},
+                       {'property_columns': ['foo::string']},
+                       {'property_columns': [{'column_name': 'x',
+                                              'data_type': 'integer'}]},
+                       {'property_columns': [{'column_name': 'x',
+                                              'data_type': 'bogus',
+                                              'delimiter': '|'}]}]
+        for update in unsupported:
+            plan = json.loads(json.dumps(PLAN))
+            plan['source_plan'].update(update)
+            with self.assertRaises(NdexBioGRIDLoaderError):
+                loadplan.compile_load_plan(plan)
+
+        plan = json.loads(json.dumps(PLAN))
+        plan['edge_plan']['property_columns'].append({'column_name': 'system'})
+        with self.assertRaises(NdexBioGRIDLoaderError):
+            loadplan.compile_load_plan(plan)
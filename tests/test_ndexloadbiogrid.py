@@ -4,16 +4,27 @@
 """Tests for `ndexbiogridloader` package."""
 
 import os
+import sys
+import json
+import argparse
+import zipfile
 import tempfile
 import shutil
+import subprocess
+import threading
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import unittest
 import ndex2
 from ndex2.nice_cx_network import NiceCXNetwork
+from ndex2.cx2 import CX2Network
 from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
 from ndexbiogridloader import ndexloadbiogrid
 from ndexbiogridloader.ndexloadbiogrid import NdexBioGRIDLoader
+from ndexbiogridloader.aggregation import MAX_OPEN_PARTITIONS
+from ndexbiogridloader.planner import WorkItem
+from ndexbiogridloader.planner import get_zip_member_sizes
+from tests import biogrid_fixtures
 
 
 class TestNdexbiogridloader(unittest.TestCase):
@@ -145,6 +156,60 @@ class TestNdexbiogridloader(unittest.TestCase):
         finally:
             shutil.rmtree(temp_dir)
 
+    def test_update_or_upload_with_retry_closes_progress_before_sleep(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        p.cxformat = 'cx'
+        loader = NdexBioGRIDLoader(p)
+        loader._ndex = MagicMock()
+        loader._ndex.save_cx_stream_as_new_network.side_effect = Exception('error')
+        events = []
+        progress = MagicMock()
+        progress.__exit__.side_effect = lambda *args: events.append('close')
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cxfile = os.path.join(temp_dir, 'file.cx')
+            with open(cxfile, 'wb') as f:
+                f.write(b'hello')
+            with patch.object(loader, '_create_progress',
+                              return_value=progress),\
+                    patch('time.sleep',
+                          side_effect=lambda secs: events.append('sleep')):
+                self.assertEqual(2, loader._update_or_upload_with_retry(cxfile=cxfile,
+                                                                        network_name='foo',
+                                                                        maxretries=2,
+                                                                        retry_sleep=1))
+            self.assertEqual(['close', 'sleep', 'close', 'sleep'], events)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_update_or_upload_with_retry_cx2(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        p.cxformat = 'cx2'
+        loader = NdexBioGRIDLoader(p)
+        loader._ndex = MagicMock()
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cxfile = os.path.join(temp_dir, 'file.cx2')
+            with open(cxfile, 'wb') as f:
+                f.write(b'hello')
+            self.assertEqual(0, loader._update_or_upload_with_retry(cxfile=cxfile,
+                                                                    network_name='foo',
+                                                                    maxretries=1,
+                                                                    retry_sleep=0))
+            loader._ndex.save_cx2_stream_as_new_network.assert_called_once()
+            self.assertEqual(0, loader._update_or_upload_with_retry(cxfile=cxfile,
+                                                                    network_name='foo',
+                                                                    network_uuid='1234',
+                                                                    maxretries=1,
+                                                                    retry_sleep=0))
+            self.assertEqual('1234', loader._ndex.update_cx2_network.call_args[0][1])
+            loader._ndex.save_cx_stream_as_new_network.assert_not_called()
+            loader._ndex.update_cx_network.assert_not_called()
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_apply_simple_spring_layout(self):
         net = NiceCXNetwork()
         n_one = net.create_node('node1')
@@ -296,6 +361,522 @@ class TestNdexbiogridloader(unittest.TestCase):
         finally:
             shutil.rmtree(temp_dir)
 
+    def test_get_load_plan_columns(self):
+        p = MagicMock()
+        p.datadir = 'datadir'
+        loader = NdexBioGRIDLoader(p)
+        with open(ndexloadbiogrid.get_organism_load_plan(), 'r') as f:
+            plan = json.load(f)
+        res = loader._get_load_plan_columns(plan)
+        self.assertEqual(set(loader._get_header_for_generating_organism_tsv()),
+                         res)
+        with open(ndexloadbiogrid.get_chemical_load_plan(), 'r') as f:
+            plan = json.load(f)
+        res = loader._get_load_plan_columns(plan)
+        self.assertEqual(9, len(res))
+        self.assertTrue('Interaction Type' not in res)
+        self.assertTrue('Chemical Source ID' in res)
+
+        res = loader._get_load_plan_columns({'source_plan': {'node_name_column': 'a::string'},
+                                             'target_plan': {'rep_column': 'b',
+                                                             'node_name_column': 'c'},
+                                             'edge_plan': {'predicate_id_column': 'd',
+                                                           'property_columns': ['e::double',
+                                                                                {'attribute_name': 'f',
+                                                                                 'default_value': 'x'}]}})
+        self.assertEqual({'a', 'b', 'c', 'd', 'e'}, res)
+
+    def test_read_tsv_as_dataframe(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = MagicMock()
+            p.datadir = temp_dir
+            p.parser = 'python'
+            loader = NdexBioGRIDLoader(p)
+            tsv_file = os.path.join(temp_dir, 'chem.tsv')
+            with open(tsv_file, 'w') as f:
+                f.write('\t'.join(loader._get_header_for_generating_chemicals_tsv()) + '\n')
+                f.write('1\tA\t\tinhibitor\ttarget\t1|2\tchem\t\tDB1\tsmall molecule\n')
+                f.write('2\tB\tS\tinhibitor\ttarget\t3\tchem2\tcas:1\tDB2\tsmall molecule\n')
+            with open(ndexloadbiogrid.get_chemical_load_plan(), 'r') as f:
+                plan = json.load(f)
+            df = loader._read_tsv_as_dataframe(tsv_file, plan, 'chemical')
+            self.assertEqual(2, len(df))
+            self.assertTrue('Interaction Type' not in df.columns)
+            self.assertEqual('category', str(df['Action'].dtype))
+            self.assertEqual('category', str(df['Chemical Type'].dtype))
+            self.assertEqual('', df['Synonyms'][0])
+            self.assertEqual('1|2', df['Pubmed ID'][0])
+            self.assertEqual('inhibitor', df['Action'][1])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_positive_float(self):
+        self.assertEqual(0.5, ndexloadbiogrid._positive_float('0.5'))
+        for val in ['0', '-1', 'x']:
+            try:
+                ndexloadbiogrid._positive_float(val)
+                self.fail('Expected ArgumentTypeError')
+            except argparse.ArgumentTypeError:
+                pass
+
+    def test_get_num_aggregation_partitions(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = MagicMock()
+            p.datadir = temp_dir
+            p.aggregationmemory = None
+            loader = NdexBioGRIDLoader(p)
+            biogrid_file = os.path.join(temp_dir, 'x.tab2.txt')
+            with open(biogrid_file, 'w') as f:
+                f.write('x' * 1024 * 1024)
+            self.assertEqual(1, loader._get_num_aggregation_partitions(biogrid_file))
+            p.aggregationmemory = 100
+            self.assertEqual(1, loader._get_num_aggregation_partitions(biogrid_file))
+            p.aggregationmemory = 1
+            self.assertEqual(2, loader._get_num_aggregation_partitions(biogrid_file))
+            p.aggregationmemory = 0.25
+            self.assertEqual(8, loader._get_num_aggregation_partitions(biogrid_file))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_taxon_id(self):
+        loader = NdexBioGRIDLoader(MagicMock())
+        self.assertEqual('9606', loader._get_taxon_id(['BIOGRID-CHEMICALS',
+                                                       'Human, 9606, Homo sapiens',
+                                                       'H. sapiens']))
+        self.assertEqual('559292', loader._get_taxon_id(['x', "Baker's yeast, 559292"]))
+        for entry in [['x'], ['x', 'Human 9606'], ['x', 'Human, , Homo sapiens'],
+                      ['x', 'Human, Homo sapiens, 9606']]:
+            with self.assertRaises(NdexBioGRIDLoaderError):
+                loader._get_taxon_id(entry)
+
+    def test_run_with_invalid_chemicals_file(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            args = biogrid_fixtures.get_args(temp_dir)
+            with open(args.chemicalsfile, 'w') as f:
+                f.write('BIOGRID-CHEMICALS\tHuman\n')
+            loader = biogrid_fixtures.create_loader(args)
+            with self.assertLogs(ndexloadbiogrid.logger, level='ERROR') as logs:
+                self.assertEqual(2, loader.run())
+            self.assertIn(args.chemicalsfile, logs.output[0])
+            self.assertIn('BIOGRID-CHEMICALS', logs.output[0])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_builds_chemical_networks_for_each_taxon_in_one_scan(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir,
+                                                  chemicals=(('Human, 9606, Homo sapiens',
+                                                              'H. sapiens'),
+                                                             ('House mouse, 10090, Mus musculus',
+                                                              'M. musculus')))
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir))
+            parser = loader._get_parser()
+            with patch.object(parser, 'iter_rows',
+                              wraps=parser.iter_rows) as mock_iter_rows:
+                self.assertEqual(0, loader.run())
+            chem_calls = [c for c in mock_iter_rows.call_args_list
+                          if c[0][0].endswith('.chemtab.txt')]
+            self.assertEqual(1, len(chem_calls))
+
+            human = ndex2.create_nice_cx_from_file(os.path.join(temp_dir,
+                                                                'BIOGRID-CHEMICALS-1.0.0-9606.cx'))
+            mouse = ndex2.create_nice_cx_from_file(os.path.join(temp_dir,
+                                                                'BIOGRID-CHEMICALS-1.0.0-10090.cx'))
+            self.assertEqual('BioGRID: Protein-Chemical Interactions (M. musculus)',
+                             mouse.get_name())
+            self.assertEqual(3, len(mouse.get_edges()))
+            self.assertEqual(15, len(human.get_edges()))
+            human_nodes = set(n['n'] for n_id, n in human.get_nodes())
+            mouse_nodes = set(n['n'] for n_id, n in mouse.get_nodes())
+            self.assertTrue('G60' in mouse_nodes)
+            self.assertFalse('G60' in human_nodes)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_split_biogrid_all_file(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir))
+            by_organism = {}
+            with zipfile.ZipFile(os.path.join(temp_dir, 'organism.zip')) as zf:
+                for name in zf.namelist():
+                    tsv_file = loader._generate_tsv_from_biogrid_organism_file(zf.extract(name, temp_dir))
+                    with open(tsv_file, 'r') as f:
+                        by_organism[tsv_file] = f.read().splitlines()
+                    os.unlink(tsv_file)
+
+            for extra_args in [[], ['--aggregationmemory', '0.001']]:
+                loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir,
+                                                                                  extra_args=['--sourcemode',
+                                                                                              'all'] +
+                                                                                  extra_args))
+                self.assertEqual(0, loader._split_biogrid_all_file())
+                self.assertEqual(sorted(by_organism.keys()),
+                                 sorted(loader._organism_tsv_files.values()))
+                for tsv_file, expected in by_organism.items():
+                    with open(tsv_file, 'r') as f:
+                        lines = f.read().splitlines()
+                    if 'Homo_sapiens' in tsv_file:
+                        self.assertEqual(expected, lines)
+                    else:
+                        # cross-species human row is also a mouse interaction
+                        # and, being read first, aggregates with the mouse row
+                        cross = [line for line in expected if line.startswith('1\t50\t')][0]
+                        self.assertEqual(expected[0], lines[0])
+                        self.assertEqual(cross.replace('\t2003\t', '\t2003|2003\t')[:-len('10090\t10090')] +
+                                         '9606\t10090', lines[1])
+                        self.assertEqual([line for line in expected[1:] if line != cross],
+                                         lines[2:])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_work_items_with_sourcemode_all(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir,
+                                                                              extra_args=['--sourcemode',
+                                                                                          'all',
+                                                                                          '--aggregationmemory',
+                                                                                          '0.001']))
+            entries = loader._get_organism_or_chemicals_file_content('organism')
+            all_size = get_zip_member_sizes(loader._all_file_name)[
+                loader._get_biogrid_all_file_name('.tab2.txt')]
+
+            # before splitting organisms share BIOGRID-ALL file evenly
+            self.assertEqual([int(all_size / 2)] * 2,
+                             [item.get_source_size() for item in
+                              loader._get_work_items(entries)])
+
+            # file does not fit the budget so organisms are spooled
+            # and then aggregated sized by their share of the rows
+            with patch.object(ndexloadbiogrid, 'RowSpool',
+                              wraps=ndexloadbiogrid.RowSpool) as mock_spool, \
+                    patch.object(loader, '_create_aggregator',
+                                 wraps=loader._create_aggregator) as mock_create:
+                self.assertEqual(0, loader._split_biogrid_all_file())
+            self.assertEqual(2, mock_spool.call_count)
+            # human has 22 rows, mouse 22 plus cross species human row
+            expected = [int(all_size * 22 / 44), int(all_size * 23 / 44)]
+            self.assertEqual(expected,
+                             [c[1]['file_size'] for c in mock_create.call_args_list])
+            self.assertEqual(expected,
+                             [item.get_source_size() for item in
+                              loader._get_work_items(entries)])
+            self.assertEqual([], [f for f in os.listdir(temp_dir)
+                                  if f.startswith('spool_')])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_with_sourcemode_all(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            os.unlink(os.path.join(temp_dir, 'organism.zip'))
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir,
+                                                                              extra_args=['--sourcemode',
+                                                                                          'all']))
+            with patch.object(loader, '_split_biogrid_all_file',
+                              wraps=loader._split_biogrid_all_file) as mock_split:
+                self.assertEqual(0, loader.run())
+            self.assertEqual(1, mock_split.call_count)
+            for name in ['Homo_sapiens', 'Mus_musculus']:
+                self.assertTrue(os.path.isfile(os.path.join(temp_dir,
+                                                            'BIOGRID-ORGANISM-' + name +
+                                                            '-1.0.0.cx')))
+
+            # missing archive
+            os.unlink(os.path.join(temp_dir, 'all.zip'))
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir,
+                                                                              extra_args=['--sourcemode',
+                                                                                          'all']))
+            self.assertEqual(9, loader.run())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_generate_tsv_with_aggregation_memory_limit(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir))
+            in_memory = {}
+            for zip_name, gen_func in [('organism.zip', loader._generate_tsv_from_biogrid_organism_file),
+                                       ('chemicals.zip', loader._generate_tsv_from_biogrid_chemicals_file)]:
+                with zipfile.ZipFile(os.path.join(temp_dir, zip_name)) as zf:
+                    for name in zf.namelist():
+                        tsv_file = gen_func(zf.extract(name, temp_dir))
+                        with open(tsv_file, 'r') as f:
+                            in_memory[name] = (tsv_file, f.read())
+            # tiny budget needs more partitions then files
+            # allowed open at once
+            for budget in ['0.001', '0.0000001']:
+                loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(temp_dir,
+                                                                                  extra_args=['--aggregationmemory',
+                                                                                              budget]))
+                for name, (tsv_file, expected) in in_memory.items():
+                    biogrid_file = os.path.join(temp_dir, name)
+                    num_partitions = loader._get_num_aggregation_partitions(biogrid_file)
+                    self.assertTrue(num_partitions > 1)
+                    if budget == '0.0000001':
+                        self.assertTrue(num_partitions > MAX_OPEN_PARTITIONS)
+                    os.unlink(tsv_file)
+                    if name.endswith('.tab2.txt'):
+                        loader._generate_tsv_from_biogrid_organism_file(biogrid_file)
+                    else:
+                        loader._generate_tsv_from_biogrid_chemicals_file(biogrid_file)
+                    with open(tsv_file, 'r') as f:
+                        self.assertEqual(expected, f.read())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_import_does_not_load_heavy_modules(self):
+        code = ('import sys\n'
+                'import ndexbiogridloader.ndexloadbiogrid\n'
+                'print(" ".join(m for m in ["pandas", "networkx", "ndex2", '
+                '"py4cytoscape", "requests", "tqdm", '
+                '"ndexutil.tsv.tsv2nicecx2"] if m in sys.modules))\n')
+        res = subprocess.run([sys.executable, '-c', code],
+                             stdout=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(0, res.returncode)
+        self.assertEqual('', res.stdout.strip())
+
+    def test_cytoscape_wrappers_created_on_first_use(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        loader = NdexBioGRIDLoader(p)
+        self.assertIsNone(loader._py4cyto)
+        self.assertIsNone(loader._ndex_extra_utils)
+        py4 = loader._py4
+        self.assertEqual('Py4CytoscapeWrapper', type(py4).__name__)
+        self.assertIs(py4, loader._py4)
+        self.assertEqual('NDExExtraUtils', type(loader._ndexextra).__name__)
+
+        mockpy4 = MagicMock()
+        loader = NdexBioGRIDLoader(p, py4cyto=mockpy4)
+        self.assertIs(mockpy4, loader._py4)
+        self.assertEqual(ndexloadbiogrid.DEFAULT_CYREST_API,
+                         ndexloadbiogrid._parse_arguments('desc', ['x']).cyresturl)
+
+    def test_collapse_edges(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        loader = NdexBioGRIDLoader(p)
+        net = NiceCXNetwork()
+        node_a = net.create_node('a')
+        node_b = net.create_node('b')
+        edges = [net.create_edge(node_a, node_b, 'pp'),
+                 net.create_edge(node_a, node_b, 'other'),
+                 net.create_edge(node_b, node_a, 'pp'),
+                 net.create_edge(node_a, node_b, 'pp')]
+        for edge, pmid in zip(edges, ['1', '2', '3', '1']):
+            net.set_edge_attribute(edge, 'pmid', pmid)
+        edge_attributes = net.edgeAttributes
+        loader._network = net
+        loader._collapse_edges()
+        self.assertIs(edge_attributes, net.edgeAttributes)
+        self.assertEqual(edges[:2], list(net.edges.keys()))
+        self.assertEqual(edges[:2], list(net.edgeAttributes.keys()))
+        self.assertEqual({'po': edges[0], 'n': 'pmid', 'v': ['1', '3'],
+                          'd': 'list_of_string'},
+                         net.edgeAttributes[edges[0]][0])
+        self.assertEqual('2', net.edgeAttributes[edges[1]][0]['v'])
+
+    def test_get_compiled_load_plan(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        p.organismloadplan = ndexloadbiogrid.get_organism_load_plan()
+        loader = NdexBioGRIDLoader(p)
+        plan = loader._get_compiled_load_plan('organism')
+        self.assertIsNotNone(plan)
+        self.assertIs(plan, loader._get_compiled_load_plan('organism'))
+
+        # plans that cannot be compiled fall back to tsv2nicecx2
+        loader._load_plans['chemical'] = {'source_plan': {'citation_id_column': 'x'}}
+        self.assertIsNone(loader._get_compiled_load_plan('chemical'))
+
+        p.converter = 'tsv2nicecx2'
+        loader = NdexBioGRIDLoader(p)
+        self.assertIsNone(loader._get_compiled_load_plan('organism'))
+
+    def test_run_with_lowmemory(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            results = {}
+            for mode in ['default', 'low']:
+                datadir = os.path.join(temp_dir, mode)
+                report_file = os.path.join(temp_dir, mode + '.json')
+                biogrid_fixtures.create_release_files(datadir)
+                extra_args = ['--reportfile', report_file]
+                if mode == 'low':
+                    extra_args.append('--lowmemory')
+                loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(datadir,
+                                                                                  extra_args=extra_args))
+                with patch.object(loader, '_apply_simple_spring_layout'):
+                    self.assertEqual(0, loader.run())
+                results[mode] = {}
+                for name in os.listdir(datadir):
+                    if name.endswith('.cx'):
+                        with open(os.path.join(datadir, name), 'r') as f:
+                            results[mode][name] = f.read()
+                results[mode + 'network'] = loader._network
+                with open(report_file, 'r') as f:
+                    results[mode + 'entries'] = json.load(f)['entries']
+            self.assertEqual(3, len(results['low']))
+            self.assertEqual(results['default'], results['low'])
+            self.assertIsNotNone(results['defaultnetwork'])
+            self.assertIsNone(results['lownetwork'])
+            for entry in results['lowentries']:
+                self.assertTrue(entry['peakMemoryBytes'] > 0)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_process_item_reports_peak_memory_of_item(self):
+        if not ndexloadbiogrid._reset_peak_memory():
+            self.skipTest('peak memory cannot be reset on this platform')
+        loader = NdexBioGRIDLoader(MagicMock())
+        loader._report = MagicMock()
+
+        def process_entry(entry, type):
+            if entry[0] == 'big':
+                data = b'x' * (64 * 1024 * 1024)
+                del data
+            return 0
+        with patch.object(loader, '_process_entry', side_effect=process_entry):
+            for name in ['big', 'small']:
+                loader._process_item(WorkItem(name, [name], 'organism', 1))
+        peaks = [c[1]['peak_memory'] for c in loader._report.add_entry.call_args_list]
+        # network built after a larger one does not report its peak
+        self.assertTrue(peaks[0] - peaks[1] > 32 * 1024 * 1024)
+
+    def test_run_uploads_to_each_profile_at_once(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            report_file = os.path.join(temp_dir, 'report.json')
+            args = biogrid_fixtures.get_args(temp_dir,
+                                             extra_args=['--profile',
+                                                         'ndexbiogridloader,prod',
+                                                         '--reportfile',
+                                                         report_file])
+            args.skipupload = False
+            with open(args.conf, 'a') as f:
+                f.write('[prod]\nuser = joe\npassword = y\n'
+                        'server = prodhost\n')
+            loader = biogrid_fixtures.create_loader(args)
+
+            # both uploads of a network must be running at the same time
+            barrier = threading.Barrier(2, timeout=10)
+            prod = MagicMock()
+            prod.get_network_summaries_for_user.return_value = \
+                [{'name': 'BioGRID: Protein-Protein Interactions (Homo_sapiens)',
+                  'externalId': 'uuid1'}]
+            for ndex in [loader._ndex, prod]:
+                ndex.save_cx_stream_as_new_network.side_effect = \
+                    lambda stream: barrier.wait()
+                ndex.update_cx_network.side_effect = \
+                    lambda stream, uuid: barrier.wait()
+
+            with patch('ndex2.client.Ndex2', return_value=prod) as mock_ndex2,\
+                    patch.object(loader, '_apply_simple_spring_layout'):
+                self.assertEqual(0, loader.run())
+            mock_ndex2.assert_called_once_with(host='prodhost', username='joe',
+                                               password='y',
+                                               user_agent='biogrid/1.0.0')
+            self.assertEqual(3, loader._ndex.save_cx_stream_as_new_network.call_count)
+            self.assertEqual(2, prod.save_cx_stream_as_new_network.call_count)
+            self.assertEqual('uuid1', prod.update_cx_network.call_args[0][1])
+            with open(report_file, 'r') as f:
+                entries = json.load(f)['entries']
+            self.assertEqual(3, len(entries))
+            for entry in entries:
+                self.assertEqual({'ndexbiogridloader': 0, 'prod': 0},
+                                 entry['uploads'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_upload_cx_reports_status_of_each_profile(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        p.profile = 'a,b'
+        p.skipupload = False
+        p.maxretries = 1
+        p.retry_sleep = 0
+        loader = NdexBioGRIDLoader(p)
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cxfile = os.path.join(temp_dir, 'file.cx')
+            with open(cxfile, 'wb') as f:
+                f.write(b'hello')
+            target_a = ndexloadbiogrid.UploadTarget('a')
+            target_a.set_ndex(MagicMock())
+            target_b = ndexloadbiogrid.UploadTarget('b')
+            target_b.set_ndex(MagicMock())
+            target_b.get_ndex().save_cx_stream_as_new_network.side_effect = \
+                Exception('error')
+            loader._targets = [target_a, target_b]
+            with self.assertLogs(ndexloadbiogrid.logger) as logs:
+                self.assertEqual(2, loader._upload_cx(cxfile, 'foo'))
+            self.assertEqual({'a': 0, 'b': 2}, loader.get_upload_statuses())
+            self.assertTrue(any('profile b' in line and 'Unable' in line
+                                for line in logs.output))
+
+            # profile that failed to connect or load its networks is
+            # skipped without using the connection of another profile
+            target_c = ndexloadbiogrid.UploadTarget('c')
+            target_d = ndexloadbiogrid.UploadTarget('d')
+            target_d.set_ndex(MagicMock())
+            target_d.get_ndex().get_network_summaries_for_user.side_effect = \
+                Exception('error')
+            target_b.get_ndex().get_network_summaries_for_user.return_value = []
+            target_a.get_ndex().get_network_summaries_for_user.return_value = \
+                [{'name': 'foo', 'externalId': 'uuid1'}]
+            loader._targets = [target_c, target_a, target_d, target_b]
+            self.assertEqual(({'FOO': 'uuid1'}, 0),
+                             loader._load_network_summaries_for_user())
+            target_a.get_ndex().reset_mock()
+            target_b.get_ndex().save_cx_stream_as_new_network.side_effect = None
+            self.assertEqual(2, loader._upload_cx(cxfile, 'foo'))
+            self.assertEqual({'a': 0, 'b': 0, 'c': 2, 'd': 2},
+                             loader.get_upload_statuses())
+            self.assertEqual(1, target_a.get_ndex().update_cx_network.call_count)
+            target_d.get_ndex().save_cx_stream_as_new_network.assert_not_called()
+
+            # no profile can be uploaded to
+            loader._targets = [target_c, target_d]
+            self.assertEqual((None, 2), loader._load_network_summaries_for_user())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_with_cxformat_cx2(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            args = biogrid_fixtures.get_args(temp_dir,
+                                             extra_args=['--cxformat', 'cx2'])
+            loader = biogrid_fixtures.create_loader(args)
+            with patch.object(loader, '_apply_simple_spring_layout'):
+                self.assertEqual(0, loader.run())
+            cx2_files = sorted(f for f in os.listdir(temp_dir)
+                               if f.endswith('.cx2'))
+            self.assertEqual(['BIOGRID-CHEMICALS-1.0.0-9606.cx2',
+                              'BIOGRID-ORGANISM-Homo_sapiens-1.0.0.cx2',
+                              'BIOGRID-ORGANISM-Mus_musculus-1.0.0.cx2'],
+                             cx2_files)
+            with open(os.path.join(temp_dir, cx2_files[1]), 'r') as f:
+                network = CX2Network()
+                network.create_from_raw_cx2(json.load(f))
+            self.assertTrue(len(network.get_edges()) > 0)
+            self.assertTrue(network.get_name().startswith('BioGRID'))
+            self.assertTrue(network.get_visual_properties()['default']['node'])
+        finally:
+            shutil.rmtree(temp_dir)
+
     @unittest.skip("skipping test_10")
     def test_10_using_panda_generate_organism_CX_and_upload(self):
 
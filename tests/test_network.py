@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `network` module."""
+
+import io
+import json
+import random
+import unittest
+from unittest.mock import MagicMock
+
+import ndex2
+
+from ndexbiogridloader import cxwriter
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader.network import ColumnarNetwork
+from ndexbiogridloader.network import EdgeAttributeColumn
+from ndexbiogridloader.network import merge_values
+from ndexbiogridloader.network import get_merged_type
+
+
+def _create_network(num_nodes=20, num_edges=200, seed=1):
+    rand = random.Random(seed)
+    network = ColumnarNetwork()
+    network.add_network_attribute(name='@context', values='{}')
+    for node_id in range(num_nodes):
+        network.add_node('node' + str(node_id),
+                         'ncbigene:' + str(node_id) if node_id % 3 else None)
+        if node_id % 4:
+            network.add_node_attribute(node_id, 'alias', ['a', str(node_id)],
+                                       'list_of_string')
+    network.add_node_attribute(0, 'type', 'protein', 'string')
+    pmid = network.add_edge_attribute_column('pmid')
+    score = network.add_edge_attribute_column('score')
+    system = network.add_edge_attribute_column('system')
+    for edge_id in range(num_edges):
+        network.add_edge(rand.randrange(num_nodes), rand.randrange(num_nodes),
+                         rand.choice(['pp', 'other']))
+        pmid.append(rand.choice(['1', '2', None]), 'string')
+        score.append(rand.choice([[1.0], [2.0, 3.0], None]), 'list_of_double')
+        system.append(rand.choice([['x'], ['x', 'y'], ['']]), 'list_of_string')
+    return network
+
+
+class TestNetwork(unittest.TestCase):
+    """Tests for `network` module."""
+
+    def _get_cx(self, network):
+        out = io.StringIO()
+        if isinstance(network, ColumnarNetwork):
+            network.write_cx(out)
+        else:
+            cxwriter.write_cx(network, out)
+        return out.getvalue()
+
+    def test_merge_values_and_type(self):
+        self.assertEqual(['a', 'b'], merge_values('a', ['b', '', 'a']))
+        self.assertEqual([1.0, 2.0], merge_values([1.0, 1.0], 2.0))
+        self.assertEqual('list_of_string', get_merged_type(None))
+        self.assertEqual('list_of_double', get_merged_type('double'))
+        self.assertEqual('list_of_string', get_merged_type('list_of_string'))
+
+    def test_edge_attribute_column(self):
+        column = EdgeAttributeColumn('foo')
+        column.append('a', 'string')
+        column.append(None, None)
+        column.append(['b', 'c'], 'list_of_string')
+        column.append([], 'list_of_string')
+        self.assertEqual(4, len(column))
+        self.assertEqual(3, column.get_count())
+        self.assertEqual(('a', 'string'), column.get(0))
+        self.assertIsNone(column.get(1))
+        self.assertEqual((['b', 'c'], 'list_of_string'), column.get(2))
+        self.assertEqual(([], 'list_of_string'), column.get(3))
+
+        selected = column.select([0, 2, 3], {2: (['x'], 'list_of_string')})
+        self.assertEqual(3, len(selected))
+        self.assertEqual(('a', 'string'), selected.get(0))
+        self.assertEqual((['x'], 'list_of_string'), selected.get(1))
+        self.assertEqual(([], 'list_of_string'), selected.get(2))
+
+    def test_write_cx_same_as_nice_cx(self):
+        network = _create_network()
+        network.set_name('foo')
+        network.set_network_attribute('networkType', ['ppi'], 'list_of_string')
+        network.set_opaque_aspect('cartesianLayout', [{'node': 0, 'x': 1.0,
+                                                       'y': 2.0}])
+        nice_cx = network.to_nice_cx()
+        self.assertEqual('foo', nice_cx.get_name())
+        self.assertEqual(20, nice_cx.node_int_id_generator)
+        self.assertEqual(200, nice_cx.edge_int_id_generator)
+        self.assertEqual(self._get_cx(nice_cx), self._get_cx(network))
+        self.assertEqual(nice_cx.metadata, network.metadata)
+        # output is valid CX
+        res = ndex2.create_nice_cx_from_raw_cx(json.loads(self._get_cx(network)))
+        self.assertEqual(200, len(res.get_edges()))
+
+    def test_write_cx_empty_network(self):
+        network = ColumnarNetwork()
+        self.assertEqual(self._get_cx(network.to_nice_cx()),
+                         self._get_cx(network))
+
+    def test_collapse_edges_same_as_nice_cx(self):
+        p = MagicMock()
+        p.datadir = '/foo'
+        loader = ndexloadbiogrid.NdexBioGRIDLoader(p)
+        for seed in range(3):
+            network = _create_network(seed=seed)
+            loader._network = network.to_nice_cx()
+            loader._collapse_edges()
+            expected = loader._network
+            loader._network = network
+            loader._collapse_edges()
+            self.assertTrue(network.get_edge_count() < 200)
+            self.assertEqual(len(expected.edges), network.get_edge_count())
+            self.assertEqual(self._get_cx(expected), self._get_cx(network))
+
+    def test_to_networkx(self):
+        network = _create_network(num_nodes=5, num_edges=7)
+        graph = network.to_networkx(mode='default')
+        self.assertEqual(list(range(5)), list(graph.nodes()))
+        self.assertEqual(7, graph.number_of_edges())
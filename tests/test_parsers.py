@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `parsers` module."""
+
+import os
+import zipfile
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+from ndexbiogridloader import parsers
+from ndexbiogridloader.exceptions import NdexBioGRIDLoaderError
+from tests import biogrid_fixtures
+
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class TestParsers(unittest.TestCase):
+    """Tests for `parsers` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._source = biogrid_fixtures.write_rows(os.path.join(self._temp_dir,
+                                                                'x.tab2.txt'),
+                                                   biogrid_fixtures.ORGANISM_HEADER,
+                                                   biogrid_fixtures.get_organism_rows())
+        self._tsv = os.path.join(self._temp_dir, 'x.tsv')
+        with open(self._tsv, 'w') as f:
+            f.write('a\tb\tc\n')
+            f.write('1\t\tx\n')
+            f.write('2\tfoo\ty\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_get_parser_backend(self):
+        self.assertEqual(parsers.PYTHON_PARSER,
+                         parsers.get_parser_backend('python').get_name())
+        try:
+            parsers.get_parser_backend('foo')
+            self.fail('Expected NdexBioGRIDLoaderError')
+        except NdexBioGRIDLoaderError as e:
+            self.assertEqual('Unknown parser: foo', str(e))
+
+    def test_get_parser_backend_arrow_fallback(self):
+        with patch.dict('sys.modules', {'pyarrow': None}):
+            res = parsers.get_parser_backend(parsers.ARROW_PARSER)
+        self.assertEqual(parsers.PYTHON_PARSER, res.get_name())
+
+    def test_python_iter_rows(self):
+        rows = list(parsers.PythonParserBackend().iter_rows(self._source))
+        expected = biogrid_fixtures.get_organism_rows()
+        self.assertEqual(len(expected), len(rows))
+        self.assertEqual(expected[0][:-1], rows[0][:-1])
+        self.assertEqual('BIOGRID\n', rows[0][-1])
+
+    def test_python_iter_rows_with_filter(self):
+        rows = list(parsers.PythonParserBackend().iter_rows(self._source,
+                                                            filter_column=16,
+                                                            filter_values={'10090'}))
+        self.assertEqual(1, len(rows))
+        self.assertEqual('50', rows[0][2][-2:])
+        self.assertEqual([], list(parsers.PythonParserBackend().iter_rows(self._source,
+                                                                          filter_column=15,
+                                                                          filter_values={'1'})))
+
+    def test_python_iter_rows_with_max_column(self):
+        expected = list(parsers.PythonParserBackend().iter_rows(self._source))
+        rows = list(parsers.PythonParserBackend().iter_rows(self._source,
+                                                            max_column=21))
+        self.assertEqual([r[:22] for r in expected], [r[:22] for r in rows])
+        self.assertEqual(23, len(rows[0]))
+        self.assertEqual('-\tBIOGRID\n', rows[0][22])
+        rows = list(parsers.PythonParserBackend().iter_rows(self._source,
+                                                            filter_column=16,
+                                                            filter_values={'10090'},
+                                                            max_column=2))
+        self.assertEqual(1, len(rows))
+        self.assertEqual(4, len(rows[0]))
+
+    def test_iter_rows_from_zip_member(self):
+        zip_file = os.path.join(self._temp_dir, 'x.zip')
+        with zipfile.ZipFile(zip_file, 'w') as zf:
+            zf.write(self._source, 'x.tab2.txt')
+        expected = [r[:-1] for r in parsers.PythonParserBackend().iter_rows(self._source)]
+        backends = [parsers.PythonParserBackend()]
+        if HAS_PYARROW:
+            backends.append(parsers.ArrowParserBackend(block_size=1024))
+        for backend in backends:
+            with zipfile.ZipFile(zip_file) as zf, zf.open('x.tab2.txt') as f:
+                rows = [list(r[:-1]) for r in backend.iter_rows(f)]
+            self.assertEqual(expected, rows)
+
+    def test_python_read_tsv(self):
+        df = parsers.PythonParserBackend().read_tsv(self._tsv, ['a', 'b'],
+                                                    {'a': str,
+                                                     'b': 'category'})
+        self.assertEqual(['a', 'b'], list(df.columns))
+        self.assertEqual('', df['b'][0])
+        self.assertEqual('category', str(df['b'].dtype))
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_arrow_iter_rows_matches_python(self):
+        python_rows = list(parsers.PythonParserBackend().iter_rows(self._source))
+        arrow_rows = list(parsers.ArrowParserBackend(block_size=1024).iter_rows(self._source))
+        self.assertEqual(len(python_rows), len(arrow_rows))
+        for p_row, a_row in zip(python_rows, arrow_rows):
+            self.assertEqual(p_row[:-1], list(a_row[:-1]))
+            self.assertEqual(p_row[-1].rstrip('\n'), a_row[-1])
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_arrow_iter_rows_with_filter_matches_python(self):
+        for filter_values in [{'9606'}, {'10090'}, {'9606', '10090'}, set()]:
+            python_rows = list(parsers.PythonParserBackend().iter_rows(self._source,
+                                                                       filter_column=16,
+                                                                       filter_values=filter_values))
+            arrow_rows = list(parsers.ArrowParserBackend(block_size=1024).iter_rows(self._source,
+                                                                                    filter_column=16,
+                                                                                    filter_values=filter_values))
+            self.assertEqual([r[:-1] for r in python_rows],
+                             [list(r[:-1]) for r in arrow_rows])
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_arrow_iter_rows_with_max_column(self):
+        python_rows = list(parsers.PythonParserBackend().iter_rows(self._source,
+                                                                   filter_column=16,
+                                                                   filter_values={'9606'}))
+        arrow_rows = list(parsers.ArrowParserBackend(block_size=1024).iter_rows(self._source,
+                                                                                filter_column=16,
+                                                                                filter_values={'9606'},
+                                                                                max_column=2))
+        self.assertEqual([r[:17] for r in python_rows],
+                         [list(r) for r in arrow_rows])
+
+    @unittest.skipUnless(HAS_PYARROW, 'requires pyarrow')
+    def test_arrow_read_tsv(self):
+        df = parsers.ArrowParserBackend().read_tsv(self._tsv, ['a', 'b'],
+                                                   {'a': str,
+                                                    'b': 'category'})
+        self.assertEqual(['a', 'b'], list(df.columns))
+        self.assertEqual('1', df['a'][0])
+        self.assertEqual('', df['b'][0])
+        self.assertEqual('foo', df['b'][1])
+        self.assertEqual('category', str(df['b'].dtype))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `planner` module."""
+
+import io
+import os
+import glob
+import json
+import zipfile
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+import ndex2
+
+from ndexbiogridloader import planner
+from ndexbiogridloader.planner import WorkItem
+from ndexbiogridloader.planner import WorkPlanner
+from tests import biogrid_fixtures
+
+
+def _item(name, size):
+    return WorkItem(name, [name], 'organism', size)
+
+
+class TestPlanner(unittest.TestCase):
+    """Tests for `planner` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_get_zip_member_sizes(self):
+        self.assertEqual({}, planner.get_zip_member_sizes(os.path.join(self._temp_dir,
+                                                                       'missing.zip')))
+        bad_zip = os.path.join(self._temp_dir, 'bad.zip')
+        with open(bad_zip, 'w') as f:
+            f.write('not a zip')
+        self.assertEqual({}, planner.get_zip_member_sizes(bad_zip))
+
+        zip_file = os.path.join(self._temp_dir, 'x.zip')
+        with zipfile.ZipFile(zip_file, 'w',
+                             compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('a.txt', 'x' * 1000)
+            zf.writestr('b.txt', '')
+        self.assertEqual({'a.txt': 1000, 'b.txt': 0},
+                         planner.get_zip_member_sizes(zip_file))
+
+    def test_work_item_estimates(self):
+        item = _item('x', planner.SOURCE_BYTES_PER_ROW * 10)
+        self.assertEqual(10, item.get_estimated_rows())
+        self.assertEqual(int(item.get_source_size() *
+                             planner.NETWORK_BYTES_PER_SOURCE_BYTE),
+                         item.get_estimated_memory())
+        res = item.to_dict()
+        self.assertEqual('x', res['name'])
+        self.assertEqual(10, res['estimatedRows'])
+        unknown = _item('y', None)
+        self.assertEqual(0, unknown.get_source_size())
+        self.assertEqual(0, unknown.get_estimated_memory())
+
+    def test_order_largest_first(self):
+        items = [_item('a', 10), _item('b', 30), _item('c', 20),
+                 _item('d', 30)]
+        self.assertEqual(['b', 'd', 'c', 'a'],
+                         [i.get_name() for i in WorkPlanner().order(items)])
+
+    def test_select_next_admission(self):
+        mem = planner.NETWORK_BYTES_PER_SOURCE_BYTE
+        big = _item('big', 100)
+        medium = _item('medium', 60)
+        small = _item('small', 30)
+        work_planner = WorkPlanner(max_workers=2, memory_budget=int(100 * mem))
+        pending = [big, medium, small]
+        self.assertEqual(big, work_planner.select_next(pending, []))
+        # nothing fits alongside big
+        self.assertIsNone(work_planner.select_next([medium, small], [big]))
+        # small is admitted ahead of medium since medium does not fit
+        self.assertEqual(small, work_planner.select_next([medium, small],
+                                                         [_item('other', 50)]))
+        # worker limit
+        self.assertIsNone(work_planner.select_next([small], [small, small]))
+        # item larger then budget runs when nothing else is
+        self.assertEqual(big, WorkPlanner(max_workers=2,
+                                          memory_budget=1).select_next([big], []))
+        # no budget
+        self.assertEqual(medium, WorkPlanner(max_workers=2).select_next([medium],
+                                                                        [big]))
+
+    def test_simulate(self):
+        rate = planner.SOURCE_BYTES_PER_SECOND
+        items = [_item('a', rate), _item('b', rate * 4), _item('c', rate * 2),
+                 _item('d', rate)]
+        schedule, total, peak = WorkPlanner(max_workers=2).simulate(items)
+        self.assertEqual(['b', 'c', 'a', 'd'], [s[0].get_name() for s in schedule])
+        self.assertEqual([0.0, 0.0, 2.0, 3.0], [s[1] for s in schedule])
+        self.assertEqual(4.0, total)
+        self.assertEqual(items[1].get_estimated_memory() +
+                         items[2].get_estimated_memory(), peak)
+
+        # budget only fits one at a time
+        schedule, total, peak = WorkPlanner(max_workers=2,
+                                            memory_budget=1).simulate(items)
+        self.assertEqual(8.0, total)
+        self.assertEqual(items[1].get_estimated_memory(), peak)
+
+    def test_format_plan(self):
+        res = WorkPlanner(max_workers=3).format_plan([_item('foo', 1024 * 1024)])
+        self.assertTrue('foo' in res)
+        self.assertTrue('Workers: 3  Memory budget: unlimited' in res)
+        self.assertTrue('Estimated peak memory' in res)
+
+    def test_run_plan_only(self):
+        biogrid_fixtures.create_release_files(self._temp_dir)
+        loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(self._temp_dir,
+                                                                          extra_args=['--plan-only',
+                                                                                      '--memorybudget',
+                                                                                      '100']))
+        with patch('sys.stdout', new_callable=io.StringIO) as out:
+            self.assertEqual(0, loader.run())
+        res = out.getvalue()
+        self.assertTrue('BIOGRID-ORGANISM-Homo_sapiens' in res)
+        self.assertTrue('BIOGRID-ORGANISM-Mus_musculus' in res)
+        self.assertTrue('BIOGRID-CHEMICALS-9606' in res)
+        self.assertTrue('Memory budget: 100.0 MB' in res)
+        self.assertEqual([], glob.glob(os.path.join(self._temp_dir, '*.cx')))
+
+    def test_get_work_items(self):
+        biogrid_fixtures.create_release_files(self._temp_dir)
+        loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(self._temp_dir))
+        entries = loader._get_organism_or_chemicals_file_content('organism')
+        entries.append(['BIOGRID-ORGANISM-Missing', '"x, 1, y"', 'x'])
+        items = loader._get_work_items(entries, 'organism')
+        self.assertEqual(3, len(items))
+        with zipfile.ZipFile(os.path.join(self._temp_dir, 'organism.zip')) as zf:
+            self.assertEqual(zf.getinfo('BIOGRID-ORGANISM-Homo_sapiens-1.0.0.tab2.txt').file_size,
+                             items[0].get_source_size())
+        self.assertEqual(0, items[2].get_source_size())
+
+    def test_run_with_workers_matches_serial_run(self):
+        results = {}
+        for workers in ['1', '2']:
+            datadir = os.path.join(self._temp_dir, workers)
+            tracefile = os.path.join(self._temp_dir, workers + '.json')
+            biogrid_fixtures.create_release_files(datadir)
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(datadir,
+                                                                              extra_args=['--workers',
+                                                                                          workers,
+                                                                                          '--tracefile',
+                                                                                          tracefile]))
+            self.assertEqual(0, loader.run())
+            results[workers] = {}
+            for cx_file in glob.glob(os.path.join(datadir, '*.cx')):
+                net = ndex2.create_nice_cx_from_file(cx_file)
+                results[workers][os.path.basename(cx_file)] = \
+                    (sorted(str(n) for n in net.get_nodes()),
+                     sorted(str(e) for e in net.get_edges()))
+            with open(tracefile, 'r') as f:
+                events = json.load(f)['traceEvents']
+            results[workers + 'pids'] = set(e['pid'] for e in events
+                                            if e.get('name') == 'convert' and
+                                            e['args']['entry'].startswith('BIOGRID-ORGANISM'))
+        self.assertEqual(3, len(results['1']))
+        self.assertEqual(results['1'], results['2'])
+        self.assertEqual(1, len(results['1pids']))
+        # organisms were converted in worker processes
+        self.assertEqual(2, len(results['2pids']))
+        self.assertFalse(os.getpid() in results['2pids'])
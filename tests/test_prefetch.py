@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `prefetch` module."""
+
+import os
+import time
+import shutil
+import zipfile
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from ndexbiogridloader import prefetch
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader.prefetch import MemberPrefetcher
+
+from tests import biogrid_fixtures
+
+
+class TestPrefetch(unittest.TestCase):
+    """Tests for `prefetch` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._zip_file = os.path.join(self._temp_dir, 'files.zip')
+        with zipfile.ZipFile(self._zip_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for i in range(5):
+                zf.writestr('m' + str(i) + '.txt', ('line ' + str(i) + '\n') * 1000)
+        self._dest_dir = os.path.join(self._temp_dir, 'out')
+        os.makedirs(self._dest_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _wait_for(self, started, count):
+        deadline = time.time() + 10
+        while len(started) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_get_extracts_ahead_in_order(self):
+        started = []
+        gate = threading.Event()
+        extract = MemberPrefetcher._extract
+
+        def _extract(prefetcher, member):
+            started.append(member)
+            gate.wait(10)
+            return extract(prefetcher, member)
+
+        members = ['m' + str(i) + '.txt' for i in range(5)]
+        with patch.object(MemberPrefetcher, '_extract', _extract):
+            with MemberPrefetcher(self._zip_file, members, self._dest_dir,
+                                  ahead=2) as prefetcher:
+                self._wait_for(started, 2)
+                time.sleep(0.1)
+                self.assertEqual(['m0.txt', 'm1.txt'], sorted(started))
+                gate.set()
+                for member in members[:3]:
+                    path = prefetcher.get(member)
+                    self.assertEqual(os.path.join(self._dest_dir, member), path)
+                    with open(path, 'r') as f:
+                        self.assertEqual(1000, len(f.readlines()))
+                self._wait_for(started, 5)
+                self.assertEqual(members, started)
+                self.assertIsNone(prefetcher.get('m0.txt'))
+                self.assertIsNone(prefetcher.get('other.txt'))
+        self.assertEqual([], [f for f in os.listdir(self._dest_dir)
+                              if f.endswith(prefetch.PREFETCH_SUFFIX)])
+
+    def test_get_out_of_order_and_errors(self):
+        with MemberPrefetcher(self._zip_file, ['m0.txt', 'missing.txt',
+                                               'm4.txt'],
+                              self._dest_dir) as prefetcher:
+            self.assertEqual(os.path.join(self._dest_dir, 'm4.txt'),
+                             prefetcher.get('m4.txt'))
+            with self.assertRaises(KeyError):
+                prefetcher.get('missing.txt')
+            self.assertEqual(os.path.join(self._dest_dir, 'm0.txt'),
+                             prefetcher.get('m0.txt'))
+        self.assertEqual(['m0.txt', 'm4.txt'], sorted(os.listdir(self._dest_dir)))
+
+    def test_parse_arguments(self):
+        args = ndexloadbiogrid._parse_arguments('desc', [self._temp_dir])
+        self.assertEqual(1, args.prefetch)
+        with self.assertRaises(SystemExit):
+            ndexloadbiogrid._parse_arguments('desc', [self._temp_dir,
+                                                      '--prefetch', '-1'])
+
+    def test_run_uses_prefetched_files(self):
+        biogrid_fixtures.create_release_files(self._dest_dir)
+        outputs = {}
+        for num in ['0', '2']:
+            args = biogrid_fixtures.get_args(self._dest_dir,
+                                             extra_args=['--prefetch', num])
+            loader = biogrid_fixtures.create_loader(args)
+            with patch.object(loader, '_apply_simple_spring_layout'),\
+                    patch.object(MemberPrefetcher, 'get',
+                                 autospec=True,
+                                 side_effect=MemberPrefetcher.get) as mock_get:
+                self.assertEqual(0, loader.run())
+            self.assertIsNone(loader._prefetcher)
+            outputs[num] = {}
+            for name in os.listdir(self._dest_dir):
+                if name.endswith('.cx'):
+                    with open(os.path.join(self._dest_dir, name), 'r') as f:
+                        outputs[num][name] = f.read()
+            if num == '0':
+                mock_get.assert_not_called()
+            else:
+                self.assertEqual(['BIOGRID-ORGANISM-Homo_sapiens-1.0.0.tab2.txt',
+                                  'BIOGRID-ORGANISM-Mus_musculus-1.0.0.tab2.txt'],
+                                 sorted(c[0][1] for c in mock_get.call_args_list))
+        self.assertEqual(3, len(outputs['0']))
+        self.assertEqual(outputs['0'], outputs['2'])
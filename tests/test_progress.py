@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `progress` module."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ndexbiogridloader import progress
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader.progress import StageProgress
+from ndexbiogridloader.progress import ProgressReader
+
+from tests import biogrid_fixtures
+
+
+class _Clock(object):
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgress(unittest.TestCase):
+    """Tests for `progress` module."""
+
+    def test_logs_rate_and_eta(self):
+        clock = _Clock()
+        with self.assertLogs('ndexbiogridloader.progress', level='INFO') as logs:
+            with StageProgress('download', name='organism.zip', total=1000,
+                               log_interval=10, clock=clock) as stage:
+                clock.now += 5
+                stage.update(100)
+                self.assertEqual(20.0, stage.get_rate())
+                self.assertEqual(45.0, stage.get_eta())
+                clock.now += 5
+                stage.update(100)
+                clock.now += 1
+                stage.update(300)
+                clock.now += 9
+                stage.update(0)
+                self.assertEqual(500, stage.get_done())
+        self.assertEqual(['progress stage=download name="organism.zip" '
+                          'done=200 total=1000 unit=B rate=20.0/s eta=40s',
+                          'progress stage=download name="organism.zip" '
+                          'done=500 total=1000 unit=B rate=25.0/s eta=20s',
+                          'progress stage=download name="organism.zip" '
+                          'done=500 total=1000 unit=B rate=25.0/s '
+                          'status=done'],
+                         [r.getMessage() for r in logs.records])
+
+    def test_unknown_total(self):
+        clock = _Clock()
+        stage = StageProgress('parse', unit='rows', clock=clock)
+        self.assertIsNone(stage.get_rate())
+        clock.now += 2
+        stage.update(10)
+        self.assertIsNone(stage.get_eta())
+        with self.assertLogs('ndexbiogridloader.progress', level='INFO') as logs:
+            stage.close()
+            stage.close()
+        self.assertEqual(['progress stage=parse done=10 unit=rows '
+                          'rate=5.0/s status=done'],
+                         [r.getMessage() for r in logs.records])
+
+    def test_progress_reader_and_helpers(self):
+        stage = StageProgress('decompress', log_interval=3600)
+        reader = ProgressReader(io.BytesIO(b'a\nbb\nccc\n'), stage)
+        self.assertEqual(b'a\n', reader.readline())
+        self.assertEqual(0, stage.get_done())
+        self.assertEqual(b'bb', reader.read(2))
+        self.assertEqual([b'\n', b'ccc\n'], list(reader))
+        self.assertEqual(7, stage.get_done())
+
+        target = io.BytesIO()
+        progress.copy_with_progress(io.BytesIO(b'x' * 10), target, stage,
+                                    buffer_size=3)
+        self.assertEqual(b'x' * 10, target.getvalue())
+        self.assertEqual(17, stage.get_done())
+
+        with patch.object(stage, 'update') as mock_update:
+            self.assertEqual(list(range(5)),
+                             list(progress.iter_with_progress(range(5), stage,
+                                                              batch=2)))
+        self.assertEqual([2, 2, 1], [c[0][0] for c in mock_update.call_args_list])
+
+    def test_parse_arguments(self):
+        args = ndexloadbiogrid._parse_arguments('desc', ['datadir'])
+        self.assertEqual(progress.LOG_INTERVAL, args.progressinterval)
+
+    def test_run_logs_every_stage(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            biogrid_fixtures.create_release_files(temp_dir)
+            args = biogrid_fixtures.get_args(temp_dir,
+                                             extra_args=['--progressinterval',
+                                                         '3600'])
+            loader = biogrid_fixtures.create_loader(args)
+            with patch.object(loader, '_apply_simple_spring_layout'),\
+                    self.assertLogs('ndexbiogridloader.progress',
+                                    level='INFO') as logs:
+                self.assertEqual(0, loader.run())
+            lines = [r.getMessage() for r in logs.records]
+            self.assertTrue(all(line.endswith(' status=done') for line in lines))
+            stages = {}
+            for line in lines:
+                stage = line.split(' ')[1]
+                stages[stage] = stages.get(stage, 0) + 1
+            # an organism and chemicals file decompressed and parsed
+            # and 3 networks collapsed
+            self.assertEqual({'stage=decompress': 3, 'stage=parse': 3,
+                              'stage=collapse': 3}, stages)
+            self.assertIn('progress stage=decompress '
+                          'name="BIOGRID-ORGANISM-Homo_sapiens-1.0.0.tab2.txt" '
+                          'done=' +
+                          str(os.path.getsize(os.path.join(temp_dir,
+                                                           'BIOGRID-ORGANISM-'
+                                                           'Homo_sapiens-1.0.0.tab2.txt'))),
+                          '\n'.join(lines))
+        finally:
+            shutil.rmtree(temp_dir)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sampling` module."""
+
+import os
+import json
+import shutil
+import tempfile
+import argparse
+import unittest
+from unittest.mock import patch
+
+from ndexbiogridloader import sampling
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader.sampling import RowSampler
+
+from tests import biogrid_fixtures
+
+
+def _row(row_id, gene_a, gene_b):
+    return [str(row_id), str(gene_a), str(gene_b)]
+
+
+class TestSampling(unittest.TestCase):
+    """Tests for `sampling` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_parse_sample(self):
+        self.assertEqual((0.25, None), sampling.parse_sample('0.25'))
+        self.assertEqual((None, 5000), sampling.parse_sample('5000'))
+        for value in ['0', '1.0', '-2', '0.0', 'x']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                sampling.parse_sample(value)
+
+    def test_parse_arguments(self):
+        args = ndexloadbiogrid._parse_arguments('desc', [self._temp_dir])
+        self.assertIsNone(args.sample)
+        self.assertFalse(args.skipupload)
+        args = ndexloadbiogrid._parse_arguments('desc', [self._temp_dir,
+                                                         '--sample', '100'])
+        self.assertEqual((None, 100), args.sample)
+        self.assertEqual(0, args.sampleseed)
+        self.assertTrue(args.skipupload)
+        args = ndexloadbiogrid._parse_arguments('desc', [self._temp_dir,
+                                                         '--sample', '0.1',
+                                                         '--sampleupload'])
+        self.assertFalse(args.skipupload)
+
+    def test_fraction_is_deterministic(self):
+        rows = [_row(i, i, i + 1) for i in range(2000)]
+        kept = []
+        for seed in [1, 1, 2]:
+            sampler = RowSampler(fraction=0.1, seed=seed)
+            kept.append([r[0] for r in rows if sampler.keep(r)])
+            self.assertEqual(2000, sampler.get_num_rows())
+            self.assertEqual(len(kept[-1]), sampler.get_num_kept())
+        self.assertEqual(kept[0], kept[1])
+        self.assertNotEqual(kept[0], kept[2])
+        self.assertTrue(100 < len(kept[0]) < 300)
+
+        # same rows are kept regardless of order
+        sampler = RowSampler(fraction=0.1, seed=1)
+        self.assertEqual(sorted(kept[0]),
+                         sorted(r[0] for r in reversed(rows)
+                                if sampler.keep(r)))
+
+    def test_max_rows(self):
+        sampler = RowSampler(max_rows=3)
+        self.assertEqual(['0', '1', '2'],
+                         [r[0] for r in [_row(i, i, i + 1) for i in range(10)]
+                          if sampler.keep(r)])
+        self.assertEqual([('sampleMaxRows', 3, 'integer'),
+                          ('sampleNeighborhoods', False, 'boolean'),
+                          ('sampleRows', 3, 'integer'),
+                          ('sourceRows', 10, 'integer')],
+                         sampler.get_network_attributes())
+        self.assertTrue(sampler.is_done())
+        self.assertFalse(RowSampler(fraction=0.5).is_done())
+        sampler = RowSampler(max_rows=1, gene_columns=[1])
+        sampler.keep(_row(0, 0, 1))
+        self.assertFalse(sampler.is_done())
+
+    def test_neighborhoods(self):
+        rows = [_row(i, i % 50, 50 + i % 7) for i in range(500)]
+        sampler = RowSampler(fraction=0.2, seed=3, gene_columns=[1])
+        kept = [r for r in rows if sampler.keep(r)]
+        self.assertTrue(0 < len(kept) < len(rows))
+        # every row of a sampled gene is kept
+        genes = {r[1] for r in kept}
+        self.assertEqual([r for r in rows if r[1] in genes], kept)
+        self.assertIn(('sampleNeighborhoods', True, 'boolean'),
+                      sampler.get_network_attributes())
+
+        # a number of rows samples genes of the first rows
+        sampler = RowSampler(max_rows=2, gene_columns=[1, 2])
+        kept = [r for r in rows if sampler.keep(r)]
+        self.assertEqual([r for r in rows if r[1] in ('0', '1') or
+                          r[2] in ('50', '51')], kept)
+
+    def _read_network_attributes(self, path):
+        with open(path, 'r') as f:
+            aspects = json.load(f)
+        attributes = {}
+        for aspect in aspects:
+            for attr in aspect.get('networkAttributes', []):
+                attributes[attr['n']] = attr['v']
+        return attributes
+
+    def test_run_with_sample(self):
+        biogrid_fixtures.create_release_files(self._temp_dir)
+        cachedir = os.path.join(self._temp_dir, 'cache')
+        args = biogrid_fixtures.get_args(self._temp_dir,
+                                         extra_args=['--sample', '0.5',
+                                                     '--sampleseed', '4',
+                                                     '--cachedir', cachedir,
+                                                     '--interactionindex',
+                                                     os.path.join(self._temp_dir,
+                                                                  'index.db')])
+        loader = biogrid_fixtures.create_loader(args)
+        with patch.object(loader, '_apply_simple_spring_layout'):
+            self.assertEqual(0, loader.run())
+        self.assertFalse(os.path.exists(cachedir))
+        self.assertFalse(os.path.exists(os.path.join(self._temp_dir,
+                                                     'index.db')))
+        cx_files = sorted(f for f in os.listdir(self._temp_dir)
+                          if f.endswith('.cx'))
+        self.assertEqual(3, len(cx_files))
+        for cx_file in cx_files:
+            attributes = self._read_network_attributes(os.path.join(self._temp_dir,
+                                                                    cx_file))
+            self.assertTrue(attributes['name'].endswith(ndexloadbiogrid.SAMPLE_NAME_SUFFIX))
+            self.assertEqual(0.5, attributes['sampleFraction'])
+            self.assertEqual(4, attributes['sampleSeed'])
+            self.assertFalse(attributes['sampleNeighborhoods'])
+            self.assertTrue(0 < attributes['sampleRows'] <
+                            attributes['sourceRows'])
+
+    def test_run_with_max_rows_stops_reading(self):
+        biogrid_fixtures.create_release_files(self._temp_dir)
+        args = biogrid_fixtures.get_args(self._temp_dir,
+                                         extra_args=['--sample', '1'])
+        loader = biogrid_fixtures.create_loader(args)
+        with patch.object(loader, '_apply_simple_spring_layout'):
+            self.assertEqual(0, loader.run())
+        cx_files = sorted(f for f in os.listdir(self._temp_dir)
+                          if f.endswith('.cx'))
+        self.assertEqual(3, len(cx_files))
+        for cx_file in cx_files:
+            attributes = self._read_network_attributes(os.path.join(self._temp_dir,
+                                                                    cx_file))
+            self.assertEqual(1, attributes['sampleRows'])
+            if 'ORGANISM' in cx_file:
+                # rows after the first are not read
+                self.assertEqual(1, attributes['sourceRows'])
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `service` module."""
+
+import os
+import json
+import tempfile
+import shutil
+import threading
+import unittest
+import urllib.parse
+import urllib.request
+import urllib.error
+from unittest.mock import patch
+from unittest.mock import MagicMock
+
+import ndex2
+
+from ndexbiogridloader import service
+from tests import biogrid_fixtures
+
+
+class TestService(unittest.TestCase):
+    """Tests for `service` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        version_dir = os.path.join(self._temp_dir, '1.0.0')
+        biogrid_fixtures.create_release_files(version_dir)
+        args = biogrid_fixtures.get_args(version_dir)
+        args.datadir = self._temp_dir
+        self._service = service.LoaderService(args, biogrid_fixtures.create_loader)
+        self._server = service.create_server(self._service, port=0)
+        self._url = 'http://127.0.0.1:' + str(self._server.server_address[1])
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.start()
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        shutil.rmtree(self._temp_dir)
+
+    def _request(self, path, data=None):
+        if data is not None and not isinstance(data, bytes):
+            data = json.dumps(data).encode('utf-8')
+        try:
+            with urllib.request.urlopen(self._url + path, data=data) as res:
+                return res.status, json.loads(res.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read().decode('utf-8'))
+
+    def test_status_and_names(self):
+        status, res = self._request(service.STATUS_PATH)
+        self.assertEqual(200, status)
+        self.assertEqual('1.0.0', res['defaultBiogridVersion'])
+        self.assertEqual(0, res['builds'])
+
+        status, res = self._request(service.NETWORKS_PATH)
+        self.assertEqual(200, status)
+        self.assertEqual(['BIOGRID-ORGANISM-Homo_sapiens',
+                          'BIOGRID-ORGANISM-Mus_musculus',
+                          'BIOGRID-CHEMICALS-9606'], res['names'])
+
+        status, res = self._request('/nope')
+        self.assertEqual(404, status)
+
+    def test_build_reuses_loader(self):
+        cx_file = os.path.join(self._temp_dir, '1.0.0',
+                               'BIOGRID-ORGANISM-Homo_sapiens-1.0.0.cx')
+        with patch('ndex2.create_nice_cx_from_file',
+                   wraps=ndex2.create_nice_cx_from_file) as mock_create:
+            for i in range(2):
+                if os.path.isfile(cx_file):
+                    os.unlink(cx_file)
+                status, res = self._request(service.NETWORKS_PATH,
+                                            {'name': 'BIOGRID-ORGANISM-Homo_sapiens'})
+                self.assertEqual(200, status)
+                self.assertEqual(0, res['exitCode'])
+                self.assertEqual('1.0.0', res['version'])
+                self.assertEqual('organism', res['type'])
+                self.assertTrue(os.path.isfile(cx_file))
+            status, res = self._request(service.NETWORKS_PATH,
+                                        {'name': 'BIOGRID-CHEMICALS-9606',
+                                         'version': '1.0.0'})
+            self.assertEqual(200, status)
+            self.assertEqual('chemicals', res['type'])
+            # style templates are only parsed by first build
+            self.assertEqual(2, mock_create.call_count)
+
+        loader = self._service._loaders['1.0.0']
+        self.assertEqual(['chemical', 'organism'], sorted(loader._load_plans.keys()))
+        status, res = self._request(service.STATUS_PATH)
+        self.assertEqual(3, res['builds'])
+        self.assertEqual(0, res['failedBuilds'])
+        self.assertEqual(['1.0.0'], res['loadedBiogridVersions'])
+
+    def test_build_bad_requests(self):
+        status, res = self._request(service.NETWORKS_PATH, {'name': 'foo'})
+        self.assertEqual(404, status)
+        self.assertTrue('foo' in res['error'])
+
+        status, res = self._request(service.NETWORKS_PATH, b'not json')
+        self.assertEqual(400, status)
+
+        status, res = self._request(service.NETWORKS_PATH, {'x': 'y'})
+        self.assertEqual(400, status)
+
+    def test_invalid_versions(self):
+        for version in ['../../etc', '/tmp/evil', '1', '1.0.x']:
+            status, res = self._request(service.NETWORKS_PATH,
+                                        {'name': 'BIOGRID-CHEMICALS-9606',
+                                         'version': version})
+            self.assertEqual(400, status)
+            self.assertTrue('version' in res['error'])
+            status, res = self._request(service.NETWORKS_PATH + '?version=' +
+                                        urllib.parse.quote(version))
+            self.assertEqual(400, status)
+        self.assertEqual(['1.0.0'], os.listdir(self._temp_dir))
+        status, res = self._request(service.STATUS_PATH)
+        self.assertEqual([], res['loadedBiogridVersions'])
+
+    def test_get_names_error(self):
+        with patch.object(self._service, 'get_names',
+                          side_effect=IOError('no organism file')):
+            status, res = self._request(service.NETWORKS_PATH)
+        self.assertEqual(500, status)
+        self.assertEqual('no organism file', res['error'])
+
+    def test_keeps_only_ready_loaders(self):
+        loaders = []
+
+        def create_loader(args):
+            loader = MagicMock()
+            loader.is_ready.return_value = args.biogridversion != '9.9.9'
+            loader.build_network.return_value = (MagicMock(), 0, 0.0)
+            loaders.append(loader)
+            return loader
+
+        loader_service = service.LoaderService(self._service._args,
+                                               create_loader)
+        loader_service.get_names('1.0.0')
+        loader_service.build('x', version='9.9.9')
+        self.assertEqual([], loader_service.get_status()['loadedBiogridVersions'])
+        for version in ['1.0.0', '2.0.0', '1.0.0', '3.0.0']:
+            loader_service.build('x', version=version)
+        self.assertEqual(5, len(loaders))
+        self.assertEqual(['1.0.0', '3.0.0'],
+                         loader_service.get_status()['loadedBiogridVersions'])
+        # loaders used once, not set up or evicted are closed
+        self.assertEqual([True, True, False, True, False],
+                         [loader.close.called for loader in loaders])
+
+    def test_get_names_during_build(self):
+        building = threading.Event()
+        finish = threading.Event()
+
+        def build_network(name):
+            building.set()
+            finish.wait(10)
+            return MagicMock(), 0, 0.0
+
+        loader = MagicMock()
+        loader.is_ready.return_value = True
+        loader.build_network.side_effect = build_network
+        loader.get_work_item_names.return_value = ['x']
+        loader_service = service.LoaderService(self._service._args,
+                                               lambda args: loader)
+        finish.set()
+        loader_service.build('x')
+        finish.clear()
+        building.clear()
+        thread = threading.Thread(target=loader_service.build, args=('x',))
+        thread.start()
+        try:
+            self.assertTrue(building.wait(10))
+            self.assertEqual(['x'], loader_service.get_names())
+            self.assertEqual(1, loader_service.get_status()['builds'])
+        finally:
+            finish.set()
+            thread.join()
+        self.assertEqual(2, loader_service.get_status()['builds'])
+        self.assertFalse(loader.close.called)
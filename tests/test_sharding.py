@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sharding` module."""
+
+import io
+import os
+import glob
+import json
+import argparse
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+from ndexbiogridloader import sharding
+from ndexbiogridloader import ndexloadbiogrid
+from ndexbiogridloader.planner import WorkItem
+from tests import biogrid_fixtures
+
+
+def _item(name, size, type='organism'):
+    return WorkItem(name, [name], type, size)
+
+
+class TestSharding(unittest.TestCase):
+    """Tests for `sharding` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_parse_shard(self):
+        self.assertEqual((1, 1), sharding.parse_shard('1/1'))
+        self.assertEqual((3, 4), sharding.parse_shard('3/4'))
+        for value in ['0/4', '5/4', '1/0', 'x', '1', '1/2/3', 'a/b']:
+            try:
+                sharding.parse_shard(value)
+                self.fail('Expected ArgumentTypeError for ' + value)
+            except argparse.ArgumentTypeError:
+                pass
+
+    def test_assign_shards_balanced_and_stable(self):
+        items = [_item('a', 10), _item('b', 70), _item('c', 20),
+                 _item('d', 30), _item('e', 40), _item('f', 20, 'chemicals')]
+        shards = sharding.assign_shards(items, 2)
+        self.assertEqual([['b', 'f', 'a'], ['e', 'd', 'c']],
+                         [[i.get_name() for i in shard] for shard in shards])
+        self.assertEqual([100, 90], [sum(i.get_source_size() for i in shard)
+                                     for shard in shards])
+        # input order does not matter
+        shuffled = sharding.assign_shards(list(reversed(items)), 2)
+        self.assertEqual([[i.get_name() for i in shard] for shard in shards],
+                         [[i.get_name() for i in shard] for shard in shuffled])
+        # more shards then items
+        shards = sharding.assign_shards(items[:2], 4)
+        self.assertEqual([1, 1, 0, 0], [len(shard) for shard in shards])
+
+    def test_run_report(self):
+        report = sharding.RunReport('1.0', shard=(2, 3))
+        report.add_entry(_item('a', 10), 0, 1.23456, peak_memory=2048)
+        res = report.to_dict(0)
+        self.assertEqual('1.0', res['biogridVersion'])
+        self.assertEqual(2, res['shard'])
+        self.assertEqual(3, res['numShards'])
+        self.assertEqual(0, res['exitCode'])
+        self.assertEqual('a', res['entries'][0]['name'])
+        self.assertEqual(1.235, res['entries'][0]['seconds'])
+        self.assertEqual(2048, res['entries'][0]['peakMemoryBytes'])
+
+        res = sharding.RunReport('1.0').to_dict(None)
+        self.assertIsNone(res['shard'])
+        self.assertEqual(1, res['numShards'])
+        self.assertIsNone(res['exitCode'])
+
+    def _get_report(self, shard, num_shards, exit_code, names, version='1.0'):
+        report = sharding.RunReport(version, shard=(shard, num_shards))
+        for name in names:
+            report.add_entry(_item(name, 1), exit_code or 0, 1)
+        return report.to_dict(exit_code)
+
+    def test_merge_reports(self):
+        reports = [self._get_report(2, 2, 0, ['b']),
+                   self._get_report(1, 2, 0, ['a'])]
+        res = sharding.merge_reports(reports)
+        self.assertEqual(0, res['exitCode'])
+        self.assertEqual([1, 2], res['shards'])
+        self.assertEqual(['a', 'b'], [e['name'] for e in res['entries']])
+        self.assertEqual([], res['errors'])
+
+        # shard with failing upload
+        res = sharding.merge_reports([self._get_report(1, 2, 0, ['a']),
+                                      self._get_report(2, 2, 9, ['b'])])
+        self.assertEqual(9, res['exitCode'])
+
+        # missing shard
+        res = sharding.merge_reports([self._get_report(1, 3, 0, ['a'])])
+        self.assertEqual(2, res['exitCode'])
+        self.assertEqual([2, 3], res['missingShards'])
+
+        # shard that did not finish
+        res = sharding.merge_reports([self._get_report(1, 2, 0, ['a']),
+                                      self._get_report(2, 2, None, [])])
+        self.assertEqual(2, res['exitCode'])
+
+        # duplicate shard and different version
+        res = sharding.merge_reports([self._get_report(1, 2, 0, ['a']),
+                                      self._get_report(1, 2, 0, ['a']),
+                                      self._get_report(2, 2, 0, ['b'],
+                                                       version='2.0')])
+        self.assertEqual(2, res['exitCode'])
+        self.assertEqual(2, len(res['errors']))
+
+    def test_run_shards_and_merge_reports(self):
+        biogrid_fixtures.create_release_files(self._temp_dir)
+        built = []
+        for shard in ['1/2', '2/2']:
+            loader = biogrid_fixtures.create_loader(biogrid_fixtures.get_args(self._temp_dir,
+                                                                              extra_args=['--shard',
+                                                                                          shard]))
+            self.assertEqual(0, loader.run())
+            cx_files = set(glob.glob(os.path.join(self._temp_dir, '*.cx')))
+            shard_files = cx_files.difference(*built) if built else cx_files
+            self.assertTrue(len(shard_files) > 0)
+            built.append(shard_files)
+        self.assertEqual(3, len(built[0]) + len(built[1]))
+
+        reports = sorted(glob.glob(os.path.join(self._temp_dir,
+                                                'run_report_shard_*_of_2.json')))
+        self.assertEqual(2, len(reports))
+        with open(reports[0], 'r') as f:
+            report = json.load(f)
+        self.assertEqual(1, report['shard'])
+        self.assertEqual(len(built[0]), len(report['entries']))
+
+        merged_file = os.path.join(self._temp_dir, 'merged.json')
+        with patch('sys.stdout', new_callable=io.StringIO) as out:
+            res = ndexloadbiogrid.main(['ndexloadbiogrid.py', self._temp_dir,
+                                        '--reportfile', merged_file,
+                                        '--mergereports'] + reports)
+        self.assertEqual(0, res)
+        self.assertTrue('3 networks, 0 failed' in out.getvalue())
+        with open(merged_file, 'r') as f:
+            self.assertEqual(3, len(json.load(f)['entries']))
+
+        # missing report for second shard
+        with patch('sys.stdout', new_callable=io.StringIO) as out:
+            res = ndexloadbiogrid.main(['ndexloadbiogrid.py', self._temp_dir,
+                                        '--mergereports', reports[0],
+                                        os.path.join(self._temp_dir, 'nope.json')])
+        self.assertEqual(2, res)
+        self.assertTrue('Missing reports for shards: 2' in out.getvalue())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `standin` module."""
+
+import io
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from ndex2.client import Ndex2
+
+from ndexbiogridloader import standin
+from ndexbiogridloader import ndexloadbiogrid
+
+
+class TestStandIn(unittest.TestCase):
+    """Tests for `standin` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._servers = []
+
+    def tearDown(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(self._temp_dir)
+
+    def _start(self, stand_in):
+        server = standin.create_server(stand_in)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._servers.append(server)
+        return 'http://127.0.0.1:' + str(server.server_address[1])
+
+    def _get_stream(self, name, cx2=False):
+        if cx2:
+            cx = [{'CXVersion': '2.0', 'hasFragments': False},
+                  {'networkAttributes': [{'name': name}]}]
+        else:
+            cx = [{'networkAttributes': [{'n': 'description', 'v': 'x'},
+                                         {'n': 'name', 'v': name}]}]
+        return io.BytesIO(json.dumps(cx).encode('utf-8'))
+
+    def test_get_network_name(self):
+        self.assertEqual('foo', standin.get_network_name(self._get_stream('foo').read()))
+        self.assertEqual('foo', standin.get_network_name(self._get_stream('foo',
+                                                                          cx2=True).read()))
+        self.assertIsNone(standin.get_network_name(b'[{"nodes": []}]'))
+        self.assertIsNone(standin.get_network_name(b'[{"networkAttributes": [{"n'))
+
+    def test_ndex_client(self):
+        stand_in = standin.NDExStandIn(users={'bob': 'pw', 'joe': 'pw2'})
+        host = self._start(stand_in)
+        client = Ndex2(host=host, username='bob', password='pw')
+        url = client.save_cx_stream_as_new_network(self._get_stream('foo'))
+        network_id = url.split('/')[-1]
+        summaries = client.get_network_summaries_for_user('bob')
+        self.assertEqual([('foo', network_id)],
+                         [(s['name'], s['externalId']) for s in summaries])
+        self.assertEqual([], client.get_network_summaries_for_user('joe'))
+
+        client.update_cx_network(self._get_stream('bar'), network_id)
+        url = client.save_cx2_stream_as_new_network(self._get_stream('cx2', cx2=True))
+        self.assertTrue(url.startswith(host + '/v3/networks/'))
+        networks = stand_in.get_networks()
+        self.assertEqual('bar', networks[network_id]['name'])
+        self.assertEqual('cx2', networks[url.split('/')[-1]]['format'])
+
+        # other users and bad passwords cannot update
+        other = Ndex2(host=host, username='joe', password='pw2')
+        with self.assertRaises(Exception):
+            other.update_cx_network(self._get_stream('x'), network_id)
+        other = Ndex2(host=host, username='bob', password='wrong')
+        with self.assertRaises(Exception):
+            other.save_cx_stream_as_new_network(self._get_stream('x'))
+        self.assertEqual([201, 204, 201, 404, 401],
+                         [u['status'] for u in stand_in.get_uploads()])
+        self.assertEqual({'uploads': 5, 'failedUploads': 2,
+                          'bytes': sum(u['bytes'] for u in stand_in.get_uploads())},
+                         stand_in.get_stats())
+
+    def test_bandwidth(self):
+        stand_in = standin.NDExStandIn(users={'bob': 'pw'}, bandwidth=1048576)
+        client = Ndex2(host=self._start(stand_in), username='bob', password='pw')
+        start = time.time()
+        client.save_cx_stream_as_new_network(io.BytesIO(b' ' * 262144))
+        self.assertTrue(time.time() - start >= 0.2)
+
+    def test_loader_retries_and_updates(self):
+        stand_in = standin.NDExStandIn(users={'bob': 'pw'}, fail_first=1)
+        host = self._start(stand_in)
+        conf = os.path.join(self._temp_dir, 'conf')
+        with open(conf, 'w') as f:
+            f.write('[ndexbiogridloader]\nuser = bob\npassword = pw\n'
+                    'server = ' + host + '\n')
+        args = ndexloadbiogrid._parse_arguments('desc', [self._temp_dir,
+                                                         '--conf', conf,
+                                                         '--maxretries', '2',
+                                                         '--retry_sleep', '0'])
+        loader = ndexloadbiogrid.NdexBioGRIDLoader(args)
+        loader._parse_config()
+        loader._create_ndex_connection()
+        cxfile = os.path.join(self._temp_dir, 'net.cx')
+        with open(cxfile, 'wb') as f:
+            f.write(self._get_stream('Net').read())
+
+        self.assertEqual(({}, 0), loader._load_network_summaries_for_user())
+        self.assertEqual(0, loader._upload_cx(cxfile, 'Net'))
+        self.assertEqual([500, 201], [u['status'] for u in stand_in.get_uploads()])
+
+        summaries, status_code = loader._load_network_summaries_for_user()
+        self.assertEqual(list(stand_in.get_networks().keys()),
+                         list(summaries.values()))
+        self.assertEqual(0, loader._upload_cx(cxfile, 'Net'))
+        self.assertEqual(204, stand_in.get_uploads()[-1]['status'])
+        self.assertEqual(1, len(stand_in.get_networks()))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `targets` module."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ndexbiogridloader import targets
+from ndexbiogridloader.targets import UploadTarget
+
+
+class TestTargets(unittest.TestCase):
+    """Tests for `targets` module."""
+
+    def test_parse_profiles(self):
+        self.assertEqual(['a'], targets.parse_profiles('a'))
+        self.assertEqual(['a', 'b'], targets.parse_profiles('a, b,,a'))
+        self.assertEqual([], targets.parse_profiles(''))
+
+    def test_connect(self):
+        target = UploadTarget('foo', server='s', user='u', password='p')
+        self.assertEqual('foo', target.get_profile())
+        with patch('ndex2.client.Ndex2') as mock_ndex2:
+            ndex = target.connect('agent')
+            self.assertEqual(mock_ndex2.return_value, ndex)
+            mock_ndex2.assert_called_once_with(host='s', username='u',
+                                               password='p',
+                                               user_agent='agent')
+            # connection is reused
+            self.assertEqual(ndex, target.connect('agent'))
+            self.assertEqual(1, mock_ndex2.call_count)
+
+        target = UploadTarget('foo')
+        with patch('ndex2.client.Ndex2', side_effect=Exception('error')):
+            self.assertIsNone(target.connect('agent'))
+        self.assertFalse(target.is_available())
+        self.assertEqual((None, 2), target.load_network_summaries())
+
+    def test_load_network_summaries(self):
+        target = UploadTarget('foo', user='u')
+        target.set_ndex(MagicMock())
+        target.get_ndex().get_network_summaries_for_user.return_value = \
+            [{'name': 'Net', 'externalId': '123'}, {'externalId': '456'}]
+        self.assertEqual(({'NET': '123'}, 0), target.load_network_summaries())
+        self.assertTrue(target.is_available())
+        target.get_ndex().get_network_summaries_for_user.assert_called_with('u')
+        self.assertEqual('123', target.get_network_uuid('net'))
+        self.assertIsNone(target.get_network_uuid('other'))
+
+        target.get_ndex().get_network_summaries_for_user.side_effect = \
+            Exception('error')
+        self.assertEqual((None, 2), target.load_network_summaries())
+        self.assertIsNone(target.get_network_uuid('net'))
+        self.assertFalse(target.is_available())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `tracing` module."""
+
+import os
+import json
+import tempfile
+import shutil
+import unittest
+
+from ndexbiogridloader.tracing import TraceRecorder
+from tests import biogrid_fixtures
+
+
+class TestTracing(unittest.TestCase):
+    """Tests for `tracing` module."""
+
+    def test_span_disabled(self):
+        tracer = TraceRecorder(enabled=False)
+        with tracer.span('foo'):
+            pass
+        self.assertFalse(tracer.is_enabled())
+        self.assertEqual([], tracer.get_events())
+
+    def test_span_records_complete_event(self):
+        tracer = TraceRecorder()
+        with tracer.span('unzip', args={'entry': 'x'}):
+            pass
+        events = tracer.get_events()
+        self.assertEqual(2, len(events))
+        self.assertEqual('M', events[0]['ph'])
+        self.assertEqual('unzip', events[1]['name'])
+        self.assertEqual('X', events[1]['ph'])
+        self.assertEqual({'entry': 'x'}, events[1]['args'])
+        self.assertTrue(events[1]['dur'] >= 0)
+        self.assertEqual(os.getpid(), events[1]['pid'])
+
+    def test_span_recorded_on_exception(self):
+        tracer = TraceRecorder()
+        try:
+            with tracer.span('fail'):
+                raise ValueError('error')
+        except ValueError:
+            pass
+        self.assertEqual('fail', tracer.get_events()[-1]['name'])
+
+    def test_add_events_and_clear(self):
+        tracer = TraceRecorder()
+        tracer.add_events([{'name': 'a', 'ph': 'X'}])
+        self.assertEqual(1, len(tracer.get_events()))
+        tracer.clear()
+        self.assertEqual([], tracer.get_events())
+
+    def test_write(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tracer = TraceRecorder()
+            with tracer.span('write'):
+                pass
+            trace_file = os.path.join(temp_dir, 'trace.json')
+            tracer.write(trace_file)
+            with open(trace_file, 'r') as f:
+                res = json.load(f)
+            self.assertEqual('write', res['traceEvents'][-1]['name'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_writes_trace_with_stage_spans(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            datadir = os.path.join(temp_dir, 'data')
+            biogrid_fixtures.create_release_files(datadir)
+            trace_file = os.path.join(temp_dir, 'trace.json')
+            args = biogrid_fixtures.get_args(datadir,
+                                             extra_args=['--tracefile',
+                                                         trace_file])
+            loader = biogrid_fixtures.create_loader(args)
+            self.assertEqual(0, loader.run())
+            with open(trace_file, 'r') as f:
+                res = json.load(f)
+            names = set()
+            entries = set()
+            for event in res['traceEvents']:
+                if event['ph'] == 'X':
+                    names.add(event['name'])
+                    entries.add(event.get('args', {}).get('entry'))
+            for stage in ['entry', 'unzip', 'aggregate', 'convert',
+                          'collapse', 'layout', 'write', 'upload']:
+                self.assertTrue(stage in names, stage)
+            self.assertTrue('BIOGRID-ORGANISM-Mus_musculus' in entries)
+            self.assertTrue('BIOGRID-CHEMICALS' in entries)
+        finally:
+            shutil.rmtree(temp_dir)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `watcher` module."""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import zipfile
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from ndexbiogridloader import watcher
+from ndexbiogridloader import ndexloadbiogrid
+
+
+INDEX_PAGE = """<html><body>
+<a href="/BioGRID/Release-Archive/BIOGRID-4.2.191/">BIOGRID-4.2.191</a>
+<a href="/BioGRID/Release-Archive/BIOGRID-4.4.200/">BIOGRID-4.4.200</a>
+<a href="/BioGRID/Release-Archive/BIOGRID-4.10.1/">BIOGRID-4.10.1</a>
+<a href="/BioGRID/Release-Archive/BIOGRID-3.5.187/">BIOGRID-3.5.187</a>
+</body></html>"""
+
+
+class _IndexHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = self.server.page.encode('utf-8')
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWatcher(unittest.TestCase):
+    """Tests for `watcher` module."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _IndexHandler)
+        self._server.page = INDEX_PAGE
+        self._server.status = 200
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._url = 'http://127.0.0.1:' + str(self._server.server_address[1]) + '/'
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self._temp_dir)
+
+    def _get_args(self, extra_args=None):
+        return ndexloadbiogrid._parse_arguments('desc', [self._temp_dir,
+                                                         '--watch', '60',
+                                                         '--watchmaxbackoff', '300',
+                                                         '--releaseindexurl', self._url] +
+                                                (extra_args or []))
+
+    def _get_loader_factory(self, exit_codes):
+        created = []
+
+        def factory(args):
+            loader = MagicMock()
+            loader.run.return_value = exit_codes.pop(0)
+            created.append(args)
+            return loader
+        return factory, created
+
+    def test_parse_versions(self):
+        self.assertEqual(['3.5.187', '4.2.191', '4.4.200', '4.10.1'],
+                         watcher.parse_versions(INDEX_PAGE + INDEX_PAGE))
+        self.assertEqual([], watcher.parse_versions('<html></html>'))
+
+    def test_parse_arguments(self):
+        args = ndexloadbiogrid._parse_arguments('desc', [self._temp_dir])
+        self.assertIsNone(args.watch)
+        self.assertEqual(watcher.RELEASE_ARCHIVE_URL, args.releaseindexurl)
+        self.assertEqual(86400, args.watchmaxbackoff)
+
+    def test_loads_newest_version_once(self):
+        factory, created = self._get_loader_factory([0])
+        sleeps = []
+        release_watcher = watcher.ReleaseWatcher(self._get_args(['--skipdownload']),
+                                                 factory, sleep=sleeps.append)
+        self.assertEqual('4.2.191', release_watcher.get_last_loaded_version())
+        self.assertEqual(0, release_watcher.run(max_checks=3))
+        self.assertEqual(1, len(created))
+        self.assertEqual('4.10.1', created[0].biogridversion)
+        self.assertEqual(os.path.join(self._temp_dir, '4.10.1'),
+                         created[0].datadir)
+        self.assertFalse(created[0].skipdownload)
+        self.assertEqual([60, 60], sleeps)
+        with open(os.path.join(self._temp_dir, watcher.WATCH_STATE_FILE)) as f:
+            self.assertEqual('4.10.1', json.load(f)['lastLoadedVersion'])
+
+        # state is kept across restarts
+        release_watcher = watcher.ReleaseWatcher(self._get_args(), factory)
+        self.assertEqual('4.10.1', release_watcher.get_last_loaded_version())
+        self.assertIsNone(release_watcher.get_new_version())
+
+    def test_no_newer_version(self):
+        factory, created = self._get_loader_factory([])
+        release_watcher = watcher.ReleaseWatcher(self._get_args(['--biogridversion',
+                                                                 '5.0.1']),
+                                                 factory)
+        self.assertEqual(0, release_watcher.check())
+        self.assertEqual([], created)
+
+    def test_backs_off_on_failures(self):
+        factory, created = self._get_loader_factory([2, 2, 0])
+        sleeps = []
+        release_watcher = watcher.ReleaseWatcher(self._get_args(), factory,
+                                                 sleep=sleeps.append)
+        self._server.status = 503
+        self.assertEqual(2, release_watcher.check())
+        self._server.status = 200
+        self.assertEqual(0, release_watcher.run(max_checks=4))
+        self.assertEqual(3, len(created))
+        self.assertEqual(['4.10.1'] * 3, [a.biogridversion for a in created])
+        self.assertEqual([120, 240, 60], sleeps)
+        self.assertEqual([120, 240, 300, 300],
+                         [release_watcher.get_wait(2) for i in range(4)])
+        self.assertEqual(60, release_watcher.get_wait(0))
+
+    def test_backs_off_when_loader_raises(self):
+        results = [zipfile.BadZipFile('truncated'), OSError('disk full'), 0]
+        created = []
+
+        def factory(args):
+            loader = MagicMock()
+            loader.run.side_effect = [results.pop(0)]
+            created.append(args)
+            return loader
+        sleeps = []
+        release_watcher = watcher.ReleaseWatcher(self._get_args(), factory,
+                                                 sleep=sleeps.append)
+        self.assertEqual(0, release_watcher.run(max_checks=3))
+        self.assertEqual(3, len(created))
+        self.assertEqual([120, 240], sleeps)
+        self.assertEqual('4.10.1', release_watcher.get_last_loaded_version())
+
+    def test_main_runs_watch_mode(self):
+        with patch('ndexbiogridloader.watcher.watch',
+                   return_value=0) as mock_watch:
+            self.assertEqual(0, ndexloadbiogrid.main(['prog', self._temp_dir,
+                                                      '--watch', '10']))
+        self.assertEqual(10, mock_watch.call_args[0][0].watch)